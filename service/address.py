@@ -7,8 +7,10 @@ Contiene funciones y clases utilizadas para normalizar direcciones (recurso
 
 from abc import ABC, abstractmethod
 from service import names as N
-from service import data, constants, utils
-from service.geometry import Point, street_block_number_location
+from service import data, constants
+from service.geometry import Point, street_block_number_locations
+from service.geometry import approximate_distances_meters, geojson_circles
+from service.geometry import midpoints
 from service.query_result import QueryResult
 
 
@@ -57,9 +59,15 @@ class AddressQueryPlanner(ABC):
         requeridos para completar la búsqueda de los datos la dirección.
         Distintas direcciones requieren distintas cantidades de pasos.
 
+        Cada paso puede producir una búsqueda, o una lista de búsquedas
+        independientes entre sí que deben ser ejecutadas en la misma ronda.
+        En el primer caso, se envía al iterador el resultado de la búsqueda;
+        en el segundo, una lista con los resultados de cada búsqueda (en el
+        mismo orden).
+
         Yields:
-            ElasticsearchSearch: Búsqueda que debe ser ejecutada por el
-                invocador de 'next()'.
+            ElasticsearchSearch, list: Búsqueda, o lista de búsquedas, que
+                debe ser ejecutada por el invocador de 'next()'.
 
         """
         raise NotImplementedError()
@@ -115,6 +123,28 @@ class AddressQueryPlanner(ABC):
 
         return data.StreetBlocksSearch(query)
 
+    def _build_street_blocks_searches(self, add_number=False):
+        """Crea una búsqueda de cuadras por cada calle de la dirección, para
+        ser ejecutadas en una misma ronda. Se buscan todas las cuadras
+        posibles de cada calle.
+
+        Args:
+            add_number (bool): Si es verdadero, agrega a la búsqueda de la
+                primera calle un filtrado por altura (ver
+                '_build_street_blocks_search').
+
+        Returns:
+            list: Lista de StreetBlocksSearch, una por cada calle de la
+                dirección (en orden).
+
+        """
+        return [
+            self._build_street_blocks_search(street,
+                                             add_number=add_number and i == 0,
+                                             force_all=True)
+            for i, street in enumerate(self._address_data.street_names)
+        ]
+
     def _address_full_name(self, *streets):
         """Obtiene una representación canónica de una dirección, utilizando los
         nombres ya normalizados de las calles que la componen (y su altura).
@@ -380,8 +410,20 @@ class AddressSimpleQueryPlanner(AddressQueryPlanner):
         """
         address_hits = []
         fields = self._format[N.FIELDS]
+        street_blocks = self._elasticsearch_result.hits
+
+        if N.LOCATION_LAT in fields or N.LOCATION_LON in fields:
+            # Calcular las posiciones de todas las cuadras a la vez
+            points = street_block_number_locations(
+                [(block[N.GEOM], block[N.DOOR_NUM])
+                 for block in street_blocks],
+                self._numerical_door_number,
+                approximate=True
+            )
+        else:
+            points = [None] * len(street_blocks)
 
-        for street_block in self._elasticsearch_result.hits:
+        for street_block, point in zip(street_blocks, points):
             street = street_block[N.STREET]
             address_hit = self._build_base_address_hit(
                 street.get(N.STATE), street.get(N.DEPT),
@@ -395,14 +437,7 @@ class AddressSimpleQueryPlanner(AddressQueryPlanner):
             if N.FULL_NAME in fields:
                 address_hit[N.FULL_NAME] = self._address_full_name(street)
 
-            if N.LOCATION_LAT in fields or N.LOCATION_LON in fields:
-                point = street_block_number_location(
-                    street_block[N.GEOM],
-                    street_block[N.DOOR_NUM],
-                    self._numerical_door_number,
-                    approximate=True
-                )
-
+            if point:
                 address_hit[N.LOCATION] = point.to_json_location()
 
             address_hits.append(address_hit)
@@ -487,10 +522,8 @@ class AddressIsctQueryPlanner(AddressQueryPlanner):
             query['offset'] = 0
 
         if points:
-            query['geo_shape_geoms'] = [
-                point.to_geojson_circle(tolerance_m)
-                for point in points
-            ]
+            query['geo_shape_geoms'] = geojson_circles(list(points),
+                                                       tolerance_m)
 
         return data.IntersectionsSearch(query)
 
@@ -519,14 +552,13 @@ class AddressIsctQueryPlanner(AddressQueryPlanner):
         # geográfica de cada altura por cada resultado de la calle 1.
         # Ignorar los resultados donde la ubicación no se puede calcular.
         if self._numerical_door_number:
-            for street_block in result.hits:
-                street = street_block[N.STREET]
+            points = street_block_number_locations(
+                [(block[N.GEOM], block[N.DOOR_NUM]) for block in result.hits],
+                self._numerical_door_number
+            )
 
-                point = street_block_number_location(
-                    street_block[N.GEOM],
-                    street_block[N.DOOR_NUM],
-                    self._numerical_door_number
-                )
+            for street_block, point in zip(result.hits, points):
+                street = street_block[N.STREET]
 
                 if point:
                     street_1_ids.add(street[N.ID])
@@ -547,9 +579,9 @@ class AddressIsctQueryPlanner(AddressQueryPlanner):
 
         Pasos requeridos:
             1) Expandir búsqueda de localidad, si la hay.
-            2) Búsqueda de la calle principal (calle 1).
-            3) Búsqueda de la calle 2.
-            4) Búsqueda de intersecciones entre las calles 1 y 2.
+            2) Búsqueda de la calle principal (calle 1) y de la calle 2 (en
+               simultáneo).
+            3) Búsqueda de intersecciones entre las calles 1 y 2.
 
         Explicación: Primero, se buscan las calles 1 y 2, obteniendo todos los
         IDs de las mismas. Luego, se buscan intersecciones de calles que
@@ -559,8 +591,8 @@ class AddressIsctQueryPlanner(AddressQueryPlanner):
         a la calle 1 y la B a la 2, o vice versa.
 
         Yields:
-            ElasticsearchSearch: Búsqueda que debe ser ejecutada por el
-                invocador de 'next()'.
+            ElasticsearchSearch, list: Búsqueda, o lista de búsquedas, que
+                debe ser ejecutada por el invocador de 'next()'.
 
         """
         if self._locality:
@@ -568,15 +600,14 @@ class AddressIsctQueryPlanner(AddressQueryPlanner):
             if not found:
                 return
 
-        # Buscar la primera calle, incluyendo la altura si está presente
-        result = yield self._build_street_blocks_search(
-            self._address_data.street_names[0],
-            add_number=True,
-            force_all=True
-        )
+        # Buscar las dos calles en la misma ronda, ya que sus búsquedas son
+        # independientes entre sí. La primera calle incluye la altura si está
+        # presente.
+        result_1, result_2 = yield self._build_street_blocks_searches(
+            add_number=True)
 
         street_1_ids, street_1_points = self._read_street_blocks_1_results(
-            result)
+            result_1)
 
         if not street_1_ids:
             # Ninguno de los resultados pudo ser utilizado para
@@ -584,13 +615,8 @@ class AddressIsctQueryPlanner(AddressQueryPlanner):
             # Devolver 0 resultados de intersección.
             return
 
-        result = yield self._build_street_blocks_search(
-            self._address_data.street_names[1],
-            force_all=True
-        )
-
         # Resultados de la segunda calle
-        street_2_ids = {hit[N.STREET][N.ID] for hit in result.hits}
+        street_2_ids = {hit[N.STREET][N.ID] for hit in result_2.hits}
         if not street_2_ids:
             return
 
@@ -759,37 +785,15 @@ class AddressBtwnQueryPlanner(AddressIsctQueryPlanner):
             self.street_3 = None
             self.street_3_point = None
 
-        def valid(self):
-            """Comprueba que el resultado potencial 'between' sea válido.
-
-            Returns:
-                bool: Verdadero si las tres calles están presentes y las
-                    calles 2 y 3 no están a mas de cierta distancia entre sí.
-
-            """
-            if not all((self.street_1, self.street_2, self.street_3)):
-                return False
-
-            distance = self.street_2_point.approximate_distance_meters(
-                self.street_3_point)
-
-            return distance < constants.BTWN_DISTANCE_TOLERANCE_M
-
-        def point(self):
-            """Devuelve el punto 'Point' que representa la dirección
-            encontrada.
+        def complete(self):
+            """Comprueba que el resultado potencial 'between' tenga sus tres
+            calles presentes.
 
             Returns:
-                Point: Punto representativo de la dirección. Si calculó la
-                    posición de la altura sobre la calle 1, se utiliza ese
-                    dato. Si no, se utiliza el promedio de los puntos de las
-                    dos intersecciones encontradas (calle 1-2, calle 1-3).
+                bool: Verdadero si las tres calles están presentes.
 
             """
-            if self.street_1_point:
-                return self.street_1_point
-
-            return self.street_2_point.midpoint(self.street_3_point)
+            return all((self.street_1, self.street_2, self.street_3))
 
     def __init__(self, query, fmt):
         """Inicializa un objeto de tipo 'AddressBtwnQueryPlanner'.
@@ -880,10 +884,9 @@ class AddressBtwnQueryPlanner(AddressIsctQueryPlanner):
 
         Pasos requeridos:
             1) Expandir búsqueda de localidad, si la hay.
-            2) Búsqueda de la calle principal (calle 1).
-            3) Búsqueda de la calle 2.
-            4) Búsqueda de la calle 3.
-            5) Búsqueda de intersecciones entre las calles 1 y 2, y las calles
+            2) Búsqueda de la calle principal (calle 1), de la calle 2 y de
+               la calle 3 (en simultáneo).
+            3) Búsqueda de intersecciones entre las calles 1 y 2, y las calles
                1 y 3 (en simultáneo).
 
         Explicación: Primero, se buscan las calles 1, 2 y 3, obteniendo todos
@@ -894,8 +897,8 @@ class AddressBtwnQueryPlanner(AddressIsctQueryPlanner):
         finales.
 
         Yields:
-            ElasticsearchSearch: Búsqueda que debe ser ejecutada por el
-                invocador de 'next()'.
+            ElasticsearchSearch, list: Búsqueda, o lista de búsquedas, que
+                debe ser ejecutada por el invocador de 'next()'.
 
         """
         if self._locality:
@@ -903,15 +906,14 @@ class AddressBtwnQueryPlanner(AddressIsctQueryPlanner):
             if not found:
                 return
 
-        # Buscar la primera calle, incluyendo la altura si está presente
-        result = yield self._build_street_blocks_search(
-            self._address_data.street_names[0],
-            add_number=True,
-            force_all=True
-        )
+        # Buscar las tres calles en la misma ronda, ya que sus búsquedas son
+        # independientes entre sí. La primera calle incluye la altura si está
+        # presente.
+        result_1, result_2, result_3 = \
+            yield self._build_street_blocks_searches(add_number=True)
 
         street_1_ids, street_1_points = self._read_street_blocks_1_results(
-            result)
+            result_1)
 
         if not street_1_ids:
             # Ninguno de los resultados pudo ser utilizado para
@@ -919,23 +921,13 @@ class AddressBtwnQueryPlanner(AddressIsctQueryPlanner):
             # Devolver 0 resultados de intersección.
             return
 
-        result = yield self._build_street_blocks_search(
-            self._address_data.street_names[1],
-            force_all=True
-        )
-
         # Resultados de la segunda calle
-        street_2_ids = {hit[N.STREET][N.ID] for hit in result.hits}
+        street_2_ids = {hit[N.STREET][N.ID] for hit in result_2.hits}
         if not street_2_ids:
             return
 
-        result = yield self._build_street_blocks_search(
-            self._address_data.street_names[2],
-            force_all=True
-        )
-
         # Resultados de la tercera calle
-        street_3_ids = {hit[N.STREET][N.ID] for hit in result.hits}
+        street_3_ids = {hit[N.STREET][N.ID] for hit in result_3.hits}
         if not street_3_ids:
             return
 
@@ -953,11 +945,55 @@ class AddressBtwnQueryPlanner(AddressIsctQueryPlanner):
                                               street_2_ids, street_3_ids,
                                               street_1_points)
 
-        # Las tres calles deben estar presentes, y las dos intersecciones
-        # deben estar a menos de cierta distancia entre sí
         self._between_hits = self._build_between_hits(
-            entry for entry in entries if entry.valid()
-        )
+            self._valid_between_entries(entries))
+
+    def _valid_between_entries(self, entries):
+        """Filtra los resultados potenciales 'between' válidos: las tres
+        calles deben estar presentes, y las dos intersecciones deben estar a
+        menos de cierta distancia entre sí. Las distancias de todos los
+        resultados se calculan a la vez.
+
+        Args:
+            entries (list): Lista de 'BetweenEntry'.
+
+        Returns:
+            list: Lista de 'BetweenEntry' válidas.
+
+        """
+        entries = [entry for entry in entries if entry.complete()]
+        distances = approximate_distances_meters(
+            [entry.street_2_point for entry in entries],
+            [entry.street_3_point for entry in entries])
+
+        return [
+            entry for entry, distance in zip(entries, distances)
+            if distance < constants.BTWN_DISTANCE_TOLERANCE_M
+        ]
+
+    def _between_points(self, entries):
+        """Calcula los puntos 'Point' que representan cada dirección
+        encontrada. Si se calculó la posición de la altura sobre la calle 1,
+        se utiliza ese dato. Si no, se utiliza el punto medio entre las dos
+        intersecciones encontradas (calle 1-2, calle 1-3). Los puntos medios
+        de todos los resultados se calculan a la vez.
+
+        Args:
+            entries (list): Lista de 'BetweenEntry' válidas.
+
+        Returns:
+            list: Lista de 'Point', uno por resultado.
+
+        """
+        pending = [entry for entry in entries if not entry.street_1_point]
+        middle_points = iter(midpoints(
+            [entry.street_2_point for entry in pending],
+            [entry.street_3_point for entry in pending]))
+
+        return [
+            entry.street_1_point or next(middle_points)
+            for entry in entries
+        ]
 
     def _build_between_hits(self, entries):
         """Construye los resultados de la búsqueda de direcciones, dada una
@@ -973,7 +1009,12 @@ class AddressBtwnQueryPlanner(AddressIsctQueryPlanner):
         between_hits = []
         fields = self._format[N.FIELDS]
 
-        for entry in entries:
+        if N.LOCATION_LAT in fields or N.LOCATION_LON in fields:
+            points = self._between_points(entries)
+        else:
+            points = [None] * len(entries)
+
+        for entry, point in zip(entries, points):
             address_hit = self._build_base_address_hit(
                 entry.street_1.get(N.STATE), entry.street_1.get(N.DEPT),
                 entry.street_1.get(N.CENSUS_LOCALITY))
@@ -985,8 +1026,7 @@ class AddressBtwnQueryPlanner(AddressIsctQueryPlanner):
                 entry.street_3)
             address_hit[N.SOURCE] = entry.street_1[N.SOURCE]
 
-            if N.LOCATION_LAT in fields or N.LOCATION_LON in fields:
-                point = entry.point()
+            if point:
                 address_hit[N.LOCATION] = point.to_json_location()
 
             if N.FULL_NAME in fields:
@@ -1034,44 +1074,22 @@ def _run_query_planners(es, query_planners):
     'AddressQueryPlanner'.
 
     Para lograr esto, se utiliza el método 'planner_steps' de cada
-    'AddressQueryPlanner' para obtener un iterador de 'ElasticsearchSearch'. A
-    cada iterador se le pide la primera búsqueda a ejecutar utilizando
-    'next()'. Luego, se ejecutan todas las búsquedas a la vez utilizando
-    'run_searches', y se entregan los resultados a los iteradores. El proceso
-    se repite hasta que todos los iteradores no tengan más busquedas a
-    realizar. De esta forma, se logra ejecutar varias búsquedas de direcciones
-    de distintos tipos, minimizando la cantidad de consultas hechas a
-    Elasticsearch.
+    'AddressQueryPlanner' para obtener un iterador de 'ElasticsearchSearch'.
+    Los iteradores son ejecutados utilizando 'data.run_search_steps', que
+    agrupa en cada ronda todas las búsquedas pendientes de todos los
+    iteradores, incluyendo los pasos adicionales de cada búsqueda (validación
+    de IDs, búsquedas de localidades, etc.). De esta forma, se logra ejecutar
+    varias búsquedas de direcciones de distintos tipos, minimizando la
+    cantidad de consultas hechas a Elasticsearch.
 
     Args:
         es (Elasticsearch): Conexión a Elasticsearch.
         query_planners (list): Lista de 'AddressQueryPlanner' o derivados.
 
     """
-    iterators = [planner.planner_steps() for planner in query_planners]
-    iteration_data = []
-
-    for iterator in iterators:
-        # Generar datos de primera iteración
-        search = utils.step_iterator(iterator)
-        if search:
-            iteration_data.append((iterator, search))
-
-    while iteration_data:
-        # Tomar las búsquedas anteriores, ejecutarlas, tomar los resultados y
-        # entregárselos a los QueryPlanners para que generen nuevas búsquedas
-        # (si las necesitan). Repetir cuantas veces sea necesario.
-
-        searches = [search for _, search in iteration_data]
-        data.ElasticsearchSearch.run_searches(es, searches)
-
-        iterators = (iterator for iterator, _ in iteration_data)
-        iteration_data = []
-
-        for iterator, prev_search in zip(iterators, searches):
-            search = utils.step_iterator(iterator, prev_search.result)
-            if search:
-                iteration_data.append((iterator, search))
+    data.run_search_steps(es, [
+        planner.planner_steps() for planner in query_planners
+    ])
 
 
 def run_address_queries(es, params_list, queries, formats):
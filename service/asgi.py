@@ -0,0 +1,456 @@
+"""Módulo 'asgi' de georef-ar-api.
+
+Expone la aplicación Flask de la API (recursos bajo /api y /api/v1.0) mediante
+la interfaz ASGI, para poder ser ejecutada con servidores como uvicorn:
+
+    uvicorn service.asgi:app
+
+Requiere las dependencias listadas en 'requirements-asgi.txt'.
+
+Cada request HTTP es procesada por la aplicación Flask dentro de un greenlet
+propio, en uno de unos pocos threads de trabajo. Todas las consultas a
+Elasticsearch se envían desde un único event loop asyncio, utilizando una
+conexión asincrónica (ver 'data.AsyncSearchRunner'): mientras una request
+espera una respuesta de Elasticsearch (o más datos de su cuerpo, o que el
+cliente reciba su respuesta), su greenlet se suspende y el thread continúa
+procesando otras requests. De esta forma, un mismo proceso puede mantener
+cientos de consultas a Elasticsearch en curso sin necesitar un thread por
+cada una, y el event loop no ejecuta código de la aplicación. Los iteradores
+'search_steps' y 'planner_steps' se utilizan sin modificaciones.
+
+Las operaciones bloqueantes que no pasan por el event loop (por ejemplo,
+lecturas de archivos) bloquean a todas las requests del mismo thread de
+trabajo.
+"""
+
+import asyncio
+import io
+import itertools
+import queue
+import sys
+import threading
+import greenlet
+from service import app as flask_app
+from service import data
+
+DEFAULT_MAX_REQUESTS = 200
+DEFAULT_THREADS = 4
+
+
+def build_environ(scope, body):
+    """Construye un diccionario 'environ' WSGI a partir de una request HTTP
+    ASGI.
+
+    Args:
+        scope (dict): Scope ASGI de la request (tipo 'http').
+        body (io.BufferedReader): Cuerpo de la request (ver
+            '_RequestBody').
+
+    Returns:
+        dict: Diccionario 'environ' WSGI.
+
+    """
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode().decode('latin-1'),
+        'PATH_INFO': scope['path'].encode().decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': 'HTTP/{}'.format(scope.get('http_version', '1.1')),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        # El cuerpo finaliza cuando el servidor ASGI lo indica, por lo que
+        # puede ser leído aunque su largo no sea conocido (por ejemplo, en
+        # una request con 'Transfer-Encoding: chunked').
+        'wsgi.input_terminated': True,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False
+    }
+
+    client = scope.get('client')
+    if client:
+        environ['REMOTE_ADDR'] = client[0]
+        environ['REMOTE_PORT'] = str(client[1])
+
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1')
+        value = value.decode('latin-1')
+
+        if name == 'content-type':
+            key = 'CONTENT_TYPE'
+        elif name == 'content-length':
+            key = 'CONTENT_LENGTH'
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+
+        if key in environ:
+            value = environ[key] + ',' + value
+
+        environ[key] = value
+
+    return environ
+
+
+class _RequestBody(io.RawIOBase):
+    """Cuerpo de una request HTTP ASGI, leído a medida que la aplicación WSGI
+    lo consume. Cada lectura que requiere más datos espera el siguiente
+    mensaje ASGI 'http.request' (ver '_Worker.wait').
+
+    Attributes:
+        _receive (coroutine function): Función 'receive' ASGI.
+        _wait (function): Función que ejecuta una corrutina en el event loop
+            y devuelve su resultado.
+        _chunk (memoryview): Datos recibidos todavía no leídos.
+        _more_body (bool): Falso si ya se recibió el último mensaje del
+            cuerpo (o si el cliente se desconectó).
+
+    """
+
+    def __init__(self, receive, wait):
+        """Inicializa un objeto de tipo _RequestBody.
+
+        Args:
+            receive (coroutine function): Ver atributo '_receive'.
+            wait (function): Ver atributo '_wait'.
+
+        """
+        super().__init__()
+        self._receive = receive
+        self._wait = wait
+        self._chunk = memoryview(b'')
+        self._more_body = True
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._chunk and self._more_body:
+            message = self._wait(self._receive())
+            if message['type'] == 'http.disconnect':
+                self._more_body = False
+            else:
+                self._chunk = memoryview(message.get('body', b''))
+                self._more_body = message.get('more_body', False)
+
+        length = min(len(b), len(self._chunk))
+        b[:length] = self._chunk[:length]
+        self._chunk = self._chunk[length:]
+
+        return length
+
+
+def _set_future_result(future, exception):
+    """Finaliza un futuro asyncio, si el mismo no fue cancelado. Debe ser
+    invocado desde el event loop.
+
+    Args:
+        future (asyncio.Future): Futuro a finalizar.
+        exception (BaseException): Excepción a asignar al futuro, o 'None'
+            para asignarle un resultado vacío.
+
+    """
+    if future.done():
+        return
+
+    if exception is None:
+        future.set_result(None)
+    else:
+        future.set_exception(exception)
+
+
+class _Worker:
+    """Thread de trabajo que ejecuta funciones (requests WSGI) cada una en su
+    propio greenlet. El greenlet principal del thread espera eventos en
+    '_events', y los despacha al greenlet correspondiente: funciones nuevas a
+    ejecutar, o resultados de corrutinas que un greenlet estaba esperando.
+
+    Attributes:
+        _loop (asyncio.AbstractEventLoop): Event loop de la aplicación.
+        _events (queue.SimpleQueue): Eventos a despachar: tuplas de
+            (greenlet, valor). Si el greenlet es 'None', el valor es una
+            función a ejecutar en un nuevo greenlet (o 'None' para finalizar
+            el thread).
+        _hub (greenlet.greenlet): Greenlet principal del thread.
+        _thread (threading.Thread): Thread de trabajo.
+
+    """
+
+    __slots__ = ['_loop', '_events', '_hub', '_thread']
+
+    def __init__(self, loop, es):
+        """Inicializa un objeto de tipo _Worker, e inicia su thread.
+
+        Args:
+            loop (asyncio.AbstractEventLoop): Ver atributo '_loop'.
+            es (AsyncElasticsearch): Conexión asincrónica a Elasticsearch.
+
+        """
+        self._loop = loop
+        self._events = queue.SimpleQueue()
+        self._hub = None
+        self._thread = threading.Thread(target=self._run, args=(es,),
+                                        daemon=True)
+        self._thread.start()
+
+    def _run(self, es):
+        """Despacha los eventos recibidos hasta recibir el evento de
+        finalización.
+
+        Args:
+            es (AsyncElasticsearch): Conexión asincrónica a Elasticsearch.
+
+        """
+        self._hub = greenlet.getcurrent()
+        data.set_thread_search_runner(data.AsyncSearchRunner(
+            self._loop, es, self.wait))
+
+        while True:
+            target, value = self._events.get()
+
+            if target is None:
+                if value is None:
+                    return
+
+                target = greenlet.greenlet(value)
+
+            target.switch(value)
+
+    def submit(self, fn):
+        """Ejecuta una función en un nuevo greenlet del thread de trabajo.
+
+        Args:
+            fn (function): Función a ejecutar (sin argumentos).
+
+        Returns:
+            asyncio.Future: Futuro que finaliza junto con la función. Debe
+                ser esperado desde el event loop.
+
+        """
+        future = self._loop.create_future()
+
+        def run(_):
+            try:
+                fn()
+            except greenlet.GreenletExit:
+                raise
+            except BaseException as e:  # pylint: disable=broad-except
+                self._loop.call_soon_threadsafe(_set_future_result, future,
+                                                e)
+            else:
+                self._loop.call_soon_threadsafe(_set_future_result, future,
+                                                None)
+
+        self._events.put((None, run))
+        return future
+
+    def wait(self, coro):
+        """Ejecuta una corrutina en el event loop y devuelve su resultado.
+        Mientras la corrutina se ejecuta, el greenlet actual se suspende y el
+        thread continúa despachando eventos. Debe ser invocado desde un
+        greenlet creado por 'submit'.
+
+        Args:
+            coro (coroutine): Corrutina a ejecutar.
+
+        Returns:
+            object: Resultado de la corrutina.
+
+        """
+        current = greenlet.getcurrent()
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        future.add_done_callback(
+            lambda done: self._events.put((current, done)))
+
+        return self._hub.switch().result()
+
+    def stop(self):
+        """Finaliza el thread de trabajo una vez despachados los eventos
+        pendientes."""
+        self._events.put((None, None))
+
+
+class GeorefASGIApp:
+    """Aplicación ASGI que procesa requests HTTP utilizando una aplicación
+    WSGI (Flask), ejecutando sus búsquedas Elasticsearch en el event loop.
+
+    Attributes:
+        _wsgi_app (flask.Flask): Aplicación WSGI a utilizar.
+        _max_requests (int): Cantidad máxima de requests a procesar
+            simultáneamente.
+        _threads (int): Cantidad de threads de trabajo.
+        _workers (list): Threads de trabajo (_Worker).
+        _next_worker (iterator): Iterador cíclico sobre '_workers'.
+        _semaphore (asyncio.Semaphore): Semáforo utilizado para limitar la
+            cantidad de requests simultáneas.
+        _es (AsyncElasticsearch): Conexión asincrónica a Elasticsearch.
+
+    """
+
+    __slots__ = ['_wsgi_app', '_max_requests', '_threads', '_workers',
+                 '_next_worker', '_semaphore', '_es']
+
+    def __init__(self, wsgi_app, max_requests=DEFAULT_MAX_REQUESTS,
+                 threads=DEFAULT_THREADS):
+        """Inicializa un objeto de tipo GeorefASGIApp.
+
+        Args:
+            wsgi_app (flask.Flask): Ver atributo '_wsgi_app'.
+            max_requests (int): Ver atributo '_max_requests'.
+            threads (int): Ver atributo '_threads'.
+
+        """
+        self._wsgi_app = wsgi_app
+        self._max_requests = max_requests
+        self._threads = max(threads, 1)
+        self._workers = None
+        self._next_worker = None
+        self._semaphore = None
+        self._es = None
+
+    def _startup(self):
+        """Crea la conexión asincrónica a Elasticsearch y los threads de
+        trabajo. Debe ser invocado desde el event loop.
+
+        """
+        if self._workers is not None:
+            return
+
+        config = self._wsgi_app.config
+        self._es = data.async_elasticsearch_connection(
+            hosts=config['ES_HOSTS'],
+            sniff=config['ES_SNIFF'],
+            sniffer_timeout=config['ES_SNIFFER_TIMEOUT']
+        )
+
+        loop = asyncio.get_running_loop()
+        self._workers = [_Worker(loop, self._es)
+                         for _ in range(self._threads)]
+        self._next_worker = itertools.cycle(self._workers)
+        self._semaphore = asyncio.Semaphore(self._max_requests)
+
+    async def _shutdown(self):
+        """Libera los recursos creados por '_startup'."""
+        if self._workers is None:
+            return
+
+        for worker in self._workers:
+            worker.stop()
+
+        self._workers = None
+        self._next_worker = None
+
+        await self._es.close()
+        self._es = None
+
+    async def _lifespan(self, receive, send):
+        """Procesa los mensajes ASGI de tipo 'lifespan'.
+
+        Args:
+            receive (coroutine function): Función 'receive' ASGI.
+            send (coroutine function): Función 'send' ASGI.
+
+        """
+        while True:
+            message = await receive()
+
+            if message['type'] == 'lifespan.startup':
+                try:
+                    self._startup()
+                except Exception as e:  # pylint: disable=broad-except
+                    await send({'type': 'lifespan.startup.failed',
+                                'message': str(e)})
+                    return
+
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self._shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def _run_wsgi(self, worker, scope, receive, send):
+        """Procesa una request HTTP con la aplicación WSGI, y envía su
+        respuesta vía la función 'send' ASGI. Debe ser invocado desde un
+        greenlet de un thread de trabajo, nunca desde el event loop.
+
+        Args:
+            worker (_Worker): Thread de trabajo actual.
+            scope (dict): Scope ASGI de la request.
+            receive (coroutine function): Función 'receive' ASGI.
+            send (coroutine function): Función 'send' ASGI.
+
+        """
+        def send_message(message):
+            worker.wait(send(message))
+
+        response_start = {}
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and response_start.get('sent'):
+                raise exc_info[1].with_traceback(exc_info[2])
+
+            response_start['message'] = {
+                'type': 'http.response.start',
+                'status': int(status.split(' ', 1)[0]),
+                'headers': [
+                    (name.lower().encode('latin-1'), value.encode('latin-1'))
+                    for name, value in headers
+                ]
+            }
+
+        def send_start():
+            if not response_start.get('sent'):
+                send_message(response_start['message'])
+                response_start['sent'] = True
+
+        body = io.BufferedReader(_RequestBody(receive, worker.wait))
+        result = self._wsgi_app(build_environ(scope, body), start_response)
+
+        try:
+            for chunk in result:
+                if chunk:
+                    send_start()
+                    send_message({'type': 'http.response.body',
+                                  'body': chunk, 'more_body': True})
+
+            send_start()
+            send_message({'type': 'http.response.body', 'body': b''})
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+    async def __call__(self, scope, receive, send):
+        """Punto de entrada ASGI.
+
+        Args:
+            scope (dict): Scope ASGI.
+            receive (coroutine function): Función 'receive' ASGI.
+            send (coroutine function): Función 'send' ASGI.
+
+        """
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+
+        if scope['type'] != 'http':
+            raise ValueError('Unsupported scope type: {}'.format(
+                scope['type']))
+
+        # Si el servidor no soporta mensajes 'lifespan', inicializar los
+        # recursos al recibir la primera request.
+        self._startup()
+
+        async with self._semaphore:
+            worker = next(self._next_worker)
+            await worker.submit(
+                lambda: self._run_wsgi(worker, scope, receive, send))
+
+
+app = GeorefASGIApp(
+    flask_app,
+    flask_app.config.get('ASGI_MAX_REQUESTS', DEFAULT_MAX_REQUESTS),
+    flask_app.config.get('ASGI_THREADS', DEFAULT_THREADS))
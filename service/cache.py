@@ -0,0 +1,528 @@
+"""Módulo 'cache' de georef-ar-api.
+
+Contiene caches en memoria con tamaño máximo, con una misma interfaz similar
+a dict y distintas políticas de desalojo intercambiables:
+
+    - 'lfu': Desaloja la clave menos utilizada ("Least Frequently Used").
+    - 'lru': Desaloja la clave utilizada hace más tiempo ("Least Recently
+      Used").
+    - 'tinylfu': Política W-TinyLFU: las claves nuevas ingresan a una ventana
+      LRU pequeña, y solo son admitidas en el cache principal (LRU
+      segmentado) si su frecuencia de uso estimada supera a la de la clave
+      que desalojarían.
+
+Todas las operaciones de los caches tienen complejidad O(1). Cada cache
+cuenta las consultas exitosas ('hits'), las fallidas ('misses') y los
+desalojos ('evictions') realizados.
+"""
+
+from abc import ABC, abstractmethod
+import collections
+
+POLICY_LFU = 'lfu'
+POLICY_LRU = 'lru'
+POLICY_TINYLFU = 'tinylfu'
+
+POLICIES = [POLICY_LFU, POLICY_LRU, POLICY_TINYLFU]
+
+
+class Cache(ABC):
+    """Cache con tamaño máximo e interfaz similar a dict. Siempre se mantiene
+    la propiedad len(Cache(N)) <= N.
+
+    Las consultas de presencia ('key in cache') que no encuentran la clave se
+    cuentan como fallos, ya que el uso habitual de los caches es el siguiente:
+
+        if key in cache:
+            return cache[key]
+
+    Attributes:
+        _size (int): Cantidad máxima de ítems a almacenar.
+        hits (int): Cantidad de consultas que encontraron su clave.
+        misses (int): Cantidad de consultas que no encontraron su clave.
+        evictions (int): Cantidad de ítems desalojados.
+
+    """
+
+    __slots__ = ['_size', 'hits', 'misses', 'evictions']
+
+    def __init__(self, size):
+        """Inicializa un objeto de tipo Cache.
+
+        Args:
+            size (int): Ver atributo '_size'.
+
+        Raises:
+            ValueError: Si el tamaño es menor a 1.
+
+        """
+        if size < 1:
+            raise ValueError('size must be 1 or larger')
+
+        self._size = size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @abstractmethod
+    def _get(self, key):
+        """Devuelve el valor de una clave, registrando su uso.
+
+        Args:
+            key (object): Clave del ítem.
+
+        Raises:
+            KeyError: Si la clave no está almacenada.
+
+        Returns:
+            object: Valor almacenado bajo 'key'.
+
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _set(self, key, value):
+        """Almacena un ítem, desalojando otro si es necesario (ver
+        'evictions').
+
+        Args:
+            key (object): Clave del ítem.
+            value (object): Valor del ítem.
+
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _contains(self, key):
+        """Comprueba si una clave está almacenada, sin registrar su uso.
+
+        Args:
+            key (object): Clave a utilizar.
+
+        Returns:
+            bool: Verdadero si la clave está almacenada.
+
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def __len__(self):
+        raise NotImplementedError()
+
+    def __getitem__(self, key):
+        """Devuelve un ítem del cache.
+
+        Args:
+            key (object): Clave del ítem.
+
+        Raises:
+            KeyError: Si la clave no está almacenada.
+
+        Returns:
+            object: Valor almacenado bajo 'key'.
+
+        """
+        if key is None:
+            raise TypeError('Invalid key: None')
+
+        try:
+            value = self._get(key)
+        except KeyError:
+            self.misses += 1
+            raise
+
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        """Establece un ítem clave-valor del cache.
+
+        Args:
+            key (object): Clave del ítem.
+            value (object): Valor del ítem.
+
+        """
+        if key is None:
+            raise TypeError('Invalid key: None')
+
+        self._set(key, value)
+
+    def __contains__(self, key):
+        """Comprueba si una clave está contenida o no en el cache.
+
+        Args:
+            key (object): Clave a utilizar.
+
+        Returns:
+            bool: Verdadero si la clave está contenida en el cache.
+
+        """
+        found = self._contains(key)
+        if not found:
+            self.misses += 1
+
+        return found
+
+    def get(self, key, default=None):
+        """Devuelve un ítem del cache, o un valor por defecto.
+
+        Args:
+            key (object): Clave del ítem.
+            default (object): Valor a devolver si la clave no está
+                almacenada.
+
+        Returns:
+            object: Valor almacenado bajo 'key', o 'default'.
+
+        """
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def stats(self):
+        """Devuelve los contadores del cache.
+
+        Returns:
+            dict: Tamaño máximo, cantidad de ítems, consultas exitosas,
+                consultas fallidas y desalojos.
+
+        """
+        return {
+            'size': self._size,
+            'len': len(self),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, self.stats())
+
+
+class LRUCache(Cache):
+    """Cache LRU ("Least Recently Used"): cuando se llega al tamaño máximo,
+    se desaloja la clave utilizada hace más tiempo.
+
+    Attributes:
+        _items (collections.OrderedDict): Ítems almacenados, ordenados desde
+            el utilizado hace más tiempo al utilizado más recientemente.
+
+    """
+
+    __slots__ = ['_items']
+
+    def __init__(self, size):
+        super().__init__(size)
+        self._items = collections.OrderedDict()
+
+    def _get(self, key):
+        value = self._items[key]
+        self._items.move_to_end(key)
+        return value
+
+    def _set(self, key, value):
+        if key in self._items:
+            self._items.move_to_end(key)
+        elif len(self._items) >= self._size:
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+        self._items[key] = value
+
+    def _contains(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+
+class LFUCache(Cache):
+    """Cache LFU ("Least Frequently Used"): cuando se llega al tamaño
+    máximo, se desaloja la clave menos utilizada. Entre claves con la misma
+    cantidad de usos, se desaloja la utilizada hace más tiempo.
+
+    Para lograr desalojos en tiempo O(1), las claves se agrupan por cantidad
+    de usos (frecuencia), y se mantiene la frecuencia mínima de todas las
+    claves almacenadas.
+
+    Attributes:
+        _items (dict): Valor y frecuencia de cada clave.
+        _buckets (dict): Claves de cada frecuencia
+            (collections.OrderedDict), ordenadas desde la utilizada hace más
+            tiempo a la utilizada más recientemente.
+        _min_frequency (int): Frecuencia mínima de las claves almacenadas.
+
+    """
+
+    __slots__ = ['_items', '_buckets', '_min_frequency']
+
+    def __init__(self, size):
+        super().__init__(size)
+        self._items = {}
+        self._buckets = collections.defaultdict(collections.OrderedDict)
+        self._min_frequency = 0
+
+    def _touch(self, key, item):
+        """Incrementa la frecuencia de una clave almacenada.
+
+        Args:
+            key (object): Clave almacenada.
+            item (list): Valor y frecuencia de la clave.
+
+        """
+        frequency = item[1]
+        bucket = self._buckets[frequency]
+        del bucket[key]
+
+        if not bucket:
+            del self._buckets[frequency]
+            if self._min_frequency == frequency:
+                self._min_frequency = frequency + 1
+
+        item[1] = frequency + 1
+        self._buckets[frequency + 1][key] = None
+
+    def _get(self, key):
+        item = self._items[key]
+        self._touch(key, item)
+        return item[0]
+
+    def _set(self, key, value):
+        item = self._items.get(key)
+        if item is not None:
+            item[0] = value
+            self._touch(key, item)
+            return
+
+        if len(self._items) >= self._size:
+            bucket = self._buckets[self._min_frequency]
+            evicted, _ = bucket.popitem(last=False)
+            if not bucket:
+                del self._buckets[self._min_frequency]
+
+            del self._items[evicted]
+            self.evictions += 1
+
+        self._items[key] = [value, 0]
+        self._buckets[0][key] = None
+        self._min_frequency = 0
+
+    def _contains(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+
+class _FrequencySketch:
+    """Estimador de frecuencias de uso de claves (Count-Min Sketch) con
+    envejecimiento: luego de cierta cantidad de incrementos, todos los
+    contadores se dividen por dos, para que las claves populares en el pasado
+    no lo sean indefinidamente.
+
+    Attributes:
+        _mask (int): Máscara para obtener posiciones dentro de cada fila de
+            contadores.
+        _rows (list): Filas de contadores (una por función de hash).
+        _additions (int): Cantidad de incrementos desde el último
+            envejecimiento.
+        _sample_size (int): Cantidad de incrementos luego de la cual se
+            envejecen los contadores.
+
+    """
+
+    __slots__ = ['_mask', '_rows', '_additions', '_sample_size']
+
+    DEPTH = 4
+    MAX_COUNT = 15
+    SEEDS = (0x9E3779B1, 0x85EBCA77, 0xC2B2AE3D, 0x27D4EB2F)
+
+    def __init__(self, size):
+        """Inicializa un objeto de tipo _FrequencySketch.
+
+        Args:
+            size (int): Cantidad máxima de claves del cache asociado.
+
+        """
+        width = 1 << max(4 * size - 1, 1).bit_length()
+        self._mask = width - 1
+        self._rows = [[0] * width for _ in range(self.DEPTH)]
+        self._additions = 0
+        self._sample_size = 10 * size
+
+    def _indexes(self, key):
+        key_hash = hash(key)
+        return [
+            (((key_hash ^ seed) * 0x9E3779B97F4A7C15 & 0xFFFFFFFFFFFFFFFF) >>
+             32) & self._mask
+            for seed in self.SEEDS
+        ]
+
+    def increment(self, key):
+        """Registra un uso de una clave.
+
+        Args:
+            key (object): Clave utilizada.
+
+        """
+        for row, index in zip(self._rows, self._indexes(key)):
+            if row[index] < self.MAX_COUNT:
+                row[index] += 1
+
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._age()
+
+    def estimate(self, key):
+        """Estima la cantidad de usos de una clave.
+
+        Args:
+            key (object): Clave a utilizar.
+
+        Returns:
+            int: Cantidad de usos estimada.
+
+        """
+        return min(row[index]
+                   for row, index in zip(self._rows, self._indexes(key)))
+
+    def _age(self):
+        """Divide todos los contadores por dos."""
+        for row in self._rows:
+            row[:] = [count >> 1 for count in row]
+
+        self._additions //= 2
+
+
+class TinyLFUCache(Cache):
+    """Cache W-TinyLFU. Las claves nuevas ingresan a una ventana LRU (1% del
+    tamaño). Las claves desalojadas de la ventana son candidatas a ingresar al
+    cache principal, un LRU segmentado en claves en prueba ('probation', 20%)
+    y protegidas ('protected', 80%): una candidata solo es admitida si su
+    frecuencia estimada (ver '_FrequencySketch') es mayor que la de la clave
+    en prueba utilizada hace más tiempo, que es desalojada en su lugar.
+
+    De esta forma, las claves utilizadas una única vez (por ejemplo, en un
+    recorrido secuencial de muchos valores distintos) no desalojan a las
+    claves utilizadas frecuentemente.
+
+    Attributes:
+        _values (dict): Valores de las claves almacenadas.
+        _window (collections.OrderedDict): Claves de la ventana LRU.
+        _probation (collections.OrderedDict): Claves en prueba del cache
+            principal.
+        _protected (collections.OrderedDict): Claves protegidas del cache
+            principal.
+        _window_size (int): Tamaño máximo de la ventana.
+        _protected_size (int): Tamaño máximo del segmento protegido.
+        _sketch (_FrequencySketch): Estimador de frecuencias.
+
+    """
+
+    __slots__ = ['_values', '_window', '_probation', '_protected',
+                 '_window_size', '_protected_size', '_sketch']
+
+    def __init__(self, size):
+        super().__init__(size)
+        self._values = {}
+        self._window = collections.OrderedDict()
+        self._probation = collections.OrderedDict()
+        self._protected = collections.OrderedDict()
+
+        self._window_size = max(size // 100, 1)
+        self._protected_size = (size - self._window_size) * 4 // 5
+        self._sketch = _FrequencySketch(size)
+
+    def _get(self, key):
+        value = self._values[key]
+        self._sketch.increment(key)
+
+        if key in self._window:
+            self._window.move_to_end(key)
+        elif key in self._protected:
+            self._protected.move_to_end(key)
+        else:
+            # Promover la clave al segmento protegido, degradando a la clave
+            # protegida utilizada hace más tiempo si es necesario.
+            del self._probation[key]
+            self._protected[key] = None
+
+            if len(self._protected) > self._protected_size:
+                demoted, _ = self._protected.popitem(last=False)
+                self._probation[demoted] = None
+
+        return value
+
+    def _set(self, key, value):
+        if key in self._values:
+            self._values[key] = value
+            self._get(key)
+            return
+
+        self._sketch.increment(key)
+        self._values[key] = value
+        self._window[key] = None
+
+        if len(self._window) > self._window_size:
+            candidate, _ = self._window.popitem(last=False)
+            self._admit(candidate)
+
+    def _admit(self, candidate):
+        """Decide si una clave desalojada de la ventana ingresa al cache
+        principal.
+
+        Args:
+            candidate (object): Clave desalojada de la ventana.
+
+        """
+        main_size = self._size - self._window_size
+        if len(self._probation) + len(self._protected) < main_size:
+            self._probation[candidate] = None
+            return
+
+        victim = next(iter(self._probation), None)
+        if victim is None and self._protected:
+            victim = next(iter(self._protected))
+
+        if (victim is not None and
+                self._sketch.estimate(candidate) >
+                self._sketch.estimate(victim)):
+            self._probation.pop(victim, None)
+            self._protected.pop(victim, None)
+            del self._values[victim]
+            self._probation[candidate] = None
+        else:
+            del self._values[candidate]
+
+        self.evictions += 1
+
+    def _contains(self, key):
+        return key in self._values
+
+    def __len__(self):
+        return len(self._values)
+
+
+def create_cache(policy, size):
+    """Crea un cache utilizando una política de desalojo.
+
+    Args:
+        policy (str): Política de desalojo ('lfu', 'lru' o 'tinylfu').
+        size (int): Cantidad máxima de ítems a almacenar.
+
+    Raises:
+        ValueError: Si la política no es válida.
+
+    Returns:
+        Cache: Cache creado.
+
+    """
+    if policy == POLICY_LFU:
+        return LFUCache(size)
+    if policy == POLICY_LRU:
+        return LRUCache(size)
+    if policy == POLICY_TINYLFU:
+        return TinyLFUCache(size)
+
+    raise ValueError('Invalid cache policy: {}'.format(policy))
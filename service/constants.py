@@ -10,10 +10,31 @@ API_NAME = 'georef-ar-api'
 MAX_RESULT_LEN = current_app.config['MAX_RESULT_LEN']
 MAX_RESULT_WINDOW = current_app.config['MAX_RESULT_WINDOW']
 MAX_BULK_LEN = current_app.config['MAX_BULK_LEN']
+MAX_BULK_NDJSON_LEN = current_app.config.get('MAX_BULK_NDJSON_LEN', 100000)
+BULK_NDJSON_WINDOW_LEN = current_app.config.get('BULK_NDJSON_WINDOW_LEN',
+                                                500)
+BULK_CSV_WINDOW_LEN = current_app.config.get('BULK_CSV_WINDOW_LEN', 500)
+JOBS_MAX_LEN = current_app.config.get('JOBS_MAX_LEN', 5000000)
+JOBS_WINDOW_LEN = current_app.config.get('JOBS_WINDOW_LEN', 5000)
 ES_MULTISEARCH_MAX_LEN = current_app.config.get('ES_MULTISEARCH_MAX_LEN',
                                                 MAX_RESULT_LEN)
+ES_MULTISEARCH_CONCURRENCY = current_app.config.get(
+    'ES_MULTISEARCH_CONCURRENCY', 1)
 ES_TRACK_TOTAL_HITS = current_app.config.get('ES_TRACK_TOTAL_HITS')
+ES_COMPILED_QUERIES = current_app.config.get('ES_COMPILED_QUERIES', True)
 ADDRESS_PARSER_CACHE_SIZE = current_app.config['ADDRESS_PARSER_CACHE_SIZE']
+ADDRESS_PARSER_CACHE_POLICY = current_app.config.get(
+    'ADDRESS_PARSER_CACHE_POLICY', 'lfu')
+ADDRESS_PARSER_SHARED_CACHE_PATH = current_app.config.get(
+    'ADDRESS_PARSER_SHARED_CACHE_PATH')
+ADDRESS_PARSER_SHARED_CACHE_LEN = current_app.config.get(
+    'ADDRESS_PARSER_SHARED_CACHE_LEN', 65536)
+ADDRESS_PARSER_PROCESSES = current_app.config.get('ADDRESS_PARSER_PROCESSES',
+                                                  0)
+ADDRESS_PARSER_PROCESS_MIN_LEN = current_app.config.get(
+    'ADDRESS_PARSER_PROCESS_MIN_LEN', 1000)
+LOCATION_ENGINE = current_app.config.get('LOCATION_ENGINE', 'elasticsearch')
+JSON_SERIALIZER = current_app.config.get('JSON_SERIALIZER', 'orjson')
 
 ISCT_DOOR_NUM_TOLERANCE_M = 50
 BTWN_DOOR_NUM_TOLERANCE_M = 150
@@ -4,14 +4,42 @@ Contiene funciones que ejecutan consultas a índices de Elasticsearch.
 """
 
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import copy
+import json
+import threading
 import elasticsearch
 from elasticsearch_dsl import Search, MultiSearch
+from elasticsearch_dsl.connections import connections
+from flask import g, has_request_context
 from elasticsearch_dsl.query import Match, Range, MatchPhrasePrefix, GeoShape
 from elasticsearch_dsl.query import MatchNone, Terms, Prefix, Bool
 from service import names as N
-from service import constants, utils
+from service import constants, utils, search_cache, query_templates
 from service.management import es_config
 
+try:
+    from gevent import monkey as gevent_monkey
+    import gevent.pool
+except ImportError:
+    gevent_monkey = None
+
+_TEMPLATE_CONST_PARAMS = {'order', 'geo_shape_relation'}
+"""set: Parámetros de búsqueda cuyos valores afectan la estructura de las
+búsquedas construidas (ver 'query_templates.query_shape')."""
+
+MULTISEARCH_FILTER_PATH = ','.join([
+    'responses.hits.total',
+    'responses.hits.hits._source',
+    'responses.error',
+    'responses.timed_out',
+    'responses._shards.failed'
+])
+"""str: Campos de las respuestas MultiSearch a recibir de Elasticsearch. Los
+campos 'error', 'timed_out' y '_shards.failed' son necesarios para detectar
+respuestas con errores o incompletas."""
+
 INTERSECTION_PARAM_TYPES = {
     N.STATES,
     N.DEPARTMENTS,
@@ -20,6 +48,12 @@ INTERSECTION_PARAM_TYPES = {
 }
 
 
+_executor = None
+_executor_lock = threading.Lock()
+
+_thread_state = threading.local()
+
+
 class DataConnectionException(Exception):
     """Representa un error sucedido al intentar realizar una operación
     utilizando Elasticsearch.
@@ -57,14 +91,164 @@ def elasticsearch_connection(hosts, sniff=False, sniffer_timeout=60):
         raise DataConnectionException from e
 
 
+def async_elasticsearch_connection(hosts, sniff=False, sniffer_timeout=60):
+    """Crea una conexión asincrónica a Elasticsearch. Requiere la versión del
+    paquete 'elasticsearch' con soporte para asyncio (elasticsearch[async]).
+
+    Args:
+        hosts (list): Lista de nodos Elasticsearch a los cuales conectarse.
+        sniff (bool): Activa la función de sniffing, la cual permite descubrir
+            nuevos nodos en un cluster y conectarse a ellos.
+
+    Raises:
+        DataConnectionException: si la conexión no pudo ser establecida.
+        RuntimeError: Si el paquete 'elasticsearch' no tiene soporte para
+            asyncio.
+
+    Returns:
+        AsyncElasticsearch: Conexión asincrónica a Elasticsearch.
+
+    """
+    client_class = getattr(elasticsearch, 'AsyncElasticsearch', None)
+    if client_class is None:
+        raise RuntimeError('The elasticsearch[async] package is required to '
+                           'create asynchronous connections')
+
+    try:
+        options = {
+            'hosts': hosts
+        }
+
+        if sniff:
+            options['sniff_on_start'] = True
+            options['sniff_on_connection_fail'] = True
+            options['sniffer_timeout'] = sniffer_timeout
+
+        return client_class(**options)
+    except elasticsearch.ElasticsearchException as e:
+        raise DataConnectionException from e
+
+
+def _multisearch_responses(raw_responses):
+    """Extrae las respuestas a cada búsqueda de una respuesta MultiSearch.
+
+    Las respuestas se utilizan directamente como diccionarios (sin
+    convertirlas a objetos elasticsearch_dsl.response.Response), ya que solo
+    se leen sus campos 'hits.total' y 'hits.hits._source' (ver
+    'ElasticsearchResult').
+
+    Args:
+        raw_responses (dict): Respuesta de Elasticsearch a la consulta
+            MultiSearch.
+
+    Raises:
+        DataConnectionException: Si alguna de las búsquedas retornó un error.
+
+    Returns:
+        list: Lista de respuestas a cada búsqueda (dict).
+
+    """
+    responses = raw_responses['responses']
+
+    for response in responses:
+        if response.get('error', False):
+            error = response['error']
+            raise DataConnectionException() from elasticsearch.TransportError(
+                'N/A', error['type'], error)
+
+    return responses
+
+
+def _execute_multisearch(ms):
+    """Ejecuta una búsqueda MultiSearch, recibiendo de Elasticsearch solo los
+    campos necesarios de cada respuesta (ver MULTISEARCH_FILTER_PATH).
+
+    Args:
+        ms (elasticsearch_dsl.MultiSearch): Búsqueda a ejecutar.
+
+    Raises:
+        DataConnectionException: Si ocurrió un error al ejecutar la búsqueda.
+
+    Returns:
+        list: Lista de respuestas a cada búsqueda contenida en 'ms'.
+
+    """
+    # pylint: disable=protected-access
+    params = {'filter_path': MULTISEARCH_FILTER_PATH}
+
+    try:
+        es = connections.get_connection(ms._using)
+        raw_responses = es.msearch(index=ms._index, body=ms.to_dict(),
+                                   params=params, **ms._params)
+    except elasticsearch.ElasticsearchException as e:
+        raise DataConnectionException() from e
+
+    return _multisearch_responses(raw_responses)
+
+
+def _get_executor():
+    """Devuelve el pool de threads utilizado para ejecutar búsquedas
+    MultiSearch concurrentemente. El pool es creado si no existía (se lo crea
+    recién al necesitarlo para no crear threads antes de que el proceso sea
+    clonado por gunicorn).
+
+    Returns:
+        concurrent.futures.ThreadPoolExecutor: Pool de threads.
+
+    """
+    global _executor  # pylint: disable=global-statement
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=constants.ES_MULTISEARCH_CONCURRENCY)
+
+    return _executor
+
+
+def _map_multisearch(multisearches):
+    """Ejecuta una lista de búsquedas MultiSearch, concurrentemente si la
+    configuración ES_MULTISEARCH_CONCURRENCY lo permite. Si el proceso utiliza
+    gevent (módulo 'threading' modificado), se utilizan greenlets en lugar de
+    threads.
+
+    Args:
+        multisearches (list): Lista de elasticsearch_dsl.MultiSearch.
+
+    Raises:
+        DataConnectionException: Si ocurrió un error al ejecutar alguna de las
+            búsquedas.
+
+    Returns:
+        list: Lista de respuestas de cada MultiSearch, en el mismo orden que
+            'multisearches'.
+
+    """
+    concurrency = constants.ES_MULTISEARCH_CONCURRENCY
+
+    if concurrency <= 1 or len(multisearches) <= 1:
+        return [_execute_multisearch(ms) for ms in multisearches]
+
+    if gevent_monkey and gevent_monkey.is_module_patched('threading'):
+        pool = gevent.pool.Pool(concurrency)
+        return pool.map(_execute_multisearch, multisearches)
+
+    # Executor.map() retorna los resultados en el orden original, y propaga
+    # la primera excepción encontrada al iterarlos.
+    return list(_get_executor().map(_execute_multisearch, multisearches))
+
+
 def _run_multisearch(es, searches):
     """Ejecuta una lista de búsquedas Elasticsearch utilizando la función
-    MultiSearch. La cantidad de búsquedas que se envían a la vez es
-    configurable vía la variable ES_MULTISEARCH_MAX_LEN.
+    MultiSearch. Si el cache de búsquedas está activado (ver
+    ES_CACHE_STORAGE), solo se envían a Elasticsearch las búsquedas cuyas
+    respuestas no estén almacenadas en el cache.
 
     Args:
         es (Elasticsearch): Conexión a Elasticsearch.
-        searches (list): Lista de elasticsearch_dsl.Search.
+        searches (list): Lista de _CanonicalSearch (ver
+            '_collapse_searches').
 
     Raises:
         DataConnectionException: Si ocurrió un error al ejecutar las búsquedas.
@@ -72,11 +256,137 @@ def _run_multisearch(es, searches):
     Returns:
         list: Lista de respuestas a cada búsqueda.
 
+    """
+    cache = search_cache.get_search_cache()
+    if cache is None or not searches:
+        return _run_uncached_multisearch(es, searches)
+
+    try:
+        for alias in cache.outdated_aliases(searches):
+            cache.set_index_version(alias, es.indices.get_alias(index=alias))
+    except elasticsearch.ElasticsearchException as e:
+        raise DataConnectionException() from e
+
+    keys = _search_keys(cache, searches)
+    responses = _cached_responses(cache, keys)
+
+    missing = [i for i, response in enumerate(responses) if response is None]
+    if missing:
+        _store_responses(cache, keys, responses, missing,
+                         _run_uncached_multisearch(es, [
+                             searches[i] for i in missing
+                         ]))
+
+    return responses
+
+
+async def _run_multisearch_async(es, searches):
+    """Versión asincrónica de '_run_multisearch'.
+
+    Args:
+        es (AsyncElasticsearch): Conexión asincrónica a Elasticsearch.
+        searches (list): Lista de _CanonicalSearch (ver
+            '_collapse_searches').
+
+    Raises:
+        DataConnectionException: Si ocurrió un error al ejecutar las búsquedas.
+
+    Returns:
+        list: Lista de respuestas a cada búsqueda.
+
+    """
+    cache = search_cache.get_search_cache()
+    if cache is None or not searches:
+        return await _run_uncached_multisearch_async(es, searches)
+
+    aliases = cache.outdated_aliases(searches)
+    for alias, response in zip(aliases, await _get_aliases_async(es,
+                                                                 aliases)):
+        cache.set_index_version(alias, response)
+
+    keys = _search_keys(cache, searches)
+    responses = _cached_responses(cache, keys)
+
+    missing = [i for i, response in enumerate(responses) if response is None]
+    if missing:
+        _store_responses(cache, keys, responses, missing,
+                         await _run_uncached_multisearch_async(es, [
+                             searches[i] for i in missing
+                         ]))
+
+    return responses
+
+
+def _search_keys(cache, searches):
+    """Calcula las claves en el cache de búsquedas de una lista de búsquedas.
+
+    Args:
+        cache (SearchCache): Cache de búsquedas.
+        searches (list): Lista de _CanonicalSearch.
+
+    Returns:
+        list: Clave de cada búsqueda en el cache.
+
+    """
+    # pylint: disable=protected-access
+    return [cache.search_key(search._index or (), search.body)
+            for search in searches]
+
+
+def _cached_responses(cache, keys):
+    """Busca en el cache de búsquedas las respuestas a una lista de búsquedas.
+
+    Args:
+        cache (SearchCache): Cache de búsquedas.
+        keys (list): Clave de cada búsqueda en el cache.
+
+    Returns:
+        list: Respuesta almacenada de cada búsqueda, o 'None' si la búsqueda
+            no está almacenada.
+
+    """
+    return cache.get_many(keys)
+
+
+def _store_responses(cache, keys, responses, missing, missing_responses):
+    """Almacena en el cache de búsquedas las respuestas obtenidas desde
+    Elasticsearch, y las agrega a la lista de respuestas a devolver.
+
+    Args:
+        cache (SearchCache): Cache de búsquedas.
+        keys (list): Clave de cada búsqueda en el cache.
+        responses (list): Lista de respuestas a completar.
+        missing (list): Posiciones de 'responses' sin respuesta.
+        missing_responses (list): Respuestas obtenidas para cada posición de
+            'missing'.
+
+    """
+    # Serializar las respuestas antes de devolverlas, ya que sus contenidos
+    # pueden ser modificados luego por el invocador.
+    cache.set_many([
+        (keys[i], response)
+        for i, response in zip(missing, missing_responses)
+    ])
+
+    for i, response in zip(missing, missing_responses):
+        responses[i] = response
+
+
+def _build_multisearches(es, searches):
+    """Parte una lista de búsquedas en varias búsquedas MultiSearch, de hasta
+    ES_MULTISEARCH_MAX_LEN búsquedas cada una.
+
+    Args:
+        es (Elasticsearch, AsyncElasticsearch): Conexión a Elasticsearch.
+        searches (list): Lista de elasticsearch_dsl.Search.
+
+    Returns:
+        list: Lista de elasticsearch_dsl.MultiSearch.
+
     """
     step_size = constants.ES_MULTISEARCH_MAX_LEN
-    responses = []
+    multisearches = []
 
-    # Partir las búsquedas en varios baches si es necesario.
     for i in range(0, len(searches), step_size):
         end = min(i + step_size, len(searches))
         ms = MultiSearch(using=es)
@@ -84,14 +394,730 @@ def _run_multisearch(es, searches):
         for j in range(i, end):
             ms = ms.add(searches[j])
 
-        try:
-            responses.extend(ms.execute(raise_on_error=True))
-        except elasticsearch.ElasticsearchException as e:
-            raise DataConnectionException() from e
+        multisearches.append(ms)
+
+    return multisearches
+
+
+def _run_uncached_multisearch(es, searches):
+    """Ejecuta una lista de búsquedas Elasticsearch utilizando la función
+    MultiSearch. La cantidad de búsquedas que se envían a la vez es
+    configurable vía la variable ES_MULTISEARCH_MAX_LEN. Si las búsquedas
+    deben ser separadas en varias consultas MultiSearch, las mismas pueden ser
+    ejecutadas concurrentemente (ver ES_MULTISEARCH_CONCURRENCY).
+
+    Args:
+        es (Elasticsearch): Conexión a Elasticsearch.
+        searches (list): Lista de elasticsearch_dsl.Search.
+
+    Raises:
+        DataConnectionException: Si ocurrió un error al ejecutar las búsquedas.
+
+    Returns:
+        list: Lista de respuestas a cada búsqueda.
+
+    """
+    responses = []
+    for ms_responses in _map_multisearch(_build_multisearches(es, searches)):
+        responses.extend(ms_responses)
+
+    return responses
+
+
+def _multisearch_request(ms):
+    """Serializa una búsqueda MultiSearch, obteniendo los argumentos a
+    utilizar para enviarla con 'msearch()'. Solo se solicitan a
+    Elasticsearch los campos necesarios de cada respuesta (ver
+    MULTISEARCH_FILTER_PATH).
+
+    Args:
+        ms (elasticsearch_dsl.MultiSearch): Búsqueda a serializar.
+
+    Returns:
+        dict: Argumentos de 'msearch()'.
+
+    """
+    # pylint: disable=protected-access
+    return dict(ms._params, index=ms._index, body=ms.to_dict(),
+                params={'filter_path': MULTISEARCH_FILTER_PATH})
+
+
+async def _send_multisearches_async(es, requests):
+    """Envía una lista de búsquedas MultiSearch serializadas (ver
+    '_multisearch_request'), ejecutando hasta ES_MULTISEARCH_CONCURRENCY a la
+    vez. Como la corrutina solo espera las respuestas de Elasticsearch, la
+    serialización de las búsquedas y el procesamiento de sus respuestas
+    pueden realizarse fuera del event loop.
+
+    Args:
+        es (AsyncElasticsearch): Conexión asincrónica a Elasticsearch.
+        requests (list): Argumentos de 'msearch()' de cada búsqueda.
+
+    Raises:
+        DataConnectionException: Si ocurrió un error al ejecutar alguna de las
+            búsquedas.
+
+    Returns:
+        list: Respuestas de Elasticsearch a cada búsqueda MultiSearch, en el
+            mismo orden que 'requests'.
+
+    """
+    semaphore = asyncio.Semaphore(max(constants.ES_MULTISEARCH_CONCURRENCY, 1))
+
+    async def send(request):
+        async with semaphore:
+            try:
+                return await es.msearch(**request)
+            except elasticsearch.ElasticsearchException as e:
+                raise DataConnectionException() from e
+
+    return await asyncio.gather(*[send(request) for request in requests])
+
+
+async def _get_aliases_async(es, aliases):
+    """Obtiene los índices referenciados por una lista de alias.
+
+    Args:
+        es (AsyncElasticsearch): Conexión asincrónica a Elasticsearch.
+        aliases (list): Nombres de alias (o índices).
+
+    Raises:
+        DataConnectionException: Si ocurrió un error al consultar los alias.
+
+    Returns:
+        list: Respuesta de Elasticsearch para cada alias.
+
+    """
+    try:
+        return [await es.indices.get_alias(index=alias) for alias in aliases]
+    except elasticsearch.ElasticsearchException as e:
+        raise DataConnectionException() from e
+
+
+async def _run_uncached_multisearch_async(es, searches):
+    """Versión asincrónica de '_run_uncached_multisearch'. Se ejecutan hasta
+    ES_MULTISEARCH_CONCURRENCY consultas MultiSearch a la vez.
+
+    Args:
+        es (AsyncElasticsearch): Conexión asincrónica a Elasticsearch.
+        searches (list): Lista de elasticsearch_dsl.Search.
+
+    Raises:
+        DataConnectionException: Si ocurrió un error al ejecutar las búsquedas.
+
+    Returns:
+        list: Lista de respuestas a cada búsqueda.
+
+    """
+    requests = [_multisearch_request(ms)
+                for ms in _build_multisearches(es, searches)]
+
+    responses = []
+    for raw_responses in await _send_multisearches_async(es, requests):
+        responses.extend(_multisearch_responses(raw_responses))
+
+    return responses
+
+
+class SearchStats:
+    """Contadores de búsquedas ejecutadas utilizando
+    'ElasticsearchSearch.run_searches'.
+
+    Attributes:
+        rounds (int): Cantidad de rondas (consultas MultiSearch lógicas)
+            ejecutadas.
+        searches (int): Cantidad de búsquedas elasticsearch_dsl.Search
+            generadas por los iteradores.
+        executed (int): Cantidad de búsquedas efectivamente enviadas a
+            Elasticsearch, luego de agrupar búsquedas idénticas.
+
+    """
+
+    __slots__ = ['rounds', 'searches', 'executed']
+
+    def __init__(self):
+        self.rounds = 0
+        self.searches = 0
+        self.executed = 0
+
+    @property
+    def collapsed(self):
+        """Cantidad de búsquedas que no fueron enviadas a Elasticsearch por
+        ser idénticas a otra búsqueda de la misma ronda.
+
+        Returns:
+            int: Cantidad de búsquedas agrupadas.
+
+        """
+        return self.searches - self.executed
+
+    def add_round(self, searches, executed):
+        """Registra una ronda de búsquedas.
+
+        Args:
+            searches (int): Cantidad de búsquedas de la ronda.
+            executed (int): Cantidad de búsquedas enviadas a Elasticsearch.
+
+        """
+        self.rounds += 1
+        self.searches += searches
+        self.executed += executed
+
+    def merge(self, other):
+        """Suma los contadores de otro objeto 'SearchStats' a este objeto.
+
+        Args:
+            other (SearchStats): Contadores a sumar.
+
+        """
+        self.rounds += other.rounds
+        self.searches += other.searches
+        self.executed += other.executed
+
+    def to_dict(self):
+        return {
+            'rounds': self.rounds,
+            'searches': self.searches,
+            'executed': self.executed,
+            'collapsed': self.collapsed
+        }
+
+
+def request_search_stats():
+    """Devuelve los contadores de búsquedas de la request HTTP actual.
+
+    Returns:
+        SearchStats: Contadores de búsquedas, o 'None' si no hay una request
+            HTTP activa.
+
+    """
+    if not has_request_context():
+        return None
+
+    if 'search_stats' not in g:
+        g.search_stats = SearchStats()
+
+    return g.search_stats
+
+
+class _CanonicalSearch:
+    """Representa una búsqueda elasticsearch_dsl.Search cuyo cuerpo es
+    generado y serializado una única vez. El cuerpo serializado (con claves
+    ordenadas) identifica a la búsqueda al agruparla con búsquedas idénticas y
+    al construir su clave en el cache de búsquedas, y el cuerpo generado es
+    reutilizado al agregarla a una búsqueda MultiSearch.
+
+    Attributes:
+        _index (list): Índices (o alias) de la búsqueda.
+        _params (dict): Parámetros de la búsqueda.
+        _body (dict): Cuerpo de la búsqueda.
+        body (str): Parámetros y cuerpo de la búsqueda serializados.
+        fingerprint (tuple): Identificador de la búsqueda, compuesto de sus
+            índices y su cuerpo serializado.
+
+    """
+
+    __slots__ = ['_index', '_params', '_body', 'body', 'fingerprint']
+
+    def __init__(self, search):
+        """Inicializa un objeto de tipo '_CanonicalSearch'.
+
+        Args:
+            search (elasticsearch_dsl.Search): Búsqueda.
+
+        """
+        # pylint: disable=protected-access
+        self._index = search._index
+        self._params = search._params
+        self._body = search.to_dict()
+        self.body = json.dumps([self._params, self._body], sort_keys=True)
+        self.fingerprint = (tuple(self._index or ()), self.body)
+
+    def to_dict(self):
+        return self._body
+
+
+def _collapse_searches(searches):
+    """Agrupa las búsquedas idénticas de una lista de búsquedas.
+
+    Args:
+        searches (list): Lista de elasticsearch_dsl.Search.
+
+    Returns:
+        tuple: Lista de búsquedas distintas (_CanonicalSearch), y posición
+            dentro de esa lista correspondiente a cada búsqueda de
+            'searches'.
+
+    """
+    positions = {}
+    unique_searches = []
+    search_positions = []
+
+    for search in searches:
+        search = _CanonicalSearch(search)
+        position = positions.get(search.fingerprint)
+
+        if position is None:
+            position = len(unique_searches)
+            positions[search.fingerprint] = position
+            unique_searches.append(search)
+
+        search_positions.append(position)
+
+    return unique_searches, search_positions
+
+
+def _expand_responses(search_positions, unique_responses):
+    """Distribuye las respuestas a búsquedas agrupadas con
+    '_collapse_searches' a cada una de las búsquedas originales. Las
+    búsquedas idénticas reciben copias independientes de la misma respuesta,
+    para que puedan ser modificadas sin afectarse entre sí.
+
+    Args:
+        search_positions (list): Posiciones devueltas por
+            '_collapse_searches', para cada búsqueda original.
+        unique_responses (list): Respuestas a las búsquedas distintas.
+
+    Returns:
+        list: Respuestas a cada búsqueda original, en el mismo orden.
+
+    """
+    used = [False] * len(unique_responses)
+    responses = []
+
+    for position in search_positions:
+        response = unique_responses[position]
+
+        if used[position]:
+            response = copy.deepcopy(response)
+        else:
+            used[position] = True
+
+        responses.append(response)
 
     return responses
 
 
+def _run_collapsed_multisearch(es, searches):
+    """Ejecuta una lista de búsquedas utilizando '_run_multisearch', enviando
+    cada búsqueda distinta una sola vez (ver '_collapse_searches').
+
+    Args:
+        es (Elasticsearch): Conexión a Elasticsearch.
+        searches (list): Lista de elasticsearch_dsl.Search.
+
+    Raises:
+        DataConnectionException: Si ocurrió un error al ejecutar las búsquedas.
+
+    Returns:
+        tuple: Lista de respuestas a cada búsqueda de 'searches' (en el mismo
+            orden), y cantidad de búsquedas enviadas a Elasticsearch.
+
+    """
+    unique_searches, search_positions = _collapse_searches(searches)
+    unique_responses = _run_multisearch(es, unique_searches)
+
+    return (_expand_responses(search_positions, unique_responses),
+            len(unique_searches))
+
+
+async def _run_collapsed_multisearch_async(es, searches):
+    """Versión asincrónica de '_run_collapsed_multisearch'.
+
+    Args:
+        es (AsyncElasticsearch): Conexión asincrónica a Elasticsearch.
+        searches (list): Lista de elasticsearch_dsl.Search.
+
+    Raises:
+        DataConnectionException: Si ocurrió un error al ejecutar las búsquedas.
+
+    Returns:
+        tuple: Lista de respuestas a cada búsqueda de 'searches' (en el mismo
+            orden), y cantidad de búsquedas enviadas a Elasticsearch.
+
+    """
+    unique_searches, search_positions = _collapse_searches(searches)
+    unique_responses = await _run_multisearch_async(es, unique_searches)
+
+    return (_expand_responses(search_positions, unique_responses),
+            len(unique_searches))
+
+
+class _StepNode:
+    """Nodo del árbol de iteradores coordinado por '_search_rounds'. Cada
+    nodo contiene un iterador de pasos ('search_steps' o 'planner_steps'),
+    que puede estar esperando la respuesta a una búsqueda DSL, o los
+    resultados de una o más búsquedas ElasticsearchSearch anidadas (nodos
+    hijos).
+
+    Attributes:
+        iterator (iterator): Iterador de pasos.
+        parent (_StepNode): Nodo que espera la finalización de este nodo, o
+            'None' si es un nodo raíz.
+        step (object): Último paso producido por el iterador.
+        pending (int): Cantidad de nodos hijos que todavía no finalizaron.
+
+    """
+
+    __slots__ = ['iterator', 'parent', 'step', 'pending']
+
+    def __init__(self, iterator, parent=None):
+        """Inicializa un objeto de tipo _StepNode.
+
+        Args:
+            iterator (iterator): Ver atributo 'iterator'.
+            parent (_StepNode): Ver atributo 'parent'.
+
+        """
+        self.iterator = iterator
+        self.parent = parent
+        self.step = None
+        self.pending = 0
+
+    def step_results(self):
+        """Devuelve el valor a enviar al iterador una vez finalizadas las
+        búsquedas ElasticsearchSearch de su último paso.
+
+        Returns:
+            ElasticsearchResult, list: Resultado de la búsqueda, o lista de
+                resultados de cada búsqueda (en el mismo orden).
+
+        """
+        if isinstance(self.step, (list, tuple)):
+            return [search.result for search in self.step]
+
+        return self.step.result
+
+
+def _advance_step_node(node, value, frontier):
+    """Avanza el iterador de un nodo '_StepNode' hasta que el mismo (o alguno
+    de sus descendientes) requiera ejecutar búsquedas DSL, o hasta que
+    finalice. Cuando todos los hijos de un nodo finalizan, el nodo padre es
+    avanzado inmediatamente, sin esperar a la siguiente ronda.
+
+    Args:
+        node (_StepNode): Nodo a avanzar.
+        value (object): Valor a enviar al iterador del nodo ('None' para
+            obtener su primer paso).
+        frontier (list): Lista de tuplas (_StepNode, elasticsearch_dsl.Search)
+            a la cual agregar las búsquedas DSL pendientes.
+
+    """
+    while node is not None:
+        step = utils.step_iterator(node.iterator, value)
+
+        if step is None:
+            # El iterador finalizó: continuar con el padre si este ya no
+            # espera a ningún otro hijo.
+            node = node.parent
+            if node is not None:
+                node.pending -= 1
+                if node.pending:
+                    return
+
+                value = node.step_results()
+
+            continue
+
+        node.step = step
+
+        if isinstance(step, Search):
+            frontier.append((node, step))
+            return
+
+        searches = step if isinstance(step, (list, tuple)) else [step]
+        if not searches:
+            value = []
+            continue
+
+        node.pending = len(searches)
+        for search in searches:
+            _advance_step_node(_StepNode(search.search_steps(), node), None,
+                               frontier)
+
+        return
+
+
+def _search_rounds(iterators):
+    """Coordina un conjunto de iteradores de pasos, agrupando las búsquedas
+    DSL pendientes de todos los iteradores (y de todos sus niveles de
+    anidamiento) en rondas. El generador no realiza ninguna operación de
+    entrada/salida, por lo que puede ser utilizado tanto desde código
+    sincrónico como asincrónico.
+
+    Cada paso de un iterador puede ser:
+
+        1) Una búsqueda elasticsearch_dsl.Search: se envía al iterador la
+           respuesta de Elasticsearch a la búsqueda.
+        2) Una búsqueda ElasticsearchSearch: sus pasos ('search_steps') se
+           ejecutan junto con los del resto de los iteradores, y al
+           finalizar se envía al iterador el resultado de la búsqueda.
+        3) Una lista de búsquedas ElasticsearchSearch independientes entre
+           sí: se ejecutan todas a la vez, y al finalizar se envía al
+           iterador la lista de resultados (en el mismo orden).
+
+    De esta forma, una búsqueda que requiere pasos adicionales (por ejemplo,
+    un 'AddressQueryPlanner' cuyas búsquedas requieren validar IDs de
+    entidades) no demora a las búsquedas de los demás iteradores: todas las
+    búsquedas DSL pendientes se envían en la misma ronda.
+
+    Args:
+        iterators (list): Lista de iteradores de pasos.
+
+    Yields:
+        list: Búsquedas elasticsearch_dsl.Search de la ronda. Las respuestas a
+            cada una (en el mismo orden) deben ser enviadas al generador vía
+            'send()'.
+
+    """
+    frontier = []
+    for iterator in iterators:
+        _advance_step_node(_StepNode(iterator), None, frontier)
+
+    while frontier:
+        responses = yield [search for _, search in frontier]
+
+        prev_frontier = frontier
+        frontier = []
+
+        for (node, _), response in zip(prev_frontier, responses):
+            _advance_step_node(node, response, frontier)
+
+
+def run_search_steps(es, iterators):
+    """Ejecuta las búsquedas requeridas por un conjunto de iteradores de pasos
+    (ver '_search_rounds'), enviando una consulta MultiSearch lógica por
+    ronda.
+
+    Si el thread actual tiene asignado un objeto 'AsyncSearchRunner' (ver
+    'set_thread_search_runner'), las búsquedas se ejecutan en su event loop
+    utilizando 'run_search_steps_async', y el parámetro 'es' es ignorado.
+
+    Args:
+        es (Elasticsearch): Conexión a Elasticsearch.
+        iterators (list): Lista de iteradores de pasos.
+
+    Raises:
+        DataConnectionException: Si ocurrió un error al ejecutar las
+            búsquedas.
+
+    Returns:
+        SearchStats: Contadores de las búsquedas ejecutadas. Los mismos
+            también se suman a los contadores de la request HTTP actual (ver
+            'request_search_stats').
+
+    """
+    runner = getattr(_thread_state, 'search_runner', None)
+
+    if runner is not None:
+        stats = runner.run_search_steps(iterators)
+    else:
+        stats = SearchStats()
+        rounds = _search_rounds(iterators)
+        round_searches = utils.step_iterator(rounds)
+
+        while round_searches:
+            responses, executed = _run_collapsed_multisearch(
+                es, round_searches)
+            stats.add_round(len(round_searches), executed)
+            round_searches = utils.step_iterator(rounds, responses)
+
+    current_stats = request_search_stats()
+    if current_stats is not None:
+        current_stats.merge(stats)
+
+    return stats
+
+
+async def run_search_steps_async(es, iterators):
+    """Versión asincrónica de 'run_search_steps'. Las búsquedas de cada ronda
+    se envían utilizando una conexión asincrónica a Elasticsearch.
+
+    A diferencia de 'run_search_steps', los contadores de búsquedas no se
+    suman a los de la request HTTP actual.
+
+    Args:
+        es (AsyncElasticsearch): Conexión asincrónica a Elasticsearch.
+        iterators (list): Lista de iteradores de pasos.
+
+    Returns:
+        SearchStats: Contadores de las búsquedas ejecutadas.
+
+    """
+    stats = SearchStats()
+    rounds = _search_rounds(iterators)
+    round_searches = utils.step_iterator(rounds)
+
+    while round_searches:
+        responses, executed = await _run_collapsed_multisearch_async(
+            es, round_searches)
+        stats.add_round(len(round_searches), executed)
+        round_searches = utils.step_iterator(rounds, responses)
+
+    return stats
+
+
+class AsyncSearchRunner:
+    """Permite ejecutar 'run_search_steps' desde threads
+    sincrónicos, delegando las consultas a Elasticsearch a un event loop
+    asyncio que utiliza una conexión asincrónica. De esta forma, un único
+    proceso puede mantener muchas consultas a Elasticsearch en curso sin
+    necesitar una conexión (o un proceso) por cada una.
+
+    Los iteradores de pasos, la agrupación de búsquedas idénticas, el cache
+    de búsquedas y la serialización de las consultas se ejecutan en el
+    thread invocador: el event loop solo espera las respuestas de
+    Elasticsearch.
+
+    Ver 'set_thread_search_runner'.
+
+    Attributes:
+        _loop (asyncio.AbstractEventLoop): Event loop donde se ejecutan las
+            consultas.
+        _es (AsyncElasticsearch): Conexión asincrónica a Elasticsearch.
+        _wait (function): Función que recibe una corrutina, la ejecuta en
+            '_loop' y devuelve su resultado. Por defecto, bloquea el thread
+            invocador hasta que la corrutina finalice.
+
+    """
+
+    __slots__ = ['_loop', '_es', '_wait']
+
+    def __init__(self, loop, es, wait=None):
+        """Inicializa un objeto de tipo AsyncSearchRunner.
+
+        Args:
+            loop (asyncio.AbstractEventLoop): Ver atributo '_loop'.
+            es (AsyncElasticsearch): Ver atributo '_es'.
+            wait (function): Ver atributo '_wait'.
+
+        """
+        self._loop = loop
+        self._es = es
+        self._wait = wait or self._wait_blocking
+
+    def _wait_blocking(self, coro):
+        """Ejecuta una corrutina en el event loop, bloqueando el thread
+        actual hasta que finalice.
+
+        Args:
+            coro (coroutine): Corrutina a ejecutar.
+
+        Returns:
+            object: Resultado de la corrutina.
+
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def _run_multisearch(self, searches):
+        """Versión de '_run_multisearch' que utiliza la conexión asincrónica.
+
+        Args:
+            searches (list): Lista de _CanonicalSearch (ver
+                '_collapse_searches').
+
+        Raises:
+            DataConnectionException: Si ocurrió un error al ejecutar las
+                búsquedas.
+
+        Returns:
+            list: Lista de respuestas a cada búsqueda.
+
+        """
+        cache = search_cache.get_search_cache()
+        if cache is None or not searches:
+            return self._run_uncached_multisearch(searches)
+
+        aliases = cache.outdated_aliases(searches)
+        if aliases:
+            for alias, response in zip(aliases, self._wait(
+                    _get_aliases_async(self._es, aliases))):
+                cache.set_index_version(alias, response)
+
+        keys = _search_keys(cache, searches)
+        responses = _cached_responses(cache, keys)
+
+        missing = [i for i, response in enumerate(responses)
+                   if response is None]
+        if missing:
+            _store_responses(cache, keys, responses, missing,
+                             self._run_uncached_multisearch([
+                                 searches[i] for i in missing
+                             ]))
+
+        return responses
+
+    def _run_uncached_multisearch(self, searches):
+        """Versión de '_run_uncached_multisearch' que utiliza la conexión
+        asincrónica.
+
+        Args:
+            searches (list): Lista de elasticsearch_dsl.Search.
+
+        Raises:
+            DataConnectionException: Si ocurrió un error al ejecutar las
+                búsquedas.
+
+        Returns:
+            list: Lista de respuestas a cada búsqueda.
+
+        """
+        requests = [_multisearch_request(ms)
+                    for ms in _build_multisearches(self._es, searches)]
+
+        responses = []
+        for raw_responses in self._wait(_send_multisearches_async(self._es,
+                                                                  requests)):
+            responses.extend(_multisearch_responses(raw_responses))
+
+        return responses
+
+    def run_search_steps(self, iterators):
+        """Ejecuta las búsquedas requeridas por un conjunto de iteradores de
+        pasos, de la misma forma que 'run_search_steps'. Debe ser invocado
+        dentro de un contexto de la aplicación Flask, y nunca desde el thread
+        del event loop.
+
+        Args:
+            iterators (list): Lista de iteradores de pasos (ver
+                '_search_rounds').
+
+        Raises:
+            DataConnectionException: Si ocurrió un error al ejecutar las
+                búsquedas.
+
+        Returns:
+            SearchStats: Contadores de las búsquedas ejecutadas.
+
+        """
+        stats = SearchStats()
+        rounds = _search_rounds(iterators)
+        round_searches = utils.step_iterator(rounds)
+
+        while round_searches:
+            unique_searches, search_positions = _collapse_searches(
+                round_searches)
+            responses = _expand_responses(
+                search_positions, self._run_multisearch(unique_searches))
+
+            stats.add_round(len(round_searches), len(unique_searches))
+            round_searches = utils.step_iterator(rounds, responses)
+
+        return stats
+
+
+def set_thread_search_runner(runner):
+    """Establece el objeto 'AsyncSearchRunner' a utilizar en el thread actual
+    para ejecutar 'run_search_steps'.
+
+    Args:
+        runner (AsyncSearchRunner): Objeto a utilizar, o 'None' para ejecutar
+            las búsquedas utilizando la conexión sincrónica recibida.
+
+    """
+    _thread_state.search_runner = runner
+
+
 class ElasticsearchSearch(ABC):
     """Representa una búsqueda a realizar utilizando Elasticsearch. Dependiendo
     de los parámetros de búsqueda, se puede llegar a necesitar más de una
@@ -118,18 +1144,48 @@ class ElasticsearchSearch(ABC):
                 dentro del diccionario.
 
         """
-        self._search = Search(index=index)
+        self._index = index
+        self._offset = query.get('offset', 0)
+        self._result = None
+
+        if constants.ES_COMPILED_QUERIES and self._compiled_query_allowed():
+            self._search = query_templates.compiled_search(
+                index, (self.__class__, index), query,
+                _TEMPLATE_CONST_PARAMS, self._build_dsl_search)
+        else:
+            self._search = self._build_dsl_search(query)
+
+    def _build_dsl_search(self, query):
+        """Construye la búsqueda principal utilizando objetos de
+        elasticsearch_dsl.
+
+        Args:
+            query (dict): Parámetros de la búsqueda.
+
+        Returns:
+            elasticsearch_dsl.Search: Búsqueda construida.
+
+        """
+        self._search = Search(index=self._index)
         if constants.ES_TRACK_TOTAL_HITS:
             # Configurar la cantidad máxima de hits con los que se pueden
             # calcular total de hits precisos (nuevo en Elasticsearch 7.0.0).
             self._search = self._search.extra(
                 track_total_hits=constants.ES_TRACK_TOTAL_HITS)
 
-        self._index = index
-        self._offset = query.get('offset', 0)
-        self._result = None
-
         self._read_query(**query)
+        return self._search
+
+    def _compiled_query_allowed(self):
+        """Indica si la búsqueda principal puede ser construida a partir de un
+        template compilado (ver módulo 'query_templates'), en lugar de
+        utilizar objetos de elasticsearch_dsl.
+
+        Returns:
+            bool: Verdadero si se puede utilizar un template compilado.
+
+        """
+        return True
 
     @abstractmethod
     def search_steps(self):
@@ -140,6 +1196,11 @@ class ElasticsearchSearch(ABC):
         Cuando el iterador finaliza, el valor de 'self._result' contiene el
         resultado final de la búsqueda.
 
+        Además de búsquedas DSL, el iterador puede producir búsquedas
+        ElasticsearchSearch (o listas de las mismas) anidadas, cuyos pasos
+        son ejecutados junto con los del resto de las búsquedas (ver
+        '_search_rounds').
+
         Yields:
             elasticsearch_dsl.Search: Búsqueda DSL que se desea ejecutar. Sus
                 resultados deberían ser devueltos por el invocador de
@@ -174,14 +1235,13 @@ class ElasticsearchSearch(ABC):
         de Elasticsearch no acepta IDs de documentos no existentes. Si se
         intenta utilizar un ID inválido, retorna HTTP 400.
 
-        Para realizar la búsqueda, se retorna un iterador de
-        elasticsearch_dsl.Search. De esta forma, se puede utilizar este método
-        desde 'search_steps', agregando instancias de elasticsearch_dsl.Search
-        que deben ser ejecutadas para completar los resultados de la instancia
-        de ElasticsearchSearch.
+        Para realizar la búsqueda, se retorna un iterador que produce la lista
+        de búsquedas ElasticsearchSearch necesarias (una por tipo de entidad,
+        ejecutadas en la misma ronda). De esta forma, se puede utilizar este
+        método desde 'search_steps'.
 
         Yields:
-            elasticsearch_dsl.Search: Búsqueda DSL necesaria para completar el
+            list: Búsquedas ElasticsearchSearch necesarias para completar el
                 chequeo de IDs.
 
         Args:
@@ -190,25 +1250,27 @@ class ElasticsearchSearch(ABC):
                 tipo de entidad.
 
         """
-        checked_ids = {}
-
-        for entity_type in INTERSECTION_PARAM_TYPES:
-            if entity_type not in geo_shape_ids:
-                continue
+        entity_types = [
+            entity_type for entity_type in INTERSECTION_PARAM_TYPES
+            if entity_type in geo_shape_ids
+        ]
+        searches = []
 
+        for entity_type in entity_types:
             entity_ids = list(geo_shape_ids[entity_type])
             search_class = entity_search_class(entity_type)
-            search = search_class({
+            searches.append(search_class({
                 'ids': entity_ids,
                 'size': len(entity_ids),
                 'fields': [N.ID]
-            })
+            }))
 
-            yield from search.search_steps()
+        results = yield searches
 
-            checked_ids[entity_type] = [
-                hit[N.ID] for hit in search.result.hits
-            ]
+        checked_ids = {
+            entity_type: [hit[N.ID] for hit in result.hits]
+            for entity_type, result in zip(entity_types, results)
+        }
 
         self._search = self._search.query(_build_geo_query(
             N.GEOM,
@@ -227,18 +1289,16 @@ class ElasticsearchSearch(ABC):
         IDs de los resultados encontrados en la búsqueda principal
         ('self._search').
 
-        Para realizar la búsqueda de geometrías, se retorna un iterador de
-        elasticsearch_dsl.Search. De esta forma, se puede utilizar este método
-        desde 'search_steps', agregando instancias de elasticsearch_dsl.Search
-        que deben ser ejecutadas para completar los resultados de la instancia
-        de ElasticsearchSearch.
+        Para realizar la búsqueda de geometrías, se retorna un iterador que
+        produce la búsqueda ElasticsearchSearch necesaria. De esta forma, se
+        puede utilizar este método desde 'search_steps'.
 
         Args:
-            search_class (type): Clase a utilizar para crear el iterador de
-                búsquedas.
+            search_class (type): Clase a utilizar para crear la búsqueda de
+                geometrías.
 
         Yields:
-            elasticsearch_dsl.Search: Búsqueda DSL necesaria para obtener las
+            ElasticsearchSearch: Búsqueda necesaria para obtener las
                 geometrías.
 
         """
@@ -250,11 +1310,11 @@ class ElasticsearchSearch(ABC):
             'size': len(ids)
         })
 
-        yield from geom_search.search_steps()
+        geom_result = yield geom_search
 
         original_hits = {hit[N.ID]: hit for hit in self._result.hits}
 
-        for hit in geom_search.result.hits:
+        for hit in geom_result.hits:
             # Agregar campo geometría a los resultados originales
             original_hits[hit[N.ID]][N.GEOM] = hit[N.GEOM]
 
@@ -292,6 +1352,15 @@ class ElasticsearchSearch(ABC):
             3) Utilizar la funcionalidad de MultiSearch para hacer la menor
                cantidad de consultas posible a Elasticsearch.
 
+        Las búsquedas elasticsearch_dsl.Search idénticas de una misma ronda
+        (mismos índices y cuerpo) se envían una sola vez a Elasticsearch, y su
+        respuesta se entrega a todos los iteradores que la generaron.
+
+        Los iteradores se ejecutan utilizando 'run_search_steps' (ver
+        '_search_rounds'), por lo que las búsquedas ElasticsearchSearch
+        anidadas dentro de otras comparten rondas con el resto de las
+        búsquedas.
+
         Los resultados de cada búsqueda pueden ser accedidos vía el campo
         '.result' de cada una.
 
@@ -302,27 +1371,38 @@ class ElasticsearchSearch(ABC):
                 contenidos son fraccionados por '_run_multisearch' para evitar
                 consultas demasiado extensas a Elasticsearch.
 
+        Returns:
+            SearchStats: Contadores de las búsquedas ejecutadas. Los mismos
+                también se suman a los contadores de la request HTTP actual
+                (ver 'request_search_stats').
+
         """
-        iterators = [search.search_steps() for search in searches]
-        iteration_data = []
-        for iterator in iterators:
-            search = utils.step_iterator(iterator)
+        return run_search_steps(es, [
+            search.search_steps() for search in searches
+        ])
 
-            if search:
-                iteration_data.append((iterator, search))
+    @staticmethod
+    async def run_searches_async(es, searches):
+        """Versión asincrónica de 'run_searches'. Los iteradores
+        'search_steps' de cada búsqueda se utilizan de la misma forma, pero
+        las búsquedas de cada ronda se envían utilizando una conexión
+        asincrónica a Elasticsearch.
 
-        while iteration_data:
-            responses = _run_multisearch(es, [
-                search for _, search in iteration_data
-            ])
+        A diferencia de 'run_searches', los contadores de búsquedas no se
+        suman a los de la request HTTP actual.
 
-            iterators = (iterator for iterator, _ in iteration_data)
-            iteration_data = []
+        Args:
+            es (AsyncElasticsearch): Conexión asincrónica a Elasticsearch.
+            searches (list): Lista de búsquedas ElasticsearchSearch o
+                derivados.
 
-            for iterator, response in zip(iterators, responses):
-                search = utils.step_iterator(iterator, response)
-                if search:
-                    iteration_data.append((iterator, search))
+        Returns:
+            SearchStats: Contadores de las búsquedas ejecutadas.
+
+        """
+        return await run_search_steps_async(es, [
+            search.search_steps() for search in searches
+        ])
 
 
 class TerritoriesSearch(ElasticsearchSearch):
@@ -374,9 +1454,16 @@ class TerritoriesSearch(ElasticsearchSearch):
 
         super().__init__(index, query)
 
+    def _compiled_query_allowed(self):
+        # La búsqueda se modifica luego de validar los IDs de
+        # 'geo_shape_ids', por lo que debe ser construida con
+        # elasticsearch_dsl.
+        return not self._geo_shape_ids
+
     def _read_query(self, ids=None, name=None, census_locality=None,
                     municipality=None, department=None, state=None,
-                    exact=False, geo_shape_geoms=None, order=None, **kwargs):
+                    exact=False, geo_shape_geoms=None,
+                    geo_shape_relation='intersects', order=None, **kwargs):
         """Lee los parámetros de búsqueda recibidos y los agrega al atributo
         'self._search'. Luego, invoca al método '_read_query' de la superclase
         con los parámetros que no fueron procesados.
@@ -394,6 +1481,8 @@ class TerritoriesSearch(ElasticsearchSearch):
                 provincia, etc.).
             geo_shape_geoms (list): Lista de geometrías GeoJSON a utilizar para
                 filtrar por intersección con geometrías.
+            geo_shape_relation (str): Relación a utilizar al filtrar por
+                'geo_shape_geoms' (por defecto, 'intersects').
             order (str): Campo a utilizar para ordenar los resultados.
             kwargs (dict): Parámetros a delegar a la superclase.
 
@@ -410,7 +1499,8 @@ class TerritoriesSearch(ElasticsearchSearch):
         if geo_shape_geoms:
             self._search = self._search.query(_build_geo_query(
                 N.GEOM,
-                geoms=geo_shape_geoms
+                geoms=geo_shape_geoms,
+                relation=geo_shape_relation
             ))
 
         if census_locality:
@@ -495,6 +1585,10 @@ class StreetsSearch(ElasticsearchSearch):
         self._geo_shape_ids = query.pop('geo_shape_ids', None)
         super().__init__(N.STREETS, query)
 
+    def _compiled_query_allowed(self):
+        # Ver comentario en 'TerritoriesSearch._compiled_query_allowed'.
+        return not self._geo_shape_ids
+
     def _read_query(self, ids=None, name=None, census_locality=None,
                     department=None, state=None, category=None, order=None,
                     exact=False, **kwargs):
@@ -940,6 +2034,10 @@ def entity_search_class(entity):
 class ElasticsearchResult:
     """Representa resultados para una consulta a Elasticsearch.
 
+    Los resultados se construyen directamente a partir de la respuesta de
+    Elasticsearch (dict), utilizando los diccionarios '_source' de cada
+    documento como resultados.
+
     Attributes:
         _hits (list): Lista de resultados (diccionarios).
         _total (int): Total de resultados encontrados, no necesariamente
@@ -952,12 +2050,15 @@ class ElasticsearchResult:
     __slots__ = ['_hits', '_total', '_offset']
 
     def __init__(self, response, offset):
-        self._hits = [hit.to_dict() for hit in response.hits]
-        # En Elasticsearch 7.0.0, response.hits.total dejó de ser un int y
-        # ahora es un objeto (dict). Si total.relation es 'gte', entonces el
-        # total es un estimado (lower bound). Solo se hacen estimados para
-        # queries que matcheen más de 10k documentos (por default).
-        self._total = response.hits.total.value
+        hits = response['hits']
+        # Al utilizar 'filter_path', Elasticsearch omite la lista de
+        # documentos si la misma está vacía.
+        self._hits = [hit['_source'] for hit in hits.get('hits', ())]
+        # En Elasticsearch 7.0.0, hits.total dejó de ser un int y ahora es un
+        # objeto (dict). Si total.relation es 'gte', entonces el total es un
+        # estimado (lower bound). Solo se hacen estimados para queries que
+        # matcheen más de 10k documentos (por default).
+        self._total = hits['total']['value']
         self._offset = offset
 
     @property
@@ -6,22 +6,28 @@ las consultas a los índices o a la base de datos.
 
 import csv
 import io
+import operator
+import threading
 import zipfile
 import shutil
 from xml.etree import ElementTree
 from flask import make_response, jsonify, Response, request, send_file
+from flask import current_app, stream_with_context
 import geojson
 import shapefile
-from service import strings, constants
+from service import strings, constants, serializer
 from service import names as N
+from service.cache import LRUCache
 
 
 CSV_SEP = ','
 CSV_QUOTE = '"'
 CSV_NEWLINE = '\n'
+NDJSON_MIMETYPE = 'application/x-ndjson'
 FLAT_SEP = '_'
 _SHP_MAX_FIELD_CONTENT_LEN = 128
 _SHP_MAX_FIELD_NAME_LEN = 11
+_PROJECTORS_CACHE_SIZE = 512
 _SHP_PRJ = ('GEOGCS["GCS_WGS_1984",DATUM["D_WGS_1984",SPHEROID["WGS_1984",6378'
             '137,298.257223563]],PRIMEM["Greenwich",0],UNIT["Degree",0.0174532'
             '92519943295]]')
@@ -182,6 +188,9 @@ _SHP_SHORT_FIELD_NAMES = {
 caracteres, por lo que es necesario especificar abreviaciones para campos que
 maneje la API que sean demasiado largos."""
 
+_projectors = LRUCache(_PROJECTORS_CACHE_SIZE)
+_projectors_lock = threading.Lock()
+
 
 class CSVLineWriter:
     """La clase CSVWriter permite escribir contenido CSV de a líneas, sin la
@@ -494,16 +503,18 @@ def create_405_error_response(url_map):
         flask.Response: Respuesta HTTP con error 405.
 
     """
-    methods = {
-        rule.rule: (list(rule.methods.difference({'HEAD', 'OPTIONS'})))
-        for rule
-        in url_map.iter_rules()
-    }
+    # Utilizar el mapa de URLs para obtener los métodos de la regla que
+    # corresponde a la URL (que puede contener variables, como el ID de un
+    # trabajo).
+    methods = url_map.bind_to_environ(request.environ).allowed_methods()
 
     errors = [
         {
             'mensaje': strings.NOT_ALLOWED,
-            'metodos_disponibles': methods[request.path]
+            'metodos_disponibles': [
+                method for method in methods
+                if method not in {'HEAD', 'OPTIONS'}
+            ]
         }
     ]
 
@@ -544,19 +555,21 @@ def _format_result_xml(name, result, fmt):
 
     """
     # Remover campos no especificados por el usuario.
-    _format_result_fields(result, fmt)
+    projector = get_projector(name, fmt[N.FIELDS])
 
     root = _create_xml_element(N.RESULT)
     root.append(value_to_xml(N.PARAMETERS, result.params,
                              list_item_default=N.ITEM))
 
     if result.iterable:
-        root.append(value_to_xml(name, result.entities))
-        root.append(_create_xml_element(N.QUANTITY, len(result.entities)))
+        entities = [projector.project(entity) for entity in result.entities]
+        root.append(value_to_xml(name, entities))
+        root.append(_create_xml_element(N.QUANTITY, len(entities)))
         root.append(_create_xml_element(N.TOTAL, result.total))
         root.append(_create_xml_element(N.OFFSET, result.offset))
     else:
-        root.append(value_to_xml(name, result.first_entity()))
+        root.append(value_to_xml(
+            name, projector.project(result.first_entity())))
 
     return root
 
@@ -605,9 +618,9 @@ def _create_shp_response_single(name, result, fmt):
     prj = io.BytesIO(_SHP_PRJ.encode('utf-8'))
 
     writer = shapefile.Writer(shp=shp, shx=shx, dbf=dbf)
-    keys = [field.replace(N.FIELDS_SEP, FLAT_SEP) for field in fmt[N.FIELDS]]
+    projector = get_projector(name, fmt[N.FIELDS])
 
-    for key in keys:
+    for key in projector.field_names:
         if len(key) > _SHP_MAX_FIELD_NAME_LEN:
             key = _SHP_SHORT_FIELD_NAMES[key]
         writer.field(key, 'C', _SHP_MAX_FIELD_CONTENT_LEN)
@@ -615,10 +628,9 @@ def _create_shp_response_single(name, result, fmt):
     for entity in result.entities:
         writer.shape(entity[N.GEOM])
 
-        flatten_dict(entity, max_depth=3)
         record = []
-        for key in keys:
-            value = str(entity[key])
+        for value in projector.fields_row(entity):
+            value = str(value)
             if len(value) > _SHP_MAX_FIELD_CONTENT_LEN:
                 value = value[:_SHP_MAX_FIELD_CONTENT_LEN]
 
@@ -642,6 +654,18 @@ def _create_shp_response_single(name, result, fmt):
                      as_attachment=True)
 
 
+def _csv_writer():
+    """Crea un objeto CSVLineWriter con el formato de las respuestas CSV de la
+    API.
+
+    Returns:
+        CSVLineWriter: Objeto writer.
+
+    """
+    return CSVLineWriter(delimiter=CSV_SEP, lineterminator=CSV_NEWLINE,
+                         quotechar=CSV_QUOTE, quoting=csv.QUOTE_NONNUMERIC)
+
+
 def _create_csv_response_single(name, result, fmt):
     """Toma un resultado (iterable) de una consulta, y devuelve una respuesta
     HTTP 200 con el resultado en formato CSV.
@@ -656,27 +680,13 @@ def _create_csv_response_single(name, result, fmt):
 
     """
     def csv_generator():
-        csv_writer = CSVLineWriter(delimiter=CSV_SEP,
-                                   lineterminator=CSV_NEWLINE,
-                                   quotechar=CSV_QUOTE,
-                                   quoting=csv.QUOTE_NONNUMERIC)
-
-        keys = []
-        field_names = []
-        csv_fields = _ENDPOINT_CSV_FIELDS[name]
+        csv_writer = _csv_writer()
+        projector = get_projector(name, fmt[N.FIELDS])
 
-        for original_field, csv_field_name in csv_fields:
-            if original_field in fmt[N.FIELDS]:
-                keys.append(original_field.replace(N.FIELDS_SEP, FLAT_SEP))
-                field_names.append(FLAT_SEP.join(csv_field_name))
-
-        yield csv_writer.row_to_str(field_names)
+        yield csv_writer.row_to_str(projector.csv_field_names)
 
         for match in result.entities:
-            flatten_dict(match, max_depth=3)
-            values = [match[key] for key in keys]
-
-            yield csv_writer.row_to_str(values)
+            yield csv_writer.row_to_str(projector.csv_row(match))
 
     resp = Response(csv_generator(), mimetype='text/csv')
     return make_response((resp, {
@@ -685,11 +695,42 @@ def _create_csv_response_single(name, result, fmt):
     }))
 
 
-def _create_geojson_response_single(result, fmt):
+def _create_ndjson_response_single(name, result, fmt):
+    """Toma un resultado (iterable) de una consulta, y devuelve una respuesta
+    HTTP 200 con el resultado en formato NDJSON (una entidad por línea). Las
+    entidades son formateadas y codificadas a medida que se envía la
+    respuesta.
+
+    Args:
+        name (str): Nombre de la entidad que fue consultada.
+        result (QueryResult): Resultado de una consulta (con iterable==True).
+        fmt (dict): Parámetros de formato.
+
+    Returns:
+        flask.Response: Respuesta HTTP con contenido NDJSON.
+
+    """
+    def ndjson_generator():
+        projector = get_projector(name, fmt[N.FIELDS],
+                                  fmt.get(N.FLATTEN, False))
+
+        for match in result.entities:
+            yield serializer.dumps(projector.project(match)) + b'\n'
+
+    resp = Response(stream_with_context(ndjson_generator()),
+                    mimetype=NDJSON_MIMETYPE)
+    return make_response((resp, {
+        'Content-Disposition': 'attachment; filename={}.ndjson'.format(
+            name.lower())
+    }))
+
+
+def _create_geojson_response_single(name, result, fmt):
     """Toma un resultado de una consulta, y devuelve una respuesta
     HTTP 200 con el resultado en formato GeoJSON.
 
     Args:
+        name (str): Nombre de la entidad consultada.
         result (QueryResult): Resultado de una consulta.
         fmt (dict): Parámetros de formato.
 
@@ -698,10 +739,11 @@ def _create_geojson_response_single(result, fmt):
 
     """
     # Remover campos no especificados por el usuario.
-    _format_result_fields(result, fmt)
+    projector = get_projector(name, fmt[N.FIELDS])
 
     features = []
-    for item in result.entities:
+    for entity in result.entities:
+        item = projector.project(entity)
         lat, lon = None, None
         if N.LAT in item and N.LON in item:
             lat = item.pop(N.LAT)
@@ -713,12 +755,15 @@ def _create_geojson_response_single(result, fmt):
 
         if lat and lon:
             if fmt.get(N.FLATTEN, False):
-                flatten_dict(item, max_depth=3)
+                # El punto de la entidad no se incluye en sus propiedades, por
+                # lo que se aplana la entidad luego de removerlo.
+                item = _flattened(item)
 
             point = geojson.Point((lon, lat))
             features.append(geojson.Feature(geometry=point, properties=item))
 
-    return make_response(jsonify(geojson.FeatureCollection(features)))
+    return make_response(
+        serializer.json_response(geojson.FeatureCollection(features)))
 
 
 def _format_result_json(name, result, fmt):
@@ -734,27 +779,22 @@ def _format_result_json(name, result, fmt):
         dict: Resultados con estructura y formato apropiados.
 
     """
-    # Remover campos no especificados por el usuario.
-    _format_result_fields(result, fmt)
-
-    if fmt.get(N.FLATTEN, False):
-        if result.iterable:
-            for match in result.entities:
-                flatten_dict(match, max_depth=3)
-        else:
-            flatten_dict(result.first_entity(), max_depth=3)
+    # Remover campos no especificados por el usuario, y aplanar las
+    # entidades si fue solicitado.
+    projector = get_projector(name, fmt[N.FIELDS], fmt.get(N.FLATTEN, False))
 
     if result.iterable:
+        entities = [projector.project(entity) for entity in result.entities]
         return {
-            name: result.entities,
-            N.QUANTITY: len(result.entities),
+            name: entities,
+            N.QUANTITY: len(entities),
             N.TOTAL: result.total,
             N.OFFSET: result.offset,
             N.PARAMETERS: result.params
         }
 
     return {
-        name: result.first_entity(),
+        name: projector.project(result.first_entity()),
         N.PARAMETERS: result.params
     }
 
@@ -773,12 +813,45 @@ def _create_json_response_single(name, result, fmt):
 
     """
     json_response = _format_result_json(name, result, fmt)
-    return jsonify(json_response)
+    return serializer.json_response(json_response)
+
+
+def _json_bulk_generator(name, results, formats):
+    """Genera el contenido de una respuesta JSON bulk de forma incremental:
+    cada resultado es formateado y codificado recién al ser enviado. El
+    contenido generado es idéntico al que se obtendría codificando el objeto
+    '{"resultados": [...]}' completo.
+
+    Una vez codificado, cada resultado es removido de la lista 'results',
+    para que la memoria utilizada por sus entidades pueda ser liberada antes
+    de terminar de enviar la respuesta.
+
+    Args:
+        name (str): Nombre de la entidad consultada.
+        results (list): Lista de resultados.
+        formats (list): Lista de parámetros de formato por consulta.
+
+    Yields:
+        bytes: Fragmentos del contenido JSON.
+
+    """
+    yield b'{' + serializer.dumps(N.RESULTS) + b':['
+
+    for i, fmt in enumerate(formats):
+        json_result = serializer.dumps(
+            _format_result_json(name, results[i], fmt))
+        results[i] = None
+
+        yield json_result if i == 0 else b',' + json_result
+
+    yield b']}\n'
 
 
 def _create_json_response_bulk(name, results, formats):
     """Toma una lista de resultados de una consulta o más, y devuelve una
-    respuesta HTTP 200 con los resultados en formato JSON.
+    respuesta HTTP 200 con los resultados en formato JSON. La respuesta es
+    enviada de forma incremental (ver '_json_bulk_generator'), excepto
+    cuando Flask genera contenidos JSON con indentación.
 
     Args:
         name (str): Nombre de la entidad consultada.
@@ -789,14 +862,17 @@ def _create_json_response_bulk(name, results, formats):
         flask.Response: Respuesta HTTP con contenido JSON.
 
     """
-    json_results = [
-        _format_result_json(name, result, fmt)
-        for result, fmt in zip(results, formats)
-    ]
+    if serializer.pretty_print():
+        return serializer.json_response({
+            N.RESULTS: [
+                _format_result_json(name, result, fmt)
+                for result, fmt in zip(results, formats)
+            ]
+        })
 
-    return jsonify({
-        N.RESULTS: json_results
-    })
+    return Response(
+        stream_with_context(_json_bulk_generator(name, results, formats)),
+        mimetype=current_app.config['JSONIFY_MIMETYPE'])
 
 
 def filter_result_fields(result, fields_dict, max_depth=3):
@@ -825,23 +901,6 @@ def filter_result_fields(result, fields_dict, max_depth=3):
             filter_result_fields(value, fields_dict[key], max_depth - 1)
 
 
-def _format_result_fields(result, fmt):
-    """Dada la lista de campos en fmt[N.FIELDS], remueve los campos no
-    especificados en cada entidad del resultado.
-
-    Args:
-        result (QueryResult): Resultado con valores a filtrar.
-        fmt (dict): Parámetros de formato.
-
-    """
-    fields_dict = fields_list_to_dict(fmt[N.FIELDS])
-    if result.iterable:
-        for item in result.entities:
-            filter_result_fields(item, fields_dict)
-    else:
-        filter_result_fields(result.first_entity(), fields_dict)
-
-
 def fields_list_to_dict(fields, sep=N.FIELDS_SEP):
     """Convierte una lista de campos (potencialmente, campos anidados separados
     con puntos) en un diccionario de uno o más niveles conteniendo 'True' por
@@ -881,6 +940,254 @@ def fields_list_to_dict(fields, sep=N.FIELDS_SEP):
     return fields_dict
 
 
+def _flattened(d, max_depth=3, sep=FLAT_SEP):
+    """Versión de 'flatten_dict' que no modifica el diccionario original, y
+    devuelve un nuevo diccionario aplanado. El orden de las keys resultantes
+    es el mismo que el obtenido con 'flatten_dict'.
+
+    Args:
+        d (dict): Diccionario a aplanar.
+        max_depth (int): Profundidad máxima a alcanzar.
+        sep (str): Separador de keys anidadas.
+
+    Raises:
+        RuntimeError: cuando se alcanza la profundidad máxima.
+
+    Returns:
+        dict: Diccionario aplanado.
+
+    """
+    if max_depth <= 0:
+        raise RuntimeError("Maximum depth reached")
+
+    flat = {}
+    nested = []
+
+    for key, value in d.items():
+        if isinstance(value, dict):
+            nested.append((key, _flattened(value, max_depth - 1, sep)))
+        else:
+            flat[key] = value
+
+    # 'flatten_dict' agrega las keys aplanadas al final del diccionario.
+    for key, subdict in nested:
+        for subkey, subval in subdict.items():
+            flat[sep.join([key, subkey])] = subval
+
+    return flat
+
+
+def _compile_projection(fields_dict, flatten, max_depth=3):
+    """Genera una función que construye, en una sola pasada, una copia de una
+    entidad que contiene solo los campos especificados, y que opcionalmente
+    está aplanada. El resultado es idéntico al de aplicar
+    'filter_result_fields' y luego 'flatten_dict' sobre la entidad, pero la
+    entidad original no es modificada.
+
+    Args:
+        fields_dict (dict): Diccionario de campos (ver
+            'fields_list_to_dict').
+        flatten (bool): Verdadero si se debe aplanar el resultado.
+        max_depth (int): Profundidad máxima a alcanzar.
+
+    Returns:
+        function: Función que recibe una entidad (dict) y devuelve su
+            proyección (dict).
+
+    """
+    if max_depth <= 0:
+        def fail(_):
+            raise RuntimeError('Maximum depth reached')
+
+        return fail
+
+    # Proyección de cada campo: None para los campos a incluir completos, o
+    # una función para los campos con subcampos especificados. También se
+    # precalcula el prefijo de las keys aplanadas de cada campo.
+    children = {
+        key: (None if field is True else
+              _compile_projection(field, flatten, max_depth - 1),
+              key + FLAT_SEP)
+        for key, field in fields_dict.items()
+        if field
+    }
+
+    def project(entity):
+        projected = {}
+        nested = []
+
+        for key, value in entity.items():
+            if key not in children:
+                continue
+
+            child, prefix = children[key]
+            if child is not None:
+                if not isinstance(value, dict):
+                    raise ValueError(
+                        'Can\'t specify sub-fields for non-dict values')
+
+                value = child(value)
+                if flatten:
+                    nested.append((prefix, value))
+                    continue
+            elif flatten and isinstance(value, dict):
+                nested.append((prefix, _flattened(value, max_depth - 1)))
+                continue
+
+            projected[key] = value
+
+        for prefix, subdict in nested:
+            for subkey, subval in subdict.items():
+                projected[prefix + subkey] = subval
+
+        return projected
+
+    return project
+
+
+def _compile_path_getter(field):
+    """Genera una función que obtiene el valor de un campo (potencialmente
+    anidado) de una entidad sin aplanar.
+
+    Args:
+        field (str): Nombre del campo (por ejemplo, 'provincia.id').
+
+    Returns:
+        function: Función que recibe una entidad y devuelve el valor del
+            campo.
+
+    """
+    path = field.split(N.FIELDS_SEP)
+    if len(path) == 1:
+        return operator.itemgetter(path[0])
+
+    def get_value(entity):
+        for part in path:
+            entity = entity[part]
+
+        return entity
+
+    return get_value
+
+
+class ResultProjector:
+    """Proyección de las entidades de un endpoint para una lista de campos y
+    un valor del parámetro 'aplanar'. Las funciones de proyección son
+    generadas una única vez por combinación de parámetros (ver
+    'get_projector'), y construyen el contenido de cada respuesta
+    directamente desde las entidades obtenidas, sin modificarlas.
+
+    Attributes:
+        _project (function): Función de proyección de entidades (ver
+            '_compile_projection').
+        _csv_getters (list): Funciones que obtienen el valor de cada columna
+            CSV de una entidad (vacía si el endpoint no genera CSV).
+        _csv_field_names (list): Nombres de las columnas CSV.
+        _field_getters (list): Funciones que obtienen el valor de cada campo
+            de una entidad, en el orden de la lista de campos.
+        _field_names (list): Nombres de los campos aplanados, en el orden de
+            la lista de campos.
+
+    """
+
+    __slots__ = ['_project', '_csv_getters', '_csv_field_names',
+                 '_field_getters', '_field_names']
+
+    def __init__(self, name, fields, flatten):
+        """Inicializa un objeto de tipo ResultProjector.
+
+        Args:
+            name (str): Nombre de la entidad consultada.
+            fields (tuple): Lista de campos solicitados.
+            flatten (bool): Verdadero si se deben aplanar las entidades.
+
+        """
+        self._project = _compile_projection(fields_list_to_dict(fields),
+                                            flatten)
+
+        self._csv_getters = []
+        self._csv_field_names = []
+        for original_field, csv_field_name in _ENDPOINT_CSV_FIELDS.get(name,
+                                                                       []):
+            if original_field in fields:
+                self._csv_getters.append(_compile_path_getter(original_field))
+                self._csv_field_names.append(FLAT_SEP.join(csv_field_name))
+
+        self._field_getters = [_compile_path_getter(field)
+                               for field in fields]
+        self._field_names = [field.replace(N.FIELDS_SEP, FLAT_SEP)
+                             for field in fields]
+
+    def project(self, entity):
+        """Proyecta una entidad, manteniendo solo los campos solicitados.
+
+        Args:
+            entity (dict): Entidad a proyectar (no es modificada).
+
+        Returns:
+            dict: Entidad proyectada.
+
+        """
+        return self._project(entity)
+
+    @property
+    def csv_field_names(self):
+        return self._csv_field_names
+
+    def csv_row(self, entity):
+        """Obtiene los valores de las columnas CSV de una entidad.
+
+        Args:
+            entity (dict): Entidad sin aplanar.
+
+        Returns:
+            list: Valor de cada columna.
+
+        """
+        return [getter(entity) for getter in self._csv_getters]
+
+    @property
+    def field_names(self):
+        return self._field_names
+
+    def fields_row(self, entity):
+        """Obtiene los valores de los campos solicitados de una entidad, en
+        el orden de la lista de campos.
+
+        Args:
+            entity (dict): Entidad sin aplanar.
+
+        Returns:
+            list: Valor de cada campo.
+
+        """
+        return [getter(entity) for getter in self._field_getters]
+
+
+def get_projector(name, fields, flatten=False):
+    """Devuelve el objeto ResultProjector para un endpoint, una lista de
+    campos y un valor del parámetro 'aplanar', creándolo si no existía.
+
+    Args:
+        name (str): Nombre de la entidad consultada.
+        fields (tuple): Lista de campos solicitados.
+        flatten (bool): Verdadero si se deben aplanar las entidades.
+
+    Returns:
+        ResultProjector: Proyección de entidades.
+
+    """
+    key = (name, tuple(fields), bool(flatten))
+
+    with _projectors_lock:
+        projector = _projectors.get(key)
+        if projector is None:
+            projector = ResultProjector(name, key[1], key[2])
+            _projectors[key] = projector
+
+    return projector
+
+
 def create_ok_response(name, result, fmt):
     """Toma un resultado de una consulta, y devuelve una respuesta
     HTTP 200 con el resultado en el formato especificado.
@@ -908,11 +1215,18 @@ def create_ok_response(name, result, fmt):
 
         return _create_csv_response_single(name, result, fmt)
 
+    if fmt[N.FORMAT] == 'ndjson':
+        if not result.iterable:
+            raise ValueError(
+                'Can\'t create NDJSON response from non-iterable content')
+
+        return _create_ndjson_response_single(name, result, fmt)
+
     if fmt[N.FORMAT] == 'xml':
         return _create_xml_response_single(name, result, fmt)
 
     if fmt[N.FORMAT] == 'geojson':
-        return _create_geojson_response_single(result, fmt)
+        return _create_geojson_response_single(name, result, fmt)
 
     if fmt[N.FORMAT] == 'shp':
         return _create_shp_response_single(name, result, fmt)
@@ -920,6 +1234,192 @@ def create_ok_response(name, result, fmt):
     raise ValueError('Unknown format')
 
 
+def ndjson_result_line(name, result, fmt):
+    """Toma el resultado de una consulta, y lo codifica como una línea de una
+    respuesta NDJSON bulk. El contenido de la línea es idéntico al de cada
+    elemento de la lista 'resultados' de las respuestas JSON bulk.
+
+    Args:
+        name (str): Nombre de la entidad consultada.
+        result (QueryResult): Resultado de una consulta.
+        fmt (dict): Parámetros de formato.
+
+    Returns:
+        bytes: Línea NDJSON (incluyendo el salto de línea).
+
+    """
+    return serializer.dumps(_format_result_json(name, result, fmt)) + b'\n'
+
+
+def ndjson_param_errors_line(errors):
+    """Toma un diccionario de errores de parámetros de una consulta, y lo
+    codifica como una línea de una respuesta NDJSON bulk.
+
+    Args:
+        errors (dict): Diccionario de errores.
+
+    Returns:
+        bytes: Línea NDJSON (incluyendo el salto de línea).
+
+    """
+    return serializer.dumps({
+        'errores': _format_params_error_dict(errors)
+    }) + b'\n'
+
+
+def ndjson_internal_error_line():
+    """Retorna una línea de una respuesta NDJSON bulk indicando que ocurrió
+    un error interno, luego de la cual no se envían más resultados.
+
+    Returns:
+        bytes: Línea NDJSON (incluyendo el salto de línea).
+
+    """
+    return serializer.dumps({
+        'errores': [{'mensaje': strings.INTERNAL_ERROR}]
+    }) + b'\n'
+
+
+def create_ndjson_response_bulk(lines):
+    """Toma un iterable de líneas NDJSON (ver 'ndjson_result_line'), y
+    devuelve una respuesta HTTP 200 que las envía de forma incremental, a
+    medida que son generadas.
+
+    Args:
+        lines (iterable): Líneas NDJSON (bytes).
+
+    Returns:
+        flask.Response: Respuesta HTTP con contenido NDJSON.
+
+    """
+    return Response(stream_with_context(lines), mimetype=NDJSON_MIMETYPE)
+
+
+def address_csv_error_row(csv_writer, message):
+    """Retorna la última fila de una respuesta CSV de normalización de
+    direcciones, indicando que ocurrió un error luego de la cual no se envían
+    más filas. Es el equivalente CSV de 'ndjson_internal_error_line': la
+    primera columna contiene el valor 'errores', y la segunda el mensaje.
+
+    Args:
+        csv_writer (CSVLineWriter): Objeto utilizado para escribir la fila.
+        message (str): Mensaje de error.
+
+    Returns:
+        str: Fila CSV (incluyendo el salto de línea).
+
+    """
+    return csv_writer.row_to_str(['errores', message])
+
+
+def create_address_csv_response(header, fields, results):
+    """Toma las filas de un CSV junto con la dirección normalizada de cada
+    una, y devuelve una respuesta HTTP 200 con el mismo CSV, agregando al
+    final de cada fila las columnas de la dirección (con los mismos nombres
+    que las respuestas CSV de /direcciones). Las filas son enviadas de forma
+    incremental, a medida que son generadas.
+
+    Args:
+        header (list): Nombres de las columnas del CSV original.
+        fields (list): Lista de campos de direcciones a agregar.
+        results (iterable): Tuplas de fila del CSV original (list) y
+            resultado de su consulta (QueryResult, o 'None' si la consulta
+            no fue válida). Una tupla con 'None' como fila indica que
+            ocurrió un error luego de enviar los encabezados HTTP: su
+            segundo elemento es el mensaje de error (ver
+            'address_csv_error_row').
+
+    Returns:
+        flask.Response: Respuesta HTTP con contenido CSV.
+
+    """
+    def csv_generator():
+        csv_writer = _csv_writer()
+        projector = get_projector(N.ADDRESSES, fields)
+        field_names = projector.csv_field_names
+        empty_values = [None] * len(field_names)
+
+        yield csv_writer.row_to_str(header + field_names)
+
+        for row, result in results:
+            if row is None:
+                yield address_csv_error_row(csv_writer, result)
+                return
+
+            # Completar filas con menos columnas que el encabezado.
+            row = row + [''] * (len(header) - len(row))
+            values = empty_values
+
+            if result and result.entities:
+                values = projector.csv_row(result.first_entity())
+
+            yield csv_writer.row_to_str(row + values)
+
+    resp = Response(stream_with_context(csv_generator()), mimetype='text/csv')
+    return make_response((resp, {
+        'Content-Disposition': 'attachment; filename={}.csv'.format(
+            N.ADDRESSES)
+    }))
+
+
+def create_job_response(job, status=200, location=None):
+    """Toma un trabajo en segundo plano, y devuelve una respuesta HTTP con su
+    estado en formato JSON.
+
+    Args:
+        job (dict): Trabajo (ver 'jobs.JobStore').
+        status (int): Código de estado HTTP.
+        location (str): URL del estado del trabajo, a incluir en el header
+            'Location' (opcional).
+
+    Returns:
+        flask.Response: Respuesta HTTP con el estado del trabajo.
+
+    """
+    headers = {'Location': location} if location else {}
+    return make_response(jsonify({N.JOB: job}), status, headers)
+
+
+def create_job_not_finished_response(job):
+    """Retorna un error HTTP con código 409, indicando que un trabajo en
+    segundo plano todavía no finalizó.
+
+    Args:
+        job (dict): Trabajo (ver 'jobs.JobStore').
+
+    Returns:
+        flask.Response: Respuesta HTTP con error 409.
+
+    """
+    errors = [
+        {
+            'mensaje': strings.JOB_NOT_FINISHED,
+            N.JOB: job
+        }
+    ]
+
+    return make_response(jsonify({
+        'errores': errors
+    }), 409)
+
+
+def create_job_results_response(name, path):
+    """Devuelve una respuesta HTTP 200 con el archivo de resultados (NDJSON)
+    de un trabajo en segundo plano finalizado.
+
+    Args:
+        name (str): Nombre de la entidad consultada.
+        path (str): Ruta del archivo de resultados.
+
+    Returns:
+        flask.Response: Respuesta HTTP con contenido NDJSON.
+
+    """
+    return send_file(path, mimetype=NDJSON_MIMETYPE, as_attachment=True,
+                     download_name='{}.ndjson'.format(name.lower()),
+                     conditional=True)
+
+
 def create_ok_response_bulk(name, results, formats):
     """Toma una lista de resultados de una consulta o más, y devuelve una
     respuesta HTTP 200 con los resultados en formato JSON.
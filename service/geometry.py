@@ -1,17 +1,61 @@
 """Módulo 'geometry' de georef-ar-api.
 
 Contiene funciones utilizadas para operar con geometrías en formato GeoJSON
-utilizando la librería Shapely.
+utilizando la librería Shapely. Si la librería NumPy (incluida en
+requirements.txt) está instalada, las operaciones sobre listas de geometrías
+(interpolaciones de alturas, distancias, puntos medios y círculos) se
+calculan utilizando operaciones vectorizadas. Si no lo está, se utilizan
+implementaciones equivalentes (más lentas) en Python y Shapely, y se emite
+una advertencia al iniciar la API.
 """
 
+import logging
 import math
 import shapely.geometry
 import shapely.ops
 from service import names as N
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+logger = logging.getLogger('georef')
+
+if numpy is None:
+    logger.warning('NumPy no está instalado: las operaciones sobre listas de '
+                   'geometrías no serán vectorizadas (ver requirements.txt).')
+
 # Radio de la tierra promedio para WGS84
 _MEAN_EARTH_RADIUS_KM = 6371.0088
 
+# Cantidad de vértices por cuarto de círculo de los círculos GeoJSON (ver
+# 'Point.to_geojson_circle').
+_CIRCLE_RESOLUTION = 3
+
+
+def _unit_circle_template():
+    """Construye los vértices de un círculo de radio 1 centrado en (0, 0),
+    idénticos a los generados por el método 'buffer' de Shapely con
+    'resolution=_CIRCLE_RESOLUTION' (13 vértices, en sentido horario
+    comenzando por el este, y con el último vértice igual al primero).
+
+    Returns:
+        numpy.ndarray: Arreglo de vértices (x, y).
+
+    """
+    angles = -numpy.arange(4 * _CIRCLE_RESOLUTION) * (
+        math.pi / 2 / _CIRCLE_RESOLUTION)
+    template = numpy.column_stack((numpy.cos(angles), numpy.sin(angles)))
+    # Los vértices sobre los ejes tienen coordenadas exactamente 0 (en
+    # lugar de errores de redondeo como cos(pi / 2) = 6e-17).
+    template[numpy.abs(template) < 1e-12] = 0
+
+    return numpy.vstack((template, template[:1]))
+
+
+_UNIT_CIRCLE = _unit_circle_template() if numpy else None
+
 
 def _street_block_extents(door_nums, number):
     """Dados los datos de alturas de una cuadra, y una altura recibida en una
@@ -106,6 +150,381 @@ def street_block_number_location(geom, door_numbers, number,
     return None
 
 
+def _merged_street_block_coords(geom):
+    """Combina los tramos de la geometría de una cuadra en una única lista de
+    coordenadas, cuando los tramos forman un camino simple: cada tramo
+    comienza donde termina el anterior, y ningún extremo se repite. En ese
+    caso, el resultado es idéntico al de 'shapely.ops.linemerge'.
+
+    Args:
+        geom (dict): Geometría de la cuadra en formato GeoJSON
+            (MultiLineString).
+
+    Returns:
+        list: Lista de coordenadas del tramo combinado, o 'None' si los tramos
+            no forman un camino simple (en ese caso, se debe utilizar
+            'street_block_number_location').
+
+    """
+    lines = geom['coordinates']
+    if not lines or any(len(line) < 2 for line in lines):
+        return None
+
+    if len(lines) == 1:
+        return lines[0]
+
+    nodes = {tuple(lines[0][0])}
+    coords = list(lines[0])
+
+    for line in lines[1:]:
+        if line[0] != coords[-1]:
+            return None
+
+        nodes.add(tuple(line[0]))
+        if tuple(line[-1]) in nodes:
+            return None
+
+        coords.extend(line[1:])
+
+    return coords
+
+
+def _street_block_fraction(door_numbers, number):
+    """Calcula la posición relativa de una altura sobre una cuadra.
+
+    Args:
+        door_numbers (dict): Límites de altura de la cuadra.
+        number (int or None): Número de puerta o altura.
+
+    Raises:
+        ValueError: Si la altura no está contenida dentro de ninguna
+            combinación de extremos.
+
+    Returns:
+        float: Posición relativa de la altura (entre 0 y 1), o 'None' si no
+            puede ser calculada.
+
+    """
+    if number is None:
+        return None
+
+    start, end = _street_block_extents(door_numbers, number)
+    if start >= end:
+        return None
+
+    return (number - start) / (end - start)
+
+
+def _interpolate_street_blocks(lines, fractions, approximate):
+    """Calcula, para un conjunto de líneas, la posición de una fracción de su
+    largo (o su centroide), operando sobre todas las líneas a la vez.
+
+    Las coordenadas de todas las líneas se ubican en un único arreglo, y se
+    calculan los largos acumulados de sus segmentos. Luego, se busca el
+    segmento que contiene la posición de cada línea utilizando una búsqueda
+    binaria sobre los largos acumulados. Los cálculos son equivalentes a los
+    de los métodos 'interpolate' y 'centroid' de Shapely.
+
+    Args:
+        lines (list): Lista de listas de coordenadas (una por línea).
+        fractions (list): Posición relativa a calcular sobre cada línea, o
+            'None' para calcular su centroide (si 'approximate' es verdadero).
+        approximate (bool): Si es verdadero, devolver el centroide de las
+            líneas sin posición relativa.
+
+    Returns:
+        list: Lista de 'Point' (o 'None'), uno por línea. Las líneas de largo
+            cero sin posición relativa deben ser procesadas utilizando
+            Shapely, y se devuelven como 'None'.
+
+    """
+    counts = numpy.fromiter((len(line) for line in lines), dtype=numpy.intp,
+                            count=len(lines))
+    ends = numpy.cumsum(counts)
+    starts = ends - counts
+
+    coords = numpy.array([coord[:2] for line in lines for coord in line],
+                         dtype=float)
+    deltas = coords[1:] - coords[:-1]
+    seg_lens = numpy.sqrt(deltas[:, 0] ** 2 + deltas[:, 1] ** 2)
+    # Los "segmentos" que unen el final de una línea con el comienzo de la
+    # siguiente no deben ser tenidos en cuenta.
+    seg_lens[ends[:-1] - 1] = 0
+
+    cum_lens = numpy.concatenate(([0], numpy.cumsum(seg_lens)))
+    offsets = cum_lens[starts]
+    lengths = cum_lens[ends - 1] - offsets
+
+    has_fraction = numpy.fromiter((f is not None for f in fractions),
+                                  dtype=bool, count=len(fractions))
+    fraction_values = numpy.fromiter(
+        (f if f is not None else 0 for f in fractions), dtype=float,
+        count=len(fractions))
+
+    # Interpolación: buscar el vértice final del segmento que contiene la
+    # posición buscada de cada línea.
+    targets = offsets + fraction_values * lengths
+    indexes = numpy.searchsorted(cum_lens, targets, side='left')
+    indexes = numpy.clip(indexes, starts + 1, ends - 1)
+
+    seg_starts = cum_lens[indexes - 1]
+    segs = seg_lens[indexes - 1]
+    ratios = numpy.divide(targets - seg_starts, segs,
+                          out=numpy.zeros_like(segs), where=segs > 0)
+    ratios = numpy.clip(ratios, 0, 1)
+
+    points = coords[indexes - 1] + \
+        ratios[:, numpy.newaxis] * (coords[indexes] - coords[indexes - 1])
+
+    # Centroides: promedio de los puntos medios de cada segmento, ponderado
+    # por su largo.
+    if approximate:
+        midpoints = (coords[:-1] + coords[1:]) / 2
+        weighted = numpy.zeros((len(coords), 2))
+        weighted[:-1] = midpoints * seg_lens[:, numpy.newaxis]
+        sums = numpy.add.reduceat(weighted, starts, axis=0)
+        centroids = numpy.divide(sums, lengths[:, numpy.newaxis],
+                                 out=numpy.zeros_like(sums),
+                                 where=lengths[:, numpy.newaxis] > 0)
+
+    results = []
+    for i, has_value in enumerate(has_fraction):
+        if has_value:
+            results.append(Point(*points[i].tolist()))
+        elif approximate and lengths[i] > 0:
+            results.append(Point(*centroids[i].tolist()))
+        else:
+            results.append(None)
+
+    return results
+
+
+def street_block_number_locations(street_blocks, number, approximate=False):
+    """Versión de 'street_block_number_location' para una lista de cuadras.
+    Si NumPy está instalado, las geometrías de las cuadras que forman un
+    camino simple se combinan e interpolan todas a la vez (ver
+    '_interpolate_street_blocks'). El resto de las cuadras (tramos no
+    conectados o no ordenados, geometrías de largo cero) se procesan
+    utilizando 'street_block_number_location'.
+
+    Args:
+        street_blocks (list): Lista de tuplas (geometría GeoJSON, límites de
+            altura), una por cuadra.
+        number (int or None): Número de puerta o altura.
+        approximate (bool): Si es verdadero, devolver un estimado de las
+            coordenadas en caso de que la interpolación falle.
+
+    Raises:
+        TypeError: Cuando alguna geometría no es de tipo MultiLineString.
+
+    Returns:
+        list: Lista de 'Point' (o 'None'), uno por cuadra.
+
+    """
+    results = [None] * len(street_blocks)
+    kernel_indexes = []
+    lines = []
+    fractions = []
+
+    for i, (geom, door_numbers) in enumerate(street_blocks):
+        if geom['type'] != 'MultiLineString':
+            raise TypeError('GeoJSON type must be MultiLineString')
+
+        coords = _merged_street_block_coords(geom) if numpy else None
+
+        if coords is None:
+            results[i] = street_block_number_location(geom, door_numbers,
+                                                      number, approximate)
+            continue
+
+        fraction = _street_block_fraction(door_numbers, number)
+        if fraction is None and not approximate:
+            continue
+
+        kernel_indexes.append(i)
+        lines.append(coords)
+        fractions.append(fraction)
+
+    if lines:
+        points = _interpolate_street_blocks(lines, fractions, approximate)
+
+        for i, point in zip(kernel_indexes, points):
+            if point is None:
+                geom, door_numbers = street_blocks[i]
+                point = street_block_number_location(geom, door_numbers,
+                                                     number, approximate)
+
+            results[i] = point
+
+    return results
+
+
+def _radius_angle(radius_meters):
+    """Calcula el ángulo (en grados) que un arco de cierto largo representa
+    sobre la superficie de la tierra (ver 'Point.to_geojson_circle').
+
+    Args:
+        radius_meters (float): Largo del arco en metros.
+
+    Returns:
+        float: Ángulo del arco en grados.
+
+    """
+    return math.degrees(radius_meters / (1000 * _MEAN_EARTH_RADIUS_KM))
+
+
+def _points_array(points):
+    """Construye un arreglo de coordenadas a partir de una lista de puntos.
+
+    Args:
+        points (list): Lista de 'Point'.
+
+    Returns:
+        numpy.ndarray: Arreglo de coordenadas (lon, lat).
+
+    """
+    coords = numpy.empty((len(points), 2))
+    for i, point in enumerate(points):
+        coords[i] = point.lon, point.lat
+
+    return coords
+
+
+def _haversine_meters(coords_a, coords_b):
+    """Calcula distancias aproximadas en metros entre coordenadas, utilizando
+    la misma fórmula que 'Point.approximate_distance_meters'. Los arreglos
+    recibidos pueden tener cualquier forma compatible (ver "broadcasting" de
+    NumPy).
+
+    Args:
+        coords_a (numpy.ndarray): Coordenadas (lon, lat) de los puntos de
+            origen, en la última dimensión.
+        coords_b (numpy.ndarray): Coordenadas (lon, lat) de los puntos de
+            destino, en la última dimensión.
+
+    Returns:
+        numpy.ndarray: Distancias en metros.
+
+    """
+    lon_a, lat_a = numpy.radians(coords_a[..., 0]), numpy.radians(
+        coords_a[..., 1])
+    lon_b, lat_b = numpy.radians(coords_b[..., 0]), numpy.radians(
+        coords_b[..., 1])
+
+    a = numpy.sin((lat_b - lat_a) / 2) ** 2
+    b = numpy.cos(lat_a) * numpy.cos(lat_b) * \
+        (numpy.sin((lon_b - lon_a) / 2) ** 2)
+
+    kms = 2 * _MEAN_EARTH_RADIUS_KM * numpy.arcsin(numpy.sqrt(a + b))
+    return kms * 1000
+
+
+def approximate_distances_meters(points_a, points_b):
+    """Versión de 'Point.approximate_distance_meters' para listas de puntos.
+    Calcula la distancia entre cada punto de 'points_a' y el punto de
+    'points_b' en la misma posición.
+
+    Args:
+        points_a (list): Lista de 'Point'.
+        points_b (list): Lista de 'Point', del mismo largo que 'points_a'.
+
+    Returns:
+        list: Distancias aproximadas en metros (float).
+
+    """
+    if numpy is None:
+        return [a.approximate_distance_meters(b)
+                for a, b in zip(points_a, points_b)]
+
+    if not points_a:
+        return []
+
+    return _haversine_meters(_points_array(points_a),
+                             _points_array(points_b)).tolist()
+
+
+def approximate_distance_matrix_meters(points_a, points_b):
+    """Calcula las distancias aproximadas entre todos los pares de puntos de
+    dos listas (ver 'Point.approximate_distance_meters').
+
+    Args:
+        points_a (list): Lista de 'Point'.
+        points_b (list): Lista de 'Point'.
+
+    Returns:
+        list: Lista con una lista de distancias (float) por cada punto de
+            'points_a'. El valor de la posición [i][j] es la distancia en
+            metros entre 'points_a[i]' y 'points_b[j]'.
+
+    """
+    if numpy is None:
+        return [[a.approximate_distance_meters(b) for b in points_b]
+                for a in points_a]
+
+    if not points_a or not points_b:
+        return [[] for _ in points_a]
+
+    coords_a = _points_array(points_a)[:, numpy.newaxis, :]
+    coords_b = _points_array(points_b)[numpy.newaxis, :, :]
+
+    return _haversine_meters(coords_a, coords_b).tolist()
+
+
+def midpoints(points_a, points_b):
+    """Versión de 'Point.midpoint' para listas de puntos. Calcula el punto
+    medio entre cada punto de 'points_a' y el punto de 'points_b' en la misma
+    posición.
+
+    Args:
+        points_a (list): Lista de 'Point'.
+        points_b (list): Lista de 'Point', del mismo largo que 'points_a'.
+
+    Returns:
+        list: Lista de 'Point'.
+
+    """
+    if numpy is None:
+        return [a.midpoint(b) for a, b in zip(points_a, points_b)]
+
+    if not points_a:
+        return []
+
+    coords = (_points_array(points_a) + _points_array(points_b)) / 2
+    return [Point(lon, lat) for lon, lat in coords.tolist()]
+
+
+def geojson_circles(points, radius_meters):
+    """Versión de 'Point.to_geojson_circle' para listas de puntos. Los
+    círculos se construyen trasladando y escalando un círculo de radio 1
+    precalculado ('_UNIT_CIRCLE'), con los mismos vértices que genera
+    Shapely.
+
+    Args:
+        points (list): Lista de 'Point' a utilizar como centros.
+        radius_meters (int): Radio de los círculos en metros.
+
+    Returns:
+        list: Lista de círculos GeoJSON (tipo GeoJSON: "polygon").
+
+    """
+    if numpy is None:
+        return [point.to_geojson_circle(radius_meters) for point in points]
+
+    if not points:
+        return []
+
+    circle = _UNIT_CIRCLE * _radius_angle(radius_meters)
+    circles = _points_array(points)[:, numpy.newaxis, :] + circle
+
+    return [
+        {
+            'type': 'polygon',
+            'coordinates': [[tuple(coord) for coord in coords]]
+        }
+        for coords in circles.tolist()
+    ]
+
+
 class Point:
     """Representa un punto en el plano cartesiano (x, y - lon, lat). Sirve como
     intermediario entre distintas formas de representar puntos: shapely.Point,
@@ -227,12 +646,11 @@ class Point:
         # para calcular el ángulo que el arco representa sobre la superficie de
         # la tierra.
 
-        distance_angle = math.degrees(radius_meters /
-                                      (1000 * _MEAN_EARTH_RADIUS_KM))
+        distance_angle = _radius_angle(radius_meters)
 
         # Con 'resolution=3', obtenemos un polígono de 13 vértices (3 vértices
         # por cuarto de círculo, mas uno para cerrar) con forma cuasi-circular.
-        circle = point.buffer(distance_angle, resolution=3)
+        circle = point.buffer(distance_angle, resolution=_CIRCLE_RESOLUTION)
 
         return {
             'type': 'polygon',
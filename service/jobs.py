@@ -0,0 +1,720 @@
+"""Módulo 'jobs' de georef-ar-api
+
+Contiene un sistema de trabajos en segundo plano, utilizado para normalizar
+grandes cantidades de consultas (por ejemplo, millones de direcciones) sin
+necesidad de enviar miles de requests bulk.
+
+Cada trabajo recibe un archivo de consultas (NDJSON o CSV), que es almacenado
+en disco y procesado por workers en segundo plano, en ventanas de
+JOBS_WINDOW_LEN consultas. Los resultados se escriben en un archivo NDJSON
+(una línea por consulta, en el mismo orden), que el usuario puede descargar
+una vez finalizado el trabajo.
+
+El estado de los trabajos se almacena en una base de datos SQLite, y las
+consultas y resultados en archivos, ambos dentro de JOBS_DIR. De esta forma,
+no es necesario utilizar servicios adicionales: todos los procesos de la API
+(y los procesos iniciados con 'make jobs_worker') que utilicen el mismo
+directorio comparten la cola de trabajos. Los trabajos terminados se eliminan
+luego de JOBS_RETENTION segundos.
+"""
+
+import csv
+import io
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from flask import current_app
+from service import constants, strings, utils
+from service import names as N
+from service.data import DataConnectionException
+
+try:
+    from gevent import monkey as gevent_monkey
+except ImportError:
+    gevent_monkey = None
+
+STATUS_PENDING = 'pendiente'
+STATUS_RUNNING = 'procesando'
+STATUS_DONE = 'finalizado'
+STATUS_FAILED = 'error'
+
+DB_FILE = 'jobs.sqlite'
+DB_TIMEOUT = 30
+INPUT_FILE = 'consultas.ndjson'
+OUTPUT_FILE = 'resultados.ndjson'
+
+JOB_ID_REGEX = re.compile(r'[0-9a-f]{32}')
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    owner TEXT,
+    total INTEGER NOT NULL,
+    processed INTEGER NOT NULL,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created);
+'''
+
+_JOB_COLUMNS = 'id, status, total, processed, created, updated, error'
+
+logger = logging.getLogger('georef')
+
+_create_lock = threading.Lock()
+
+
+class JobStoreException(Exception):
+    """Representa un error ocurrido al acceder al almacenamiento de
+    trabajos.
+
+    """
+
+
+class JobInputException(Exception):
+    """Representa un error en el contenido recibido para crear un trabajo.
+
+    """
+
+
+def _timestamp_to_str(timestamp):
+    """Convierte un timestamp UNIX a texto (ISO 8601, UTC).
+
+    Args:
+        timestamp (float): Timestamp UNIX.
+
+    Returns:
+        str: Fecha y hora en formato ISO 8601.
+
+    """
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(
+        timespec='seconds')
+
+
+def _row_to_job(row):
+    """Convierte una fila de la tabla de trabajos a un diccionario, utilizando
+    los nombres de campos de la API.
+
+    Args:
+        row (tuple): Fila con los valores de _JOB_COLUMNS.
+
+    Returns:
+        dict: Trabajo.
+
+    """
+    job_id, status, total, processed, created, updated, error = row
+
+    return {
+        N.ID: job_id,
+        N.STATUS: status,
+        N.TOTAL: total,
+        N.PROCESSED: processed,
+        N.CREATED: _timestamp_to_str(created),
+        N.UPDATED: _timestamp_to_str(updated),
+        N.ERROR: error
+    }
+
+
+class JobStore:
+    """Almacenamiento de trabajos: estado en una base de datos SQLite, y
+    consultas y resultados en archivos (un directorio por trabajo).
+
+    Cada trabajo en estado 'procesando' tiene un dueño (el worker que lo
+    está procesando). Si un trabajo es reencolado (ver 'requeue_stale'), su
+    dueño anterior deja de poder modificarlo.
+
+    Attributes:
+        _path (str): Directorio donde se almacenan los trabajos.
+        _db_path (str): Ruta de la base de datos SQLite.
+
+    """
+
+    __slots__ = ['_path', '_db_path']
+
+    def __init__(self, path):
+        """Inicializa un objeto de tipo JobStore. El directorio y la base de
+        datos son creados si no existían.
+
+        Args:
+            path (str): Ver atributo '_path'.
+
+        Raises:
+            JobStoreException: Si no se pudo inicializar el almacenamiento.
+
+        """
+        self._path = path
+        self._db_path = os.path.join(path, DB_FILE)
+
+        try:
+            os.makedirs(path, exist_ok=True)
+        except OSError as e:
+            raise JobStoreException() from e
+
+        with self._connection() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connection(self, transaction=False):
+        """Abre una conexión a la base de datos SQLite.
+
+        Args:
+            transaction (bool): Si es verdadero, las operaciones realizadas
+                con la conexión se ejecutan dentro de una transacción, que
+                bloquea la base de datos para escritura desde su comienzo.
+
+        Raises:
+            JobStoreException: Si ocurrió un error de SQLite.
+
+        Yields:
+            sqlite3.Connection: Conexión a la base de datos.
+
+        """
+        try:
+            conn = sqlite3.connect(self._db_path, timeout=DB_TIMEOUT,
+                                   isolation_level=None)
+        except sqlite3.Error as e:
+            raise JobStoreException() from e
+
+        try:
+            if transaction:
+                conn.execute('BEGIN IMMEDIATE')
+
+            yield conn
+
+            if transaction:
+                conn.execute('COMMIT')
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise JobStoreException() from e
+        finally:
+            conn.close()
+
+    def _job_path(self, job_id, filename):
+        return os.path.join(self._path, job_id, filename)
+
+    def input_path(self, job_id):
+        """Devuelve la ruta del archivo de consultas de un trabajo.
+
+        Args:
+            job_id (str): ID del trabajo.
+
+        Returns:
+            str: Ruta del archivo (NDJSON).
+
+        """
+        return self._job_path(job_id, INPUT_FILE)
+
+    def output_path(self, job_id):
+        """Devuelve la ruta del archivo de resultados de un trabajo.
+
+        Args:
+            job_id (str): ID del trabajo.
+
+        Returns:
+            str: Ruta del archivo (NDJSON).
+
+        """
+        return self._job_path(job_id, OUTPUT_FILE)
+
+    def create(self, lines, max_len):
+        """Crea un nuevo trabajo en estado 'pendiente'. Las consultas del
+        trabajo son escritas en disco a medida que son leídas, por lo que no
+        es necesario mantenerlas en memoria.
+
+        Args:
+            lines (iterable): Consultas del trabajo, como líneas NDJSON
+                (bytes). Las líneas vacías son ignoradas.
+            max_len (int): Cantidad máxima de consultas.
+
+        Raises:
+            JobInputException: Si se supera la cantidad máxima de consultas,
+                o si no se pudo leer el contenido recibido.
+            JobStoreException: Si no se pudo almacenar el trabajo.
+
+        Returns:
+            dict: Trabajo creado.
+
+        """
+        job_id = uuid.uuid4().hex
+        total = 0
+
+        try:
+            os.mkdir(os.path.join(self._path, job_id))
+
+            with open(self.input_path(job_id), 'wb') as f:
+                for line in lines:
+                    line = line.strip()
+                    if not line:
+                        continue
+
+                    total += 1
+                    if total > max_len:
+                        raise JobInputException(
+                            strings.BULK_LEN_ERROR.format(max_len))
+
+                    f.write(line + b'\n')
+        except OSError as e:
+            self._remove_files(job_id)
+            raise JobStoreException() from e
+        except Exception:
+            self._remove_files(job_id)
+            raise
+
+        now = time.time()
+        with self._connection(transaction=True) as conn:
+            conn.execute(
+                'INSERT INTO jobs (id, status, total, processed, created, '
+                'updated) VALUES (?, ?, ?, 0, ?, ?)',
+                (job_id, STATUS_PENDING, total, now, now))
+
+        return self.get(job_id)
+
+    def _remove_files(self, job_id):
+        for filename in [INPUT_FILE, OUTPUT_FILE]:
+            try:
+                os.remove(self._job_path(job_id, filename))
+            except OSError:
+                pass
+
+        try:
+            os.rmdir(os.path.join(self._path, job_id))
+        except OSError:
+            pass
+
+    def get(self, job_id):
+        """Busca un trabajo por ID.
+
+        Args:
+            job_id (str): ID del trabajo.
+
+        Returns:
+            dict: Trabajo, o 'None' si no existe.
+
+        """
+        if not JOB_ID_REGEX.fullmatch(job_id):
+            return None
+
+        with self._connection() as conn:
+            row = conn.execute(
+                'SELECT {} FROM jobs WHERE id = ?'.format(_JOB_COLUMNS),
+                (job_id,)).fetchone()
+
+        return _row_to_job(row) if row else None
+
+    def claim(self, owner):
+        """Toma el trabajo pendiente más antiguo, y lo marca como
+        'procesando' por un worker.
+
+        Args:
+            owner (str): Identificador del worker.
+
+        Returns:
+            dict: Trabajo tomado, o 'None' si no hay trabajos pendientes.
+
+        """
+        with self._connection(transaction=True) as conn:
+            row = conn.execute(
+                'SELECT {} FROM jobs WHERE status = ? ORDER BY created '
+                'LIMIT 1'.format(_JOB_COLUMNS), (STATUS_PENDING,)).fetchone()
+
+            if not row:
+                return None
+
+            conn.execute(
+                'UPDATE jobs SET status = ?, owner = ?, processed = 0, '
+                'updated = ? WHERE id = ?',
+                (STATUS_RUNNING, owner, time.time(), row[0]))
+
+        return self.get(row[0])
+
+    def _update_owned(self, job_id, owner, assignments, values):
+        with self._connection(transaction=True) as conn:
+            cursor = conn.execute(
+                'UPDATE jobs SET {}, updated = ? WHERE id = ? AND owner = ? '
+                'AND status = ?'.format(assignments),
+                (*values, time.time(), job_id, owner, STATUS_RUNNING))
+
+        return cursor.rowcount > 0
+
+    def update_progress(self, job_id, owner, processed):
+        """Actualiza la cantidad de consultas procesadas de un trabajo.
+
+        Args:
+            job_id (str): ID del trabajo.
+            owner (str): Identificador del worker procesando el trabajo.
+            processed (int): Cantidad de consultas procesadas.
+
+        Returns:
+            bool: Falso si el worker ya no es dueño del trabajo.
+
+        """
+        return self._update_owned(job_id, owner, 'processed = ?',
+                                  (processed,))
+
+    def finish(self, job_id, owner):
+        """Marca un trabajo como 'finalizado'.
+
+        Args:
+            job_id (str): ID del trabajo.
+            owner (str): Identificador del worker procesando el trabajo.
+
+        Returns:
+            bool: Falso si el worker ya no es dueño del trabajo.
+
+        """
+        return self._update_owned(job_id, owner, 'status = ?',
+                                  (STATUS_DONE,))
+
+    def fail(self, job_id, owner, message):
+        """Marca un trabajo con estado 'error'.
+
+        Args:
+            job_id (str): ID del trabajo.
+            owner (str): Identificador del worker procesando el trabajo.
+            message (str): Mensaje de error, visible para el usuario.
+
+        Returns:
+            bool: Falso si el worker ya no es dueño del trabajo.
+
+        """
+        return self._update_owned(job_id, owner, 'status = ?, error = ?',
+                                  (STATUS_FAILED, message))
+
+    def requeue_stale(self, timeout):
+        """Vuelve a marcar como 'pendiente' a los trabajos en estado
+        'procesando' que no fueron actualizados en los últimos 'timeout'
+        segundos (por ejemplo, si el proceso del worker finalizó de forma
+        inesperada).
+
+        Args:
+            timeout (float): Tiempo máximo sin actualizaciones, en segundos.
+
+        Returns:
+            int: Cantidad de trabajos reencolados.
+
+        """
+        with self._connection(transaction=True) as conn:
+            cursor = conn.execute(
+                'UPDATE jobs SET status = ?, owner = NULL, processed = 0 '
+                'WHERE status = ? AND updated < ?',
+                (STATUS_PENDING, STATUS_RUNNING, time.time() - timeout))
+
+        return cursor.rowcount
+
+    def requeue(self, job_id, owner):
+        """Vuelve a marcar como 'pendiente' a un trabajo en estado
+        'procesando', para que sea procesado nuevamente desde el comienzo.
+
+        Args:
+            job_id (str): ID del trabajo.
+            owner (str): Worker dueño del trabajo.
+
+        Returns:
+            bool: Falso si el worker ya no era dueño del trabajo.
+
+        """
+        with self._connection(transaction=True) as conn:
+            cursor = conn.execute(
+                'UPDATE jobs SET status = ?, owner = NULL, processed = 0, '
+                'updated = ? WHERE id = ? AND owner = ? AND status = ?',
+                (STATUS_PENDING, time.time(), job_id, owner, STATUS_RUNNING))
+
+        return cursor.rowcount > 0
+
+    def purge_expired(self, retention):
+        """Elimina los trabajos terminados (con estado 'finalizado' o
+        'error') que no fueron actualizados en los últimos 'retention'
+        segundos, junto con sus archivos.
+
+        Args:
+            retention (float): Tiempo (en segundos) durante el cual se
+                conservan los trabajos terminados.
+
+        Returns:
+            int: Cantidad de trabajos eliminados.
+
+        """
+        with self._connection(transaction=True) as conn:
+            job_ids = [row[0] for row in conn.execute(
+                'SELECT id FROM jobs WHERE status IN (?, ?) AND updated < ?',
+                (STATUS_DONE, STATUS_FAILED, time.time() - retention))]
+
+            conn.executemany('DELETE FROM jobs WHERE id = ?',
+                             [(job_id,) for job_id in job_ids])
+
+        for job_id in job_ids:
+            self._remove_files(job_id)
+
+        return len(job_ids)
+
+
+def csv_ndjson_lines(stream):
+    """Convierte un archivo CSV de consultas a líneas NDJSON. La primera fila
+    del archivo debe contener los nombres de los parámetros de cada columna.
+    Las celdas vacías son ignoradas.
+
+    Args:
+        stream (io.IOBase): Contenido CSV (bytes, UTF-8).
+
+    Raises:
+        JobInputException: Si el contenido no es un CSV UTF-8 válido.
+
+    Yields:
+        bytes: Líneas NDJSON, una por cada fila del archivo.
+
+    """
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig',
+                                             newline=''))
+
+    try:
+        for row in reader:
+            param_dict = {
+                key.strip(): value
+                for key, value in row.items()
+                if key and value
+            }
+
+            yield json.dumps(param_dict, ensure_ascii=False).encode() + b'\n'
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise JobInputException(strings.JOB_INVALID_CSV) from e
+
+
+class JobWorker:
+    """Procesa trabajos pendientes de un JobStore.
+
+    Attributes:
+        _store (JobStore): Almacenamiento de trabajos.
+        _process_window (function): Función que recibe una lista de líneas
+            NDJSON de consultas, y retorna un iterable de líneas NDJSON de
+            resultados (bytes), una por cada consulta.
+        _window_len (int): Cantidad de consultas a procesar en conjunto.
+        _owner (str): Identificador del worker.
+
+    """
+
+    __slots__ = ['_store', '_process_window', '_window_len', '_owner']
+
+    def __init__(self, store, process_window, window_len):
+        """Inicializa un objeto de tipo JobWorker.
+
+        Args:
+            store (JobStore): Ver atributo '_store'.
+            process_window (function): Ver atributo '_process_window'.
+            window_len (int): Ver atributo '_window_len'.
+
+        """
+        self._store = store
+        self._process_window = process_window
+        self._window_len = window_len
+        self._owner = uuid.uuid4().hex
+
+    @property
+    def store(self):
+        return self._store
+
+    def _write_results(self, job_id, path):
+        """Procesa las consultas de un trabajo, y escribe sus resultados.
+
+        Args:
+            job_id (str): ID del trabajo.
+            path (str): Ruta del archivo de resultados.
+
+        Returns:
+            bool: Falso si el worker dejó de ser dueño del trabajo antes de
+                completarlo.
+
+        """
+        processed = 0
+
+        with open(self._store.input_path(job_id), 'rb') as input_file, \
+                open(path, 'wb') as output_file:
+            for window in utils.chunks(input_file, self._window_len):
+                output_file.writelines(self._process_window(window))
+                processed += len(window)
+
+                if not self._store.update_progress(job_id, self._owner,
+                                                   processed):
+                    return False
+
+        return True
+
+    def run_job(self, job):
+        """Procesa un trabajo previamente tomado con 'JobStore.claim'. Los
+        resultados se escriben en un archivo temporal, que solo reemplaza al
+        archivo de resultados una vez completado.
+
+        Si ocurre un error de conexión con Elasticsearch, el trabajo vuelve
+        a ser encolado, ya que el error no depende de sus consultas.
+
+        Args:
+            job (dict): Trabajo a procesar.
+
+        Returns:
+            bool: Falso si el trabajo fue reencolado por un error de
+                conexión.
+
+        """
+        job_id = job[N.ID]
+        output_path = self._store.output_path(job_id)
+        tmp_path = '{}.{}'.format(output_path, self._owner)
+
+        try:
+            if self._write_results(job_id, tmp_path):
+                os.replace(tmp_path, output_path)
+                self._store.finish(job_id, self._owner)
+            else:
+                logger.warning('Trabajo %s reencolado durante su '
+                               'procesamiento.', job_id)
+        except DataConnectionException:
+            logger.exception('Error de conexión en procesamiento de '
+                             'trabajo: %s (reencolado)', job_id)
+            self._store.requeue(job_id, self._owner)
+            return False
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Excepción en procesamiento de trabajo: %s',
+                             job_id)
+            self._store.fail(job_id, self._owner, strings.INTERNAL_ERROR)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        return True
+
+    def run_next(self):
+        """Toma y procesa el trabajo pendiente más antiguo.
+
+        Returns:
+            bool: Verdadero si se procesó un trabajo (falso si no había
+                trabajos pendientes, o si el trabajo fue reencolado).
+
+        """
+        job = self._store.claim(self._owner)
+        if not job:
+            return False
+
+        return self.run_job(job)
+
+    def run_pending(self):
+        """Procesa trabajos hasta que no queden trabajos pendientes.
+
+        Returns:
+            int: Cantidad de trabajos procesados.
+
+        """
+        count = 0
+        while self.run_next():
+            count += 1
+
+        return count
+
+
+def run_forever(app, worker):
+    """Procesa trabajos pendientes indefinidamente. Cuando no hay trabajos
+    pendientes (o si un trabajo fue reencolado por un error de conexión), se
+    comprueba nuevamente cada JOBS_POLL_INTERVAL segundos. Cada trabajo se
+    procesa dentro de un contexto de aplicación de Flask propio. Antes de
+    tomar cada trabajo, se eliminan los trabajos terminados hace más de
+    JOBS_RETENTION segundos (si el valor no es 0).
+
+    Args:
+        app (flask.Flask): Aplicación Flask de la API.
+        worker (JobWorker): Worker a utilizar.
+
+    """
+    poll_interval = app.config.get('JOBS_POLL_INTERVAL', 5)
+    stale_timeout = app.config.get('JOBS_STALE_TIMEOUT', 600)
+    retention = app.config.get('JOBS_RETENTION', 604800)
+
+    while True:
+        try:
+            with app.app_context():
+                worker.store.requeue_stale(stale_timeout)
+                if retention:
+                    worker.store.purge_expired(retention)
+
+                ran = worker.run_next()
+        except JobStoreException:
+            logger.exception('Excepción en acceso a trabajos')
+            ran = False
+
+        if not ran:
+            time.sleep(poll_interval)
+
+
+def get_job_store():
+    """Devuelve el almacenamiento de trabajos de la aplicación Flask. El
+    almacenamiento es creado si no existía, en el directorio JOBS_DIR.
+
+    Raises:
+        JobStoreException: Si no se pudo inicializar el almacenamiento.
+
+    Returns:
+        JobStore: Almacenamiento de trabajos.
+
+    """
+    if not hasattr(current_app, 'job_store'):
+        with _create_lock:
+            if not hasattr(current_app, 'job_store'):
+                current_app.job_store = JobStore(
+                    current_app.config.get('JOBS_DIR', 'jobs'))
+
+    return current_app.job_store
+
+
+def start_workers(process_window):
+    """Inicia JOBS_WORKERS threads de procesamiento de trabajos en el proceso
+    actual, si no fueron iniciados previamente.
+
+    Si el proceso utiliza gevent (módulo 'threading' modificado), no se
+    inician workers: los threads serían greenlets, y el procesamiento de cada
+    ventana de consultas (que utiliza CPU de forma continua) bloquearía al
+    resto de las requests del proceso. En ese caso, los trabajos deben ser
+    procesados con 'make jobs_worker'.
+
+    Args:
+        process_window (function): Ver atributo 'JobWorker._process_window'.
+
+    Raises:
+        JobStoreException: Si no se pudo inicializar el almacenamiento.
+
+    """
+    if hasattr(current_app, 'job_workers'):
+        return
+
+    workers = current_app.config.get('JOBS_WORKERS', 0)
+    if workers and gevent_monkey and \
+       gevent_monkey.is_module_patched('threading'):
+        logger.warning('JOBS_WORKERS ignorado: no se pueden iniciar workers '
+                       'de trabajos en procesos gevent (utilizar '
+                       '\'make jobs_worker\').')
+        workers = 0
+
+    store = get_job_store()
+    app = current_app._get_current_object()  # pylint: disable=protected-access
+
+    with _create_lock:
+        if hasattr(current_app, 'job_workers'):
+            return
+
+        threads = []
+        for i in range(workers):
+            worker = JobWorker(store, process_window,
+                               constants.JOBS_WINDOW_LEN)
+            thread = threading.Thread(target=run_forever, args=(app, worker),
+                                      name='georef-jobs-{}'.format(i),
+                                      daemon=True)
+            thread.start()
+            threads.append(thread)
+
+        current_app.job_workers = threads
@@ -7,10 +7,111 @@ Contiene las clases y funciones necesarias para la implementación del recurso
 from service.data import ElasticsearchSearch, StatesSearch, DepartmentsSearch
 from service.data import MunicipalitiesSearch
 from service import names as N
+from service import constants, location_index, location_cache
+from service import location_grid
 from service.geometry import Point
 from service.query_result import QueryResult
 
 
+class StagedLocationSearch:
+    """Representa una búsqueda de la provincia, el departamento y el municipio
+    que contienen a un punto, realizada en etapas.
+
+    Ya que las provincias y departamentos cubren todo el territorio nacional
+    (pero no los municipios), la búsqueda se realiza de la siguiente forma:
+
+        1) Buscar la posición en el índice de departamentos. Si no se obtuvo
+           nada, el punto no está en la República Argentina: finalizar la
+           búsqueda.
+        2) Buscar, en la misma ronda, la provincia del departamento por ID
+           (para obtener su fuente, ya que la misma no está incluida en el
+           documento del departamento) y la posición en el índice de
+           municipios. La búsqueda de provincia no utiliza geometrías.
+
+    La interfaz de la clase es compatible con
+    'ElasticsearchSearch.run_searches' (ver 'search_steps').
+
+    Attributes:
+        _point (Point): Punto a buscar.
+        _result (tuple): Provincia, departamento y municipio encontrados
+            (dict o None).
+
+    """
+
+    __slots__ = ['_point', '_result']
+
+    def __init__(self, point):
+        """Inicializa un objeto de tipo StagedLocationSearch.
+
+        Args:
+            point (Point): Ver atributo '_point'.
+
+        """
+        self._point = point
+        self._result = None
+
+    def search_steps(self):
+        """Ver documentación de 'ElasticsearchSearch.search_steps'.
+
+        Yields:
+            elasticsearch_dsl.Search, list: Búsqueda DSL que se desea
+                ejecutar, o lista de búsquedas ElasticsearchSearch a ejecutar
+                en una misma ronda.
+
+        """
+        geoms = [self._point.to_geojson()]
+
+        dept_search = DepartmentsSearch({
+            'geo_shape_geoms': geoms,
+            'fields': [N.ID, N.NAME, N.SOURCE, N.STATE_ID],
+            'size': 1
+        })
+
+        yield from dept_search.search_steps()
+
+        if not dept_search.result:
+            self._result = None, None, None
+            return
+
+        dept = dept_search.result.hits[0]
+        state_id = dept.pop(N.STATE)[N.ID]
+
+        state_search = StatesSearch({
+            'ids': [state_id],
+            'fields': [N.ID, N.NAME, N.SOURCE],
+            'size': 1
+        })
+
+        muni_search = MunicipalitiesSearch({
+            'geo_shape_geoms': geoms,
+            'fields': [N.ID, N.NAME, N.SOURCE],
+            'size': 1
+        })
+
+        yield [state_search, muni_search]
+
+        state = state_search.result.hits[0] if state_search.result else None
+        muni = muni_search.result.hits[0] if muni_search.result else None
+        self._result = state, dept, muni
+
+    @property
+    def result(self):
+        """Devuelve el resultado de la búsqueda, si esta fue ejecutada.
+
+        Raises:
+            RuntimeError: Si la búsqueda no fue ejecutada.
+
+        Returns:
+            tuple: Provincia, departamento y municipio encontrados (dict o
+                None).
+
+        """
+        if self._result is None:
+            raise RuntimeError('Search has not been executed yet')
+
+        return self._result
+
+
 def _build_location_result(params, query, state, dept, muni):
     """Construye un resultado para una consulta al endpoint de ubicación.
 
@@ -53,11 +154,116 @@ def _build_location_result(params, query, state, dept, muni):
     }, params)
 
 
+def _build_cell_searches(cell):
+    """Construye las búsquedas necesarias para comprobar si una celda del
+    cache de ubicaciones está completamente contenida en una provincia, un
+    departamento y un municipio (o en ningún municipio).
+
+    Args:
+        cell (dict): Geometría GeoJSON de la celda.
+
+    Returns:
+        tuple: Búsquedas de provincias, departamentos y municipios que
+            contienen a la celda, y búsqueda de municipios que intersectan
+            la celda.
+
+    """
+    contains_query = {
+        'geo_shape_geoms': [cell],
+        'geo_shape_relation': 'contains',
+        'fields': [N.ID],
+        'size': 1
+    }
+
+    intersects_query = {
+        'geo_shape_geoms': [cell],
+        'fields': [N.ID],
+        'size': 2
+    }
+
+    return (
+        StatesSearch(contains_query),
+        DepartmentsSearch(contains_query),
+        MunicipalitiesSearch(contains_query),
+        MunicipalitiesSearch(intersects_query)
+    )
+
+
+def _cell_contained(cell_searches, state, dept, muni):
+    """Comprueba, utilizando los resultados de las búsquedas creadas con
+    '_build_cell_searches', si todos los puntos de una celda resultarían en
+    la misma provincia, departamento y municipio.
+
+    Args:
+        cell_searches (tuple): Búsquedas de la celda (ya ejecutadas).
+        state (dict): Provincia encontrada para el punto consultado.
+        dept (dict): Departamento encontrado para el punto consultado.
+        muni (dict): Municipio encontrado para el punto consultado.
+
+    Returns:
+        bool: Verdadero si la celda puede ser almacenada en el cache.
+
+    """
+    states, depts, munis, munis_intersecting = (
+        [hit[N.ID] for hit in search.result.hits]
+        for search in cell_searches
+    )
+
+    if not state or not dept or states != [state[N.ID]] or \
+       depts != [dept[N.ID]]:
+        return False
+
+    if not muni:
+        # Ningún municipio debe tocar la celda
+        return not munis_intersecting
+
+    return munis == [muni[N.ID]] and munis_intersecting == [muni[N.ID]]
+
+
+def _run_location_queries_local(index, params_list, queries):
+    """Dada una lista de queries de ubicación, las resuelve localmente
+    utilizando un índice de ubicaciones en memoria (ver módulo
+    'location_index') o una grilla de ubicaciones (ver módulo
+    'location_grid').
+
+    Args:
+        index (LocationIndex, LocationGrid): Índice o grilla a utilizar.
+        params_list (list): Lista de ParametersParseResult.
+        queries (list): Lista de queries de ubicación, generadas a partir de
+            'params_list'.
+
+    Returns:
+        list: Resultados de ubicaciones (QueryResult).
+
+    """
+    locations = []
+
+    for params, query in zip(params_list, queries):
+        state, dept, muni = index.locate(Point.from_json_location(query))
+
+        result = _build_location_result(params.received_values(), query, state,
+                                        dept, muni)
+        locations.append(result)
+
+    return locations
+
+
 def run_location_queries(es, params_list, queries):
     """Dada una lista de queries de ubicación, construye las queries apropiadas
     a índices de departamentos y municipios, y las ejecuta utilizando
     Elasticsearch.
 
+    Si la configuración 'LOCATION_ENGINE' tiene el valor 'memory', las queries
+    se resuelven utilizando el índice de ubicaciones en memoria. Si tiene el
+    valor 'grid', se resuelven utilizando la grilla de ubicaciones. Si tiene el
+    valor 'elasticsearch_staged', cada query se resuelve utilizando una
+    búsqueda 'StagedLocationSearch'. En ambos modos Elasticsearch, si el cache
+    de ubicaciones está activado, se lo consulta antes de construir las
+    búsquedas de cada query, y se agregan búsquedas adicionales para comprobar
+    si la celda de cada punto puede ser almacenada. Cada celda se comprueba
+    una sola vez por llamada, y las celdas que no pueden ser almacenadas no se
+    vuelven a comprobar (ver 'LocationCache.needs_check').
+
     Args:
         es (Elasticsearch): Conexión a Elasticsearch.
         params_list (list): Lista de ParametersParseResult.
@@ -68,66 +274,97 @@ def run_location_queries(es, params_list, queries):
         list: Resultados de ubicaciones (QueryResult).
 
     """
-    # TODO:
-    # Por problemas con los datos de origen, se optó por utilizar una
-    # implementación simple para la la funcion 'run_location_queries'.
-    # Cuando los datos de departamentos cubran todo el departamento nacional,
-    # se podría modificar la función para que funcione de la siguiente forma:
-    #
-    # (Recordar que las provincias y departamentos cubren todo el territorio
-    # nacional, pero no los municipios.)
-    #
-    # Por cada consulta, implementar un patrón similar al de address.py (con
-    # iteradores de consultas), donde cada iterador ('búsqueda') realiza los
-    # siguientes pasos:
-    #
-    # 1) Buscar la posición en el índice de departamentos.
-    # 2) Si se obtuvo un departamento, buscar la posición nuevamente pero en el
-    #    índice de municipios. Si no se obtuvo nada, cancelar la búsqueda.
-    # 3) Componer el departamento, la provincia del departamento y el municipio
-    #    en un QueryResult para completar la búsqueda.
+    if constants.LOCATION_ENGINE == location_index.LOCATION_ENGINE_MEMORY:
+        index = location_index.get_location_index(es)
+        return _run_location_queries_local(index, params_list, queries)
 
-    all_searches = []
+    if constants.LOCATION_ENGINE == location_index.LOCATION_ENGINE_GRID:
+        grid = location_grid.get_location_grid()
+        return _run_location_queries_local(grid, params_list, queries)
+
+    staged = (constants.LOCATION_ENGINE ==
+              location_index.LOCATION_ENGINE_ES_STAGED)
+    cache = location_cache.get_location_cache()
 
-    state_searches = []
-    muni_searches = []
-    dept_searches = []
+    all_searches = []
+    # Por cada query: (búsquedas de la posición, clave de celda, búsquedas de
+    # la celda), o None si la query fue resuelta utilizando el cache.
+    pending = []
+    cached = []
+    # Búsquedas de comprobación de cada celda, para no comprobar dos veces una
+    # misma celda.
+    cell_checks = {}
 
     for query in queries:
-        es_query = {
-            'geo_shape_geoms': [Point.from_json_location(query).to_geojson()],
-            'fields': [N.ID, N.NAME, N.SOURCE],
-            'size': 1
-        }
+        point = Point.from_json_location(query)
+        cell_key = None
+        cell_searches = None
 
-        # Buscar la posición en provincias, departamentos y municipios
+        if cache is not None:
+            cell_key = cache.cell_key(point)
+            entities = cache.get(cell_key)
+            if entities:
+                cached.append(entities)
+                pending.append(None)
+                continue
 
-        search = StatesSearch(es_query)
-        all_searches.append(search)
-        state_searches.append(search)
+            if cell_key in cell_checks:
+                cell_searches = cell_checks[cell_key]
+            elif cache.needs_check(cell_key):
+                cell_searches = _build_cell_searches(
+                    cache.cell_geojson(cell_key))
+                all_searches.extend(cell_searches)
+                cell_checks[cell_key] = cell_searches
 
-        search = DepartmentsSearch(es_query)
-        all_searches.append(search)
-        dept_searches.append(search)
+        if staged:
+            searches = StagedLocationSearch(point)
+            all_searches.append(searches)
+        else:
+            es_query = {
+                'geo_shape_geoms': [point.to_geojson()],
+                'fields': [N.ID, N.NAME, N.SOURCE],
+                'size': 1
+            }
 
-        search = MunicipalitiesSearch(es_query)
-        all_searches.append(search)
-        muni_searches.append(search)
+            # Buscar la posición en provincias, departamentos y municipios
+            searches = (
+                StatesSearch(es_query),
+                DepartmentsSearch(es_query),
+                MunicipalitiesSearch(es_query)
+            )
+            all_searches.extend(searches)
+
+        cached.append(None)
+        pending.append((searches, cell_key, cell_searches))
 
     # Ejecutar todas las búsquedas preparadas
     ElasticsearchSearch.run_searches(es, all_searches)
 
     locations = []
-    iterator = zip(params_list, queries, state_searches, dept_searches,
-                   muni_searches)
+    iterator = zip(params_list, queries, pending, cached)
 
-    for params, query, state_search, dept_search, muni_search in iterator:
-        # Ya que la query de tipo location retorna una o cero entidades,
-        # extraer la primera entidad de los resultados, o tomar None si
-        # no hay resultados.
-        state = state_search.result.hits[0] if state_search.result else None
-        dept = dept_search.result.hits[0] if dept_search.result else None
-        muni = muni_search.result.hits[0] if muni_search.result else None
+    for params, query, query_searches, entities in iterator:
+        if entities:
+            state, dept, muni = entities
+        else:
+            searches, cell_key, cell_searches = query_searches
+
+            if staged:
+                state, dept, muni = searches.result
+            else:
+                # Ya que la query de tipo location retorna una o cero
+                # entidades, extraer la primera entidad de los resultados, o
+                # tomar None si no hay resultados.
+                state, dept, muni = (
+                    search.result.hits[0] if search.result else None
+                    for search in searches
+                )
+
+            if cell_searches:
+                if _cell_contained(cell_searches, state, dept, muni):
+                    cache.put(cell_key, state, dept, muni)
+                else:
+                    cache.put_uncacheable(cell_key)
 
         result = _build_location_result(params.received_values(), query, state,
                                         dept, muni)
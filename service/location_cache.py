@@ -0,0 +1,260 @@
+"""Módulo 'location_cache' de georef-ar-api.
+
+Contiene un cache de resultados del recurso /ubicacion. Las claves del cache
+son celdas de una grilla regular (en grados) que cubre el plano lon/lat: cada
+punto consultado se cuantiza a la celda que lo contiene.
+
+Para que los puntos cercanos a límites entre entidades sigan resolviéndose de
+forma exacta, solo se almacenan celdas para las cuales se comprobó que están
+completamente contenidas en una misma provincia, un mismo departamento y un
+mismo municipio (o en ningún municipio). Las celdas para las cuales la
+comprobación falló también se recuerdan, para no volver a comprobarlas.
+"""
+
+import collections
+import copy
+import math
+import threading
+from flask import current_app, g, has_request_context
+
+_create_lock = threading.Lock()
+
+
+class LocationCache:
+    """Cache LRU ("Least Recently Used") de resultados de ubicación, indexado
+    por celdas de una grilla.
+
+    Siempre se mantiene la propiedad len(LocationCache(N, S)) <= N.
+
+    Attributes:
+        _size (int): Cantidad máxima de celdas a almacenar.
+        _cell_size (float): Tamaño (en grados) del lado de cada celda.
+        _cells (collections.OrderedDict): Celdas almacenadas, ordenadas desde
+            la menos utilizada recientemente a la más utilizada recientemente.
+        _uncacheable (collections.OrderedDict): Claves de celdas que no pueden
+            ser almacenadas (por no estar contenidas en una única provincia,
+            departamento y municipio), ordenadas de la misma forma que
+            '_cells'. Se mantienen como máximo '_size' claves.
+        _lock (threading.Lock): Lock utilizado para modificar '_cells',
+            '_uncacheable' y los contadores.
+        _hits (int): Cantidad de consultas resueltas utilizando el cache.
+        _misses (int): Cantidad de consultas no resueltas utilizando el cache.
+        _evictions (int): Cantidad de celdas removidas por falta de espacio.
+        _skipped_checks (int): Cantidad de comprobaciones de celdas evitadas
+            por estar la celda en '_uncacheable'.
+
+    """
+
+    __slots__ = ['_size', '_cell_size', '_cells', '_uncacheable', '_lock',
+                 '_hits', '_misses', '_evictions', '_skipped_checks']
+
+    def __init__(self, size, cell_size):
+        """Inicializa un objeto de tipo LocationCache.
+
+        Args:
+            size (int): Ver atributo '_size'.
+            cell_size (float): Ver atributo '_cell_size'.
+
+        """
+        if size < 1:
+            raise ValueError('size must be 1 or larger')
+        if cell_size <= 0:
+            raise ValueError('cell_size must be positive')
+
+        self._size = size
+        self._cell_size = cell_size
+        self._cells = collections.OrderedDict()
+        self._uncacheable = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._skipped_checks = 0
+
+    def cell_key(self, point):
+        """Retorna la clave de la celda que contiene a un punto.
+
+        Args:
+            point (Point): Punto a cuantizar.
+
+        Returns:
+            tuple: Clave de la celda (int, int).
+
+        """
+        return (math.floor(point.lon / self._cell_size),
+                math.floor(point.lat / self._cell_size))
+
+    def cell_geojson(self, key):
+        """Retorna la geometría de una celda en formato GeoJSON.
+
+        Args:
+            key (tuple): Clave de la celda.
+
+        Returns:
+            dict: Valor GeoJSON de la celda (tipo GeoJSON: "polygon").
+
+        """
+        min_lon = key[0] * self._cell_size
+        min_lat = key[1] * self._cell_size
+        max_lon = min_lon + self._cell_size
+        max_lat = min_lat + self._cell_size
+
+        return {
+            'type': 'polygon',
+            'coordinates': [[
+                [min_lon, min_lat],
+                [max_lon, min_lat],
+                [max_lon, max_lat],
+                [min_lon, max_lat],
+                [min_lon, min_lat]
+            ]]
+        }
+
+    def get(self, key):
+        """Busca el resultado almacenado para una celda.
+
+        Args:
+            key (tuple): Clave de la celda.
+
+        Returns:
+            tuple: Copia de la provincia, departamento y municipio de la
+                celda, o 'None' si la celda no está almacenada.
+
+        """
+        with self._lock:
+            entities = self._cells.get(key)
+            if entities is None:
+                self._misses += 1
+                return None
+
+            self._cells.move_to_end(key)
+            self._hits += 1
+
+        return copy.deepcopy(entities)
+
+    def put(self, key, state, dept, muni):
+        """Almacena el resultado de una celda. El llamador debe haber
+        comprobado que la celda está completamente contenida en las entidades
+        especificadas.
+
+        Args:
+            key (tuple): Clave de la celda.
+            state (dict): Provincia que contiene a la celda.
+            dept (dict): Departamento que contiene a la celda.
+            muni (dict): Municipio que contiene a la celda, o 'None'.
+
+        """
+        entities = copy.deepcopy((state, dept, muni))
+
+        with self._lock:
+            if key in self._cells:
+                self._cells.move_to_end(key)
+            elif len(self._cells) == self._size:
+                self._cells.popitem(last=False)
+                self._evictions += 1
+
+            self._cells[key] = entities
+
+    def needs_check(self, key):
+        """Indica si se debe comprobar si una celda no almacenada puede ser
+        almacenada en el cache (ver 'put' y 'put_uncacheable').
+
+        Args:
+            key (tuple): Clave de la celda.
+
+        Returns:
+            bool: Falso si ya se comprobó que la celda no puede ser
+                almacenada.
+
+        """
+        with self._lock:
+            if key not in self._uncacheable:
+                return True
+
+            self._uncacheable.move_to_end(key)
+            self._skipped_checks += 1
+
+        return False
+
+    def put_uncacheable(self, key):
+        """Registra que una celda no puede ser almacenada en el cache, para
+        no volver a comprobarla.
+
+        Args:
+            key (tuple): Clave de la celda.
+
+        """
+        with self._lock:
+            if key in self._uncacheable:
+                self._uncacheable.move_to_end(key)
+            elif len(self._uncacheable) == self._size:
+                self._uncacheable.popitem(last=False)
+
+            self._uncacheable[key] = None
+
+    def stats(self):
+        """Retorna los contadores de uso del cache.
+
+        Returns:
+            dict: Cantidad de aciertos, fallos, celdas removidas, celdas
+                almacenadas, celdas que no pueden ser almacenadas y
+                comprobaciones de celdas evitadas.
+
+        """
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'size': len(self._cells),
+                'uncacheable': len(self._uncacheable),
+                'skipped_checks': self._skipped_checks
+            }
+
+    def __len__(self):
+        return len(self._cells)
+
+
+def get_location_cache():
+    """Devuelve el cache de ubicaciones activo para la aplicación Flask. El
+    cache es creado si no existía, utilizando las configuraciones
+    'LOCATION_CACHE_SIZE' y 'LOCATION_CACHE_CELL_SIZE'.
+
+    Si hay una request HTTP activa, el cache se registra en 'g' para que sus
+    contadores puedan ser incluidos en el log de la request (ver
+    'request_location_cache').
+
+    Returns:
+        LocationCache: Cache de ubicaciones, o 'None' si el cache está
+            desactivado (LOCATION_CACHE_SIZE igual a 0 o no definido).
+
+    """
+    size = current_app.config.get('LOCATION_CACHE_SIZE', 0)
+    if not size:
+        return None
+
+    if not hasattr(current_app, 'location_cache'):
+        with _create_lock:
+            if not hasattr(current_app, 'location_cache'):
+                current_app.location_cache = LocationCache(
+                    size, current_app.config['LOCATION_CACHE_CELL_SIZE'])
+
+    if has_request_context():
+        g.location_cache = current_app.location_cache
+
+    return current_app.location_cache
+
+
+def request_location_cache():
+    """Devuelve el cache de ubicaciones utilizado durante la request HTTP
+    actual.
+
+    Returns:
+        LocationCache: Cache de ubicaciones, o 'None' si la request no lo
+            utilizó (o si no hay una request HTTP activa).
+
+    """
+    if not has_request_context():
+        return None
+
+    return g.get('location_cache')
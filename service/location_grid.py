@@ -0,0 +1,417 @@
+"""Módulo 'location_grid' de georef-ar-api.
+
+Contiene la implementación de una grilla multi-resolución (quadtree) de
+provincias, departamentos y municipios, utilizada para resolver consultas al
+recurso /ubicacion sin consultar a Elasticsearch y sin mantener todas las
+geometrías en memoria.
+
+La grilla se construye una vez (ver 'build_location_grid', invocado desde el
+indexador) y se almacena en un archivo binario compacto. Cada proceso de la API
+accede al archivo vía 'mmap', por lo que sus páginas son compartidas por todos
+los procesos a través del cache del sistema operativo.
+
+Cada celda del quadtree puede ser:
+    - Una hoja uniforme: la celda está completamente contenida en una misma
+      provincia, un mismo departamento y un mismo municipio (o en ninguno de
+      ellos). La hoja almacena directamente la combinación de entidades.
+    - Un nodo interno: la celda se divide en cuatro celdas hijas.
+    - Una hoja de límite: la celda tiene la máxima profundidad permitida y no
+      es uniforme. La hoja almacena, por cada tipo de entidad, las entidades
+      candidatas junto con su geometría recortada a la celda (en formato WKB),
+      para realizar un test exacto de intersección.
+
+Formato del archivo (valores little-endian):
+    - Encabezado (ver '_HEADER').
+    - Entidades: JSON con las listas de provincias, departamentos y municipios.
+    - Combinaciones: arreglo uint32 de tríos (provincia, departamento,
+      municipio), donde 0 representa 'ninguna' y N > 0 la entidad N - 1.
+    - Nodos: arreglo uint32. Los dos bits superiores indican el tipo de nodo
+      (ver '_TAG_*'); el resto es un índice: a una combinación (hojas
+      uniformes), al primero de los cuatro nodos hijos (nodos internos) o a
+      la lista de candidatos (hojas de límite).
+    - Candidatos: arreglo uint32. Cada lista comienza con su cantidad de
+      elementos, seguida de cuartetos (tipo de entidad, entidad, offset WKB,
+      largo WKB). Un largo WKB de 0 indica que la entidad contiene a la celda.
+    - Geometrías: geometrías recortadas en formato WKB.
+"""
+
+import array
+import json
+import mmap
+import struct
+import sys
+import threading
+from flask import current_app
+import shapely.geometry
+import shapely.wkb
+
+_MAGIC = b'GEOREFQT'
+_VERSION = 1
+_HEADER = struct.Struct('<8sII4d10Q')
+
+_TAG_SHIFT = 30
+_PAYLOAD_MASK = (1 << _TAG_SHIFT) - 1
+_TAG_LEAF = 0
+_TAG_INTERNAL = 1
+_TAG_BOUNDARY = 2
+
+_CANDIDATE_LEN = 4
+_LEVELS = 3
+
+_load_lock = threading.Lock()
+
+
+def _subdivide(bounds):
+    """Divide un rectángulo en cuatro cuadrantes.
+
+    El orden de los cuadrantes coincide con el índice calculado por
+    'LocationGrid._quadrant': sudoeste, sudeste, noroeste, noreste.
+
+    Args:
+        bounds (tuple): Rectángulo (min_lon, min_lat, max_lon, max_lat).
+
+    Returns:
+        list: Cuadrantes (tuplas con el mismo formato que 'bounds').
+
+    """
+    min_lon, min_lat, max_lon, max_lat = bounds
+    mid_lon = (min_lon + max_lon) / 2
+    mid_lat = (min_lat + max_lat) / 2
+
+    return [
+        (min_lon, min_lat, mid_lon, mid_lat),
+        (mid_lon, min_lat, max_lon, mid_lat),
+        (min_lon, mid_lat, mid_lon, max_lat),
+        (mid_lon, mid_lat, max_lon, max_lat)
+    ]
+
+
+class _GridBuilder:
+    """Construye los arreglos de una grilla a partir de un índice de
+    ubicaciones en memoria.
+
+    Attributes:
+        _territories (tuple): Índices de provincias, departamentos y municipios
+            (TerritoryIndex).
+        _max_depth (int): Profundidad máxima del quadtree.
+        _combos (dict): Combinaciones de entidades ya registradas, y su
+            posición en el arreglo de combinaciones.
+        nodes (array.array): Arreglo de nodos.
+        candidates (array.array): Arreglo de candidatos.
+        blobs (bytearray): Geometrías recortadas (WKB).
+
+    """
+
+    def __init__(self, location_index, max_depth):
+        self._territories = location_index.territories
+        self._max_depth = max_depth
+        self._combos = {}
+        self.nodes = array.array('I', [0])
+        self.candidates = array.array('I')
+        self.blobs = bytearray()
+
+    @property
+    def combos(self):
+        values = array.array('I')
+        for combo in sorted(self._combos, key=self._combos.get):
+            values.extend(combo)
+
+        return values
+
+    def _combo_index(self, combo):
+        if combo not in self._combos:
+            self._combos[combo] = len(self._combos)
+
+        return self._combos[combo]
+
+    def build(self, bounds):
+        self._build_node(0, bounds, 0, [None] * _LEVELS)
+
+    def _build_node(self, node, bounds, depth, parent_positions):
+        box = shapely.geometry.box(*bounds)
+        relations = [
+            territory.box_relations(box, positions)
+            for territory, positions in zip(self._territories,
+                                            parent_positions)
+        ]
+
+        # Una celda es uniforme para un tipo de entidad si no intersecta
+        # ninguna entidad, o si está contenida en la primera entidad que
+        # intersecta (la de menor ID).
+        uniform = [
+            not level or level[0][1]
+            for level in relations
+        ]
+
+        if all(uniform):
+            combo = tuple(level[0][0] + 1 if level else 0
+                          for level in relations)
+            self.nodes[node] = (_TAG_LEAF << _TAG_SHIFT |
+                                self._combo_index(combo))
+        elif depth < self._max_depth:
+            first_child = len(self.nodes)
+            self.nodes.extend([0] * 4)
+            self.nodes[node] = _TAG_INTERNAL << _TAG_SHIFT | first_child
+
+            positions = [
+                [position for position, _ in level]
+                for level in relations
+            ]
+
+            for i, child_bounds in enumerate(_subdivide(bounds)):
+                self._build_node(first_child + i, child_bounds, depth + 1,
+                                 positions)
+        else:
+            self.nodes[node] = (_TAG_BOUNDARY << _TAG_SHIFT |
+                                len(self.candidates))
+            self._add_candidates(box, relations)
+
+    def _add_candidates(self, box, relations):
+        values = []
+
+        for level, (territory, level_relations) in enumerate(
+                zip(self._territories, relations)):
+            for position, contains in level_relations:
+                if contains:
+                    # La entidad contiene a la celda: no es necesario
+                    # almacenar su geometría, ni considerar las entidades
+                    # siguientes.
+                    values.append((level, position, 0, 0))
+                    break
+
+                clipped = territory.geometry(position).intersection(box)
+                wkb = shapely.wkb.dumps(clipped)
+                values.append((level, position, len(self.blobs), len(wkb)))
+                self.blobs.extend(wkb)
+
+        self.candidates.append(len(values))
+        for value in values:
+            self.candidates.extend(value)
+
+
+def build_location_grid(location_index, filepath, max_depth):
+    """Construye una grilla multi-resolución a partir de un índice de
+    ubicaciones en memoria, y la almacena en un archivo.
+
+    Args:
+        location_index (LocationIndex): Índice de ubicaciones a utilizar.
+        filepath (str): Ruta del archivo a crear.
+        max_depth (int): Profundidad máxima del quadtree. Cada nivel divide
+            el tamaño de las celdas por dos.
+
+    """
+    all_bounds = [territory.bounds for territory in location_index.territories
+                  if len(territory)]
+    bounds = (min(b[0] for b in all_bounds), min(b[1] for b in all_bounds),
+              max(b[2] for b in all_bounds), max(b[3] for b in all_bounds))
+    builder = _GridBuilder(location_index, max_depth)
+    builder.build(bounds)
+
+    entities = json.dumps([
+        [territory.entity(i) for i in range(len(territory))]
+        for territory in location_index.territories
+    ]).encode()
+
+    sections = [entities, builder.combos, builder.nodes, builder.candidates,
+                builder.blobs]
+
+    if sys.byteorder != 'little':
+        for section in sections:
+            if isinstance(section, array.array):
+                section.byteswap()
+
+    offsets = []
+    position = _HEADER.size
+    for section in sections:
+        # Alinear todas las secciones a 8 bytes
+        position += -position % 8
+        offsets.append(position)
+        position += len(section) * getattr(section, 'itemsize', 1)
+
+    header_values = []
+    for section, offset in zip(sections, offsets):
+        header_values.extend([offset, len(section)])
+
+    with open(filepath, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, max_depth, *bounds,
+                             *header_values))
+
+        for section, offset in zip(sections, offsets):
+            f.write(b'\0' * (offset - f.tell()))
+            f.write(section)
+
+
+class LocationGrid:
+    """Grilla multi-resolución de provincias, departamentos y municipios,
+    leída desde un archivo creado con 'build_location_grid'.
+
+    Attributes:
+        _mmap (mmap.mmap): Contenidos del archivo.
+        _bounds (tuple): Rectángulo cubierto por la grilla.
+        _entities (list): Listas de provincias, departamentos y municipios.
+        _combos (memoryview): Arreglo de combinaciones (uint32).
+        _nodes (memoryview): Arreglo de nodos (uint32).
+        _candidates (memoryview): Arreglo de candidatos (uint32).
+        _blobs (memoryview): Geometrías recortadas (WKB).
+
+    """
+
+    __slots__ = ['_mmap', '_bounds', '_entities', '_combos', '_nodes',
+                 '_candidates', '_blobs']
+
+    def __init__(self, filepath):
+        """Inicializa un objeto de tipo LocationGrid.
+
+        Args:
+            filepath (str): Ruta del archivo de la grilla.
+
+        Raises:
+            ValueError: Si el archivo no tiene un formato válido.
+
+        """
+        if sys.byteorder != 'little':
+            raise ValueError('Location grids require a little-endian host')
+
+        with open(filepath, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        values = _HEADER.unpack_from(self._mmap)
+        magic, version = values[:2]
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError('Invalid location grid file: {}'.format(filepath))
+
+        self._bounds = values[3:7]
+        sections = [
+            (values[i], values[i + 1])
+            for i in range(7, len(values), 2)
+        ]
+
+        view = memoryview(self._mmap)
+        entities, combos, nodes, candidates, blobs = sections
+
+        self._entities = json.loads(
+            bytes(view[entities[0]:entities[0] + entities[1]]))
+        self._combos = self._uint32_view(view, *combos)
+        self._nodes = self._uint32_view(view, *nodes)
+        self._candidates = self._uint32_view(view, *candidates)
+        self._blobs = view[blobs[0]:blobs[0] + blobs[1]]
+
+    @staticmethod
+    def _uint32_view(view, offset, length):
+        return view[offset:offset + length * 4].cast('I')
+
+    @staticmethod
+    def _quadrant(bounds, lon, lat):
+        """Retorna el cuadrante de un rectángulo que contiene a un punto, y
+        los límites de ese cuadrante (ver '_subdivide').
+
+        Args:
+            bounds (tuple): Rectángulo (min_lon, min_lat, max_lon, max_lat).
+            lon (float): Longitud del punto.
+            lat (float): Latitud del punto.
+
+        Returns:
+            tuple: Índice del cuadrante (int) y sus límites (tuple).
+
+        """
+        min_lon, min_lat, max_lon, max_lat = bounds
+        mid_lon = (min_lon + max_lon) / 2
+        mid_lat = (min_lat + max_lat) / 2
+
+        east = lon >= mid_lon
+        north = lat >= mid_lat
+
+        return (north << 1 | east, (
+            mid_lon if east else min_lon,
+            mid_lat if north else min_lat,
+            max_lon if east else mid_lon,
+            max_lat if north else mid_lat
+        ))
+
+    def _entity(self, level, value):
+        if not value:
+            return None
+
+        return self._entities[level][value - 1].copy()
+
+    def _combo_entities(self, combo):
+        start = combo * _LEVELS
+        return tuple(
+            self._entity(level, self._combos[start + level])
+            for level in range(_LEVELS)
+        )
+
+    def _boundary_entities(self, offset, point):
+        entities = [None] * _LEVELS
+        count = self._candidates[offset]
+
+        for i in range(count):
+            start = offset + 1 + i * _CANDIDATE_LEN
+            level, position, blob_offset, blob_len = \
+                self._candidates[start:start + _CANDIDATE_LEN]
+
+            if entities[level] is not None:
+                continue
+
+            if blob_len:
+                geom = shapely.wkb.loads(
+                    bytes(self._blobs[blob_offset:blob_offset + blob_len]))
+                if not geom.intersects(point):
+                    continue
+
+            entities[level] = self._entity(level, position + 1)
+
+        return tuple(entities)
+
+    def locate(self, point):
+        """Busca la provincia, el departamento y el municipio que contienen a
+        un punto.
+
+        Args:
+            point (Point): Punto a utilizar.
+
+        Returns:
+            tuple: Provincia, departamento y municipio encontrados (dict).
+                Cualquiera de los tres valores puede ser 'None'.
+
+        """
+        lon, lat = point.lon, point.lat
+        bounds = self._bounds
+
+        if not (bounds[0] <= lon <= bounds[2] and
+                bounds[1] <= lat <= bounds[3]):
+            return None, None, None
+
+        node = 0
+        while True:
+            value = self._nodes[node]
+            tag = value >> _TAG_SHIFT
+            payload = value & _PAYLOAD_MASK
+
+            if tag == _TAG_LEAF:
+                return self._combo_entities(payload)
+
+            if tag == _TAG_BOUNDARY:
+                return self._boundary_entities(payload,
+                                               point.to_shapely_point())
+
+            quadrant, bounds = self._quadrant(bounds, lon, lat)
+            node = payload + quadrant
+
+
+def get_location_grid():
+    """Devuelve la grilla de ubicaciones activa para la aplicación Flask. La
+    grilla es leída desde el archivo 'LOCATION_GRID_FILE' si no había sido
+    leída anteriormente.
+
+    Returns:
+        LocationGrid: Grilla de ubicaciones.
+
+    """
+    if not hasattr(current_app, 'location_grid'):
+        with _load_lock:
+            if not hasattr(current_app, 'location_grid'):
+                current_app.location_grid = LocationGrid(
+                    current_app.config['LOCATION_GRID_FILE'])
+
+    return current_app.location_grid
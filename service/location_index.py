@@ -0,0 +1,395 @@
+"""Módulo 'location_index' de georef-ar-api.
+
+Contiene las clases y funciones necesarias para resolver consultas de ubicación
+(recurso /ubicacion) en memoria, sin realizar consultas GeoShape a
+Elasticsearch. Para lograr esto, se cargan las geometrías de provincias,
+departamentos y municipios en índices espaciales STR-tree compuestos de
+geometrías Shapely preparadas.
+
+Las geometrías pueden ser leídas desde los índices '*-geometria' de
+Elasticsearch, o desde los archivos NDJSON de respaldo generados por el
+indexador (ver 'BACKUPS_DIR').
+"""
+
+import json
+import os
+import threading
+import elasticsearch
+from elasticsearch import helpers
+from flask import current_app
+import shapely.geometry
+import shapely.prepared
+import shapely.strtree
+from shapely.geometry.base import BaseGeometry
+from service import names as N
+from service import data
+from service.management import es_config
+
+LOCATION_ENGINE_ES = 'elasticsearch'
+LOCATION_ENGINE_ES_STAGED = 'elasticsearch_staged'
+LOCATION_ENGINE_MEMORY = 'memory'
+LOCATION_ENGINE_GRID = 'grid'
+
+SOURCE_ES = 'elasticsearch'
+SOURCE_BACKUPS = 'backups'
+
+_BACKUP_FILES = {
+    N.STATES: 'provincias.ndjson',
+    N.DEPARTMENTS: 'departamentos.ndjson',
+    N.MUNICIPALITIES: 'municipios.ndjson'
+}
+
+_ENTITY_FIELDS = [N.ID, N.NAME, N.SOURCE]
+
+_load_lock = threading.Lock()
+
+
+class TerritoryIndex:
+    """Índice espacial en memoria de un tipo de entidad territorial
+    (provincias, departamentos o municipios).
+
+    Las entidades se almacenan ordenadas por ID: en caso de que un punto
+    intersecte más de una geometría (por ejemplo, un punto sobre un límite
+    entre dos departamentos), se retorna la entidad con menor ID.
+
+    Attributes:
+        _entities (list): Lista de entidades (diccionarios con los campos 'id',
+            'nombre' y 'fuente').
+        _geoms (list): Lista de geometrías Shapely de cada entidad.
+        _prepared (list): Lista de geometrías preparadas de cada entidad.
+        _positions (dict): Posición de cada geometría dentro de '_geoms',
+            indexado por 'id()' de la geometría. Necesario para versiones de
+            Shapely anteriores a 2.0, donde 'STRtree.query' retorna
+            geometrías en lugar de índices.
+        _tree (shapely.strtree.STRtree): Índice espacial de '_geoms'.
+
+    """
+
+    __slots__ = ['_entities', '_geoms', '_prepared', '_positions', '_tree']
+
+    def __init__(self, entities):
+        """Inicializa un objeto de tipo TerritoryIndex.
+
+        Args:
+            entities (iterable): Entidades a indexar. Cada entidad debe ser un
+                diccionario con los campos 'id', 'nombre', 'fuente' y
+                'geometria' (GeoJSON).
+
+        """
+        entities = sorted(entities, key=lambda entity: entity[N.ID])
+
+        self._entities = [
+            {key: entity[key] for key in _ENTITY_FIELDS}
+            for entity in entities
+        ]
+        self._geoms = [shapely.geometry.shape(entity[N.GEOM])
+                       for entity in entities]
+        self._prepared = [shapely.prepared.prep(geom) for geom in self._geoms]
+        self._positions = {id(geom): i for i, geom in enumerate(self._geoms)}
+        self._tree = shapely.strtree.STRtree(self._geoms)
+
+    def _candidate_positions(self, geom):
+        """Retorna las posiciones de las geometrías cuyo rectángulo envolvente
+        intersecta una geometría.
+
+        Args:
+            geom (shapely.geometry.base.BaseGeometry): Geometría a utilizar.
+
+        Returns:
+            list: Posiciones (int) ordenadas de menor a mayor.
+
+        """
+        positions = []
+        for item in self._tree.query(geom):
+            if isinstance(item, BaseGeometry):
+                positions.append(self._positions[id(item)])
+            else:
+                positions.append(int(item))
+
+        positions.sort()
+        return positions
+
+    def find(self, point):
+        """Busca la entidad cuya geometría intersecta un punto.
+
+        Args:
+            point (shapely.geometry.Point): Punto a utilizar.
+
+        Returns:
+            dict: Copia de la entidad encontrada, o 'None' si no se encontró
+                ninguna.
+
+        """
+        for position in self._candidate_positions(point):
+            if self._prepared[position].intersects(point):
+                return self._entities[position].copy()
+
+        return None
+
+    def box_relations(self, box, positions=None):
+        """Retorna las geometrías que intersectan un rectángulo, indicando
+        para cada una si contiene completamente al rectángulo.
+
+        Args:
+            box (shapely.geometry.Polygon): Rectángulo a utilizar.
+            positions (list): Si se especifica, solo considerar las geometrías
+                en estas posiciones (ordenadas de menor a mayor).
+
+        Returns:
+            list: Lista de tuplas (posición, contiene), ordenada por
+                posición.
+
+        """
+        if positions is None:
+            positions = self._candidate_positions(box)
+
+        relations = []
+        for position in positions:
+            prepared = self._prepared[position]
+            if prepared.intersects(box):
+                relations.append((position, prepared.contains(box)))
+
+        return relations
+
+    def entity(self, position):
+        """Retorna una copia de la entidad en una posición.
+
+        Args:
+            position (int): Posición de la entidad.
+
+        Returns:
+            dict: Entidad.
+
+        """
+        return self._entities[position].copy()
+
+    def geometry(self, position):
+        """Retorna la geometría de la entidad en una posición.
+
+        Args:
+            position (int): Posición de la entidad.
+
+        Returns:
+            shapely.geometry.base.BaseGeometry: Geometría.
+
+        """
+        return self._geoms[position]
+
+    @property
+    def bounds(self):
+        """Retorna el rectángulo envolvente de todas las geometrías.
+
+        Returns:
+            tuple: (min_lon, min_lat, max_lon, max_lat).
+
+        """
+        all_bounds = [geom.bounds for geom in self._geoms]
+        return (min(b[0] for b in all_bounds), min(b[1] for b in all_bounds),
+                max(b[2] for b in all_bounds), max(b[3] for b in all_bounds))
+
+    def __len__(self):
+        return len(self._entities)
+
+
+class LocationIndex:
+    """Índice espacial en memoria de provincias, departamentos y municipios,
+    utilizado para resolver consultas de ubicación.
+
+    Attributes:
+        _states (TerritoryIndex): Índice de provincias.
+        _departments (TerritoryIndex): Índice de departamentos.
+        _municipalities (TerritoryIndex): Índice de municipios.
+
+    """
+
+    __slots__ = ['_states', '_departments', '_municipalities']
+
+    def __init__(self, states, departments, municipalities):
+        """Inicializa un objeto de tipo LocationIndex.
+
+        Args:
+            states (iterable): Provincias a indexar (ver 'TerritoryIndex').
+            departments (iterable): Departamentos a indexar.
+            municipalities (iterable): Municipios a indexar.
+
+        """
+        self._states = TerritoryIndex(states)
+        self._departments = TerritoryIndex(departments)
+        self._municipalities = TerritoryIndex(municipalities)
+
+    @classmethod
+    def from_backups(cls, backups_dir):
+        """Construye un objeto 'LocationIndex' a partir de los archivos NDJSON
+        de respaldo generados por el indexador.
+
+        Args:
+            backups_dir (str): Directorio donde se encuentran los archivos de
+                respaldo.
+
+        Returns:
+            LocationIndex: Índice creado.
+
+        """
+        return cls(*[
+            _read_backup_entities(os.path.join(backups_dir,
+                                               _BACKUP_FILES[entity]))
+            for entity in [N.STATES, N.DEPARTMENTS, N.MUNICIPALITIES]
+        ])
+
+    @classmethod
+    def from_elasticsearch(cls, es):
+        """Construye un objeto 'LocationIndex' a partir de los índices de
+        entidades y de geometrías de Elasticsearch.
+
+        Args:
+            es (Elasticsearch): Conexión a Elasticsearch.
+
+        Raises:
+            DataConnectionException: Si ocurrió un error al leer los índices.
+
+        Returns:
+            LocationIndex: Índice creado.
+
+        """
+        try:
+            return cls(*[
+                _read_elasticsearch_entities(es, entity)
+                for entity in [N.STATES, N.DEPARTMENTS, N.MUNICIPALITIES]
+            ])
+        except elasticsearch.ElasticsearchException as e:
+            raise data.DataConnectionException() from e
+
+    @property
+    def territories(self):
+        """Retorna los índices de provincias, departamentos y municipios.
+
+        Returns:
+            tuple: Índices de provincias, departamentos y municipios
+                (TerritoryIndex).
+
+        """
+        return self._states, self._departments, self._municipalities
+
+    def locate(self, point):
+        """Busca la provincia, el departamento y el municipio que contienen a
+        un punto.
+
+        Args:
+            point (Point): Punto a utilizar.
+
+        Returns:
+            tuple: Provincia, departamento y municipio encontrados (dict).
+                Cualquiera de los tres valores puede ser 'None'.
+
+        """
+        shapely_point = point.to_shapely_point()
+
+        return (
+            self._states.find(shapely_point),
+            self._departments.find(shapely_point),
+            self._municipalities.find(shapely_point)
+        )
+
+
+def _read_backup_entities(filepath):
+    """Lee las entidades contenidas en un archivo NDJSON de respaldo. La
+    primera línea del archivo (metadatos) es ignorada.
+
+    Args:
+        filepath (str): Ruta local al archivo.
+
+    Yields:
+        dict: Entidad leída.
+
+    """
+    with open(filepath) as f:
+        # El primer objeto del NDJSON son los metadatos
+        next(f, None)
+
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _read_elasticsearch_entities(es, entity):
+    """Lee todas las entidades de un tipo desde Elasticsearch, junto con sus
+    geometrías.
+
+    Args:
+        es (Elasticsearch): Conexión a Elasticsearch.
+        entity (str): Nombre de la entidad (plural).
+
+    Returns:
+        list: Entidades leídas (dict).
+
+    """
+    entities = {
+        hit['_source'][N.ID]: hit['_source']
+        for hit in helpers.scan(es, index=entity,
+                                _source=_ENTITY_FIELDS)
+    }
+
+    geom_hits = helpers.scan(es, index=es_config.geom_index_for(entity),
+                             _source=[N.ID, N.GEOM])
+
+    for hit in geom_hits:
+        source = hit['_source']
+        if source[N.ID] in entities:
+            entities[source[N.ID]][N.GEOM] = source[N.GEOM]
+
+    return [entity for entity in entities.values() if N.GEOM in entity]
+
+
+def load_location_index(es, source, backups_dir):
+    """Crea un índice de ubicaciones en memoria a partir de un origen de
+    datos.
+
+    Args:
+        es (Elasticsearch): Conexión a Elasticsearch.
+        source (str): Origen de los datos ('elasticsearch' o 'backups').
+        backups_dir (str): Directorio de archivos de respaldo del indexador.
+
+    Raises:
+        DataConnectionException: Si ocurrió un error al leer los datos desde
+            Elasticsearch.
+        ValueError: Si el origen de datos no es válido.
+
+    Returns:
+        LocationIndex: Índice de ubicaciones.
+
+    """
+    if source == SOURCE_BACKUPS:
+        return LocationIndex.from_backups(backups_dir)
+
+    if source == SOURCE_ES:
+        return LocationIndex.from_elasticsearch(es)
+
+    raise ValueError('Invalid location engine source: {}'.format(source))
+
+
+def get_location_index(es):
+    """Devuelve el índice de ubicaciones en memoria activo para la aplicación
+    Flask. El índice es creado si no existía, utilizando el origen de datos
+    especificado en la configuración 'LOCATION_ENGINE_SOURCE'.
+
+    Args:
+        es (Elasticsearch): Conexión a Elasticsearch.
+
+    Raises:
+        DataConnectionException: Si ocurrió un error al leer los datos desde
+            Elasticsearch.
+
+    Returns:
+        LocationIndex: Índice de ubicaciones.
+
+    """
+    if not hasattr(current_app, 'location_index'):
+        with _load_lock:
+            if not hasattr(current_app, 'location_index'):
+                current_app.location_index = load_location_index(
+                    es,
+                    current_app.config.get('LOCATION_ENGINE_SOURCE',
+                                           SOURCE_ES),
+                    current_app.config['BACKUPS_DIR'])
+
+    return current_app.location_index
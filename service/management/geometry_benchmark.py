@@ -0,0 +1,115 @@
+"""geometry_benchmark.py - comparación de interpolaciones de alturas
+
+Compara el tiempo de cálculo de las posiciones de una altura sobre listas de
+cuadras utilizando 'geometry.street_block_number_location' (una cuadra a la
+vez, con Shapely) y 'geometry.street_block_number_locations' (todas las
+cuadras a la vez, con NumPy), y verifica que ambos métodos generen los mismos
+puntos. Las cuadras utilizadas tienen la misma estructura que los documentos
+del índice de cuadras, e incluyen cuadras de uno y varios tramos.
+
+Para utilizar, ejecutar el siguiente comando en la carpeta raíz del proyecto:
+
+$ make benchmark_geometry
+"""
+
+import argparse
+import random
+import timeit
+from service import geometry
+from service import names as N
+
+TOLERANCE = 1e-8
+
+
+def street_block(rnd):
+    lon = -58.5 + rnd.random() / 10
+    lat = -34.7 + rnd.random() / 10
+    lines = []
+
+    for _ in range(rnd.choice([1, 1, 1, 2, 3])):
+        line = [[lon, lat]]
+        for _ in range(rnd.randint(1, 3)):
+            lon += rnd.uniform(-1e-3, 1e-3)
+            lat += rnd.uniform(-1e-3, 1e-3)
+            line.append([lon, lat])
+
+        lines.append(line)
+
+    # Se utiliza la misma numeración para todas las cuadras, ya que en las
+    # búsquedas de direcciones se interpola la misma altura sobre todas.
+    door_nums = {
+        N.START: {N.RIGHT: 0, N.LEFT: 1},
+        N.END: {N.RIGHT: 98, N.LEFT: 99}
+    }
+
+    return {'type': 'MultiLineString', 'coordinates': lines}, door_nums
+
+
+def locations_per_block(blocks, number, approximate):
+    return [
+        geometry.street_block_number_location(geom, door_nums, number,
+                                              approximate)
+        for geom, door_nums in blocks
+    ]
+
+
+def same_points(points_a, points_b):
+    return all(
+        (a is None and b is None) or
+        (a is not None and b is not None and
+         abs(a.lon - b.lon) < TOLERANCE and abs(a.lat - b.lat) < TOLERANCE)
+        for a, b in zip(points_a, points_b)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--blocks', type=int, default=1000,
+                        help='Cantidad de cuadras por lista.')
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help='Cantidad de repeticiones por medición.')
+    parser.add_argument('-s', '--seed', type=int, default=0,
+                        help='Semilla para generar las cuadras.')
+    args = parser.parse_args()
+
+    if geometry.numpy is None:
+        raise RuntimeError('The numpy package is required')
+
+    rnd = random.Random(args.seed)
+    blocks = [street_block(rnd) for _ in range(args.blocks)]
+
+    cases = [
+        ('altura', 50, False),
+        ('sin altura (centroide)', None, True)
+    ]
+
+    for name, number, approximate in cases:
+        expected = locations_per_block(blocks, number, approximate)
+        points = geometry.street_block_number_locations(blocks, number,
+                                                        approximate)
+
+        if not same_points(expected, points):
+            raise RuntimeError(
+                'Methods generated different points for {}'.format(name))
+
+        timings = {
+            'shapely': lambda: locations_per_block(blocks, number,
+                                                   approximate),
+            'numpy': lambda: geometry.street_block_number_locations(
+                blocks, number, approximate)
+        }
+
+        print('{} ({} cuadras):'.format(name, args.blocks))
+        elapsed = {}
+        for method, function in timings.items():
+            elapsed[method] = min(timeit.repeat(function, repeat=args.repeat,
+                                                number=1))
+            print('    {:8} {:8.1f} ms'.format(method,
+                                               elapsed[method] * 1000))
+
+        print('    {:8} {:8.1f}x'.format(
+            'speedup', elapsed['shapely'] / elapsed['numpy']))
+
+
+if __name__ == '__main__':
+    main()
@@ -25,6 +25,7 @@ import tqdm
 from .. import app
 from .. import normalizer
 from .. import names as N
+from .. import location_index, location_grid
 from . import es_config
 
 
@@ -47,7 +48,7 @@ CACHE_DIR = 'cache'
 SEPARATOR_WIDTH = 60
 SMTP_TIMEOUT = 30
 CHUNK_SIZE = 8192
-ACTIONS = ['index', 'index_stats']
+ACTIONS = ['index', 'index_stats', 'location_grid']
 INDEX_NAMES = [
     N.STATES,
     es_config.geom_index_for(N.STATES),
@@ -66,6 +67,7 @@ INDEX_NAMES = [
 ES_TIMEOUT = 720
 DEFAULT_SHARDS = 1
 DEFAULT_REPLICAS = 2
+DEFAULT_LOCATION_GRID_MAX_DEPTH = 10
 
 
 def setup_logger(l, stream):
@@ -932,6 +934,38 @@ def run_index(es, forced, name='all', verbose=False):
     logger.info('Script finalizado.')
 
 
+def run_location_grid(es):
+    """Construye la grilla de ubicaciones utilizada por el recurso /ubicacion
+    cuando LOCATION_ENGINE es 'grid', y la almacena en LOCATION_GRID_FILE.
+
+    Las geometrías se leen desde el origen configurado en
+    LOCATION_ENGINE_SOURCE (índices de Elasticsearch o archivos de respaldo).
+
+    Args:
+        es (Elasticsearch): Cliente Elasticsearch.
+
+    """
+    source = app.config.get('LOCATION_ENGINE_SOURCE', location_index.SOURCE_ES)
+    filepath = app.config['LOCATION_GRID_FILE']
+    max_depth = app.config.get('LOCATION_GRID_MAX_DEPTH',
+                               DEFAULT_LOCATION_GRID_MAX_DEPTH)
+
+    logger.info('Cargando geometrías (origen: {})...'.format(source))
+    index = location_index.load_location_index(es, source,
+                                               app.config['BACKUPS_DIR'])
+
+    logger.info('Construyendo grilla (profundidad máxima: {})...'.format(
+        max_depth))
+    # Escribir a un archivo temporal y luego reemplazar el archivo final, para
+    # que los procesos de la API nunca lean un archivo incompleto.
+    tmp_filepath = filepath + '.tmp'
+    location_grid.build_location_grid(index, tmp_filepath, max_depth)
+    os.replace(tmp_filepath, filepath)
+
+    logger.info('Grilla creada: {}'.format(filepath))
+    logger.info('')
+
+
 def run_info(es):
     """Imprime en pantalla información sobre el estado del cluster
     Elasticsearch.
@@ -988,6 +1022,8 @@ def main():
                 run_index(es, args.forced, args.name, args.verbose)
             elif args.mode == 'index_stats':
                 run_info(es)
+            elif args.mode == 'location_grid':
+                run_location_grid(es)
             else:
                 raise ValueError('Invalid operation')
     except Exception:  # pylint: disable=broad-except
@@ -0,0 +1,27 @@
+"""jobs_worker.py - worker de trabajos en segundo plano
+
+Procesa trabajos de normalización de direcciones en segundo plano (ver módulo
+'service.jobs') de forma indefinida. Permite procesar trabajos en procesos
+independientes de la API (por ejemplo, utilizando JOBS_WORKERS = 0 en los
+procesos de la API). Se pueden iniciar varios workers, siempre que todos
+utilicen el mismo JOBS_DIR.
+
+Para utilizar, ejecutar el siguiente comando en la carpeta raíz del proyecto:
+
+$ make jobs_worker
+"""
+
+from service import app, constants, jobs, normalizer
+
+
+def main():
+    with app.app_context():
+        store = jobs.get_job_store()
+
+    worker = jobs.JobWorker(store, normalizer.process_address_job_window,
+                            constants.JOBS_WINDOW_LEN)
+    jobs.run_forever(app, worker)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""json_benchmark.py - comparación de backends de codificación JSON
+
+Compara el tiempo de codificación de respuestas JSON utilizando cada backend
+disponible del módulo 'serializer', y verifica que todos generen contenidos
+idénticos. Las respuestas utilizadas tienen la misma estructura que las
+respuestas reales de los recursos /direcciones y /localidades (incluyendo
+objetos 'AddressData' en los parámetros).
+
+Para utilizar, ejecutar el siguiente comando en la carpeta raíz del proyecto:
+
+$ make benchmark_json
+"""
+
+import argparse
+import random
+import timeit
+from georef_ar_address import AddressParser
+from service import app
+from service import names as N
+
+ADDRESSES = [
+    'Av. Corrientes 1234',
+    'Santa Fe 1520 3° B',
+    'Belgrano e/ Mitre y Sarmiento',
+    'Tucumán esq. Córdoba',
+    'Ruta 3 km 45'
+]
+
+
+def _subentity(entity_id, name):
+    return {N.ID: entity_id, N.NAME: name}
+
+
+def address_hit(i):
+    return {
+        N.DOOR_NUM: {N.VALUE: str(1000 + i), N.UNIT: None},
+        N.FLOOR: None,
+        N.STREET: {N.ID: '02007010017{:02d}'.format(i % 100),
+                   N.NAME: 'AV CORRIENTES', N.CATEGORY: 'AV'},
+        N.STREET_X1: {N.ID: None, N.NAME: None, N.CATEGORY: None},
+        N.STREET_X2: {N.ID: None, N.NAME: None, N.CATEGORY: None},
+        N.STATE: _subentity('02', 'Ciudad Autónoma de Buenos Aires'),
+        N.DEPT: _subentity('02007', 'Comuna 1'),
+        N.CENSUS_LOCALITY: _subentity('02000010', 'Ciudad de Buenos Aires'),
+        N.LOCATION: {N.LAT: -34.603722 + i / 1e4,
+                     N.LON: -58.381592 - i / 1e4},
+        N.FULL_NAME: 'AV CORRIENTES {}, Comuna 1, Ciudad Autónoma de '
+                     'Buenos Aires'.format(1000 + i),
+        N.SOURCE: 'INDEC'
+    }
+
+
+def locality_hit(i):
+    return {
+        N.ID: '06{:06d}000'.format(i),
+        N.NAME: 'Localidad Ñandú {}'.format(i),
+        N.CATEGORY: 'Localidad simple',
+        N.CENTROID: {N.LAT: -35.1 - i / 1e3, N.LON: -60.2 + i / 1e3},
+        N.STATE: _subentity('06', 'Buenos Aires'),
+        N.DEPT: _subentity('06007', 'Adolfo Alsina'),
+        N.MUN: _subentity('060007', 'Adolfo Alsina'),
+        N.CENSUS_LOCALITY: _subentity('06007010', 'Carhué'),
+        N.SOURCE: 'BAHRA'
+    }
+
+
+def bulk_response(entity, build_hit, queries, hits, params):
+    return {
+        N.RESULTS: [
+            {
+                entity: [build_hit(j) for j in range(hits)],
+                N.QUANTITY: hits,
+                N.TOTAL: hits * 10,
+                N.OFFSET: 0,
+                N.PARAMETERS: params(i)
+            }
+            for i in range(queries)
+        ]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-q', '--queries', type=int, default=1000,
+                        help='Cantidad de consultas por respuesta.')
+    parser.add_argument('-n', '--hits', type=int, default=10,
+                        help='Cantidad de resultados por consulta.')
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help='Cantidad de repeticiones por medición.')
+    args = parser.parse_args()
+
+    address_parser = AddressParser()
+    addresses = [address_parser.parse(address) for address in ADDRESSES]
+
+    responses = {
+        N.ADDRESSES: bulk_response(
+            N.ADDRESSES, address_hit, args.queries, args.hits,
+            lambda i: {N.ADDRESS: random.choice(addresses),
+                       N.STATE: 'caba', N.FIELDS: {N.ID, N.NAME}}),
+        N.LOCALITIES: bulk_response(
+            N.LOCALITIES, locality_hit, args.queries, args.hits,
+            lambda i: {N.NAME: 'localidad {}'.format(i), N.MAX: args.hits})
+    }
+
+    with app.test_request_context():
+        from service import serializer
+
+        backends = [
+            backend for backend in serializer.BACKENDS
+            if serializer.get_backend(backend) == backend
+        ]
+
+        for name, response in responses.items():
+            contents = {
+                backend: serializer.dumps(response, backend)
+                for backend in backends
+            }
+
+            if len(set(contents.values())) > 1:
+                raise RuntimeError(
+                    'Backends generated different contents for {}'.format(
+                        name))
+
+            print('{} ({} consultas x {} resultados, {:.1f} MB):'.format(
+                name, args.queries, args.hits,
+                len(contents[backends[0]]) / 1e6))
+
+            for backend in backends:
+                elapsed = min(timeit.repeat(
+                    lambda b=backend: serializer.dumps(response, b),
+                    repeat=args.repeat, number=1))
+                print('    {:8} {:8.1f} ms'.format(backend, elapsed * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -51,11 +51,14 @@ LOCATION = 'ubicacion'
 LOCATIONS = 'ubicaciones'
 RESULT = 'resultado'
 RESULTS = 'resultados'
+JOB = 'trabajo'
+JOBS = 'trabajos'
 
 # Campos, parámetros, etc.
 BASIC = 'basico'
 CENTROID = 'centroide'
 COMPLETE = 'completo'
+CREATED = 'creado'
 DOOR_NUM = 'altura'
 END = 'fin'
 ISO_ID = 'iso_id'
@@ -83,14 +86,17 @@ NAME = 'nombre'
 OFFSET = 'inicio'
 ORDER = 'orden'
 PARAMETERS = 'parametros'
+PROCESSED = 'procesadas'
 QUANTITY = 'cantidad'
 RIGHT = 'derecha'
 SOURCE = 'fuente'
 STANDARD = 'estandar'
 START = 'inicio'
+STATUS = 'estado'
 TOTAL = 'total'
 TYPE = 'tipo'
 UNIT = 'unidad'
+UPDATED = 'actualizado'
 VALUE = 'valor'
 
 ##########################
@@ -116,6 +122,13 @@ C_LON = join(CENTROID, LON)
 LOCATION_LAT = join(LOCATION, LAT)
 LOCATION_LON = join(LOCATION, LON)
 
+# Parámetros de columnas CSV
+ADDRESS_COLUMN = 'columna_direccion'
+STATE_COLUMN = 'columna_provincia'
+DEPT_COLUMN = 'columna_departamento'
+CENSUS_LOCALITY_COLUMN = 'columna_localidad_censal'
+LOCALITY_COLUMN = 'columna_localidad'
+
 # Campos de altura
 START_L = join(DOOR_NUM, START, LEFT)
 START_R = join(DOOR_NUM, START, RIGHT)
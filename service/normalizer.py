@@ -4,9 +4,13 @@ Contiene funciones que manejan la lógica de procesamiento
 de los recursos que expone la API.
 """
 
+import csv
+import io
 import logging
+from functools import partial
 from flask import current_app
 from service import data, params, formatter, address, location, utils, street
+from service import constants, jobs, strings
 from service import names as N
 from service.query_result import QueryResult
 
@@ -35,6 +39,141 @@ def get_elasticsearch():
     return current_app.elasticsearch
 
 
+def _is_ndjson_request(request):
+    """Indica si una request POST contiene consultas en formato NDJSON (una
+    consulta por línea).
+
+    Args:
+        request (flask.Request): Request POST de flask.
+
+    Returns:
+        bool: Verdadero si el contenido de la request es NDJSON.
+
+    """
+    return request.mimetype == formatter.NDJSON_MIMETYPE
+
+
+def _run_window_queries(window, run_queries):
+    """Ejecuta en conjunto las consultas válidas de una ventana de consultas
+    parseadas, y genera sus resultados en el mismo orden que las consultas.
+
+    Args:
+        window (list): Lista de tuplas (ParametersParseResult, errores) (ver
+            'params.EndpointParameters.parse_bulk_entry').
+        run_queries (function): Función que recibe una lista de
+            ParametersParseResult, y retorna una tupla de resultados
+            (QueryResult) y parámetros de formato para cada consulta.
+
+    Raises:
+        data.DataConnectionException: En caso de ocurrir un error de
+            conexión con la capa de manejo de datos.
+
+    Yields:
+        tuple: Resultado (QueryResult), parámetros de formato y errores de
+            cada consulta. Si la consulta tiene errores de parseo, el
+            resultado y los parámetros de formato son 'None'.
+
+    """
+    params_list = [parsed for parsed, errors in window if not errors]
+    results = iter(())
+
+    if params_list:
+        results = zip(*run_queries(params_list))
+
+    for _, errors in window:
+        if errors:
+            yield None, None, errors
+        else:
+            result, fmt = next(results)
+            yield result, fmt, errors
+
+
+def _ndjson_window_lines(name, window, run_queries):
+    """Ejecuta las consultas de una ventana de consultas NDJSON, y genera las
+    líneas NDJSON de sus resultados, en el mismo orden que las consultas.
+
+    Args:
+        name (str): Nombre de la entidad consultada.
+        window (list): Lista de tuplas (ParametersParseResult, errores) (ver
+            'params.EndpointParameters.parse_ndjson_params').
+        run_queries (function): Ver '_run_window_queries'.
+
+    Raises:
+        data.DataConnectionException: En caso de ocurrir un error de
+            conexión con la capa de manejo de datos.
+
+    Yields:
+        bytes: Líneas NDJSON.
+
+    """
+    for result, fmt, errors in _run_window_queries(window, run_queries):
+        if errors:
+            yield formatter.ndjson_param_errors_line(errors)
+        else:
+            yield formatter.ndjson_result_line(name, result, fmt)
+
+
+def _ndjson_bulk_lines(name, entries, run_queries):
+    """Procesa consultas NDJSON en ventanas de BULK_NDJSON_WINDOW_LEN
+    consultas: las consultas de cada ventana son leídas, parseadas y
+    ejecutadas en conjunto, y sus resultados son generados antes de leer la
+    siguiente ventana. De esta forma, los primeros resultados pueden ser
+    enviados al usuario mientras se continúa recibiendo el contenido de la
+    request, y solo es necesario mantener en memoria los resultados de una
+    ventana a la vez.
+
+    Si ocurre un error de conexión con la capa de manejo de datos, se genera
+    una línea de error y se finaliza el procesamiento.
+
+    Args:
+        name (str): Nombre de la entidad consultada.
+        entries (iterable): Consultas parseadas (ver
+            'params.EndpointParameters.parse_ndjson_params').
+        run_queries (function): Ver '_ndjson_window_lines'.
+
+    Yields:
+        bytes: Líneas NDJSON.
+
+    """
+    try:
+        for window in utils.chunks(entries, constants.BULK_NDJSON_WINDOW_LEN):
+            yield from _ndjson_window_lines(name, window, run_queries)
+    except data.DataConnectionException:
+        logger.exception(
+            'Excepción en manejo de consulta NDJSON para recurso: {}'.format(
+                name))
+        yield formatter.ndjson_internal_error_line()
+
+
+def _process_ndjson_bulk(request, name, param_parser, body_key, run_queries):
+    """Procesa una request POST con contenido NDJSON (una consulta por línea)
+    para consultar datos de una lista de entidades. La respuesta contiene una
+    línea NDJSON por cada consulta, en el mismo orden: el resultado de la
+    consulta, o los errores de parseo de sus parámetros.
+
+    Args:
+        request (flask.Request): Request POST de flask.
+        name (str): Nombre de la entidad.
+        param_parser (ParameterSet): Objeto utilizado para parsear los
+            parámetros.
+        body_key (str): Nombre de la key bajo donde se reciben las consultas
+            en requests JSON.
+        run_queries (function): Ver '_ndjson_window_lines'.
+
+    Returns:
+        flask.Response: respuesta HTTP
+
+    """
+    try:
+        entries = param_parser.parse_ndjson_params(request.args,
+                                                   request.stream, body_key)
+    except params.ParametersParseException as e:
+        return formatter.create_param_error_response_bulk(e.errors)
+
+    return formatter.create_ndjson_response_bulk(
+        _ndjson_bulk_lines(name, entries, run_queries))
+
+
 def _process_entity_single(request, name, param_parser, key_translations):
     """Procesa una request GET para consultar datos de una entidad.
     En caso de ocurrir un error de parseo, se retorna una respuesta HTTP 400.
@@ -116,9 +255,38 @@ def _process_entity_bulk(request, name, param_parser, key_translations):
     except params.ParametersParseException as e:
         return formatter.create_param_error_response_bulk(e.errors)
 
+    query_results, formats = _process_entity_queries(name, key_translations,
+                                                     body_params)
+
+    return formatter.create_ok_response_bulk(name, query_results, formats)
+
+
+def _process_entity_queries(name, key_translations, params_list):
+    """Ejecuta una lista de consultas de una entidad, partiendo desde los
+    parámetros recibidos del usuario.
+
+    Args:
+        name (str): Nombre de la entidad.
+        key_translations (dict): Traducciones de keys a utilizar para convertir
+            los diccionarios de parámetros del usuario a una lista de
+            diccionarios representando las queries a Elasticsearch.
+        params_list (list): Lista de ParametersParseResult, cada uno
+            conteniendo los parámetros de una consulta.
+
+    Raises:
+        data.DataConnectionException: En caso de ocurrir un error de
+            conexión con la capa de manejo de datos.
+
+    Returns:
+        tuple: Tupla de (list, list), donde la primera lista contiene una
+            instancia de QueryResult por cada consulta, y la segunda lista
+            contiene una instancia de dict utilizada para darle formato al
+            resultado más tarde.
+
+    """
     queries = []
     formats = []
-    for parsed_params in body_params:
+    for parsed_params in params_list:
         # Construir query a partir de parámetros
         query = utils.translate_keys(parsed_params.values, key_translations,
                                      ignore=[N.FLATTEN, N.FORMAT])
@@ -141,13 +309,13 @@ def _process_entity_bulk(request, name, param_parser, key_translations):
 
     query_results = [
         QueryResult.from_entity_list(search.result.hits,
-                                     params.received_values(),
+                                     parsed_params.received_values(),
                                      search.result.total,
                                      search.result.offset)
-        for search, params in zip(searches, body_params)
+        for search, parsed_params in zip(searches, params_list)
     ]
 
-    return formatter.create_ok_response_bulk(name, query_results, formats)
+    return query_results, formats
 
 
 def _process_entity(request, name, param_parser, key_translations):
@@ -173,6 +341,11 @@ def _process_entity(request, name, param_parser, key_translations):
             return _process_entity_single(request, name, param_parser,
                                           key_translations)
 
+        if _is_ndjson_request(request):
+            return _process_ndjson_bulk(
+                request, name, param_parser, name,
+                partial(_process_entity_queries, name, key_translations))
+
         return _process_entity_bulk(request, name, param_parser,
                                     key_translations)
     except data.DataConnectionException:
@@ -476,6 +649,11 @@ def process_street(request):
         if request.method == 'GET':
             return _process_street_single(request)
 
+        if _is_ndjson_request(request):
+            return _process_ndjson_bulk(request, N.STREETS,
+                                        params.PARAMS_STREETS, N.STREETS,
+                                        _process_street_queries)
+
         return _process_street_bulk(request)
     except data.DataConnectionException:
         logger.exception(
@@ -617,6 +795,11 @@ def process_address(request):
         if request.method == 'GET':
             return _process_address_single(request)
 
+        if _is_ndjson_request(request):
+            return _process_ndjson_bulk(request, N.ADDRESSES,
+                                        params.PARAMS_ADDRESSES, N.ADDRESSES,
+                                        _process_address_queries)
+
         return _process_address_bulk(request)
     except data.DataConnectionException:
         logger.exception(
@@ -624,6 +807,342 @@ def process_address(request):
         return formatter.create_internal_error_response()
 
 
+_ADDRESS_CSV_COLUMNS = {
+    N.ADDRESS: N.ADDRESS_COLUMN,
+    N.STATE: N.STATE_COLUMN,
+    N.DEPT: N.DEPT_COLUMN,
+    N.CENSUS_LOCALITY: N.CENSUS_LOCALITY_COLUMN,
+    N.LOCALITY: N.LOCALITY_COLUMN
+}
+
+
+def _address_csv_column_indexes(header, qs_params):
+    """Obtiene la posición de cada columna del CSV a utilizar como parámetro
+    de las consultas de direcciones.
+
+    Args:
+        header (list): Nombres de las columnas del CSV.
+        qs_params (dict): Parámetros parseados de la request (ver
+            'params.PARAMS_ADDRESSES_CSV').
+
+    Raises:
+        params.ParametersParseException: Si alguna de las columnas
+            especificadas no existe en el CSV.
+
+    Returns:
+        dict: Posición de la columna por cada parámetro de consulta.
+
+    """
+    indexes = {}
+    errors = {}
+
+    for param_name, column_param in _ADDRESS_CSV_COLUMNS.items():
+        column = qs_params.get(column_param)
+        if column is None:
+            continue
+
+        if column in header:
+            indexes[param_name] = header.index(column)
+        else:
+            errors[column_param] = params.ParamError(
+                params.ParamErrorType.INVALID_CHOICE,
+                strings.CSV_COLUMN_NOT_FOUND.format(column), 'querystring')
+
+    if errors:
+        raise params.ParametersParseException(errors)
+
+    return indexes
+
+
+def _address_csv_entry(row, indexes, extra_params):
+    """Construye y parsea los parámetros de una consulta de direcciones a
+    partir de una fila de un CSV.
+
+    Args:
+        row (list): Valores de la fila.
+        indexes (dict): Posición de la columna por cada parámetro de
+            consulta (ver '_address_csv_column_indexes').
+        extra_params (dict): Parámetros a utilizar en todas las consultas.
+
+    Returns:
+        tuple: ParametersParseResult (o 'None'), y diccionario de errores
+            (ver 'params.EndpointParameters.parse_bulk_entry').
+
+    """
+    param_dict = dict(extra_params)
+
+    for param_name, index in indexes.items():
+        value = row[index].strip() if index < len(row) else ''
+        if value:
+            param_dict[param_name] = value
+
+    return params.PARAMS_ADDRESSES.parse_bulk_entry(param_dict, N.ADDRESSES)
+
+
+def _address_csv_results(rows, indexes, extra_params):
+    """Normaliza las direcciones de las filas de un CSV, en ventanas de
+    BULK_CSV_WINDOW_LEN filas: las filas de cada ventana son leídas,
+    parseadas y normalizadas en conjunto (utilizando las mismas rondas de
+    búsquedas que las consultas bulk), y sus resultados son generados antes de
+    leer la siguiente ventana.
+
+    Args:
+        rows (iterable): Filas del CSV (listas de valores).
+        indexes (dict): Ver '_address_csv_entry'.
+        extra_params (dict): Ver '_address_csv_entry'.
+
+    Raises:
+        data.DataConnectionException: En caso de ocurrir un error de
+            conexión con la capa de manejo de datos.
+
+    Yields:
+        tuple: Fila del CSV, y resultado de su consulta (QueryResult), o
+            'None' si los parámetros de la fila no son válidos.
+
+    """
+    for window in utils.chunks(rows, constants.BULK_CSV_WINDOW_LEN):
+        entries = [
+            _address_csv_entry(row, indexes, extra_params)
+            for row in window
+        ]
+        results = _run_window_queries(entries, _process_address_queries)
+
+        for row, (result, _, _) in zip(window, results):
+            yield row, result
+
+
+def _csv_rows_until_error(rows, read_errors):
+    """Generador que devuelve las filas de un CSV hasta encontrar un error de
+    lectura (contenido que no es UTF-8 o CSV válido). El error es agregado a
+    'read_errors' en lugar de ser propagado, para que las filas leídas antes
+    del error puedan ser procesadas.
+
+    Args:
+        rows (iterable): Filas del CSV (ver 'csv.reader').
+        read_errors (list): Lista a la cual agregar el error encontrado.
+
+    Yields:
+        list: Filas del CSV.
+
+    """
+    try:
+        yield from rows
+    except (UnicodeDecodeError, csv.Error) as e:
+        read_errors.append(e)
+
+
+def _address_csv_results_logged(rows, indexes, extra_params):
+    """Generador utilizado por 'process_address_csv'. Como los encabezados
+    HTTP ya fueron enviados, no es posible responder con un error HTTP si
+    ocurre un error durante el procesamiento. En su lugar, el error es
+    registrado en el log, y se genera una tupla de error que finaliza la
+    respuesta (ver 'formatter.address_csv_error_row'):
+
+        - Si ocurre un error de conexión con la capa de manejo de datos, se
+          finaliza con un error interno.
+        - Si el contenido contiene una fila que no es UTF-8 o CSV válido, se
+          procesan las filas anteriores y se finaliza con un error de
+          contenido.
+
+    Args:
+        rows (iterable): Ver '_address_csv_results'.
+        indexes (dict): Ver '_address_csv_results'.
+        extra_params (dict): Ver '_address_csv_results'.
+
+    Yields:
+        tuple: Ver '_address_csv_results', o tupla ('None', str) de error.
+
+    """
+    read_errors = []
+
+    try:
+        yield from _address_csv_results(
+            _csv_rows_until_error(rows, read_errors), indexes, extra_params)
+    except data.DataConnectionException:
+        logger.exception(
+            'Excepción en manejo de consulta CSV para recurso: direcciones')
+        yield None, strings.INTERNAL_ERROR
+        return
+
+    if read_errors:
+        logger.warning('Contenido CSV inválido en consulta para recurso: '
+                       'direcciones (%s)', read_errors[0])
+        yield None, strings.CSV_INVALID_CONTENT
+
+
+def process_address_csv(request):
+    """Procesa una request POST con contenido CSV para normalizar las
+    direcciones de una de sus columnas. La respuesta contiene el mismo CSV,
+    con las columnas de la dirección normalizada de cada fila agregadas al
+    final. Las filas son leídas, normalizadas y enviadas en ventanas, por lo
+    que no es necesario recibir el contenido completo antes de comenzar a
+    responder.
+
+    En caso de ocurrir un error de parseo, se retorna una respuesta HTTP 400.
+
+    Args:
+        request (flask.Request): Request POST de flask.
+
+    Returns:
+        flask.Response: respuesta HTTP
+
+    """
+    try:
+        qs_params = params.PARAMS_ADDRESSES_CSV.parse_get_params(request.args)
+    except params.ParametersParseException as e:
+        return formatter.create_param_error_response_single(e.errors, 'json')
+
+    content_error = {
+        'body': params.ParamError(params.ParamErrorType.INVALID_BULK,
+                                  strings.CSV_INVALID_CONTENT, 'body')
+    }
+
+    if request.mimetype != 'text/csv':
+        return formatter.create_param_error_response_single(content_error,
+                                                            'json')
+
+    reader = csv.reader(io.TextIOWrapper(request.stream,
+                                         encoding='utf-8-sig', newline=''))
+
+    try:
+        header = next(reader)
+        indexes = _address_csv_column_indexes(header, qs_params.values)
+    except (StopIteration, UnicodeDecodeError, csv.Error):
+        return formatter.create_param_error_response_single(content_error,
+                                                            'json')
+    except params.ParametersParseException as e:
+        return formatter.create_param_error_response_single(e.errors, 'json')
+
+    # Utilizar los valores originales de los parámetros: cada fila es
+    # parseada como una consulta bulk a /direcciones.
+    extra_params = {N.MAX: 1}
+    for param_name in [N.FIELDS, N.EXACT]:
+        if param_name in request.args:
+            extra_params[param_name] = request.args[param_name]
+
+    return formatter.create_address_csv_response(
+        header, qs_params.values[N.FIELDS],
+        _address_csv_results_logged(reader, indexes, extra_params))
+
+
+def process_address_job_window(lines):
+    """Procesa una ventana de consultas de un trabajo de normalización de
+    direcciones en segundo plano (ver módulo 'jobs').
+
+    Args:
+        lines (list): Líneas NDJSON de consultas, una por dirección.
+
+    Raises:
+        data.DataConnectionException: En caso de ocurrir un error de
+            conexión con la capa de manejo de datos.
+
+    Returns:
+        list: Líneas NDJSON de resultados, una por cada consulta (ver
+            '_ndjson_window_lines').
+
+    """
+    entries = params.PARAMS_ADDRESSES.parse_ndjson_params(
+        {}, lines, N.ADDRESSES, max_len=constants.JOBS_MAX_LEN)
+
+    return list(_ndjson_window_lines(N.ADDRESSES, list(entries),
+                                     _process_address_queries))
+
+
+def _job_input_lines(request):
+    """Devuelve las consultas recibidas en una request POST de creación de
+    trabajo, como líneas NDJSON.
+
+    Args:
+        request (flask.Request): Request POST de flask, con contenido NDJSON
+            o CSV.
+
+    Raises:
+        jobs.JobInputException: Si el tipo de contenido no es válido.
+
+    Returns:
+        iterable: Líneas NDJSON (bytes).
+
+    """
+    if _is_ndjson_request(request):
+        return request.stream
+
+    if request.mimetype == 'text/csv':
+        return jobs.csv_ndjson_lines(request.stream)
+
+    raise jobs.JobInputException(strings.JOB_INVALID_CONTENT)
+
+
+def process_address_job_create(request):
+    """Procesa una request POST para crear un trabajo de normalización de
+    direcciones en segundo plano. En caso de recibir contenido inválido, se
+    retorna una respuesta HTTP 400.
+
+    Args:
+        request (flask.Request): Request POST de flask.
+
+    Returns:
+        flask.Response: respuesta HTTP 202 con el estado del trabajo creado.
+
+    """
+    try:
+        jobs.start_workers(process_address_job_window)
+        params.PARAMS_ADDRESSES.check_bulk_querystring(request.args)
+        job = jobs.get_job_store().create(_job_input_lines(request),
+                                          constants.JOBS_MAX_LEN)
+    except params.ParametersParseException as e:
+        return formatter.create_param_error_response_bulk(e.errors)
+    except jobs.JobInputException as e:
+        return formatter.create_param_error_response_bulk([{
+            N.ADDRESSES: params.ParamError(params.ParamErrorType.INVALID_BULK,
+                                           str(e), 'body')
+        }])
+    except jobs.JobStoreException:
+        logger.exception(
+            'Excepción en creación de trabajo para recurso: direcciones')
+        return formatter.create_internal_error_response()
+
+    location = '{}/{}'.format(request.base_url.rstrip('/'), job[N.ID])
+    return formatter.create_job_response(job, status=202, location=location)
+
+
+def process_address_job(job_id, results=False):
+    """Procesa una request GET para consultar el estado o los resultados de
+    un trabajo de normalización de direcciones en segundo plano. En caso de
+    que el trabajo no exista, se retorna una respuesta HTTP 404. En caso de
+    solicitar los resultados de un trabajo no finalizado, se retorna una
+    respuesta HTTP 409.
+
+    Args:
+        job_id (str): ID del trabajo.
+        results (bool): Si es verdadero, se devuelven los resultados del
+            trabajo en lugar de su estado.
+
+    Returns:
+        flask.Response: respuesta HTTP
+
+    """
+    try:
+        jobs.start_workers(process_address_job_window)
+        store = jobs.get_job_store()
+        job = store.get(job_id)
+    except jobs.JobStoreException:
+        logger.exception(
+            'Excepción en consulta de trabajo para recurso: direcciones')
+        return formatter.create_internal_error_response()
+
+    if not job:
+        return formatter.create_404_error_response()
+
+    if not results:
+        return formatter.create_job_response(job)
+
+    if job[N.STATUS] != jobs.STATUS_DONE:
+        return formatter.create_job_not_finished_response(job)
+
+    return formatter.create_job_results_response(N.ADDRESSES,
+                                                 store.output_path(job_id))
+
+
 def _build_location_query_format(parsed_params):
     """Construye dos diccionarios a partir de parámetros de consulta
     recibidos, el primero representando la query a Elasticsearch a
@@ -700,17 +1219,41 @@ def _process_location_bulk(request):
     except params.ParametersParseException as e:
         return formatter.create_param_error_response_bulk(e.errors)
 
+    results, formats = _process_location_queries(body_params)
+    return formatter.create_ok_response_bulk(N.LOCATION, results, formats)
+
+
+def _process_location_queries(params_list):
+    """Ejecuta una lista de consultas de ubicaciones, partiendo desde los
+    parámetros recibidos del usuario.
+
+    Args:
+        params_list (list): Lista de ParametersParseResult, cada uno
+            conteniendo los parámetros de una consulta al recurso de
+            ubicación de la API.
+
+    Raises:
+        data.DataConnectionException: En caso de ocurrir un error de
+            conexión con la capa de manejo de datos.
+
+    Returns:
+        tuple: Tupla de (list, list), donde la primera lista contiene una
+            instancia de QueryResult por cada consulta, y la segunda lista
+            contiene una instancia de dict utilizada para darle formato al
+            resultado más tarde.
+
+    """
     queries = []
     formats = []
-    for parsed_params in body_params:
+    for parsed_params in params_list:
         query, fmt = _build_location_query_format(parsed_params.values)
         queries.append(query)
         formats.append(fmt)
 
     es = get_elasticsearch()
-    results = location.run_location_queries(es, body_params, queries)
+    results = location.run_location_queries(es, params_list, queries)
 
-    return formatter.create_ok_response_bulk(N.LOCATION, results, formats)
+    return results, formats
 
 
 def process_location(request):
@@ -730,6 +1273,11 @@ def process_location(request):
         if request.method == 'GET':
             return _process_location_single(request)
 
+        if _is_ndjson_request(request):
+            return _process_ndjson_bulk(request, N.LOCATION,
+                                        params.PARAMS_LOCATION, N.LOCATIONS,
+                                        _process_location_queries)
+
         return _process_location_bulk(request)
     except data.DataConnectionException:
         logger.exception(
@@ -5,13 +5,14 @@ HTTP.
 """
 
 from abc import ABC, abstractmethod
-import threading
 import math
+import json
 from enum import Enum, unique
 from collections import defaultdict
-from georef_ar_address import AddressParser
 import service.names as N
-from service import strings, constants, utils
+from service import strings, constants
+from service.parser_pool import AddressParserPool
+from service.shared_cache import SharedAddressCache
 
 
 class ParametersParseException(Exception):
@@ -179,7 +180,7 @@ class Parameter(ABC):
             except InvalidChoiceException:
                 raise ValueError('Default value not contained in choices')
 
-    def get_value(self, val):
+    def get_value(self, val, parsed_values=None):
         """Toma un valor 'val' recibido desde una request HTTP, y devuelve el
         verdadero valor (con tipo apropiado) resultante de acuerdo a las
         propiedades del objeto Parameter.
@@ -187,8 +188,9 @@ class Parameter(ABC):
         Args:
             val (str): String recibido desde la request HTTP, o None si no se
                 recibió un valor.
-            from_source (str): Ubicación de la request HTTP donde se recibió el
-                valor.
+            parsed_values (dict): Valores ya parseados por 'parse_many'
+                (opcional). Si 'val' no está incluido, se lo parsea
+                normalmente.
 
         Returns:
             El valor del parámetro resultante, cuyo tipo depende de las reglas
@@ -201,7 +203,11 @@ class Parameter(ABC):
 
             return self._default
 
-        parsed = self._parse_value(val)
+        if (parsed_values is not None and isinstance(val, str) and
+                val in parsed_values):
+            parsed = parsed_values[val]
+        else:
+            parsed = self._parse_value(val)
 
         if self._choices:
             self._check_value_in_choices(parsed)
@@ -225,6 +231,22 @@ class Parameter(ABC):
         if val not in self._choices:
             raise InvalidChoiceException(strings.INVALID_CHOICE)
 
+    def parse_many(self, vals):
+        """Parsea una lista de valores de tipo string en lote. Las subclases
+        pueden implementar este método cuando parsear varios valores a la vez
+        es más eficiente que parsearlos individualmente.
+
+        Args:
+            vals (list): Valores a parsear.
+
+        Returns:
+            dict: Valores parseados, indexados por valor original (ver
+                'get_value'). Los valores no incluidos son parseados
+                individualmente.
+
+        """
+        return {}
+
     @abstractmethod
     def _parse_value(self, val):
         """Parsea un valor de tipo string y devuelve el resultado con el tipo
@@ -247,6 +269,14 @@ class Parameter(ABC):
     def choices(self):
         return sorted(list(self._choices))
 
+    @property
+    def required(self):
+        return self._required
+
+    @property
+    def default(self):
+        return self._default
+
 
 class StrParameter(Parameter):
     """Representa un parámetro de tipo string no vacío.
@@ -581,33 +611,37 @@ class AddressParameter(Parameter):
     validación propias de AddressParameter.
 
     Attributes:
-        _parser (AddressParser): Parser de direcciones de la librería
-            georef-ar-address.
-        _parser_lock (threading.Lock): Mutex utilizado para sincronizar el uso
-            de '_parser' (ver comentario en '__init__').
+        _pool (AddressParserPool): Pool de parsers de direcciones de la
+            librería georef-ar-address. Cada thread utiliza su propio parser,
+            ya que los parsers cuentan con un estado interno mutable (su
+            cache).
 
     """
 
     def __init__(self):
-        # Se crea el Lock 'self._parser_lock' para evitar problemas con
-        # 'self._parser' en contextos de ejecución donde se usen threads, ya
-        # que el parser cuenta con un estado interno mutable (su propiedad
-        # '_cache'). Si se utilizan threads o no depende de la configuración
-        # que se esté usando para los workers de Gunicorn. Por defecto los
-        # workers son de tipo 'sync', por lo que se crea un proceso separado
-        # por worker (no se usan threads).
-        self._parser_lock = threading.Lock()
-
-        cache = utils.LFUDict(constants.ADDRESS_PARSER_CACHE_SIZE)
-        self._parser = AddressParser(cache=cache)
+        shared_cache = None
+        if constants.ADDRESS_PARSER_SHARED_CACHE_PATH:
+            shared_cache = SharedAddressCache(
+                constants.ADDRESS_PARSER_SHARED_CACHE_PATH,
+                constants.ADDRESS_PARSER_SHARED_CACHE_LEN)
+
+        self._pool = AddressParserPool(
+            constants.ADDRESS_PARSER_CACHE_POLICY,
+            constants.ADDRESS_PARSER_CACHE_SIZE,
+            shared_cache=shared_cache,
+            processes=constants.ADDRESS_PARSER_PROCESSES,
+            process_min_len=constants.ADDRESS_PARSER_PROCESS_MIN_LEN)
+
         super().__init__(required=True)
 
+    def parse_many(self, vals):
+        return self._pool.parse_many([val for val in vals if val])
+
     def _parse_value(self, val):
         if not val:
             raise ValueError(strings.STRING_EMPTY)
 
-        with self._parser_lock:
-            return self._parser.parse(val)
+        return self._pool.parse(val)
 
 
 class IntersectionParameter(Parameter):
@@ -772,12 +806,16 @@ class ParametersParseResult:
 
     __slots__ = ['_values', '_received']
 
-    def __init__(self):
+    def __init__(self, values=None, received=None):
         """Inicializa un objeto de tipo 'ParametersParseResult'.
 
+        Args:
+            values (dict): Ver atributo '_values' (opcional).
+            received (set): Ver atributo '_received' (opcional).
+
         """
-        self._values = {}
-        self._received = set()
+        self._values = values if values is not None else {}
+        self._received = received if received is not None else set()
 
     def add_value(self, param_name, value):
         """Agrega el valor de un parámetro parseado.
@@ -812,6 +850,191 @@ class ParametersParseResult:
         """
         return {name: self._values[name] for name in self._received}
 
+    def copy(self):
+        """Retorna una copia del resultado. Los valores parseados no son
+        copiados, ya que no son modificados luego del parseo.
+
+        Returns:
+            ParametersParseResult: Copia del resultado.
+
+        """
+        return ParametersParseResult(dict(self._values), set(self._received))
+
+
+def _body_entry_key(entry):
+    """Genera una clave que identifica a una consulta recibida vía body,
+    utilizada para parsear las consultas idénticas una única vez. Los tipos
+    de los valores forman parte de la clave, ya que, por ejemplo, 1 y True
+    son considerados iguales por Python pero no por los parámetros.
+
+    Args:
+        entry (dict): Consulta recibida.
+
+    Returns:
+        object: Clave de la consulta, o None si no se pudo generar.
+
+    """
+    try:
+        key = tuple(sorted(
+            (name, type(value), value) for name, value in entry.items()
+        ))
+        hash(key)
+        return key
+    except (AttributeError, TypeError):
+        pass
+
+    # La consulta contiene valores no hasheables (listas u objetos JSON).
+    try:
+        return json.dumps(entry, sort_keys=True)
+    except (TypeError, ValueError):
+        return None
+
+
+class BodyParamsParser:
+    """Parser de consultas recibidas vía body (requests POST), generado una
+    única vez a partir del conjunto de parámetros de un endpoint y de sus
+    validadores de grupos de parámetros.
+
+    A diferencia de 'EndpointParameters._parse_params_dict', las consultas se
+    parsean en una sola pasada sobre listas de parámetros precalculadas: los
+    parámetros no recibidos toman su valor default (o generan un error si son
+    requeridos) sin lanzar excepciones, los parámetros desconocidos se
+    detectan con una única operación de conjuntos, y los errores se devuelven
+    en lugar de ser lanzados. Los mensajes de error generados son los mismos.
+
+    Attributes:
+        _params (tuple): Tuplas (nombre, Parameter, requerido, default) de
+            los parámetros, en el orden original.
+        _batch_params (tuple): Tuplas (nombre, Parameter) de los parámetros
+            que implementan 'Parameter.parse_many'.
+        _names (frozenset): Nombres de los parámetros aceptados.
+        _names_help (list): Nombres de los parámetros aceptados, utilizados
+            en los errores de parámetros desconocidos.
+        _cross_validators (tuple): Tuplas (validador, [nombres]) de
+            validadores de grupos de parámetros.
+
+    """
+
+    __slots__ = ['_params', '_batch_params', '_names', '_names_help',
+                 '_cross_validators']
+
+    def __init__(self, params, cross_validators):
+        """Inicializa un objeto de tipo BodyParamsParser.
+
+        Args:
+            params (dict): Diccionario de objetos Parameter
+                (nombre-Parameter).
+            cross_validators (list): Ver atributo '_cross_validators'.
+
+        """
+        self._params = tuple(
+            (name, param, param.required, param.default)
+            for name, param in params.items()
+        )
+        self._batch_params = tuple(
+            (name, param) for name, param in params.items()
+            if type(param).parse_many is not Parameter.parse_many
+        )
+        self._names = frozenset(params)
+        self._names_help = list(params.keys())
+        self._cross_validators = tuple(cross_validators)
+
+    def parse(self, received, parsed_values=None):
+        """Parsea los parámetros de una consulta.
+
+        Args:
+            received (dict): Parámetros recibidos sin procesar
+                (nombre-valor).
+            parsed_values (dict): Valores ya parseados en lote de cada
+                parámetro (opcional, ver 'Parameter.parse_many').
+
+        Returns:
+            tuple: ParametersParseResult (o 'None' si ocurrieron errores), y
+                diccionario de errores de parseo (vacío si no ocurrieron
+                errores).
+
+        """
+        values = {}
+        errors = {}
+
+        for param_name, param, required, default in self._params:
+            received_val = received.get(param_name)
+
+            if received_val is None:
+                if required:
+                    errors[param_name] = ParamError(
+                        ParamErrorType.PARAM_REQUIRED,
+                        strings.MISSING_ERROR.format(param_name), 'body')
+                else:
+                    values[param_name] = default
+                continue
+
+            try:
+                values[param_name] = param.get_value(
+                    received_val,
+                    parsed_values.get(param_name) if parsed_values else None)
+            except ValueError as e:
+                errors[param_name] = ParamError(ParamErrorType.VALUE_ERROR,
+                                                str(e), 'body')
+            except ParameterValueError as e:
+                errors[param_name] = ParamError(ParamErrorType.VALUE_ERROR,
+                                                e.message, 'body', e.help)
+            except InvalidChoiceException as e:
+                errors[param_name] = ParamError(ParamErrorType.INVALID_CHOICE,
+                                                str(e), 'body', param.choices)
+
+        if not self._names.issuperset(received):
+            for param_name in received:
+                if param_name not in self._names:
+                    errors[param_name] = ParamError(
+                        ParamErrorType.UNKNOWN_PARAM, strings.UNKNOWN_ERROR,
+                        'body', self._names_help)
+
+        if errors:
+            return None, errors
+
+        for validator, param_names in self._cross_validators:
+            try:
+                validator.validate_values(
+                    param_names, [values[name] for name in param_names])
+            except ValueError as e:
+                # Utilizar solo el primer error encontrado.
+                return None, {
+                    name: ParamError(ParamErrorType.INVALID_SET, str(e),
+                                     'body')
+                    for name in param_names
+                }
+
+        return ParametersParseResult(values, set(received)), {}
+
+    def parse_many_values(self, entries):
+        """Parsea en lote los valores de cada parámetro de una lista de
+        consultas (ver 'Parameter.parse_many'). Los valores inválidos son
+        ignorados, y sus errores se reportan al parsear cada consulta.
+
+        Args:
+            entries (list): Consultas recibidas.
+
+        Returns:
+            dict: Valores parseados de cada parámetro, indexados por nombre de
+                parámetro y luego por valor original.
+
+        """
+        if not self._batch_params:
+            return {}
+
+        entries = [entry for entry in entries if hasattr(entry, 'get')]
+        parsed_values = {}
+
+        for param_name, param in self._batch_params:
+            vals = [entry.get(param_name) for entry in entries]
+            parsed = param.parse_many([val for val in vals
+                                       if isinstance(val, str)])
+            if parsed:
+                parsed_values[param_name] = parsed
+
+        return parsed_values
+
 
 class EndpointParameters:
     """Representa un conjunto de parámetros para un endpoint HTTP.
@@ -839,6 +1062,10 @@ class EndpointParameters:
             puede enviar varias consultas, con parámetros repetidos entre
             consultas.
 
+        _body_parser (BodyParamsParser): Parser de consultas recibidas vía
+            body, generado a partir de '_post_body_params' y
+            '_cross_validators'.
+
     """
 
     def __init__(self, shared_params=None, get_qs_params=None):
@@ -857,6 +1084,8 @@ class EndpointParameters:
 
         self._cross_validators = []
         self._set_validators = defaultdict(list)
+        self._body_parser = BodyParamsParser(self._post_body_params,
+                                             self._cross_validators)
 
     def with_cross_validator(self, param_names, validator):
         """Agrega un validador a la lista de validadores para grupos de
@@ -869,6 +1098,8 @@ class EndpointParameters:
 
         """
         self._cross_validators.append((validator, param_names))
+        self._body_parser = BodyParamsParser(self._post_body_params,
+                                             self._cross_validators)
         return self
 
     def with_set_validator(self, param_name, validator):
@@ -884,7 +1115,8 @@ class EndpointParameters:
         self._set_validators[param_name].append(validator)
         return self
 
-    def _parse_params_dict(self, params, received, from_source):
+    def _parse_params_dict(self, params, received, from_source,
+                           parsed_values=None):
         """Parsea parámetros (clave-valor) recibidos en una request HTTP,
         utilizando el conjunto 'params' de parámetros.
 
@@ -893,6 +1125,8 @@ class EndpointParameters:
             received (dict): Parámetros recibidos sin procesar (nombre-valor).
             from_source (str): Ubicación dentro de la request HTTP donde fueron
                 recibidos los parámetros.
+            parsed_values (dict): Valores ya parseados en lote de cada
+                parámetro (opcional, ver 'Parameter.parse_many').
 
         Returns:
             ParametersParseResult: Objeto con la información de todos los
@@ -920,7 +1154,9 @@ class EndpointParameters:
                 continue
 
             try:
-                parsed = param.get_value(received_val)
+                parsed = param.get_value(
+                    received_val,
+                    parsed_values.get(param_name) if parsed_values else None)
                 results.add_value(param_name, parsed)
             except ParameterRequiredException:
                 errors[param_name] = ParamError(ParamErrorType.PARAM_REQUIRED,
@@ -1011,7 +1247,7 @@ class EndpointParameters:
         errors_list = [{} for _ in range(len(results))]
 
         for name in self._post_body_params.keys():
-            validators = self._set_validators[name]
+            validators = self._set_validators.get(name, [])
 
             for validator in validators:
                 try:
@@ -1058,13 +1294,7 @@ class EndpointParameters:
                 de parámetros.
 
         """
-        if qs_params:
-            # No aceptar parámetros de querystring en bulk
-            raise ParametersParseException([
-                {'querystring': ParamError(ParamErrorType.INVALID_LOCATION,
-                                           strings.BULK_QS_INVALID,
-                                           'querystring')}
-            ])
+        self.check_bulk_querystring(qs_params)
 
         body_params = body.get(body_key) if isinstance(body, dict) else None
 
@@ -1085,20 +1315,24 @@ class EndpointParameters:
                     'body')}
             ])
 
+        parsed_values = self._body_parser.parse_many_values(body_params)
+
+        # Las consultas idénticas se parsean una única vez.
+        memo = {}
         results, errors_list = [], []
         for param_dict in body_params:
-            parsed = None
-            errors = {}
-            if hasattr(param_dict, 'get'):
-                try:
-                    parsed = self._parse_params_dict(self._post_body_params,
-                                                     param_dict, 'body')
-                except ParametersParseException as e:
-                    errors = e.errors
+            key = _body_entry_key(param_dict)
+
+            if key is not None and key in memo:
+                parsed, errors = memo[key]
+                if parsed:
+                    parsed = parsed.copy()
+                errors = dict(errors)
             else:
-                errors[body_key] = ParamError(
-                    ParamErrorType.INVALID_BULK_ENTRY,
-                    strings.INVALID_BULK_ENTRY, 'body')
+                parsed, errors = self.parse_bulk_entry(param_dict, body_key,
+                                                       parsed_values)
+                if key is not None:
+                    memo[key] = parsed, errors
 
             results.append(parsed)
             errors_list.append(errors)
@@ -1109,6 +1343,130 @@ class EndpointParameters:
         self._validate_param_sets(results)
         return results
 
+    def check_bulk_querystring(self, qs_params):
+        """Comprueba que una request HTTP POST no contenga parámetros vía
+        querystring.
+
+        Args:
+            qs_params (dict): Parámetros recibidos en el query string.
+
+        Raises:
+            ParametersParseException: Si se recibieron parámetros.
+
+        """
+        if qs_params:
+            # No aceptar parámetros de querystring en bulk
+            raise ParametersParseException([
+                {'querystring': ParamError(ParamErrorType.INVALID_LOCATION,
+                                           strings.BULK_QS_INVALID,
+                                           'querystring')}
+            ])
+
+    def parse_bulk_entry(self, param_dict, body_key, parsed_values=None):
+        """Parsea los parámetros de una consulta recibida en una request HTTP
+        POST.
+
+        Args:
+            param_dict (dict): Parámetros de la consulta.
+            body_key (str): Nombre de la key bajo donde se reciben las
+                consultas (utilizado para reportar errores).
+            parsed_values (dict): Valores ya parseados en lote de cada
+                parámetro (opcional, ver
+                'BodyParamsParser.parse_many_values').
+
+        Returns:
+            tuple: ParametersParseResult (o 'None' si ocurrieron errores), y
+                diccionario de errores de parseo (vacío si no ocurrieron
+                errores).
+
+        """
+        if not hasattr(param_dict, 'get'):
+            return None, {
+                body_key: ParamError(ParamErrorType.INVALID_BULK_ENTRY,
+                                     strings.INVALID_BULK_ENTRY, 'body')
+            }
+
+        return self._body_parser.parse(param_dict, parsed_values)
+
+    def parse_ndjson_params(self, qs_params, lines, body_key, max_len=None):
+        """Parsea parámetros recibidos en una request HTTP POST con contenido
+        NDJSON (un objeto JSON por línea, cada uno representando una
+        consulta). Las líneas son leídas y parseadas a medida que se itera el
+        valor de retorno, por lo que no es necesario recibir el contenido
+        completo de la request antes de comenzar a procesar las consultas.
+
+        A diferencia de 'parse_post_params', los errores de cada consulta no
+        invalidan al resto de las consultas, y los validadores de conjuntos
+        de valores (ver 'with_set_validator') no son utilizados. La cantidad
+        de consultas está limitada por 'max_len'.
+
+        Args:
+            qs_params (dict): Parámetros recibidos en el query string.
+            lines (iterable): Líneas del contenido de la request (bytes o
+                str). Las líneas vacías son ignoradas.
+            body_key (str): Nombre de la key bajo donde se reciben las
+                consultas en requests JSON (utilizado para reportar
+                errores).
+            max_len (int): Cantidad máxima de consultas (por defecto,
+                MAX_BULK_NDJSON_LEN).
+
+        Raises:
+            ParametersParseException: Si se recibieron parámetros vía
+                querystring.
+
+        Returns:
+            generator: Generador de tuplas (ParametersParseResult,
+                diccionario de errores), una por cada consulta (ver
+                'parse_bulk_entry'). Si se supera la cantidad máxima de
+                consultas, el último elemento generado contiene un error, y
+                el resto de las líneas no es leído.
+
+        """
+        self.check_bulk_querystring(qs_params)
+        return self._parse_ndjson_lines(
+            lines, body_key, max_len or constants.MAX_BULK_NDJSON_LEN)
+
+    def _parse_ndjson_lines(self, lines, body_key, max_len):
+        """Generador utilizado por 'parse_ndjson_params'.
+
+        Args:
+            lines (iterable): Líneas del contenido de la request.
+            body_key (str): Nombre de la key bajo donde se reciben las
+                consultas en requests JSON.
+            max_len (int): Cantidad máxima de consultas.
+
+        Yields:
+            tuple: ParametersParseResult (o 'None'), y diccionario de
+                errores.
+
+        """
+        count = 0
+
+        for line in lines:
+            if not line.strip():
+                continue
+
+            count += 1
+            if count > max_len:
+                yield None, {
+                    body_key: ParamError(
+                        ParamErrorType.INVALID_BULK_LEN,
+                        strings.BULK_LEN_ERROR.format(max_len),
+                        'body')
+                }
+                return
+
+            try:
+                param_dict = json.loads(line)
+            except ValueError:
+                yield None, {
+                    body_key: ParamError(ParamErrorType.INVALID_BULK_ENTRY,
+                                         strings.INVALID_NDJSON_LINE, 'body')
+                }
+                continue
+
+            yield self.parse_bulk_entry(param_dict, body_key)
+
     def parse_get_params(self, qs_params):
         """Parsea parámetros (clave-valor) recibidos en una request HTTP GET
         utilizando el conjunto de parámetros internos.
@@ -1145,7 +1503,8 @@ PARAMS_STATES = EndpointParameters(shared_params={
     N.EXACT: BoolParameter()
 }, get_qs_params={
     N.FORMAT: StrParameter(default='json',
-                           choices=['json', 'csv', 'geojson', 'xml', 'shp'])
+                           choices=['json', 'csv', 'geojson', 'xml', 'shp',
+                                    'ndjson'])
 }).with_set_validator(
     N.MAX,
     IntSetSumValidator(upper_limit=constants.MAX_RESULT_LEN)
@@ -1174,7 +1533,8 @@ PARAMS_DEPARTMENTS = EndpointParameters(shared_params={
     N.EXACT: BoolParameter()
 }, get_qs_params={
     N.FORMAT: StrParameter(default='json',
-                           choices=['json', 'csv', 'geojson', 'xml', 'shp'])
+                           choices=['json', 'csv', 'geojson', 'xml', 'shp',
+                                    'ndjson'])
 }).with_set_validator(
     N.MAX,
     IntSetSumValidator(upper_limit=constants.MAX_RESULT_LEN)
@@ -1204,7 +1564,8 @@ PARAMS_MUNICIPALITIES = EndpointParameters(shared_params={
     N.EXACT: BoolParameter()
 }, get_qs_params={
     N.FORMAT: StrParameter(default='json',
-                           choices=['json', 'csv', 'geojson', 'xml', 'shp'])
+                           choices=['json', 'csv', 'geojson', 'xml', 'shp',
+                                    'ndjson'])
 }).with_set_validator(
     N.MAX,
     IntSetSumValidator(upper_limit=constants.MAX_RESULT_LEN)
@@ -1237,7 +1598,8 @@ PARAMS_CENSUS_LOCALITIES = EndpointParameters(shared_params={
     N.EXACT: BoolParameter()
 }, get_qs_params={
     N.FORMAT: StrParameter(default='json',
-                           choices=['json', 'csv', 'geojson', 'xml', 'shp'])
+                           choices=['json', 'csv', 'geojson', 'xml', 'shp',
+                                    'ndjson'])
 }).with_set_validator(
     N.MAX,
     IntSetSumValidator(upper_limit=constants.MAX_RESULT_LEN)
@@ -1276,7 +1638,8 @@ PARAMS_SETTLEMENTS = EndpointParameters(shared_params={
     N.EXACT: BoolParameter()
 }, get_qs_params={
     N.FORMAT: StrParameter(default='json',
-                           choices=['json', 'csv', 'geojson', 'xml', 'shp'])
+                           choices=['json', 'csv', 'geojson', 'xml', 'shp',
+                                    'ndjson'])
 }).with_set_validator(
     N.MAX,
     IntSetSumValidator(upper_limit=constants.MAX_RESULT_LEN)
@@ -1315,7 +1678,8 @@ PARAMS_LOCALITIES = EndpointParameters(shared_params={
     N.EXACT: BoolParameter()
 }, get_qs_params={
     N.FORMAT: StrParameter(default='json',
-                           choices=['json', 'csv', 'geojson', 'xml', 'shp'])
+                           choices=['json', 'csv', 'geojson', 'xml', 'shp',
+                                    'ndjson'])
 }).with_set_validator(
     N.MAX,
     IntSetSumValidator(upper_limit=constants.MAX_RESULT_LEN)
@@ -1372,7 +1736,7 @@ PARAMS_ADDRESSES = EndpointParameters(shared_params={
     N.EXACT: BoolParameter()
 }, get_qs_params={
     N.FORMAT: StrParameter(default='json',
-                           choices=['json', 'csv', 'geojson', 'xml'])
+                           choices=['json', 'csv', 'geojson', 'xml', 'ndjson'])
 }).with_set_validator(
     N.MAX,
     IntSetSumValidator(upper_limit=constants.MAX_RESULT_LEN)
@@ -1381,6 +1745,18 @@ PARAMS_ADDRESSES = EndpointParameters(shared_params={
     IntSetSumValidator(upper_limit=constants.MAX_RESULT_WINDOW)
 )
 
+PARAMS_ADDRESSES_CSV = EndpointParameters(get_qs_params={
+    N.ADDRESS_COLUMN: StrParameter(required=True),
+    N.STATE_COLUMN: StrParameter(),
+    N.DEPT_COLUMN: StrParameter(),
+    N.CENSUS_LOCALITY_COLUMN: StrParameter(),
+    N.LOCALITY_COLUMN: StrParameter(),
+    N.FIELDS: FieldListParameter(basic=_ADDRESSES_BASIC_FIELDS,
+                                 standard=_ADDRESSES_STANDARD_FIELDS,
+                                 complete=_ADDRESSES_COMPLETE_FIELDS),
+    N.EXACT: BoolParameter()
+})
+
 PARAMS_STREETS = EndpointParameters(shared_params={
     N.ID: IdsParameter(id_length=constants.STREET_ID_LEN),
     N.NAME: StrParameter(),
@@ -1412,7 +1788,7 @@ PARAMS_STREETS = EndpointParameters(shared_params={
     N.EXACT: BoolParameter()
 }, get_qs_params={
     N.FORMAT: StrParameter(default='json',
-                           choices=['json', 'csv', 'xml', 'shp'])
+                           choices=['json', 'csv', 'xml', 'shp', 'ndjson'])
 }).with_set_validator(
     N.MAX,
     IntSetSumValidator(upper_limit=constants.MAX_RESULT_LEN)
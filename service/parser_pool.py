@@ -0,0 +1,363 @@
+"""Módulo 'parser_pool' de georef-ar-api.
+
+Contiene un pool de parsers de direcciones (georef-ar-address). Cada thread
+del sistema operativo utiliza su propia instancia de 'AddressParser' (con su
+propio cache), por lo que no es necesario sincronizar el uso de los parsers
+entre threads. Si el proceso utiliza gevent, todos los greenlets de un mismo
+thread comparten su parser: el parseo no realiza operaciones de
+entrada/salida, por lo que un greenlet nunca es suspendido mientras lo
+utiliza.
+
+Opcionalmente, los lotes grandes de direcciones pueden ser parseados en un
+pool de procesos, para aprovechar más de un núcleo de CPU. Los procesos se
+crean desde un servidor 'forkserver', para no clonar el proceso actual (y
+los locks tomados por sus threads). El pool de procesos no puede ser
+utilizado en procesos que utilizan gevent.
+"""
+
+import concurrent.futures
+import logging
+import multiprocessing
+import threading
+from flask import g, has_request_context
+from georef_ar_address import AddressParser
+from service.cache import create_cache
+
+try:
+    from gevent import monkey as gevent_monkey
+except ImportError:
+    gevent_monkey = None
+
+_process_parser = None
+
+logger = logging.getLogger('georef')
+
+
+def _gevent_patched():
+    """Indica si el módulo 'threading' fue modificado por gevent.
+
+    Returns:
+        bool: Verdadero si el proceso utiliza gevent.
+
+    """
+    return bool(gevent_monkey and
+                gevent_monkey.is_module_patched('threading'))
+
+
+def _os_thread_local():
+    """Crea un objeto 'threading.local' cuyo estado es propio de cada thread
+    del sistema operativo, incluso si el proceso utiliza gevent (que
+    reemplaza 'threading.local' por un objeto propio de cada greenlet).
+
+    Returns:
+        threading.local: Estado por thread.
+
+    """
+    if _gevent_patched():
+        return gevent_monkey.get_original('threading', 'local')()
+
+    return threading.local()
+
+
+def _init_process_parser(cache_policy, cache_size):
+    """Inicializa el parser de direcciones de un proceso del pool de
+    procesos.
+
+    Args:
+        cache_policy (str): Política de desalojo del cache del parser.
+        cache_size (int): Tamaño del cache del parser.
+
+    """
+    global _process_parser  # pylint: disable=global-statement
+    _process_parser = AddressParser(cache=create_cache(cache_policy,
+                                                       cache_size))
+
+
+def _parse_chunk(addresses):
+    """Parsea una lista de direcciones en un proceso del pool de procesos.
+
+    Args:
+        addresses (list): Lista de direcciones (str).
+
+    Returns:
+        list: Tuplas (bool, AddressData) por dirección: el primer elemento
+            indica si el parseo terminó sin errores.
+
+    """
+    results = []
+    for address in addresses:
+        try:
+            results.append((True, _process_parser.parse(address)))
+        except Exception:  # pylint: disable=broad-except
+            results.append((False, None))
+
+    return results
+
+
+class AddressParserPool:
+    """Pool de parsers de direcciones.
+
+    Attributes:
+        _cache_policy (str): Política de desalojo de los caches de los
+            parsers.
+        _cache_size (int): Tamaño de los caches de los parsers.
+        _shared_cache (SharedAddressCache): Cache de direcciones parseadas
+            compartido entre procesos (puede ser None).
+        _processes (int): Cantidad de procesos a utilizar para parsear lotes
+            grandes de direcciones (0 para no utilizar procesos). Si el
+            proceso utiliza gevent, no se utilizan procesos.
+        _process_min_len (int): Cantidad mínima de direcciones de un lote
+            para parsearlo utilizando procesos.
+        _local (threading.local): Estado de cada thread del sistema
+            operativo (su parser).
+        _caches (list): Caches de todos los parsers creados (de todos los
+            threads), utilizados para calcular 'stats'.
+        _caches_lock (threading.Lock): Lock utilizado para modificar
+            '_caches'.
+        _executor (concurrent.futures.ProcessPoolExecutor): Pool de procesos,
+            creado al necesitarlo.
+        _executor_lock (threading.Lock): Lock utilizado para crear
+            '_executor'.
+
+    """
+
+    __slots__ = ['_cache_policy', '_cache_size', '_shared_cache',
+                 '_processes', '_process_min_len', '_local', '_caches',
+                 '_caches_lock', '_executor', '_executor_lock']
+
+    def __init__(self, cache_policy, cache_size, shared_cache=None,
+                 processes=0, process_min_len=1000):
+        """Inicializa un objeto de tipo AddressParserPool.
+
+        Args:
+            cache_policy (str): Ver atributo '_cache_policy'.
+            cache_size (int): Ver atributo '_cache_size'.
+            shared_cache (SharedAddressCache): Ver atributo '_shared_cache'.
+            processes (int): Ver atributo '_processes'.
+            process_min_len (int): Ver atributo '_process_min_len'.
+
+        Raises:
+            ValueError: Si la cantidad de procesos es negativa.
+
+        """
+        if processes < 0:
+            raise ValueError('processes must be 0 or larger')
+
+        if processes and _gevent_patched():
+            logger.warning('ADDRESS_PARSER_PROCESSES ignorado: no se pueden '
+                           'utilizar procesos de parseo en procesos gevent.')
+            processes = 0
+
+        self._cache_policy = cache_policy
+        self._cache_size = cache_size
+        self._shared_cache = shared_cache
+        self._processes = processes
+        self._process_min_len = process_min_len
+        self._local = _os_thread_local()
+        self._caches = []
+        self._caches_lock = threading.Lock()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _get_parser(self):
+        """Devuelve el parser del thread del sistema operativo actual,
+        creándolo si no existía.
+
+        Returns:
+            AddressParser: Parser del thread actual.
+
+        """
+        parser = getattr(self._local, 'parser', None)
+        if parser is None:
+            cache = create_cache(self._cache_policy, self._cache_size)
+            parser = AddressParser(cache=cache)
+            self._local.parser = parser
+
+            with self._caches_lock:
+                self._caches.append(cache)
+
+        return parser
+
+    def _register_request(self):
+        """Si hay una request HTTP activa, registra el pool en 'g' para que
+        sus contadores puedan ser incluidos en el log de la request (ver
+        'request_parser_pool').
+
+        """
+        if has_request_context():
+            g.address_parser_pool = self
+
+    def stats(self):
+        """Retorna los contadores de uso de los caches de los parsers del
+        proceso actual (sumados entre todos los threads), y del cache
+        compartido entre procesos. Los caches de los procesos del pool de
+        procesos no son incluidos.
+
+        Returns:
+            dict: Cantidad de parsers creados, contadores sumados de sus
+                caches (ver 'Cache.stats'), y aciertos y fallos del cache
+                compartido (o 'None' si no se utiliza).
+
+        """
+        with self._caches_lock:
+            caches = list(self._caches)
+
+        totals = {'len': 0, 'hits': 0, 'misses': 0, 'evictions': 0}
+        for cache in caches:
+            cache_stats = cache.stats()
+            for key in totals:
+                totals[key] += cache_stats[key]
+
+        shared = None
+        if self._shared_cache:
+            shared = {
+                'hits': self._shared_cache.hits,
+                'misses': self._shared_cache.misses
+            }
+
+        return {
+            'parsers': len(caches),
+            'cache': totals,
+            'shared_cache': shared
+        }
+
+    def _get_executor(self):
+        """Devuelve el pool de procesos. El pool es creado si no existía (se
+        lo crea recién al necesitarlo para no crear procesos antes de que el
+        proceso actual sea clonado por gunicorn).
+
+        Los procesos se inician desde un servidor 'forkserver' (que importa
+        este módulo una sola vez), ya que clonar el proceso actual con
+        'fork' mientras otros threads mantienen locks tomados puede
+        bloquear a los procesos creados.
+
+        Returns:
+            concurrent.futures.ProcessPoolExecutor: Pool de procesos.
+
+        """
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    context = multiprocessing.get_context('forkserver')
+                    context.set_forkserver_preload([__name__])
+
+                    self._executor = concurrent.futures.ProcessPoolExecutor(
+                        max_workers=self._processes,
+                        mp_context=context,
+                        initializer=_init_process_parser,
+                        initargs=(self._cache_policy, self._cache_size))
+
+        return self._executor
+
+    def parse(self, address):
+        """Parsea una dirección utilizando el parser del thread actual.
+
+        Args:
+            address (str): Dirección a parsear.
+
+        Returns:
+            AddressData: Componentes de la dirección, o None si no se pudieron
+                extraer.
+
+        """
+        self._register_request()
+
+        if self._shared_cache:
+            found, address_data = self._shared_cache.lookup(address)
+            if found:
+                return address_data
+
+        address_data = self._get_parser().parse(address)
+
+        if self._shared_cache:
+            self._shared_cache.store(address, address_data)
+
+        return address_data
+
+    def parse_many(self, addresses):
+        """Parsea una lista de direcciones. Si se configuró un pool de
+        procesos y la lista contiene suficientes direcciones distintas, las
+        direcciones se reparten entre los procesos del pool.
+
+        Args:
+            addresses (list): Lista de direcciones (str).
+
+        Returns:
+            dict: Resultado de 'parse' por cada dirección distinta. Las
+                direcciones cuyo parseo lanzó una excepción no son incluidas,
+                para que el error pueda ser reportado al parsearlas
+                individualmente.
+
+        """
+        self._register_request()
+        pending = list(dict.fromkeys(addresses))
+        results = {}
+
+        if self._shared_cache:
+            missing = []
+            for address in pending:
+                found, address_data = self._shared_cache.lookup(address)
+                if found:
+                    results[address] = address_data
+                else:
+                    missing.append(address)
+
+            pending = missing
+
+        if self._processes > 0 and len(pending) >= self._process_min_len:
+            parsed = self._parse_in_processes(pending)
+        else:
+            parsed = []
+            parser = self._get_parser()
+            for address in pending:
+                try:
+                    parsed.append((True, parser.parse(address)))
+                except Exception:  # pylint: disable=broad-except
+                    parsed.append((False, None))
+
+        for address, (ok, address_data) in zip(pending, parsed):
+            if not ok:
+                continue
+
+            results[address] = address_data
+            if self._shared_cache:
+                self._shared_cache.store(address, address_data)
+
+        return results
+
+    def _parse_in_processes(self, addresses):
+        """Parsea una lista de direcciones utilizando el pool de procesos.
+
+        Args:
+            addresses (list): Lista de direcciones (str).
+
+        Returns:
+            list: Tuplas (bool, AddressData) por dirección (ver
+                '_parse_chunk').
+
+        """
+        chunk_len = -(-len(addresses) // self._processes)
+        chunks = [addresses[i:i + chunk_len]
+                  for i in range(0, len(addresses), chunk_len)]
+
+        return [
+            result
+            for chunk_results in self._get_executor().map(_parse_chunk,
+                                                          chunks)
+            for result in chunk_results
+        ]
+
+
+def request_parser_pool():
+    """Devuelve el pool de parsers de direcciones utilizado durante la
+    request HTTP actual.
+
+    Returns:
+        AddressParserPool: Pool de parsers, o 'None' si la request no lo
+            utilizó (o si no hay una request HTTP activa).
+
+    """
+    if not has_request_context():
+        return None
+
+    return g.get('address_parser_pool')
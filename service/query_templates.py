@@ -0,0 +1,346 @@
+"""Módulo 'query_templates' de georef-ar-api.
+
+Contiene un compilador de cuerpos de búsquedas Elasticsearch. Construir cada
+búsqueda utilizando objetos de elasticsearch_dsl (y luego serializarlos)
+implica crear y copiar una gran cantidad de objetos por cada consulta. Para
+evitar esto, las búsquedas se agrupan por "forma" (qué parámetros se
+utilizaron, y de qué tipo es cada uno), y para cada forma se construye una
+única vez la búsqueda elasticsearch_dsl, utilizando valores marcadores en
+lugar de los valores reales. El cuerpo JSON resultante se compila a un
+template, que luego se completa con los valores de cada consulta, generando
+diccionarios idénticos a los que generaría elasticsearch_dsl.
+"""
+
+import threading
+from elasticsearch_dsl import Search
+from service import constants
+
+MAX_TEMPLATES = 1024
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+class _StrSlot(str):
+    """Marcador de posición de un valor de tipo str."""
+
+
+class _IntSlot(int):
+    """Marcador de posición de un valor de tipo int."""
+
+
+class _ListSlot(list):
+    """Marcador de posición de una lista (o tupla) de valores escalares."""
+
+
+class _DictSlot(dict):
+    """Marcador de posición de un valor de tipo dict."""
+
+
+_SLOT_TYPES = (_StrSlot, _IntSlot, _ListSlot, _DictSlot)
+
+
+def _slot(slot_class, name, value):
+    """Crea un marcador de posición.
+
+    Args:
+        slot_class (type): Tipo de marcador.
+        name (str): Nombre del valor a reemplazar por el marcador.
+        value (object): Valor de ejemplo del marcador. El valor debe tomar el
+            mismo camino que el valor real al construir la búsqueda (por
+            ejemplo, tener el mismo largo si el largo afecta la búsqueda).
+
+    Returns:
+        object: Marcador de posición.
+
+    """
+    slot = slot_class(value)
+    slot.slot_name = name
+    return slot
+
+
+class CompiledSearch(Search):
+    """Búsqueda elasticsearch_dsl.Search cuyo cuerpo fue generado a partir de
+    un template compilado. Solo debe ser utilizada para ejecutar la búsqueda
+    (vía MultiSearch) y para leer sus resultados: modificar la búsqueda (por
+    ejemplo, con '.query()') no tiene efecto sobre su cuerpo.
+
+    Attributes:
+        _body (dict): Cuerpo de la búsqueda.
+
+    """
+
+    def __init__(self, body=None, **kwargs):
+        """Inicializa un objeto de tipo CompiledSearch.
+
+        Args:
+            body (dict): Ver atributo '_body'.
+            kwargs (dict): Parámetros de elasticsearch_dsl.Search.
+
+        """
+        super().__init__(**kwargs)
+        self._body = body
+
+    def _clone(self):
+        s = super()._clone()
+        s._body = self._body
+        return s
+
+    def to_dict(self, count=False, **kwargs):
+        if kwargs:
+            return dict(self._body, **kwargs)
+
+        return self._body
+
+
+def _value_shape(name, value, values):
+    """Calcula la forma de un valor de parámetro de búsqueda, y almacena en
+    'values' los valores que deberán ser insertados en el template.
+
+    Args:
+        name (str): Nombre del valor.
+        value (object): Valor del parámetro.
+        values (dict): Diccionario donde almacenar los valores a insertar.
+
+    Raises:
+        TypeError: Si el tipo del valor no está soportado.
+
+    Returns:
+        tuple: Forma del valor.
+
+    """
+    if value is None or isinstance(value, bool):
+        return ('const', value)
+
+    if isinstance(value, str):
+        if not value:
+            return ('const', value)
+
+        values[name] = value
+        return ('str',
+                len(value.strip()) >= constants.MIN_AUTOCOMPLETE_CHARS)
+
+    if isinstance(value, int):
+        values[name] = value
+        return ('int',)
+
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return ('empty', isinstance(value, tuple))
+
+        if all(isinstance(item, (str, int)) for item in value):
+            values[name] = value
+            return ('list',)
+
+        if isinstance(value, list) and all(isinstance(item, dict)
+                                           for item in value):
+            for i, item in enumerate(value):
+                values['{}.{}'.format(name, i)] = item
+
+            return ('dicts', len(value))
+
+        if isinstance(value, tuple):
+            return ('tuple', tuple(
+                _value_shape('{}.{}'.format(name, i), item, values)
+                for i, item in enumerate(value)
+            ))
+
+    raise TypeError('Unsupported query value: {!r}'.format(value))
+
+
+def _slot_value(name, shape):
+    """Construye el valor marcador correspondiente a una forma de valor (ver
+    '_value_shape').
+
+    Args:
+        name (str): Nombre del valor.
+        shape (tuple): Forma del valor.
+
+    Returns:
+        object: Valor marcador.
+
+    """
+    kind = shape[0]
+
+    if kind == 'const':
+        return shape[1]
+
+    if kind == 'empty':
+        return () if shape[1] else []
+
+    if kind == 'str':
+        sample = 'x' * (constants.MIN_AUTOCOMPLETE_CHARS if shape[1] else 1)
+        return _slot(_StrSlot, name, sample)
+
+    if kind == 'int':
+        return _slot(_IntSlot, name, 1)
+
+    if kind == 'list':
+        return _slot(_ListSlot, name, ['x'])
+
+    if kind == 'dicts':
+        return [
+            _slot(_DictSlot, '{}.{}'.format(name, i), {})
+            for i in range(shape[1])
+        ]
+
+    return tuple(
+        _slot_value('{}.{}'.format(name, i), item_shape)
+        for i, item_shape in enumerate(shape[1])
+    )
+
+
+def query_shape(query, const_params):
+    """Calcula la forma de una consulta (parámetros de búsqueda).
+
+    Args:
+        query (dict): Parámetros de la búsqueda.
+        const_params (set): Parámetros cuyos valores afectan la estructura de
+            la búsqueda (por ejemplo, 'order'), y que por lo tanto se
+            incluyen directamente en la forma.
+
+    Returns:
+        tuple: Forma de la consulta, y valores a insertar en el template
+            correspondiente. Si la consulta contiene valores no soportados,
+            se retorna (None, None).
+
+    """
+    values = {
+        'offset': query.get('offset') or 0,
+        'size': query.get('size', constants.DEFAULT_SEARCH_SIZE)
+    }
+    shape = []
+
+    try:
+        for key in sorted(query):
+            if key in ('offset', 'size'):
+                continue
+
+            value = query[key]
+            if key in const_params:
+                shape.append((key, ('const', value)))
+            else:
+                shape.append((key, _value_shape(key, value, values)))
+    except TypeError:
+        return None, None
+
+    return tuple(shape), values
+
+
+def slot_query(shape):
+    """Construye una consulta con valores marcadores a partir de una forma de
+    consulta (ver 'query_shape').
+
+    Args:
+        shape (tuple): Forma de la consulta.
+
+    Returns:
+        dict: Parámetros de búsqueda con valores marcadores.
+
+    """
+    query = {key: _slot_value(key, value_shape)
+             for key, value_shape in shape}
+    query['offset'] = 0
+    query['size'] = 1
+    return query
+
+
+def _compile_node(node):
+    """Compila un nodo del cuerpo de una búsqueda construida con valores
+    marcadores.
+
+    Args:
+        node (object): Nodo a compilar.
+
+    Returns:
+        tuple: Función que recibe un diccionario de valores y retorna el nodo
+            completo, y verdadero si el nodo contiene marcadores. Los nodos
+            sin marcadores se comparten entre todas las búsquedas generadas.
+
+    """
+    if isinstance(node, _SLOT_TYPES):
+        name = node.slot_name
+        return (lambda values: values[name]), True
+
+    if isinstance(node, dict):
+        children = [(key, _compile_node(value)) for key, value in node.items()]
+
+        if any(has_slots for _, (_, has_slots) in children):
+            fns = [(key, fn) for key, (fn, _) in children]
+            return (lambda values: {key: fn(values) for key, fn in fns}), True
+
+        const = {key: fn(None) for key, (fn, _) in children}
+        return (lambda values: const), False
+
+    if isinstance(node, (list, tuple)):
+        children = [_compile_node(value) for value in node]
+
+        if any(has_slots for _, has_slots in children):
+            fns = [fn for fn, _ in children]
+            return (lambda values: [fn(values) for fn in fns]), True
+
+        const = [fn(None) for fn, _ in children]
+        return (lambda values: const), False
+
+    return (lambda values: node), False
+
+
+def compile_template(body):
+    """Compila el cuerpo de una búsqueda construida con valores marcadores
+    (ver 'slot_query').
+
+    Args:
+        body (dict): Cuerpo de la búsqueda (elasticsearch_dsl.Search.to_dict).
+
+    Returns:
+        function: Función que recibe un diccionario de valores y retorna el
+            cuerpo de la búsqueda.
+
+    """
+    body = dict(body)
+    # Los valores 'from' y 'size' son calculados por elasticsearch_dsl a
+    # partir de un slice, por lo que no pueden ser reemplazados por
+    # marcadores antes de construir la búsqueda.
+    body['from'] = _slot(_IntSlot, 'offset', 0)
+    body['size'] = _slot(_IntSlot, 'size', 0)
+
+    fn, _ = _compile_node(body)
+    return fn
+
+
+def compiled_search(index, key, query, const_params, build_dsl_search):
+    """Construye una búsqueda a partir del template compilado correspondiente
+    a su forma. Si el template no existe, se lo crea y se lo almacena.
+
+    Args:
+        index (str): Índice de la búsqueda.
+        key (tuple): Identificador del constructor de la búsqueda (por
+            ejemplo, clase e índice). Se combina con la forma de la consulta
+            para identificar al template.
+        query (dict): Parámetros de la búsqueda.
+        const_params (set): Ver 'query_shape'.
+        build_dsl_search (function): Función que recibe parámetros de búsqueda
+            y retorna la búsqueda elasticsearch_dsl.Search correspondiente.
+
+    Returns:
+        elasticsearch_dsl.Search: Búsqueda construida (CompiledSearch), o
+            búsqueda construida con 'build_dsl_search' si los parámetros no
+            pueden ser compilados.
+
+    """
+    shape, values = query_shape(query, const_params)
+    if shape is None:
+        return build_dsl_search(query)
+
+    template_key = (key, shape, constants.ES_TRACK_TOTAL_HITS)
+    template = _templates.get(template_key)
+
+    if template is None:
+        template = compile_template(
+            build_dsl_search(slot_query(shape)).to_dict())
+
+        with _templates_lock:
+            if len(_templates) < MAX_TEMPLATES:
+                _templates[template_key] = template
+
+    return CompiledSearch(index=index, body=template(values))
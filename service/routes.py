@@ -4,11 +4,15 @@ Declara las rutas de los recursos que expone la API e
 invoca las funciones que procesan dichos recursos.
 """
 
+import logging
 from functools import wraps
 from flask import current_app, request, redirect, Blueprint
-from service import app, normalizer, formatter
+from service import app, normalizer, formatter, data, location_cache
+from service import parser_pool
 from service import names as N
 
+logger = logging.getLogger('georef')
+
 
 def disable_cache(f):
     """Dada una función que maneja una request HTTP, modifica los valores de
@@ -61,6 +65,34 @@ def add_complete_downloads(bp, urls):
                                 lambda location=url: redirect(location))
 
 
+@app.teardown_request
+def log_search_stats(_):
+    """Registra en el log (nivel DEBUG) los contadores de búsquedas a
+    Elasticsearch de la request HTTP actual, si se realizó alguna. El valor
+    'rounds' indica la cantidad de rondas MultiSearch ejecutadas durante la
+    request. Si la request utilizó el cache de ubicaciones o el pool de
+    parsers de direcciones, también se registran sus contadores.
+
+    Se utiliza 'teardown_request' en lugar de 'after_request' para incluir
+    también las búsquedas realizadas mientras se generan respuestas por
+    streaming.
+
+    """
+    stats = data.request_search_stats()
+    if stats and stats.rounds:
+        logger.debug('Búsquedas %s: %s', request.path, stats.to_dict())
+
+    cache = location_cache.request_location_cache()
+    if cache is not None:
+        logger.debug('Cache de ubicaciones %s: %s', request.path,
+                     cache.stats())
+
+    pool = parser_pool.request_parser_pool()
+    if pool is not None:
+        logger.debug('Parsers de direcciones %s: %s', request.path,
+                     pool.stats())
+
+
 @app.errorhandler(404)
 def handle_404(_):
     return formatter.create_404_error_response()
@@ -117,6 +149,27 @@ def get_addresses():
     return normalizer.process_address(request)
 
 
+@bp_v1_0.route('/direcciones/csv', methods=['POST'])
+def normalize_address_csv():
+    return normalizer.process_address_csv(request)
+
+
+@bp_v1_0.route('/direcciones/trabajos', methods=['POST'])
+def create_address_job():
+    return normalizer.process_address_job_create(request)
+
+
+@bp_v1_0.route('/direcciones/trabajos/<job_id>', methods=['GET'])
+@disable_cache
+def get_address_job(job_id):
+    return normalizer.process_address_job(job_id)
+
+
+@bp_v1_0.route('/direcciones/trabajos/<job_id>/resultados', methods=['GET'])
+def get_address_job_results(job_id):
+    return normalizer.process_address_job(job_id, results=True)
+
+
 @bp_v1_0.route('/ubicacion', methods=['GET', 'POST'])
 @disable_cache
 def get_location():
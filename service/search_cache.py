@@ -0,0 +1,347 @@
+"""Módulo 'search_cache' de georef-ar-api.
+
+Contiene un cache de respuestas de Elasticsearch compartido entre requests. Las
+claves del cache se componen de los nombres reales de los índices consultados
+(no sus alias) y del contenido JSON canónico de cada búsqueda. Como el
+indexador crea un nuevo índice '<alias>-<uuid>-<timestamp>' con cada
+actualización de datos, al cambiar el índice referenciado por un alias todas
+las entradas anteriores dejan de ser utilizadas automáticamente.
+
+El almacenamiento de las respuestas es intercambiable: se puede utilizar un
+cache LRU local a cada proceso, o un servidor Redis compartido entre procesos
+(requiere el paquete 'redis').
+"""
+
+import collections
+import hashlib
+import json
+import logging
+import threading
+import time
+from flask import current_app
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+STORAGE_LRU = 'lru'
+STORAGE_REDIS = 'redis'
+
+KEY_PREFIX = 'georef:search:'
+
+logger = logging.getLogger('georef')
+
+_create_lock = threading.Lock()
+
+
+class LRUStorage:
+    """Almacenamiento LRU ("Least Recently Used") en memoria, local a cada
+    proceso, con tiempo de expiración por entrada.
+
+    Siempre se mantiene la propiedad len(LRUStorage(N)) <= N.
+
+    Attributes:
+        _size (int): Cantidad máxima de entradas a almacenar.
+        _entries (collections.OrderedDict): Entradas almacenadas (valor y
+            momento de expiración), ordenadas desde la menos utilizada
+            recientemente a la más utilizada recientemente.
+        _lock (threading.Lock): Lock utilizado para modificar '_entries'.
+
+    """
+
+    __slots__ = ['_size', '_entries', '_lock']
+
+    def __init__(self, size):
+        """Inicializa un objeto de tipo LRUStorage.
+
+        Args:
+            size (int): Ver atributo '_size'.
+
+        """
+        if size < 1:
+            raise ValueError('size must be 1 or larger')
+
+        self._size = size
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        """Busca los valores almacenados para una lista de claves.
+
+        Args:
+            keys (list): Claves a buscar (str).
+
+        Returns:
+            list: Valor de cada clave (str), o 'None' si la clave no está
+                almacenada o expiró.
+
+        """
+        now = time.monotonic()
+        values = []
+
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+
+                if entry is None:
+                    values.append(None)
+                elif entry[1] <= now:
+                    del self._entries[key]
+                    values.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    values.append(entry[0])
+
+        return values
+
+    def set_many(self, items, ttl):
+        """Almacena una lista de valores.
+
+        Args:
+            items (list): Lista de tuplas (clave, valor) a almacenar (str).
+            ttl (float): Tiempo de vida de las entradas, en segundos.
+
+        """
+        expiration = time.monotonic() + ttl
+
+        with self._lock:
+            for key, value in items:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                elif len(self._entries) == self._size:
+                    self._entries.popitem(last=False)
+
+                self._entries[key] = (value, expiration)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisStorage:
+    """Almacenamiento compartido entre procesos utilizando un servidor Redis.
+    La expiración de las entradas es administrada por Redis.
+
+    Los errores de comunicación con Redis no son propagados: las búsquedas se
+    consideran no almacenadas, y se ejecutan normalmente contra
+    Elasticsearch.
+
+    Attributes:
+        _client (redis.Redis): Cliente Redis.
+
+    """
+
+    __slots__ = ['_client']
+
+    def __init__(self, url):
+        """Inicializa un objeto de tipo RedisStorage.
+
+        Args:
+            url (str): URL del servidor Redis (por ejemplo,
+                'redis://localhost:6379/0').
+
+        """
+        if redis is None:
+            raise RuntimeError('The redis package is required to use the '
+                               'redis search cache storage')
+
+        self._client = redis.Redis.from_url(url)
+
+    def get_many(self, keys):
+        """Ver 'LRUStorage.get_many'."""
+        try:
+            values = self._client.mget(keys)
+        except redis.RedisError:
+            logger.exception('Error al leer el cache de búsquedas')
+            return [None] * len(keys)
+
+        return [
+            value.decode() if value is not None else None
+            for value in values
+        ]
+
+    def set_many(self, items, ttl):
+        """Ver 'LRUStorage.set_many'."""
+        try:
+            pipeline = self._client.pipeline(transaction=False)
+            for key, value in items:
+                pipeline.set(key, value, px=int(ttl * 1000))
+
+            pipeline.execute()
+        except redis.RedisError:
+            logger.exception('Error al escribir el cache de búsquedas')
+
+
+class SearchCache:
+    """Cache de respuestas de búsquedas elasticsearch_dsl.Search.
+
+    Attributes:
+        _storage (LRUStorage, RedisStorage): Almacenamiento de las respuestas.
+        _ttl (float): Tiempo de vida de cada respuesta almacenada, en
+            segundos.
+        _version_ttl (float): Cada cuántos segundos se debe volver a consultar
+            qué índice referencia cada alias.
+        _versions (dict): Nombres de índices referenciados por cada alias,
+            junto con el momento en el que se los debe volver a consultar.
+        _lock (threading.Lock): Lock utilizado para modificar '_versions'.
+
+    """
+
+    __slots__ = ['_storage', '_ttl', '_version_ttl', '_versions', '_lock']
+
+    def __init__(self, storage, ttl, version_ttl):
+        """Inicializa un objeto de tipo SearchCache.
+
+        Args:
+            storage (LRUStorage, RedisStorage): Ver atributo '_storage'.
+            ttl (float): Ver atributo '_ttl'.
+            version_ttl (float): Ver atributo '_version_ttl'.
+
+        """
+        self._storage = storage
+        self._ttl = ttl
+        self._version_ttl = version_ttl
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def outdated_aliases(self, searches):
+        """Retorna los alias consultados por una lista de búsquedas para los
+        cuales se debe volver a consultar qué índice referencian (ver
+        'set_index_version').
+
+        Args:
+            searches (list): Lista de elasticsearch_dsl.Search.
+
+        Returns:
+            list: Nombres de alias (o índices), ordenados.
+
+        """
+        now = time.monotonic()
+        aliases = set()
+
+        with self._lock:
+            for search in searches:
+                # pylint: disable=protected-access
+                for alias in search._index or ():
+                    version = self._versions.get(alias)
+                    if version is None or version[1] <= now:
+                        aliases.add(alias)
+
+        return sorted(aliases)
+
+    def set_index_version(self, alias, response):
+        """Almacena los nombres de los índices referenciados por un alias.
+
+        Args:
+            alias (str): Nombre del alias (o índice).
+            response (dict): Respuesta de Elasticsearch a la consulta
+                'indices.get_alias' para el alias.
+
+        """
+        indices = sorted(response.keys())
+
+        with self._lock:
+            self._versions[alias] = (indices,
+                                     time.monotonic() + self._version_ttl)
+
+    def search_key(self, aliases, body):
+        """Retorna la clave del cache correspondiente a una búsqueda. Los
+        índices referenciados por los alias de la búsqueda deben haber sido
+        establecidos previamente (ver 'outdated_aliases').
+
+        Args:
+            aliases (list): Alias (o índices) de la búsqueda.
+            body (str): Parámetros y cuerpo de la búsqueda, serializados en
+                formato JSON con claves ordenadas.
+
+        Returns:
+            str: Clave de la búsqueda.
+
+        """
+        with self._lock:
+            indices = [self._versions[alias][0] for alias in aliases]
+
+        key_body = json.dumps(indices) + body
+
+        return KEY_PREFIX + hashlib.sha1(key_body.encode()).hexdigest()
+
+    def get_many(self, keys):
+        """Busca las respuestas almacenadas para una lista de claves.
+
+        Args:
+            keys (list): Claves a buscar (ver 'search_key').
+
+        Returns:
+            list: Respuesta de Elasticsearch de cada clave (dict), o 'None'
+                si la clave no está almacenada.
+
+        """
+        return [
+            json.loads(value) if value is not None else None
+            for value in self._storage.get_many(keys)
+        ]
+
+    def set_many(self, items):
+        """Almacena una lista de respuestas de Elasticsearch. Las respuestas
+        parciales (por ejemplo, por timeouts) no son almacenadas.
+
+        Args:
+            items (list): Lista de tuplas (clave, respuesta) a almacenar.
+
+        """
+        items = [
+            (key, json.dumps(response))
+            for key, response in items
+            if not response.get('timed_out') and
+            not response.get('_shards', {}).get('failed')
+        ]
+
+        if items:
+            self._storage.set_many(items, self._ttl)
+
+
+def create_storage(config):
+    """Crea el almacenamiento de respuestas a partir de una configuración.
+
+    Args:
+        config (dict): Configuración de la aplicación Flask.
+
+    Raises:
+        ValueError: Si el tipo de almacenamiento no es válido.
+
+    Returns:
+        LRUStorage, RedisStorage: Almacenamiento creado.
+
+    """
+    storage = config.get('ES_CACHE_STORAGE')
+
+    if storage == STORAGE_LRU:
+        return LRUStorage(config['ES_CACHE_SIZE'])
+
+    if storage == STORAGE_REDIS:
+        return RedisStorage(config['ES_CACHE_REDIS_URL'])
+
+    raise ValueError('Invalid search cache storage: {}'.format(storage))
+
+
+def get_search_cache():
+    """Devuelve el cache de búsquedas activo para la aplicación Flask. El cache
+    es creado si no existía, utilizando las configuraciones 'ES_CACHE_*'.
+
+    Returns:
+        SearchCache: Cache de búsquedas, o 'None' si el cache está desactivado
+            (ES_CACHE_STORAGE no definido).
+
+    """
+    if not current_app.config.get('ES_CACHE_STORAGE'):
+        return None
+
+    if not hasattr(current_app, 'search_cache'):
+        with _create_lock:
+            if not hasattr(current_app, 'search_cache'):
+                current_app.search_cache = SearchCache(
+                    create_storage(current_app.config),
+                    current_app.config['ES_CACHE_TTL'],
+                    current_app.config['ES_CACHE_VERSION_TTL'])
+
+    return current_app.search_cache
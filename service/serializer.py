@@ -0,0 +1,149 @@
+"""Módulo 'serializer' de georef-ar-api.
+
+Contiene funciones para codificar respuestas JSON utilizando distintas
+implementaciones (backends) intercambiables:
+
+    - 'json': módulo 'json' de la librería estándar, vía las funciones de
+      Flask (utilizando 'utils.GeorefJSONEncoder').
+    - 'orjson': librería 'orjson' (opcional), considerablemente más rápida al
+      codificar respuestas con una gran cantidad de resultados.
+
+Ambos backends generan contenidos idénticos a los que generaría
+'flask.jsonify' para los valores utilizados en las respuestas de la API. Si
+'orjson' no está instalado, si la configuración de Flask requiere
+funcionalidades que 'orjson' no provee (JSON_AS_ASCII, o respuestas con
+indentación), o si el contenido generado por 'orjson' difiere del de la
+librería estándar (números de punto flotante con exponente), se utiliza el
+backend 'json'.
+"""
+
+import re
+from flask import current_app, jsonify
+from flask import json as flask_json
+from service import constants, utils
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND_JSON = 'json'
+BACKEND_ORJSON = 'orjson'
+
+BACKENDS = [BACKEND_JSON, BACKEND_ORJSON]
+
+# 'orjson' codifica los números de punto flotante con exponente sin signo '+'
+# ni ceros a la izquierda ('1e16', '-1e-7'), a diferencia de la librería
+# estándar ('1e+16', '-1e-07'). Las respuestas con números de ese tipo (o
+# textos similares) se codifican con la librería estándar.
+_EXPONENT_REGEX = re.compile(rb'\de-?\d')
+
+
+def pretty_print():
+    """Indica si Flask generaría respuestas JSON con indentación.
+
+    Returns:
+        bool: Verdadero si las respuestas deben tener indentación.
+
+    """
+    return (current_app.config['JSONIFY_PRETTYPRINT_REGULAR'] or
+            current_app.debug)
+
+
+def get_backend(backend=None):
+    """Determina qué backend utilizar para codificar valores JSON.
+
+    Args:
+        backend (str): Backend solicitado. Si no se especifica, se utiliza el
+            valor de la configuración JSON_SERIALIZER.
+
+    Raises:
+        ValueError: Si el backend solicitado no es válido.
+
+    Returns:
+        str: Backend a utilizar ('json' u 'orjson').
+
+    """
+    backend = backend or constants.JSON_SERIALIZER
+
+    if backend not in BACKENDS:
+        raise ValueError('Invalid JSON serializer: {}'.format(backend))
+
+    if backend == BACKEND_ORJSON and (orjson is None or
+                                      current_app.config['JSON_AS_ASCII']):
+        return BACKEND_JSON
+
+    return backend
+
+
+def _orjson_dumps(obj, newline=False):
+    """Codifica un valor a JSON utilizando 'orjson'.
+
+    Args:
+        obj (object): Valor a codificar.
+        newline (bool): Si es verdadero, se agrega un salto de línea al final
+            del contenido.
+
+    Returns:
+        bytes: Valor codificado, o 'None' si 'orjson' no puede generar el
+            mismo contenido que la librería estándar (por ejemplo, con
+            enteros de más de 64 bits o números con exponente).
+
+    """
+    option = orjson.OPT_NON_STR_KEYS
+    if current_app.config['JSON_SORT_KEYS']:
+        option |= orjson.OPT_SORT_KEYS
+    if newline:
+        option |= orjson.OPT_APPEND_NEWLINE
+
+    try:
+        body = orjson.dumps(obj, default=utils.json_default, option=option)
+    except orjson.JSONEncodeError:
+        return None
+
+    return None if _EXPONENT_REGEX.search(body) else body
+
+
+def dumps(obj, backend=None):
+    """Codifica un valor a JSON, sin indentación ni espacios entre
+    separadores.
+
+    Args:
+        obj (object): Valor a codificar.
+        backend (str): Backend a utilizar (ver 'get_backend').
+
+    Raises:
+        TypeError: Si el valor contiene objetos que no pueden ser
+            codificados.
+
+    Returns:
+        bytes: Valor codificado (UTF-8).
+
+    """
+    if get_backend(backend) == BACKEND_ORJSON:
+        body = _orjson_dumps(obj)
+        if body is not None:
+            return body
+
+    return flask_json.dumps(obj, separators=(',', ':')).encode()
+
+
+def json_response(obj, backend=None):
+    """Crea una respuesta HTTP con contenido JSON, equivalente a la creada
+    por 'flask.jsonify'.
+
+    Args:
+        obj (object): Valor a codificar.
+        backend (str): Backend a utilizar (ver 'get_backend').
+
+    Returns:
+        flask.Response: Respuesta HTTP con contenido JSON.
+
+    """
+    if get_backend(backend) == BACKEND_ORJSON and not pretty_print():
+        body = _orjson_dumps(obj, newline=True)
+        if body is not None:
+            return current_app.response_class(
+                body, mimetype=current_app.config['JSONIFY_MIMETYPE'])
+
+    return jsonify(obj)
@@ -0,0 +1,284 @@
+"""Módulo 'shared_cache' de georef-ar-api.
+
+Contiene un cache de direcciones parseadas compartido entre procesos (por
+ejemplo, entre los workers de Gunicorn), almacenado en una tabla de hash de
+tamaño fijo sobre un archivo mapeado en memoria (mmap). Se recomienda ubicar
+el archivo en un sistema de archivos en memoria, como '/dev/shm'.
+
+La tabla se compone de slots de tamaño fijo. Cada slot contiene un número de
+secuencia, el hash de su clave, el largo de su contenido y el contenido en sí
+(la clave y su valor serializados). Las lecturas no utilizan locks: el número
+de secuencia es impar mientras el slot está siendo escrito, y se incrementa
+con cada escritura, por lo que un lector descarta el slot si el número cambió
+durante la lectura (seqlock). Las escrituras se serializan con un lock de
+archivo no bloqueante: si otro proceso está escribiendo, la escritura se
+omite, ya que el cache es solo una optimización.
+"""
+
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import struct
+from georef_ar_address.address_data import AddressData
+
+_MAGIC = b'GRAC'
+_VERSION = 1
+_FILE_HEADER = struct.Struct('<4sIII')
+_SLOT_HEADER = struct.Struct('<IQI')
+_SEQ = struct.Struct('<I')
+
+SLOT_SIZE = 256
+PROBES = 4
+
+
+def _key_hash(key):
+    """Calcula el hash de una clave. A diferencia de 'hash()', el valor
+    calculado es el mismo en todos los procesos.
+
+    Args:
+        key (str): Clave a utilizar.
+
+    Returns:
+        int: Hash de 64 bits de la clave (distinto de 0).
+
+    """
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') or 1
+
+
+class SharedCache:
+    """Tabla de hash de claves y valores de tipo str, compartida entre
+    procesos a través de un archivo mapeado en memoria.
+
+    Cada clave puede ser almacenada en uno de PROBES slots consecutivos. Si
+    todos están ocupados por otras claves, se reemplaza el primero.
+
+    Attributes:
+        _fd (int): Descriptor del archivo de la tabla.
+        _mmap (mmap.mmap): Contenido del archivo mapeado en memoria.
+        _slots (int): Cantidad de slots de la tabla.
+        hits (int): Cantidad de consultas (en este proceso) que encontraron su
+            clave.
+        misses (int): Cantidad de consultas (en este proceso) que no
+            encontraron su clave.
+
+    """
+
+    __slots__ = ['_fd', '_mmap', '_slots', 'hits', 'misses']
+
+    def __init__(self, path, slots):
+        """Inicializa un objeto de tipo SharedCache. Si el archivo no existe,
+        o fue creado con otra cantidad de slots, se inicializa una tabla
+        vacía.
+
+        Args:
+            path (str): Ruta del archivo de la tabla.
+            slots (int): Ver atributo '_slots'.
+
+        Raises:
+            ValueError: Si la cantidad de slots es menor a 1.
+
+        """
+        if slots < 1:
+            raise ValueError('slots must be 1 or larger')
+
+        header = _FILE_HEADER.pack(_MAGIC, _VERSION, slots, SLOT_SIZE)
+        file_size = _FILE_HEADER.size + slots * SLOT_SIZE
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            current = os.pread(self._fd, _FILE_HEADER.size, 0)
+            if (current != header or
+                    os.fstat(self._fd).st_size != file_size):
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, file_size)
+                os.pwrite(self._fd, header, 0)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+        self._mmap = mmap.mmap(self._fd, file_size)
+        self._slots = slots
+        self.hits = 0
+        self.misses = 0
+
+    def _offsets(self, key_hash):
+        """Devuelve las posiciones de los slots donde puede estar almacenada
+        una clave.
+
+        Args:
+            key_hash (int): Hash de la clave.
+
+        Returns:
+            list: Posiciones (en bytes) de los slots.
+
+        """
+        first = key_hash % self._slots
+        return [
+            _FILE_HEADER.size + ((first + i) % self._slots) * SLOT_SIZE
+            for i in range(min(PROBES, self._slots))
+        ]
+
+    def _read_slot(self, offset, key_hash):
+        """Lee el contenido de un slot sin utilizar locks.
+
+        Args:
+            offset (int): Posición del slot.
+            key_hash (int): Hash de la clave buscada.
+
+        Returns:
+            bytes: Contenido del slot, o None si el slot no contiene una clave
+                con el hash buscado, o si fue modificado durante la lectura.
+
+        """
+        seq, slot_hash, length = _SLOT_HEADER.unpack_from(self._mmap, offset)
+        if seq % 2 or slot_hash != key_hash:
+            return None
+
+        start = offset + _SLOT_HEADER.size
+        contents = self._mmap[start:start + length]
+
+        if _SEQ.unpack_from(self._mmap, offset)[0] != seq:
+            return None
+
+        return contents
+
+    def get(self, key):
+        """Busca el valor de una clave.
+
+        Args:
+            key (str): Clave a buscar.
+
+        Returns:
+            str: Valor de la clave, o None si no está almacenada.
+
+        """
+        key_hash = _key_hash(key)
+
+        for offset in self._offsets(key_hash):
+            contents = self._read_slot(offset, key_hash)
+            if contents is None:
+                continue
+
+            try:
+                slot_key, value = json.loads(contents)
+            except ValueError:
+                continue
+
+            if slot_key == key:
+                self.hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    def set(self, key, value):
+        """Almacena el valor de una clave. Si otro proceso está escribiendo
+        en la tabla, o si la clave y el valor no entran en un slot, no se
+        almacena nada.
+
+        Args:
+            key (str): Clave del valor.
+            value (str): Valor a almacenar.
+
+        Returns:
+            bool: Verdadero si el valor fue almacenado.
+
+        """
+        contents = json.dumps([key, value], ensure_ascii=False).encode()
+        if len(contents) > SLOT_SIZE - _SLOT_HEADER.size:
+            return False
+
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+
+        try:
+            key_hash = _key_hash(key)
+            offsets = self._offsets(key_hash)
+            target = offsets[0]
+
+            for offset in offsets:
+                _, slot_hash, _ = _SLOT_HEADER.unpack_from(self._mmap, offset)
+                if slot_hash in (0, key_hash):
+                    target = offset
+                    break
+
+            seq = _SEQ.unpack_from(self._mmap, target)[0]
+            _SEQ.pack_into(self._mmap, target, (seq + 1) & 0xFFFFFFFF)
+
+            start = target + _SLOT_HEADER.size
+            self._mmap[start:start + len(contents)] = contents
+            _SLOT_HEADER.pack_into(self._mmap, target, (seq + 2) & 0xFFFFFFFF,
+                                   key_hash, len(contents))
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+        return True
+
+    def close(self):
+        """Libera el mapeo en memoria y el archivo de la tabla."""
+        self._mmap.close()
+        os.close(self._fd)
+
+
+class SharedAddressCache(SharedCache):
+    """Cache compartido de resultados de 'AddressParser.parse()', indexado
+    por dirección. Se almacenan las componentes de cada 'AddressData'
+    serializadas como JSON, incluyendo los resultados vacíos (direcciones sin
+    componentes reconocibles).
+
+    """
+
+    __slots__ = []
+
+    def lookup(self, address):
+        """Busca el resultado de parsear una dirección.
+
+        Args:
+            address (str): Dirección a buscar.
+
+        Returns:
+            tuple: Tupla de (bool, AddressData). El primer elemento indica si
+                la dirección fue encontrada, y el segundo contiene su
+                resultado (que puede ser None).
+
+        """
+        value = self.get(address)
+        if value is None:
+            return False, None
+
+        components = json.loads(value)
+        if components is None:
+            return True, None
+
+        address_type, street_names, door_number, floor = components
+        return True, AddressData(address_type, street_names,
+                                 tuple(door_number), floor)
+
+    def store(self, address, address_data):
+        """Almacena el resultado de parsear una dirección.
+
+        Args:
+            address (str): Dirección parseada.
+            address_data (AddressData): Resultado del parseo (puede ser
+                None).
+
+        Returns:
+            bool: Verdadero si el resultado fue almacenado.
+
+        """
+        components = None
+        if address_data is not None:
+            components = [
+                address_data.type,
+                address_data.street_names,
+                [address_data.door_number_value,
+                 address_data.door_number_unit],
+                address_data.floor
+            ]
+
+        return self.set(address, json.dumps(components, ensure_ascii=False))
@@ -19,6 +19,16 @@ bajo la clave \'{}\'.'
 BULK_QS_INVALID = 'No se permiten parámetros vía query string en operaciones \
 bulk.'
 INVALID_BULK_ENTRY = 'Las operaciones bulk deben ser de tipo objeto.'
+INVALID_NDJSON_LINE = 'Cada línea debe contener un objeto JSON válido.'
+JOB_INVALID_CONTENT = 'El contenido de la petición debe ser de tipo \
+\'application/x-ndjson\' o \'text/csv\'.'
+JOB_INVALID_CSV = 'El contenido CSV debe estar codificado en UTF-8, y su \
+primera fila debe contener los nombres de los parámetros.'
+CSV_INVALID_CONTENT = 'El contenido de la petición debe ser de tipo \
+\'text/csv\', codificado en UTF-8, y su primera fila debe contener los \
+nombres de las columnas.'
+CSV_COLUMN_NOT_FOUND = 'La columna \'{}\' no existe en el archivo CSV.'
+JOB_NOT_FINISHED = 'El trabajo especificado todavía no finalizó.'
 INTERNAL_ERROR = 'Ocurrió un error interno de servidor al procesar la \
 petición.'
 MISSING_ERROR = 'El parámetro \'{}\' es obligatorio.'
@@ -350,30 +350,32 @@ class GeorefMockTest(GeorefLiveTest):
 
     def set_msearch_results(self, results):
         """Establece los valores que debería retornar el método msearch() de
-        Elasticsearch. Notar que se establecen los resultados para una sola
-        query: si se llega a utilizar uno de los recursos POST con más de una
-        query, ocurriría un error interno en la API.
+        Elasticsearch. Notar que, si 'results' es una lista, se establecen los
+        mismos resultados para todas las búsquedas de cada MultiSearch (por
+        ejemplo, para todas las calles de una dirección de tipo 'between').
 
         Args:
-            results (list): Lista de 'hits' (documentos) para una única query.
+            results (list, callable): Lista de 'hits' (documentos) para cada
+                query, o función que recibe el cuerpo de cada búsqueda y
+                retorna su lista de documentos.
 
         """
-        hits = [{'_source': copy.deepcopy(result)} for result in results]
+        def search_hits(search):
+            docs = results(search) if callable(results) else results
+            return [{'_source': copy.deepcopy(doc)} for doc in docs]
 
-        class Total:
-            value = 0
-            relation = 'eq'
+        def msearch(body=None, **_):
+            responses = []
 
-        total = Total()
-        total.value = len(hits)
-
-        self.es.return_value.msearch.return_value = {
-            'responses': [
-                {
+            for search in body[1::2]:
+                hits = search_hits(search)
+                responses.append({
                     'hits': {
                         'hits': hits,
-                        'total': total
+                        'total': {'value': len(hits), 'relation': 'eq'}
                     }
-                }
-            ]
-        }
+                })
+
+            return {'responses': responses}
+
+        self.es.return_value.msearch.side_effect = msearch
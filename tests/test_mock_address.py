@@ -0,0 +1,122 @@
+import json
+from . import GeorefMockTest
+
+STREETS = {
+    'SANTA FE': '0202701007345',
+    'CALLAO': '0202701001520',
+    'RIOBAMBA': '0202701012340'
+}
+
+
+def street_block(name):
+    return {
+        'calle': {
+            'id': STREETS[name],
+            'nombre': name,
+            'categoria': 'AV',
+            'provincia': {'id': '02',
+                          'nombre': 'Ciudad Autónoma de Buenos Aires'},
+            'departamento': {'id': '02027', 'nombre': 'Comuna 1'},
+            'localidad_censal': {'id': '02000010',
+                                 'nombre': 'Ciudad de Buenos Aires'},
+            'fuente': 'INDEC'
+        },
+        'altura': {
+            'inicio': {'derecha': 1000, 'izquierda': 1001},
+            'fin': {'derecha': 1098, 'izquierda': 1099}
+        },
+        'geometria': {
+            'type': 'MultiLineString',
+            'coordinates': [[[-58.38, -34.59], [-58.381, -34.595]]]
+        }
+    }
+
+
+def intersection(name_a, name_b, lon):
+    street_a = street_block(name_a)['calle']
+    street_b = street_block(name_b)['calle']
+
+    return {
+        'id': '{}-{}'.format(street_a['id'], street_b['id']),
+        'calle_a': street_a,
+        'calle_b': street_b,
+        'geometria': {'type': 'Point', 'coordinates': [lon, -34.59]}
+    }
+
+
+def msearch_streets(body=None, **_):
+    """Simula una respuesta MultiSearch, devolviendo cuadras de la calle
+    buscada, o intersecciones de Santa Fe con Callao y Riobamba."""
+    responses = []
+
+    for header, search in zip(body[::2], body[1::2]):
+        contents = json.dumps(search).upper()
+
+        if 'intersecciones' in header['index']:
+            hits = [
+                hit for hit in [
+                    intersection('SANTA FE', 'CALLAO', -58.3925),
+                    intersection('RIOBAMBA', 'SANTA FE', -58.3935)
+                ]
+                if hit['calle_a']['id'] in contents and
+                hit['calle_b']['id'] in contents
+            ]
+        else:
+            hits = [street_block(name) for name in STREETS
+                    if name in contents]
+
+        responses.append({
+            'hits': {
+                'hits': [{'_source': hit} for hit in hits],
+                'total': {'value': len(hits), 'relation': 'eq'}
+            }
+        })
+
+    return {'responses': responses}
+
+
+class AddressPlannersTest(GeorefMockTest):
+    def setUp(self):
+        super().setUp()
+        self.es.return_value.msearch.side_effect = msearch_streets
+
+    def get_address(self, address):
+        return self.get_response({'direccion': address},
+                                 endpoint='/api/direcciones',
+                                 entity='direcciones')
+
+    def msearch_rounds(self):
+        return [
+            len(call[1]['body']) // 2
+            for call in self.es.return_value.msearch.call_args_list
+        ]
+
+    def test_intersection_rounds(self):
+        """Las búsquedas de las dos calles de una dirección de tipo
+        'intersection' deberían ejecutarse en la misma ronda."""
+        results = self.get_address('Santa Fe y Callao')
+
+        self.assertTrue(
+            self.msearch_rounds() == [2, 1] and
+            len(results) == 1 and
+            results[0]['calle']['nombre'] == 'SANTA FE' and
+            results[0]['calle_cruce_1']['nombre'] == 'CALLAO')
+
+    def test_between_rounds(self):
+        """Las búsquedas de las tres calles de una dirección de tipo
+        'between' deberían ejecutarse en la misma ronda."""
+        results = self.get_address('Santa Fe entre Callao y Riobamba')
+
+        self.assertTrue(
+            self.msearch_rounds() == [3, 1] and
+            len(results) == 1 and
+            results[0]['calle']['nombre'] == 'SANTA FE' and
+            results[0]['calle_cruce_1']['nombre'] == 'CALLAO' and
+            results[0]['calle_cruce_2']['nombre'] == 'RIOBAMBA')
+
+    def test_intersection_street_not_found(self):
+        """Si alguna de las calles no existe, no se deberían buscar
+        intersecciones."""
+        results = self.get_address('Santa Fe y Corrientes')
+
+        self.assertTrue(self.msearch_rounds() == [2] and not results)
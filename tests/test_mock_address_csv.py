@@ -0,0 +1,189 @@
+import csv
+import io
+from unittest import mock
+import elasticsearch
+from service import strings
+from . import GeorefMockTest
+
+STREET_BLOCK = {
+    'calle': {
+        'id': '0202701007345',
+        'nombre': 'SANTA FE',
+        'categoria': 'AV',
+        'provincia': {'id': '02', 'nombre': 'Ciudad Autónoma de Buenos Aires'},
+        'departamento': {'id': '02027', 'nombre': 'Comuna 1'},
+        'localidad_censal': {'id': '02000010',
+                             'nombre': 'Ciudad de Buenos Aires'},
+        'fuente': 'INDEC'
+    },
+    'altura': {
+        'inicio': {'derecha': 1000, 'izquierda': 1001},
+        'fin': {'derecha': 1098, 'izquierda': 1099}
+    },
+    'geometria': {
+        'type': 'MultiLineString',
+        'coordinates': [[[-58.38, -34.59], [-58.381, -34.595]]]
+    }
+}
+
+
+class AddressCSVTest(GeorefMockTest):
+    def setUp(self):
+        super().setUp()
+        self.set_msearch_results([STREET_BLOCK])
+
+    def post_csv(self, rows, params=None, content_type='text/csv'):
+        contents = io.StringIO()
+        csv.writer(contents).writerows(rows)
+
+        return self.app.post('/api/direcciones/csv', query_string=params,
+                             data=contents.getvalue().encode(),
+                             content_type=content_type)
+
+    def read_rows(self, resp):
+        return list(csv.DictReader(io.StringIO(resp.data.decode())))
+
+    def test_columns_appended(self):
+        """Las columnas de la dirección normalizada deberían ser agregadas a
+        cada fila, manteniendo los valores originales."""
+        resp = self.post_csv([
+            ['id', 'domicilio', 'prov'],
+            ['1', 'Santa Fe 1050', 'caba'],
+            ['2', 'Av. Santa Fe 1020', '02']
+        ], {'columna_direccion': 'domicilio', 'columna_provincia': 'prov'})
+        rows = self.read_rows(resp)
+
+        self.assertTrue(
+            resp.mimetype == 'text/csv' and
+            'Content-Length' not in resp.headers and
+            [row['id'] for row in rows] == ['1', '2'] and
+            [row['domicilio'] for row in rows] ==
+            ['Santa Fe 1050', 'Av. Santa Fe 1020'] and
+            [row['altura_valor'] for row in rows] == ['1050', '1020'] and
+            all(row['calle_id'] == '0202701007345' for row in rows))
+
+    def test_same_columns_as_csv_format(self):
+        """Las columnas agregadas deberían ser las mismas que las de las
+        respuestas CSV de /direcciones."""
+        resp = self.post_csv([['domicilio'], ['Santa Fe 1050']],
+                             {'columna_direccion': 'domicilio'})
+        csv_resp = self.app.get('/api/direcciones', query_string={
+            'direccion': 'Santa Fe 1050',
+            'formato': 'csv'
+        })
+
+        header = resp.data.decode().splitlines()[0]
+        csv_header = csv_resp.data.decode().splitlines()[0]
+
+        self.assertEqual(header, '"domicilio",' + csv_header)
+
+    def test_fields(self):
+        """Se debería respetar el parámetro 'campos'."""
+        resp = self.post_csv([['domicilio'], ['Santa Fe 1050']],
+                             {'columna_direccion': 'domicilio',
+                              'campos': 'calle.id'})
+
+        self.assertListEqual(self.read_rows(resp), [{
+            'domicilio': 'Santa Fe 1050',
+            'calle_id': '0202701007345',
+            'calle_nombre': 'SANTA FE',
+            'altura_valor': '1050',
+            'direccion_nomenclatura': 'SANTA FE 1050, Comuna 1, Ciudad '
+                                      'Autónoma de Buenos Aires',
+            'calle_cruce_1_nombre': '',
+            'calle_cruce_1_id': '',
+            'calle_cruce_2_nombre': '',
+            'calle_cruce_2_id': ''
+        }])
+
+    def test_invalid_rows(self):
+        """Las filas sin una dirección válida deberían tener sus columnas
+        agregadas vacías, sin afectar al resto de las filas."""
+        resp = self.post_csv([
+            ['domicilio', 'otro'],
+            ['', 'a'],
+            ['Santa Fe 1050'],
+            ['Santa Fe 1050', 'b']
+        ], {'columna_direccion': 'domicilio'})
+        rows = self.read_rows(resp)
+
+        self.assertTrue(
+            len(rows) == 3 and
+            rows[0]['otro'] == 'a' and not rows[0]['calle_id'] and
+            rows[1]['otro'] == '' and rows[1]['calle_id'] and
+            rows[2]['otro'] == 'b' and rows[2]['calle_id'])
+
+    def test_windowed_execution(self):
+        """Las filas deberían ser normalizadas en ventanas de
+        BULK_CSV_WINDOW_LEN filas."""
+        with mock.patch('service.constants.BULK_CSV_WINDOW_LEN', 2):
+            resp = self.post_csv([['domicilio']] + [['Santa Fe 1050']] * 5,
+                                 {'columna_direccion': 'domicilio'})
+            rows = self.read_rows(resp)
+
+        self.assertTrue(len(rows) == 5 and
+                        self.es.return_value.msearch.call_count == 3)
+
+    def test_missing_column(self):
+        """Se debería devolver un error si una columna especificada no existe
+        en el CSV."""
+        resp = self.post_csv([['domicilio'], ['Santa Fe 1050']],
+                             {'columna_direccion': 'domicilio',
+                              'columna_provincia': 'provincia'})
+
+        self.assertTrue(resp.status_code == 400 and
+                        resp.json['errores'][0]['nombre_parametro'] ==
+                        'columna_provincia')
+
+    def test_address_column_required(self):
+        """El parámetro 'columna_direccion' debería ser obligatorio."""
+        resp = self.post_csv([['domicilio'], ['Santa Fe 1050']])
+        self.assertEqual(resp.status_code, 400)
+
+    def test_invalid_content(self):
+        """Solo se debería aceptar contenido CSV no vacío."""
+        statuses = [
+            self.post_csv([['domicilio']], {'columna_direccion': 'domicilio'},
+                          content_type='application/json').status_code,
+            self.post_csv([], {'columna_direccion': 'domicilio'}).status_code
+        ]
+
+        self.assertListEqual(statuses, [400, 400])
+
+    def test_invalid_content_mid_stream(self):
+        """Si el contenido tiene un byte inválido cerca del final, las filas
+        anteriores deberían ser normalizadas, y la respuesta debería
+        finalizar con una fila de error."""
+        body = b'id,domicilio\n' + b''.join(
+            '{},Santa Fe 1050\n'.format(i).encode() for i in range(20000))
+        body += b'20000,Santa Fe \xff\n20001,Santa Fe 1050\n'
+
+        resp = self.app.post('/api/direcciones/csv',
+                             query_string={'columna_direccion': 'domicilio'},
+                             data=body, content_type='text/csv')
+        rows = list(csv.reader(io.StringIO(resp.data.decode())))
+
+        self.assertTrue(
+            resp.status_code == 200 and
+            rows[-1] == ['errores', strings.CSV_INVALID_CONTENT] and
+            all(row[0] != '20000' for row in rows) and
+            len(rows) > 10000, rows[-3:])
+
+    def test_connection_error_mid_stream(self):
+        """Si ocurre un error de conexión con Elasticsearch luego de enviar
+        los encabezados, la respuesta debería finalizar con una fila de
+        error."""
+        msearch = self.es.return_value.msearch.side_effect
+        self.es.return_value.msearch.side_effect = [
+            msearch(body=[{}, {}] * 2),
+            elasticsearch.ElasticsearchException()
+        ]
+
+        with mock.patch('service.constants.BULK_CSV_WINDOW_LEN', 2):
+            resp = self.post_csv([['domicilio']] + [['Santa Fe 1050']] * 4,
+                                 {'columna_direccion': 'domicilio'})
+            rows = list(csv.reader(io.StringIO(resp.data.decode())))
+
+        self.assertTrue(resp.status_code == 200 and len(rows) == 4 and
+                        rows[-1] == ['errores', strings.INTERNAL_ERROR],
+                        rows)
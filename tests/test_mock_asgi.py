@@ -0,0 +1,188 @@
+import asyncio
+import json
+import threading
+from unittest import mock
+from service import app as flask_app
+from service import data
+from service.asgi import GeorefASGIApp
+from . import GeorefMockTest
+
+STATE = {'id': '02', 'nombre': 'CIUDAD AUTÓNOMA DE BUENOS AIRES'}
+
+
+class AsyncElasticsearchMock:
+    """Simula una conexión asincrónica a Elasticsearch. Si se especifica
+    'wait_for', cada consulta espera a que haya 'wait_for' consultas en curso
+    antes de responder."""
+
+    def __init__(self, wait_for=None):
+        self.msearch_calls = 0
+        self.closed = False
+        self.wait_for = wait_for
+        self.all_pending = None
+
+    async def msearch(self, body=None, **_):
+        self.msearch_calls += 1
+        await asyncio.sleep(0)
+
+        if self.wait_for:
+            if self.all_pending is None:
+                self.all_pending = asyncio.Event()
+            if self.msearch_calls == self.wait_for:
+                self.all_pending.set()
+
+            await asyncio.wait_for(self.all_pending.wait(), 5)
+
+        return {
+            'responses': [{
+                'hits': {
+                    'hits': [{'_source': dict(STATE)}],
+                    'total': {'value': 1, 'relation': 'eq'}
+                }
+            } for _ in body[1::2]]
+        }
+
+    async def close(self):
+        self.closed = True
+
+
+async def asgi_request(asgi_app, method, path, query_string=b'', body=b''):
+    """Envía una request HTTP a una aplicación ASGI, y retorna el código y el
+    cuerpo de la respuesta. Si 'body' es una lista, cada elemento se envía en
+    un mensaje ASGI distinto."""
+    messages = []
+    scope = {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'query_string': query_string,
+        'headers': [(b'content-type', b'application/json')],
+        'server': ('localhost', 8000)
+    }
+
+    chunks = list(body) if isinstance(body, list) else [body]
+
+    async def receive():
+        await asyncio.sleep(0)
+        chunk = chunks.pop(0)
+        return {'type': 'http.request', 'body': chunk,
+                'more_body': bool(chunks)}
+
+    async def send(message):
+        messages.append(message)
+
+    await asgi_app(scope, receive, send)
+
+    status = messages[0]['status']
+    content = b''.join(message.get('body', b'') for message in messages[1:])
+    return status, json.loads(content.decode())
+
+
+class ASGITest(GeorefMockTest):
+    def setUp(self):
+        super().setUp()
+        self.es_async = AsyncElasticsearchMock()
+        self.patcher_async = mock.patch(
+            'service.data.async_elasticsearch_connection',
+            return_value=self.es_async)
+        self.patcher_async.start()
+
+    def tearDown(self):
+        self.patcher_async.stop()
+        super().tearDown()
+
+    def run_requests(self, *requests, threads=2):
+        async def run():
+            asgi_app = GeorefASGIApp(flask_app, max_requests=16,
+                                     threads=threads)
+            results = await asyncio.gather(*[
+                asgi_request(asgi_app, *request) for request in requests
+            ])
+            await asgi_app._shutdown()  # pylint: disable=protected-access
+            return results
+
+        return asyncio.run(run())
+
+    def test_get_same_as_wsgi(self):
+        """Una request GET vía ASGI debería devolver el mismo resultado que
+        vía WSGI."""
+        self.set_msearch_results([STATE])
+        expected = self.get_response(endpoint='/api/provincias',
+                                     params={'id': '02'},
+                                     return_value='full')
+
+        [(status, resp)] = self.run_requests(
+            ('GET', '/api/provincias', b'id=02'))
+
+        self.assertTrue(status == 200 and resp == expected, resp)
+
+    def test_async_connection_used(self):
+        """Las búsquedas deberían ser enviadas utilizando la conexión
+        asincrónica, y nunca la sincrónica."""
+        self.run_requests(('GET', '/api/v1.0/provincias', b'id=02'))
+
+        self.assertTrue(self.es_async.msearch_calls == 1 and
+                        not self.es.return_value.msearch.called)
+
+    def test_concurrent_requests(self):
+        """Varias requests simultáneas (GET y POST) deberían ser procesadas
+        correctamente."""
+        body = json.dumps({
+            'provincias': [{'id': '02'}, {'id': '02', 'max': 2}]
+        }).encode()
+
+        results = self.run_requests(
+            ('GET', '/api/provincias', b'id=02'),
+            ('POST', '/api/provincias', b'', body),
+            ('GET', '/api/v1.0/provincias', b'id=02'),
+        )
+
+        self.assertTrue(all(status == 200 for status, _ in results) and
+                        len(results[1][1]['resultados']) == 2 and
+                        self.es_async.closed)
+
+    def test_streamed_body(self):
+        """Una request POST con su cuerpo dividido en varios mensajes ASGI (y
+        sin 'Content-Length') debería ser procesada correctamente."""
+        body = json.dumps({
+            'provincias': [{'id': '02'}, {'id': '02', 'max': 2}]
+        }).encode()
+        chunks = [body[i:i + 7] for i in range(0, len(body), 7)]
+
+        [(status, resp)] = self.run_requests(
+            ('POST', '/api/provincias', b'', chunks))
+
+        self.assertTrue(status == 200 and len(resp['resultados']) == 2, resp)
+
+    def test_requests_share_threads(self):
+        """Un único thread de trabajo debería poder mantener varias
+        requests esperando respuestas de Elasticsearch a la vez."""
+        self.es_async.wait_for = 8
+
+        results = self.run_requests(
+            *[('GET', '/api/provincias', b'id=02')] * 8, threads=1)
+
+        self.assertTrue(all(status == 200 for status, _ in results) and
+                        self.es_async.msearch_calls == 8)
+
+    def test_search_steps_outside_loop(self):
+        """Los iteradores de pasos y la preparación de las búsquedas no
+        deberían ejecutarse en el thread del event loop."""
+        threads = set()
+        canonical_search = data._CanonicalSearch
+
+        def record_thread(search):
+            threads.add(threading.get_ident())
+            return canonical_search(search)
+
+        async def run():
+            loop_thread = threading.get_ident()
+            asgi_app = GeorefASGIApp(flask_app)
+            await asgi_request(asgi_app, 'GET', '/api/provincias', b'id=02')
+            await asgi_app._shutdown()  # pylint: disable=protected-access
+            return loop_thread
+
+        with mock.patch('service.data._CanonicalSearch', record_thread):
+            loop_thread = asyncio.run(run())
+
+        self.assertTrue(threads and loop_thread not in threads)
@@ -0,0 +1,99 @@
+from unittest import mock
+from service import params
+from service.params import ParametersParseException
+from . import GeorefMockTest
+
+ENDPOINTS = [
+    params.PARAMS_STATES,
+    params.PARAMS_DEPARTMENTS,
+    params.PARAMS_MUNICIPALITIES,
+    params.PARAMS_CENSUS_LOCALITIES,
+    params.PARAMS_SETTLEMENTS,
+    params.PARAMS_LOCALITIES,
+    params.PARAMS_ADDRESSES,
+    params.PARAMS_STREETS,
+    params.PARAMS_LOCATION
+]
+
+ENTRIES = [
+    {},
+    {'nombre': 'santa fe'},
+    {'id': '02', 'max': '10', 'inicio': 5},
+    {'max': 'foobar', 'campos': 'completo'},
+    {'max': 4000, 'inicio': 9000},
+    {'orden': 'foo', 'exacto': 'si', 'aplanar': None},
+    {'direccion': 'Santa Fe 1050', 'provincia': 'caba', 'foo': 'bar'},
+    {'direccion': '', 'max': 0, 'bar': 1, 'foo': 2},
+    {'lat': '-34.6', 'lon': '-58.4', 'campos': 'basico'},
+    {'lat': 'x', 'lon': None, 'interseccion': 'provincia:02'}
+]
+
+
+def errors_summary(errors):
+    return [
+        (name, error.error_type, error.message, error.source, error.help)
+        for name, error in errors.items()
+    ]
+
+
+class BodyParamsParserTest(GeorefMockTest):
+    def generic_parse(self, endpoint, entry):
+        try:
+            result = endpoint._parse_params_dict(endpoint._post_body_params,
+                                                 entry, 'body')
+            return result, {}
+        except ParametersParseException as e:
+            return None, e.errors
+
+    def test_same_results(self):
+        """El parser de consultas generado para cada endpoint debería
+        devolver los mismos valores y errores que el parseo genérico de
+        parámetros."""
+        for endpoint in ENDPOINTS:
+            for entry in ENTRIES:
+                result, errors = endpoint.parse_bulk_entry(entry, 'body')
+                expected, expected_errors = self.generic_parse(endpoint,
+                                                               entry)
+
+                with self.subTest(entry=entry):
+                    self.assertEqual(errors_summary(errors),
+                                     errors_summary(expected_errors))
+                    if expected:
+                        self.assertTrue(
+                            result.values == expected.values and
+                            result.received_values() ==
+                            expected.received_values())
+
+    def test_identical_entries_memoized(self):
+        """Las consultas idénticas de una request POST deberían ser parseadas
+        una única vez."""
+        body = {'provincias': [{'nombre': 'cordoba', 'max': 2}] * 5 +
+                              [{'nombre': 'salta', 'max': 2}]}
+
+        with mock.patch.object(params.StrParameter, 'get_value',
+                               autospec=True,
+                               side_effect=lambda _, val, __: val) as \
+                get_value:
+            results = params.PARAMS_STATES.parse_post_params(
+                {}, body, 'provincias')
+
+        self.assertTrue(
+            get_value.call_count == 2 and
+            len(results) == 6 and
+            len(set(map(id, results))) == 6 and
+            [result.values['nombre'] for result in results] ==
+            ['cordoba'] * 5 + ['salta'])
+
+    def test_identical_entries_errors(self):
+        """Los errores de consultas idénticas deberían ser reportados en
+        cada una de ellas."""
+        body = {'provincias': [{'max': 'foo'}, {'nombre': 'salta'},
+                               {'max': 'foo'}]}
+
+        with self.assertRaises(ParametersParseException) as context:
+            params.PARAMS_STATES.parse_post_params({}, body, 'provincias')
+
+        errors = context.exception.errors
+        self.assertTrue(list(errors[0]) == ['max'] and not errors[1] and
+                        list(errors[2]) == ['max'] and
+                        errors[0] is not errors[2])
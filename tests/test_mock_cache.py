@@ -0,0 +1,144 @@
+from service.cache import LFUCache, LRUCache, TinyLFUCache, create_cache
+from . import GeorefMockTest
+
+DEFAULT_SIZE = 10
+
+
+class LFUCacheTest(GeorefMockTest):
+    def setUp(self):
+        self.lfu_dict = LFUCache(DEFAULT_SIZE)
+        super().setUp()
+
+    def test_insert_read(self):
+        """Los diccionarios LFU deberían aceptar las operaciones de
+        inserción y consulta."""
+        self.lfu_dict['foo'] = 'bar'
+        self.lfu_dict['test'] = 'working'
+
+        self.assertTrue(self.lfu_dict['foo'] == 'bar' and
+                        self.lfu_dict['test'] == 'working', self.lfu_dict)
+
+    def test_contains(self):
+        """Los diccionarios LFU deberían aceptar la operación de consulta de
+        presencia de una key."""
+        self.lfu_dict['foo'] = 'bar'
+
+        self.assertTrue('foo' in self.lfu_dict, self.lfu_dict)
+
+    def test_len(self):
+        """Los diccionarios LFU deberían aceptar la operación de consulta de
+        cantidad de ítems."""
+        self.lfu_dict['foo'] = 'bar'
+        self.lfu_dict['test'] = 'working'
+        self.lfu_dict['baz'] = 'qux'
+
+        self.assertEqual(len(self.lfu_dict), 3, self.lfu_dict)
+
+    def test_max_len(self):
+        """Los diccionarios LFU nunca deberían tener más ítems que 'size'."""
+        for i in range(DEFAULT_SIZE + 10):
+            self.lfu_dict['key{}'.format(i)] = i
+
+        self.assertEqual(len(self.lfu_dict), DEFAULT_SIZE, self.lfu_dict)
+
+    def test_key_deleted_score_0(self):
+        """Los diccionarios LFU deberían eliminar las keys menos utilizadas."""
+        lfu_dict = LFUCache(2)
+        lfu_dict['foo'] = 'foo'
+        lfu_dict['bar'] = 'bar'
+        lfu_dict['quux'] = 'quux'
+        lfu_dict['quux']  # pylint: disable=pointless-statement
+        lfu_dict['quuz'] = 'quuz'
+
+        self.assertTrue('foo' not in lfu_dict and 'bar' not in lfu_dict,
+                        lfu_dict)
+
+    def test_key_deleted(self):
+        """Los diccionarios LFU deberían eliminar las keys menos utilizadas,
+        incluso cuando todas las keys fueron accedidas una vez o más."""
+        lfu_dict = LFUCache(2)
+        lfu_dict['foo'] = 'foo'
+        for _ in range(3):
+            lfu_dict['foo']  # pylint: disable=pointless-statement
+
+        lfu_dict['bar'] = 'bar'
+        for _ in range(4):
+            lfu_dict['bar']  # pylint: disable=pointless-statement
+
+        lfu_dict['quuz'] = 'quuz'
+
+        self.assertTrue('foo' not in lfu_dict and 'bar' in lfu_dict,
+                        lfu_dict)
+
+    def test_counters(self):
+        """Los caches deberían contar consultas exitosas, fallidas y
+        desalojos."""
+        lfu_dict = LFUCache(1)
+        lfu_dict['foo'] = 'foo'
+        lfu_dict['foo']  # pylint: disable=pointless-statement
+        'bar' in lfu_dict  # pylint: disable=pointless-statement
+        lfu_dict['bar'] = 'bar'
+
+        self.assertDictEqual(lfu_dict.stats(), {
+            'size': 1,
+            'len': 1,
+            'hits': 1,
+            'misses': 1,
+            'evictions': 1
+        })
+
+
+class LRUCacheTest(GeorefMockTest):
+    def test_key_deleted(self):
+        """Los caches LRU deberían eliminar las keys utilizadas hace más
+        tiempo."""
+        cache = LRUCache(2)
+        cache['foo'] = 'foo'
+        cache['bar'] = 'bar'
+        cache['foo']  # pylint: disable=pointless-statement
+        cache['quuz'] = 'quuz'
+
+        self.assertTrue('foo' in cache and 'bar' not in cache and
+                        cache.evictions == 1, cache)
+
+
+class TinyLFUCacheTest(GeorefMockTest):
+    def test_frequent_keys_kept(self):
+        """Los caches W-TinyLFU no deberían desalojar las keys utilizadas
+        frecuentemente al recorrer muchas keys utilizadas una única vez."""
+        cache = TinyLFUCache(100)
+        for i in range(50):
+            cache[i] = i
+            for _ in range(3):
+                cache[i]  # pylint: disable=pointless-statement
+
+        for i in range(1000, 2000):
+            cache[i] = i
+
+        self.assertTrue(all(i in cache for i in range(50)) and
+                        len(cache) == 100, cache)
+
+    def test_max_len(self):
+        """Los caches W-TinyLFU nunca deberían tener más ítems que
+        'size'."""
+        cache = TinyLFUCache(3)
+        for i in range(20):
+            cache[i] = i
+            cache.get(i % 4)
+
+        self.assertTrue(len(cache) == 3 and
+                        cache.evictions == 17, cache)
+
+
+class CreateCacheTest(GeorefMockTest):
+    def test_policies(self):
+        """Se debería crear un cache de acuerdo a la política indicada."""
+        self.assertListEqual(
+            [type(create_cache(policy, 10))
+             for policy in ['lfu', 'lru', 'tinylfu']],
+            [LFUCache, LRUCache, TinyLFUCache])
+
+    def test_invalid_policy(self):
+        """Se debería lanzar un error si la política no existe."""
+        with self.assertRaises(ValueError):
+            create_cache('fifo', 10)
@@ -1,4 +1,10 @@
+import json
 import random
+import re
+import time
+from unittest import mock
+from service import app, data
+from service import names as N
 from . import GeorefMockTest
 
 
@@ -21,3 +27,147 @@ class DataMockTest(GeorefMockTest):
         )
 
         self.assertEqual(resp['inicio'], offset)
+
+    def test_concurrent_multisearch_order(self):
+        """Las respuestas de consultas MultiSearch ejecutadas en paralelo
+        deberían ser devueltas en el orden original."""
+        ids = ['{:02}'.format(i) for i in range(2, 40, 2)]
+
+        def msearch(body=None, **_):
+            # Demorar más las primeras consultas, para que terminen después
+            # que las últimas.
+            time.sleep(0.05 / len(msearch_ids))
+            responses = []
+
+            for search in body[1::2]:
+                entity_id = re.search(r'"id": \["(\d+)"\]',
+                                      json.dumps(search)).group(1)
+                msearch_ids.append(entity_id)
+                responses.append({
+                    'hits': {
+                        'hits': [{'_source': {'id': entity_id}}],
+                        'total': {'value': 1, 'relation': 'eq'}
+                    }
+                })
+
+            return {'responses': responses}
+
+        msearch_ids = ['']
+        self.es.return_value.msearch.side_effect = msearch
+
+        with mock.patch('service.constants.ES_MULTISEARCH_MAX_LEN', 3), \
+                mock.patch('service.constants.ES_MULTISEARCH_CONCURRENCY', 4):
+            resp = self.get_response(method='POST', body={
+                'provincias': [{'id': entity_id, 'campos': 'id'}
+                               for entity_id in ids]
+            }, endpoint='/api/provincias')
+
+        self.assertListEqual([result['provincias'][0]['id']
+                              for result in resp], ids)
+
+    def test_duplicate_searches_collapsed(self):
+        """Las búsquedas idénticas de una misma consulta bulk deberían ser
+        enviadas una sola vez a Elasticsearch, y su respuesta debería ser
+        utilizada para cada una de ellas."""
+        searches_sent = []
+
+        def msearch(body=None, **_):
+            responses = []
+
+            for search in body[1::2]:
+                entity_id = re.search(r'"id": \["(\d+)"\]',
+                                      json.dumps(search)).group(1)
+                searches_sent.append(entity_id)
+                responses.append({
+                    'hits': {
+                        'hits': [{'_source': {'id': entity_id,
+                                              'nombre': 'N' + entity_id}}],
+                        'total': {'value': 1, 'relation': 'eq'}
+                    }
+                })
+
+            return {'responses': responses}
+
+        self.es.return_value.msearch.side_effect = msearch
+        ids = ['02', '06', '02', '02', '06']
+
+        resp = self.get_response(method='POST', body={
+            'provincias': [{'id': entity_id, 'campos': 'id,nombre'}
+                           for entity_id in ids]
+        }, endpoint='/api/provincias')
+
+        self.assertListEqual(sorted(searches_sent), ['02', '06'])
+        self.assertListEqual([result['provincias'] for result in resp], [
+            [{'id': entity_id, 'nombre': 'N' + entity_id}]
+            for entity_id in ids
+        ])
+
+    def test_multisearch_filter_path(self):
+        """Las consultas MultiSearch deberían solicitar solo los campos
+        necesarios de cada respuesta vía 'filter_path'."""
+        self.set_msearch_results([{'id': '02', 'nombre': 'CABA'}])
+        self.get_response(params={'id': '02'}, endpoint='/api/provincias',
+                          entity='provincias')
+
+        _, kwargs = self.es.return_value.msearch.call_args
+        filter_path = kwargs['params']['filter_path'].split(',')
+
+        self.assertTrue('responses.hits.hits._source' in filter_path and
+                        'responses.hits.total' in filter_path)
+
+    def test_filtered_response_without_hits(self):
+        """Una respuesta sin documentos (donde Elasticsearch omite
+        'hits.hits' al utilizar 'filter_path') debería devolver una lista
+        vacía de resultados."""
+        self.es.return_value.msearch.return_value = {
+            'responses': [{'hits': {'total': {'value': 0,
+                                              'relation': 'eq'}}}]
+        }
+
+        resp = self.get_response(params={'nombre': 'xyz'},
+                                 endpoint='/api/provincias',
+                                 entity='provincias', return_value='full')
+
+        self.assertTrue(resp['provincias'] == [] and resp['total'] == 0)
+
+    def msearch_indices(self):
+        return [
+            [header['index'][0] for header in call[1]['body'][::2]]
+            for call in self.es.return_value.msearch.call_args_list
+        ]
+
+    def test_intersection_ids_same_round(self):
+        """Los IDs de todos los tipos de entidades del parámetro
+        'interseccion' deberían ser validados en la misma ronda."""
+        self.set_msearch_results([{'id': '06', 'nombre': 'BUENOS AIRES'}])
+        self.get_response(params={
+            'interseccion': 'departamento:06588,municipio:060588'
+        }, endpoint='/api/provincias', entity='provincias')
+
+        indices = self.msearch_indices()
+        self.assertTrue(len(indices) == 2 and
+                        sorted(indices[0]) == ['departamentos',
+                                               'municipios'] and
+                        indices[1] == ['provincias'])
+
+    def test_nested_steps_flat_rounds(self):
+        """Las búsquedas anidadas de distintos iteradores de pasos deberían
+        compartir rondas, sin esperar a que finalicen las búsquedas de los
+        demás iteradores."""
+        self.set_msearch_results([{'id': '06'}])
+
+        def nested_steps():
+            # Requiere dos rondas: validación de IDs y búsqueda principal.
+            yield data.StatesSearch({
+                'geo_shape_ids': {N.DEPARTMENTS: ['06588']}
+            })
+
+        def sequential_steps():
+            yield data.MunicipalitiesSearch({'ids': ['060588']})
+            yield data.DepartmentsSearch({'ids': ['06588']})
+
+        with app.app_context():
+            stats = data.run_search_steps(self.es.return_value,
+                                          [nested_steps(), sequential_steps()])
+
+        self.assertTrue(stats.rounds == 2 and stats.searches == 4)
@@ -1,3 +1,4 @@
+import copy
 from service import formatter
 from . import GeorefMockTest
 
@@ -151,3 +152,88 @@ class FormattingTest(GeorefMockTest):
                                  entity='provincias')
 
         self.assertEqual(resp.tag, 'georef-ar-api')
+
+
+ENTITY = {
+    'simple': 'foo',
+    'removed': 'foo',
+    'nested': {
+        'field1': 'foo',
+        'removed': 'foo',
+        'nested2': {
+            'field1': 'foo',
+            'removed': 'foo'
+        }
+    },
+    'centroide': {'lat': -34.6, 'lon': -58.4},
+    'last': 'bar'
+}
+
+FIELDS = (
+    'simple',
+    'nested.field1',
+    'nested.nested2.field1',
+    'centroide',
+    'last'
+)
+
+
+class ProjectorTest(GeorefMockTest):
+    def filter_and_flatten(self, flatten):
+        result = copy.deepcopy(ENTITY)
+        formatter.filter_result_fields(result,
+                                       formatter.fields_list_to_dict(FIELDS))
+        if flatten:
+            formatter.flatten_dict(result)
+
+        return result
+
+    def test_same_as_filter_and_flatten(self):
+        """La proyección de una entidad debería ser idéntica (incluyendo el
+        orden de las keys) a filtrar sus campos y luego aplanarla."""
+        for flatten in [False, True]:
+            projector = formatter.get_projector('test', FIELDS, flatten)
+            projected = projector.project(ENTITY)
+            expected = self.filter_and_flatten(flatten)
+
+            with self.subTest(flatten=flatten):
+                self.assertEqual(list(projected.items()),
+                                 list(expected.items()))
+
+    def test_entity_not_modified(self):
+        """La proyección no debería modificar la entidad original."""
+        original = copy.deepcopy(ENTITY)
+        formatter.get_projector('test', FIELDS, True).project(ENTITY)
+
+        self.assertEqual(ENTITY, original)
+
+    def test_projector_cached(self):
+        """Se debería crear un único objeto de proyección por endpoint, lista
+        de campos y valor de 'aplanar'."""
+        projector = formatter.get_projector('test', list(FIELDS), True)
+
+        self.assertTrue(
+            projector is formatter.get_projector('test', FIELDS, True) and
+            projector is not formatter.get_projector('test', FIELDS, False))
+
+    def test_sub_fields_non_dict(self):
+        """Se debería lanzar un error si se especifican subcampos de un valor
+        que no es un diccionario."""
+        projector = formatter.get_projector('test', ('simple.foo',))
+
+        with self.assertRaises(ValueError):
+            projector.project(ENTITY)
+
+    def test_csv_row(self):
+        """Los valores de las columnas CSV deberían ser obtenidos de la
+        entidad sin aplanar, en el orden de las columnas."""
+        projector = formatter.get_projector(
+            'provincias', ('id', 'centroide.lon', 'centroide.lat'))
+        row = projector.csv_row({'id': '02', 'nombre': 'CABA',
+                                 'centroide': {'lat': 1, 'lon': 2}})
+
+        self.assertTrue(
+            projector.csv_field_names == ['provincia_id',
+                                          'provincia_centroide_lat',
+                                          'provincia_centroide_lon'] and
+            row == ['02', 1, 2])
@@ -0,0 +1,57 @@
+from unittest import mock
+from service import geometry
+from service.geometry import Point
+from . import GeorefMockTest
+
+POINTS_A = [Point(-58.38, -34.59), Point(-64.18, -31.42), Point(0, 0)]
+POINTS_B = [Point(-58.381, -34.595), Point(-68.84, -32.89), Point(0, 0)]
+
+
+class GeometryBatchTest(GeorefMockTest):
+    def without_numpy(self, function, *args):
+        with mock.patch('service.geometry.numpy', None):
+            return function(*args)
+
+    def assert_coords_almost_equal(self, coords_a, coords_b):
+        self.assertEqual(len(coords_a), len(coords_b))
+
+        for coord_a, coord_b in zip(coords_a, coords_b):
+            for value_a, value_b in zip(coord_a, coord_b):
+                self.assertAlmostEqual(value_a, value_b, places=9)
+
+    def test_distances_without_numpy(self):
+        """Las distancias calculadas deberían ser iguales con y sin
+        NumPy."""
+        distances = geometry.approximate_distances_meters(POINTS_A, POINTS_B)
+        fallback = self.without_numpy(geometry.approximate_distances_meters,
+                                      POINTS_A, POINTS_B)
+
+        self.assert_coords_almost_equal([distances], [fallback])
+
+    def test_midpoints_without_numpy(self):
+        """Los puntos medios calculados deberían ser iguales con y sin
+        NumPy."""
+        points = geometry.midpoints(POINTS_A, POINTS_B)
+        fallback = self.without_numpy(geometry.midpoints, POINTS_A, POINTS_B)
+
+        self.assert_coords_almost_equal(
+            [(point.lon, point.lat) for point in points],
+            [(point.lon, point.lat) for point in fallback])
+
+    def test_circles_without_numpy(self):
+        """Los círculos GeoJSON generados deberían ser iguales con y sin
+        NumPy."""
+        circles = geometry.geojson_circles(POINTS_A, 50)
+        fallback = self.without_numpy(geometry.geojson_circles, POINTS_A, 50)
+
+        for circle, fallback_circle in zip(circles, fallback):
+            self.assertEqual(circle['type'], fallback_circle['type'])
+            self.assert_coords_almost_equal(circle['coordinates'][0],
+                                            fallback_circle['coordinates'][0])
+
+    def test_empty_lists(self):
+        """Las funciones deberían aceptar listas vacías."""
+        self.assertTrue(
+            geometry.approximate_distances_meters([], []) == [] and
+            geometry.midpoints([], []) == [] and
+            geometry.geojson_circles([], 50) == [])
@@ -0,0 +1,249 @@
+import json
+import os
+import tempfile
+import time
+from unittest import mock
+import elasticsearch
+from flask import current_app
+from service import app, constants, jobs, normalizer
+from . import GeorefMockTest
+
+
+class AddressJobsTest(GeorefMockTest):
+    def setUp(self):
+        super().setUp()
+        self.set_msearch_results([])
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config_patcher = mock.patch.dict(app.config, {
+            'JOBS_DIR': self.tmp_dir.name,
+            'JOBS_WORKERS': 0
+        })
+        self.config_patcher.start()
+
+    def tearDown(self):
+        with app.app_context():
+            for attr in ['job_store', 'job_workers']:
+                if hasattr(current_app, attr):
+                    delattr(current_app, attr)
+
+        self.config_patcher.stop()
+        self.tmp_dir.cleanup()
+        super().tearDown()
+
+    def post_job(self, body, content_type='application/x-ndjson',
+                 url='/api/direcciones/trabajos'):
+        return self.app.post(url, data=body.encode(),
+                             content_type=content_type)
+
+    def post_ndjson_job(self, queries):
+        return self.post_job('\n'.join(json.dumps(q) for q in queries))
+
+    def run_jobs(self, window_len=None):
+        with app.app_context():
+            worker = jobs.JobWorker(jobs.get_job_store(),
+                                    normalizer.process_address_job_window,
+                                    window_len or constants.JOBS_WINDOW_LEN)
+            return worker.run_pending()
+
+    def read_lines(self, resp):
+        return [json.loads(line) for line in resp.data.splitlines()]
+
+    def get_results(self, job_id):
+        with self.app.get(
+                '/api/direcciones/trabajos/{}/resultados'.format(job_id)
+        ) as resp:
+            return resp.mimetype, self.read_lines(resp)
+
+    def test_create_job(self):
+        """Al crear un trabajo se debería devolver su estado y la URL donde
+        consultarlo."""
+        resp = self.post_ndjson_job([{'direccion': 'Santa Fe 1000'}] * 3)
+        job = resp.json['trabajo']
+
+        self.assertTrue(
+            resp.status_code == 202 and
+            resp.headers['Location'].endswith(
+                '/api/direcciones/trabajos/' + job['id']) and
+            job['estado'] == 'pendiente' and job['total'] == 3 and
+            job['procesadas'] == 0)
+
+    def test_job_results(self):
+        """Los resultados de un trabajo deberían ser iguales a los de la
+        misma consulta NDJSON bulk."""
+        queries = [
+            {'direccion': 'Santa Fe 1000'},
+            {'direccion': 'Corrientes 1000', 'provincia': '02'},
+            {'max': 0},
+            {'direccion': 'Mitre 100', 'aplanar': True}
+        ]
+        job_id = self.post_ndjson_job(queries).json['trabajo']['id']
+        self.run_jobs()
+
+        status = self.app.get('/api/direcciones/trabajos/' + job_id)
+        mimetype, lines = self.get_results(job_id)
+        bulk = self.post_job('\n'.join(json.dumps(q) for q in queries),
+                             url='/api/direcciones')
+
+        self.assertTrue(
+            status.json['trabajo']['estado'] == 'finalizado' and
+            status.json['trabajo']['procesadas'] == 4 and
+            mimetype == 'application/x-ndjson' and len(lines) == 4 and
+            lines == self.read_lines(bulk))
+
+    def test_csv_job(self):
+        """Se deberían aceptar trabajos con contenido CSV, utilizando la
+        primera fila como nombres de parámetros."""
+        body = ('direccion,provincia\n'
+                'Santa Fe 1000,02\n'
+                '"Corrientes 1000, esq. Callao",\n')
+        job_id = self.post_job(body, 'text/csv').json['trabajo']['id']
+        self.run_jobs()
+
+        _, lines = self.get_results(job_id)
+        params = [line['parametros'] for line in lines]
+
+        self.assertTrue(len(lines) == 2 and
+                        params[0]['provincia'] == ['02'] and
+                        'provincia' not in params[1])
+
+    def test_windowed_execution(self):
+        """Las consultas de un trabajo deberían ser procesadas en ventanas de
+        JOBS_WINDOW_LEN consultas."""
+        self.post_ndjson_job([{'direccion': 'Santa Fe 1000'}] * 5)
+
+        with mock.patch.object(normalizer, 'process_address_job_window',
+                               wraps=normalizer.process_address_job_window
+                               ) as process_window:
+            self.run_jobs(window_len=2)
+
+        self.assertListEqual(
+            [len(call[0][0]) for call in process_window.call_args_list],
+            [2, 2, 1])
+
+    def test_results_not_finished(self):
+        """No se deberían poder descargar los resultados de un trabajo no
+        finalizado."""
+        job_id = self.post_ndjson_job([{'direccion': 'Santa Fe 1000'}]).json[
+            'trabajo']['id']
+        resp = self.app.get(
+            '/api/direcciones/trabajos/{}/resultados'.format(job_id))
+
+        self.assertEqual(resp.status_code, 409)
+
+    def test_unknown_job(self):
+        """Se debería devolver un error 404 para trabajos inexistentes."""
+        statuses = [
+            self.app.get('/api/direcciones/trabajos/' + job_id).status_code
+            for job_id in ['0' * 32, '..', 'abc']
+        ]
+
+        self.assertListEqual(statuses, [404] * 3)
+
+    def test_invalid_content_type(self):
+        """Solo se deberían aceptar trabajos con contenido NDJSON o CSV."""
+        resp = self.post_job('{"direcciones": []}', 'application/json')
+        self.assertEqual(resp.status_code, 400)
+
+    def test_max_len(self):
+        """No se deberían aceptar trabajos con más de JOBS_MAX_LEN
+        consultas."""
+        with mock.patch('service.constants.JOBS_MAX_LEN', 2):
+            resp = self.post_ndjson_job([{'direccion': 'Santa Fe 1000'}] * 3)
+
+        job_dirs = [
+            name for name in os.listdir(self.tmp_dir.name)
+            if os.path.isdir(os.path.join(self.tmp_dir.name, name))
+        ]
+
+        self.assertTrue(resp.status_code == 400 and not job_dirs)
+
+    def test_failed_job(self):
+        """Si ocurre un error inesperado al procesar un trabajo, el trabajo
+        debería finalizar con estado 'error'."""
+        job_id = self.post_ndjson_job([{'direccion': 'Santa Fe 1000'}]).json[
+            'trabajo']['id']
+
+        with mock.patch('service.normalizer.process_address_job_window',
+                        side_effect=RuntimeError()):
+            self.run_jobs()
+
+        job = self.app.get('/api/direcciones/trabajos/' + job_id).json[
+            'trabajo']
+
+        self.assertTrue(job['estado'] == 'error' and job['error'])
+
+    def test_connection_error_requeues_job(self):
+        """Si ocurre un error de conexión con Elasticsearch, el trabajo
+        debería volver a quedar pendiente, y ser completado luego."""
+        self.es.return_value.msearch.side_effect = \
+            elasticsearch.ElasticsearchException()
+
+        job_id = self.post_ndjson_job([{'direccion': 'Santa Fe 1000'}]).json[
+            'trabajo']['id']
+        processed = self.run_jobs()
+        requeued = self.app.get('/api/direcciones/trabajos/' + job_id).json[
+            'trabajo']
+
+        self.set_msearch_results([])
+        self.run_jobs()
+        finished = self.app.get('/api/direcciones/trabajos/' + job_id).json[
+            'trabajo']
+
+        self.assertTrue(processed == 0 and
+                        requeued['estado'] == 'pendiente' and
+                        not requeued['error'] and
+                        finished['estado'] == 'finalizado')
+
+    def test_purge_expired(self):
+        """Los trabajos terminados hace más de 'retention' segundos deberían
+        ser eliminados junto con sus archivos, y los demás conservados."""
+        done_id = self.post_ndjson_job([{'direccion': 'Santa Fe 1000'}]).json[
+            'trabajo']['id']
+        self.run_jobs()
+        pending_id = self.post_ndjson_job(
+            [{'direccion': 'Santa Fe 1000'}]).json['trabajo']['id']
+
+        with app.app_context():
+            store = jobs.get_job_store()
+            kept = store.purge_expired(30)
+
+            with mock.patch('time.time', return_value=time.time() + 60):
+                purged = store.purge_expired(30)
+
+            done, pending = store.get(done_id), store.get(pending_id)
+
+        self.assertTrue(kept == 0 and purged == 1 and done is None and
+                        pending is not None and
+                        not os.path.exists(os.path.join(self.tmp_dir.name,
+                                                        done_id)))
+
+    def test_no_workers_under_gevent(self):
+        """No se deberían iniciar workers de trabajos en procesos que
+        utilizan gevent."""
+        with mock.patch.dict(app.config, {'JOBS_WORKERS': 2}), \
+                mock.patch('service.jobs.gevent_monkey') as gevent_monkey, \
+                app.app_context():
+            gevent_monkey.is_module_patched.return_value = True
+            jobs.start_workers(normalizer.process_address_job_window)
+            workers = current_app.job_workers
+
+        self.assertListEqual(workers, [])
+
+    def test_requeue_stale(self):
+        """Los trabajos abandonados por su worker deberían volver a ser
+        encolados, y su worker anterior no debería poder modificarlos."""
+        self.post_ndjson_job([{'direccion': 'Santa Fe 1000'}])
+
+        with app.app_context():
+            store = jobs.get_job_store()
+            job = store.claim('worker-a')
+
+            with mock.patch('time.time', return_value=time.time() + 60):
+                requeued = store.requeue_stale(30)
+
+            claimed = store.claim('worker-b')
+            owned = store.update_progress(job['id'], 'worker-a', 1)
+
+        self.assertTrue(requeued == 1 and claimed['id'] == job['id'] and
+                        not owned)
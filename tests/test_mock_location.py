@@ -0,0 +1,80 @@
+from unittest import mock
+from service import location_index
+from . import GeorefMockTest
+
+DEPT = {
+    'id': '06588',
+    'nombre': 'NUEVE DE JULIO',
+    'fuente': 'ARBA',
+    'provincia': {'id': '06'}
+}
+
+STATE = {'id': '06', 'nombre': 'BUENOS AIRES', 'fuente': 'IGN'}
+
+MUNI = {'id': '060588', 'nombre': 'NUEVE DE JULIO', 'fuente': 'ARBA'}
+
+
+class StagedLocationTest(GeorefMockTest):
+    def setUp(self):
+        super().setUp()
+        self.searched_indices = []
+        self.es.return_value.msearch.side_effect = self.msearch
+
+    def msearch(self, body=None, **_):
+        """Simula una respuesta MultiSearch, registrando los índices
+        consultados en cada ronda."""
+        indices = [header['index'][0] for header in body[::2]]
+        self.searched_indices.append(indices)
+
+        responses = []
+        for index in indices:
+            source = self.entities.get(index)
+            hits = [{'_source': dict(source)}] if source else []
+            responses.append({
+                'hits': {
+                    'hits': hits,
+                    'total': {'value': len(hits), 'relation': 'eq'}
+                }
+            })
+
+        return {'responses': responses}
+
+    def get_location(self):
+        with mock.patch('service.constants.LOCATION_ENGINE',
+                        location_index.LOCATION_ENGINE_ES_STAGED):
+            return self.get_response(endpoint='/api/ubicacion',
+                                     entity='ubicacion',
+                                     params={'lat': -35.493, 'lon': -60.968,
+                                             'campos': 'completo'})
+
+    def test_staged_location(self):
+        """La búsqueda por etapas debería buscar departamentos, y luego la
+        provincia del departamento y municipios en una misma ronda."""
+        self.entities = {
+            'departamentos': DEPT,
+            'provincias': STATE,
+            'municipios': MUNI
+        }
+
+        resp = self.get_location()
+        self.assertListEqual(self.searched_indices, [
+            ['departamentos'], ['provincias', 'municipios']
+        ])
+        self.assertEqual(self.es.return_value.msearch.call_count, 2)
+        self.assertDictEqual(resp, {
+            'lat': -35.493,
+            'lon': -60.968,
+            'provincia': STATE,
+            'departamento': {'id': '06588', 'nombre': 'NUEVE DE JULIO',
+                             'fuente': 'ARBA'},
+            'municipio': MUNI
+        })
+
+    def test_staged_location_outside(self):
+        """La búsqueda por etapas no debería realizar más búsquedas si el
+        punto no está en ningún departamento."""
+        self.entities = {}
+
+        resp = self.get_location()
+        self.assertListEqual(self.searched_indices, [['departamentos']])
+        self.assertIsNone(resp['provincia']['id'])
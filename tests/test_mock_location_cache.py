@@ -0,0 +1,179 @@
+import json
+from unittest import mock
+from flask import current_app
+from service import app
+from service.geometry import Point
+from service.location_cache import LocationCache
+from . import GeorefMockTest
+
+ENTITIES = {
+    'provincias': {'id': '06', 'nombre': 'BUENOS AIRES', 'fuente': 'IGN'},
+    'departamentos': {'id': '06588', 'nombre': 'NUEVE DE JULIO',
+                      'fuente': 'ARBA'},
+    'municipios': {'id': '060588', 'nombre': 'NUEVE DE JULIO',
+                   'fuente': 'ARBA'}
+}
+
+
+def msearch_entities(body=None, **_):
+    """Simula una respuesta MultiSearch donde cada búsqueda retorna la entidad
+    correspondiente a su índice en 'ENTITIES'."""
+    headers = body[::2]
+    responses = []
+
+    for header in headers:
+        index = header['index'][0]
+        hits = [{'_source': dict(ENTITIES[index])}]
+        responses.append({
+            'hits': {
+                'hits': hits,
+                'total': {'value': len(hits), 'relation': 'eq'}
+            }
+        })
+
+    return {'responses': responses}
+
+
+def msearch_entities_not_contained(body=None, **_):
+    """Simula una respuesta MultiSearch donde ninguna entidad contiene
+    completamente a la celda consultada."""
+    responses = msearch_entities(body)['responses']
+
+    for search, response in zip(body[1::2], responses):
+        if '"contains"' in json.dumps(search):
+            response['hits'] = {
+                'hits': [],
+                'total': {'value': 0, 'relation': 'eq'}
+            }
+
+    return {'responses': responses}
+
+
+class LocationCacheTest(GeorefMockTest):
+    def tearDown(self):
+        with app.app_context():
+            if hasattr(current_app, 'location_cache'):
+                delattr(current_app, 'location_cache')
+
+        super().tearDown()
+
+    def test_cell_key(self):
+        """Dos puntos dentro de la misma celda deberían tener la misma
+        clave."""
+        cache = LocationCache(10, 0.01)
+        self.assertEqual(cache.cell_key(Point(-60.9681, -35.4931)),
+                         cache.cell_key(Point(-60.9689, -35.4939)))
+
+    def test_max_len(self):
+        """El cache nunca debería tener más celdas que 'size'."""
+        cache = LocationCache(2, 0.01)
+        for i in range(5):
+            cache.put((i, i), {}, {}, None)
+
+        self.assertTrue(len(cache) == 2 and cache.stats()['evictions'] == 3)
+
+    def test_lru_eviction(self):
+        """El cache debería remover la celda utilizada menos
+        recientemente."""
+        cache = LocationCache(2, 0.01)
+        cache.put((0, 0), {'id': 'a'}, {}, None)
+        cache.put((1, 1), {'id': 'b'}, {}, None)
+        cache.get((0, 0))
+        cache.put((2, 2), {'id': 'c'}, {}, None)
+
+        self.assertTrue(cache.get((0, 0)) and cache.get((1, 1)) is None)
+
+    def test_counters(self):
+        """El cache debería contar aciertos y fallos."""
+        cache = LocationCache(2, 0.01)
+        cache.get((0, 0))
+        cache.put((0, 0), {}, {}, None)
+        cache.get((0, 0))
+
+        stats = cache.stats()
+        self.assertTrue(stats['hits'] == 1 and stats['misses'] == 1)
+
+    def test_get_returns_copy(self):
+        """Modificar un resultado obtenido del cache no debería modificar el
+        contenido del cache."""
+        cache = LocationCache(2, 0.01)
+        cache.put((0, 0), {'id': '06'}, {}, None)
+        cache.get((0, 0))[0]['id'] = None
+
+        self.assertEqual(cache.get((0, 0))[0], {'id': '06'})
+
+    def test_location_cached(self):
+        """Una segunda consulta dentro de una celda comprobada no debería
+        consultar a Elasticsearch, y debería devolver el mismo resultado."""
+        self.es.return_value.msearch.side_effect = msearch_entities
+        config = {
+            'LOCATION_CACHE_SIZE': 10,
+            'LOCATION_CACHE_CELL_SIZE': 0.01
+        }
+
+        with mock.patch.dict(app.config, config):
+            resp_a = self.get_response(endpoint='/api/ubicacion',
+                                       entity='ubicacion',
+                                       params={'lat': -35.4931,
+                                               'lon': -60.9681})
+            resp_b = self.get_response(endpoint='/api/ubicacion',
+                                       entity='ubicacion',
+                                       params={'lat': -35.4939,
+                                               'lon': -60.9689})
+
+        del resp_a['lat'], resp_a['lon'], resp_b['lat'], resp_b['lon']
+        self.assertTrue(self.es.return_value.msearch.call_count == 1 and
+                        resp_a == resp_b, resp_b)
+
+    def test_uncacheable_cell_checked_once(self):
+        """Una celda que no puede ser almacenada no debería volver a ser
+        comprobada en consultas posteriores."""
+        self.es.return_value.msearch.side_effect = \
+            msearch_entities_not_contained
+        config = {
+            'LOCATION_CACHE_SIZE': 10,
+            'LOCATION_CACHE_CELL_SIZE': 0.01
+        }
+
+        with mock.patch.dict(app.config, config):
+            for _ in range(3):
+                self.get_response(endpoint='/api/ubicacion',
+                                  entity='ubicacion',
+                                  params={'lat': -35.4931, 'lon': -60.9681})
+
+            with app.app_context():
+                stats = current_app.location_cache.stats()
+
+        searches = [
+            len(call[1]['body']) // 2
+            for call in self.es.return_value.msearch.call_args_list
+        ]
+        self.assertTrue(searches == [7, 3, 3] and
+                        stats['uncacheable'] == 1 and
+                        stats['skipped_checks'] == 2, (searches, stats))
+
+    def test_cell_checked_once_per_request(self):
+        """Varias consultas de una misma request dentro de una misma celda
+        deberían comprobar la celda una sola vez."""
+        self.es.return_value.msearch.side_effect = \
+            msearch_entities_not_contained
+        config = {
+            'LOCATION_CACHE_SIZE': 10,
+            'LOCATION_CACHE_CELL_SIZE': 0.01
+        }
+        body = {
+            'ubicaciones': [
+                {'lat': -35.4931, 'lon': -60.9681},
+                {'lat': -35.4939, 'lon': -60.9689}
+            ]
+        }
+
+        with mock.patch.dict(app.config, config):
+            self.get_response(method='POST', body=body,
+                              endpoint='/api/ubicacion')
+
+        searches = sum(
+            len(call[1]['body']) // 2
+            for call in self.es.return_value.msearch.call_args_list
+        )
+        self.assertEqual(searches, 10)
@@ -0,0 +1,72 @@
+import os
+import random
+import tempfile
+from unittest import mock
+from service import location_index
+from service.geometry import Point
+from service.location_grid import LocationGrid, build_location_grid
+from service.location_index import LocationIndex
+from . import GeorefMockTest
+from .test_mock_location_index import STATES, DEPARTMENTS, MUNICIPALITIES
+
+
+class LocationGridTest(GeorefMockTest):
+    def setUp(self):
+        self.index = LocationIndex(STATES, DEPARTMENTS, MUNICIPALITIES)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.filepath = os.path.join(self.tmp_dir.name, 'grid.bin')
+        build_location_grid(self.index, self.filepath, max_depth=4)
+        self.grid = LocationGrid(self.filepath)
+        super().setUp()
+
+    def tearDown(self):
+        self.grid = None
+        self.tmp_dir.cleanup()
+        super().tearDown()
+
+    def test_grid_matches_index(self):
+        """La grilla debería devolver los mismos resultados que el índice en
+        memoria, tanto en celdas uniformes como en celdas de límite."""
+        rng = random.Random(0)
+        points = [Point(rng.uniform(-2, 22), rng.uniform(-2, 12))
+                  for _ in range(500)]
+        # Puntos sobre límites y vértices
+        points += [Point(5, 2), Point(10, 5), Point(1, 1), Point(3, 3),
+                   Point(20, 10), Point(0, 0)]
+
+        for point in points:
+            self.assertEqual(self.grid.locate(point),
+                             self.index.locate(point),
+                             (point.lon, point.lat))
+
+    def test_invalid_file(self):
+        """No se debería poder leer un archivo que no sea una grilla."""
+        filepath = os.path.join(self.tmp_dir.name, 'invalid.bin')
+        with open(filepath, 'wb') as f:
+            f.write(b'\0' * 1024)
+
+        with self.assertRaises(ValueError):
+            LocationGrid(filepath)
+
+    def test_location_endpoint_grid(self):
+        """El recurso /ubicacion debería poder utilizar la grilla para
+        resolver consultas bulk."""
+        body = {
+            'ubicaciones': [
+                {'lat': 2, 'lon': 2},
+                {'lat': 2, 'lon': 16},
+                {'lat': 50, 'lon': 50}
+            ]
+        }
+
+        with mock.patch('service.constants.LOCATION_ENGINE',
+                        location_index.LOCATION_ENGINE_GRID), \
+                mock.patch('service.location_grid.get_location_grid',
+                           return_value=self.grid):
+            resp = self.get_response(method='POST', body=body,
+                                     endpoint='/api/ubicacion')
+
+        self.assertFalse(self.es.return_value.msearch.called)
+        self.assertListEqual([
+            result['ubicacion']['municipio']['id'] for result in resp
+        ], ['020007', None, None])
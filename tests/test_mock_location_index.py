@@ -0,0 +1,117 @@
+import json
+import os
+import tempfile
+from unittest import mock
+from service import location_index
+from service.geometry import Point
+from service.location_index import LocationIndex
+from . import GeorefMockTest
+
+
+def square(x, y, size):
+    return {
+        'type': 'Polygon',
+        'coordinates': [[
+            [x, y], [x + size, y], [x + size, y + size], [x, y + size], [x, y]
+        ]]
+    }
+
+
+def entity(entity_id, name, geom):
+    return {
+        'id': entity_id,
+        'nombre': name,
+        'fuente': 'TEST',
+        'geometria': geom
+    }
+
+
+STATES = [
+    entity('02', 'PROVINCIA A', square(0, 0, 10)),
+    entity('06', 'PROVINCIA B', square(10, 0, 10))
+]
+
+DEPARTMENTS = [
+    entity('02007', 'DEPARTAMENTO A', square(0, 0, 5)),
+    entity('02014', 'DEPARTAMENTO B', square(5, 0, 5)),
+    entity('06007', 'DEPARTAMENTO C', square(10, 0, 10))
+]
+
+MUNICIPALITIES = [
+    entity('020007', 'MUNICIPIO A', square(1, 1, 2))
+]
+
+
+class LocationIndexTest(GeorefMockTest):
+    def setUp(self):
+        self.index = LocationIndex(STATES, DEPARTMENTS, MUNICIPALITIES)
+        super().setUp()
+
+    def test_locate(self):
+        """Se debería encontrar la provincia, departamento y municipio que
+        contienen un punto."""
+        state, dept, muni = self.index.locate(Point(2, 2))
+
+        self.assertEqual((state, dept, muni), (
+            {'id': '02', 'nombre': 'PROVINCIA A', 'fuente': 'TEST'},
+            {'id': '02007', 'nombre': 'DEPARTAMENTO A', 'fuente': 'TEST'},
+            {'id': '020007', 'nombre': 'MUNICIPIO A', 'fuente': 'TEST'}
+        ))
+
+    def test_locate_no_muni(self):
+        """Si el punto no está contenido en ningún municipio, se debería
+        devolver None como municipio."""
+        _, dept, muni = self.index.locate(Point(15, 5))
+        self.assertTrue(dept['id'] == '06007' and muni is None)
+
+    def test_locate_outside(self):
+        """Si el punto está fuera de todas las geometrías, se deberían
+        devolver valores None."""
+        self.assertEqual(self.index.locate(Point(-5, -5)), (None, None, None))
+
+    def test_locate_boundary_lowest_id(self):
+        """Si el punto está sobre el límite de dos geometrías, se debería
+        devolver la entidad con menor ID."""
+        _, dept, _ = self.index.locate(Point(5, 2))
+        self.assertEqual(dept['id'], '02007')
+
+    def test_from_backups(self):
+        """Se debería poder construir el índice a partir de los archivos de
+        respaldo del indexador (ignorando la línea de metadatos)."""
+        files = {
+            'provincias.ndjson': STATES,
+            'departamentos.ndjson': DEPARTMENTS,
+            'municipios.ndjson': MUNICIPALITIES
+        }
+
+        with tempfile.TemporaryDirectory() as backups_dir:
+            for filename, entities in files.items():
+                with open(os.path.join(backups_dir, filename), 'w') as f:
+                    f.write(json.dumps({'timestamp': 0}) + '\n')
+                    for item in entities:
+                        f.write(json.dumps(item) + '\n')
+
+            index = LocationIndex.from_backups(backups_dir)
+
+        self.assertEqual(index.locate(Point(2, 2)),
+                         self.index.locate(Point(2, 2)))
+
+    def test_location_endpoint_memory(self):
+        """El recurso /ubicacion debería devolver resultados idénticos a los
+        de Elasticsearch al utilizar el motor en memoria."""
+        with mock.patch('service.constants.LOCATION_ENGINE',
+                        location_index.LOCATION_ENGINE_MEMORY), \
+                mock.patch('service.location_index.get_location_index',
+                           return_value=self.index):
+            resp = self.get_response(endpoint='/api/ubicacion',
+                                     entity='ubicacion',
+                                     params={'lat': 2, 'lon': 16})
+
+        self.assertFalse(self.es.return_value.msearch.called)
+        self.assertDictEqual(resp, {
+            'lat': 2.0,
+            'lon': 16.0,
+            'provincia': {'id': '06', 'nombre': 'PROVINCIA B'},
+            'departamento': {'id': '06007', 'nombre': 'DEPARTAMENTO C'},
+            'municipio': {'id': None, 'nombre': None}
+        })
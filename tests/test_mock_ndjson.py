@@ -0,0 +1,124 @@
+import json
+import re
+from unittest import mock
+import elasticsearch
+from . import GeorefMockTest
+
+
+def searched_states(search):
+    """Retorna una provincia con el ID buscado en la búsqueda 'search'."""
+    match = re.search(r'"id": \["(\d+)"\]', json.dumps(search))
+    state_id = match.group(1) if match else '02'
+    return [{'id': state_id, 'nombre': 'N' + state_id}]
+
+
+class NDJSONBulkTest(GeorefMockTest):
+    def setUp(self):
+        super().setUp()
+        self.set_msearch_results(searched_states)
+
+    def post_ndjson(self, lines, url='/api/provincias'):
+        body = '\n'.join(
+            line if isinstance(line, str) else json.dumps(line)
+            for line in lines
+        )
+
+        return self.app.post(url, data=body.encode(),
+                             content_type='application/x-ndjson')
+
+    def read_lines(self, resp):
+        return [json.loads(line) for line in resp.data.splitlines()]
+
+    def test_results_in_order(self):
+        """Cada línea de la respuesta debería contener el resultado de la
+        consulta correspondiente, en el mismo orden."""
+        ids = ['02', '06', '10', '02', '14']
+        resp = self.post_ndjson([{'id': state_id} for state_id in ids])
+
+        self.assertTrue(
+            resp.mimetype == 'application/x-ndjson' and
+            [line['provincias'][0]['id'] for line in self.read_lines(resp)] ==
+            ids)
+
+    def test_same_results_as_json_bulk(self):
+        """Los resultados NDJSON deberían ser iguales a los resultados de la
+        misma consulta bulk JSON."""
+        queries = [{'id': '02', 'aplanar': True}, {'nombre': 'cordoba'}]
+        json_results = self.get_response(method='POST',
+                                         endpoint='/api/provincias',
+                                         body={'provincias': queries})
+
+        resp = self.post_ndjson(queries)
+
+        self.assertListEqual(self.read_lines(resp), json_results)
+
+    def test_windowed_execution(self):
+        """Las consultas deberían ser ejecutadas en ventanas de
+        BULK_NDJSON_WINDOW_LEN consultas."""
+        with mock.patch('service.constants.BULK_NDJSON_WINDOW_LEN', 2):
+            resp = self.post_ndjson([{'id': '02'}] * 5)
+            lines = self.read_lines(resp)
+
+        self.assertTrue(len(lines) == 5 and
+                        self.es.return_value.msearch.call_count == 3)
+
+    def test_invalid_lines(self):
+        """Las consultas inválidas deberían generar una línea de errores, sin
+        afectar al resto de las consultas."""
+        resp = self.post_ndjson([
+            {'id': '02'},
+            {'max': 0},
+            '{"id": "06"',
+            '',
+            '["06"]',
+            {'id': '06'}
+        ])
+        lines = self.read_lines(resp)
+
+        self.assertTrue(
+            resp.status_code == 200 and len(lines) == 5 and
+            [line['provincias'][0]['id'] for line in (lines[0], lines[4])] ==
+            ['02', '06'] and
+            all('errores' in line for line in lines[1:4]))
+
+    def test_max_len(self):
+        """Si se supera MAX_BULK_NDJSON_LEN, la última línea de la respuesta
+        debería contener un error."""
+        with mock.patch('service.constants.MAX_BULK_NDJSON_LEN', 3):
+            resp = self.post_ndjson([{'id': '02'}] * 5)
+            lines = self.read_lines(resp)
+
+        self.assertTrue(len(lines) == 4 and
+                        lines[3]['errores'][0]['codigo_interno'] == 1008)
+
+    def test_querystring_params(self):
+        """No se deberían aceptar parámetros vía querystring."""
+        resp = self.post_ndjson([{'id': '02'}], url='/api/provincias?id=02')
+        self.assertEqual(resp.status_code, 400)
+
+    def test_all_resources(self):
+        """Todos los recursos deberían aceptar consultas NDJSON."""
+        self.set_msearch_results([])
+
+        urls = ['/api/departamentos', '/api/municipios',
+                '/api/localidades-censales', '/api/asentamientos',
+                '/api/localidades', '/api/calles']
+        results = []
+        for url in urls:
+            resp = self.post_ndjson([{'nombre': 'x'}], url)
+            results.append((resp.status_code, self.read_lines(resp)))
+
+        self.assertTrue(all(
+            status == 200 and len(lines) == 1 and 'errores' not in lines[0]
+            for status, lines in results), results)
+
+    def test_internal_error(self):
+        """Si ocurre un error de conexión con Elasticsearch, la última línea
+        de la respuesta debería contener un error."""
+        self.es.return_value.msearch.side_effect = \
+            elasticsearch.ElasticsearchException()
+
+        resp = self.post_ndjson([{'id': '02'}])
+        lines = self.read_lines(resp)
+
+        self.assertTrue(len(lines) == 1 and 'errores' in lines[0])
@@ -0,0 +1,207 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from unittest import mock
+from georef_ar_address import AddressParser
+from service import params
+from service.parser_pool import AddressParserPool
+from service.shared_cache import SharedAddressCache
+from service.params import ParametersParseException
+from . import GeorefMockTest
+
+ADDRESSES = [
+    'Santa Fe 1050',
+    'Callao y Corrientes',
+    'Santa Fe entre Callao y Riobamba',
+    'Tucumán 1300 1° A',
+    '???'
+]
+
+
+GEVENT_SCRIPT = """
+from gevent import monkey
+monkey.patch_all()
+import gevent
+from service.parser_pool import AddressParserPool
+
+pool = AddressParserPool('lfu', 10, processes=2)
+parsers = [job.value for job in gevent.joinall(
+    [gevent.spawn(pool._get_parser) for _ in range(3)])]
+print(len(set(map(id, parsers))), pool._processes)
+"""
+
+
+def to_dicts(results):
+    return [
+        None if address_data is None else address_data.to_dict()
+        for address_data in results
+    ]
+
+
+class AddressParserPoolTest(GeorefMockTest):
+    def setUp(self):
+        super().setUp()
+        self.parser = AddressParser()
+
+    def expected(self, addresses):
+        return to_dicts(self.parser.parse(address) for address in addresses)
+
+    def test_parse_many(self):
+        """Los resultados de 'parse_many' deberían ser iguales a los de
+        parsear cada dirección individualmente."""
+        pool = AddressParserPool('lfu', 10)
+        results = pool.parse_many(ADDRESSES + ADDRESSES)
+
+        self.assertTrue(
+            len(results) == len(ADDRESSES) and
+            to_dicts(results[address] for address in ADDRESSES) ==
+            self.expected(ADDRESSES))
+
+    def test_parser_per_thread(self):
+        """Cada thread debería utilizar su propio parser."""
+        pool = AddressParserPool('lfu', 10)
+        parsers = []
+
+        def get_parser():
+            parsers.append(pool._get_parser())
+
+        threads = [threading.Thread(target=get_parser) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(len(set(map(id, parsers))) == 3 and
+                        pool._get_parser() is pool._get_parser())
+
+    def test_parser_per_os_thread_under_gevent(self):
+        """Bajo gevent, los greenlets de un mismo thread deberían compartir
+        su parser, y no se deberían utilizar procesos."""
+        output = subprocess.run([sys.executable, '-c', GEVENT_SCRIPT],
+                                stdout=subprocess.PIPE, check=True,
+                                timeout=60).stdout
+
+        self.assertEqual(output.split(), [b'1', b'0'])
+
+    def test_negative_processes(self):
+        """No se debería permitir una cantidad de procesos negativa."""
+        with self.assertRaises(ValueError):
+            AddressParserPool('lfu', 10, processes=-1)
+
+    def test_processes(self):
+        """Los lotes grandes de direcciones deberían ser parseados en un pool
+        de procesos, con los mismos resultados."""
+        pool = AddressParserPool('lfu', 10, processes=2, process_min_len=2)
+        results = pool.parse_many(ADDRESSES)
+        executor = pool._executor
+        executor.shutdown()
+
+        self.assertTrue(
+            executor is not None and
+            to_dicts(results[address] for address in ADDRESSES) ==
+            self.expected(ADDRESSES))
+
+    def test_small_batch_without_processes(self):
+        """Los lotes pequeños de direcciones no deberían utilizar el pool de
+        procesos."""
+        pool = AddressParserPool('lfu', 10, processes=2, process_min_len=100)
+        pool.parse_many(ADDRESSES)
+
+        self.assertIsNone(pool._executor)
+
+    def test_parse_error_omitted(self):
+        """Las direcciones cuyo parseo lanza una excepción no deberían ser
+        incluidas en los resultados de 'parse_many'."""
+        pool = AddressParserPool('lfu', 10)
+        parse = pool._get_parser().parse
+
+        def failing_parse(address):
+            if address == 'Callao y Corrientes':
+                raise RuntimeError()
+            return parse(address)
+
+        with mock.patch.object(pool._get_parser(), 'parse', failing_parse):
+            results = pool.parse_many(ADDRESSES)
+
+        self.assertTrue('Callao y Corrientes' not in results and
+                        len(results) == len(ADDRESSES) - 1)
+
+    def test_stats(self):
+        """Los contadores del pool deberían sumar los de los caches de los
+        parsers de todos los threads, y los del cache compartido."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            shared_cache = SharedAddressCache(
+                os.path.join(tmp_dir, 'cache'), 64)
+            pool = AddressParserPool('lfu', 10, shared_cache=shared_cache)
+
+            thread = threading.Thread(target=pool.parse_many,
+                                      args=(ADDRESSES,))
+            thread.start()
+            thread.join()
+
+            # Las direcciones ya están en el cache compartido: solo se
+            # utiliza el parser del thread actual para una dirección nueva.
+            pool.parse_many(ADDRESSES + ['Corrientes 1000'])
+            stats = pool.stats()
+            shared_cache.close()
+
+        self.assertTrue(
+            stats['parsers'] == 2 and
+            stats['cache']['misses'] == len(ADDRESSES) + 1 and
+            stats['cache']['len'] == len(ADDRESSES) + 1 and
+            stats['shared_cache'] == {'hits': len(ADDRESSES),
+                                      'misses': len(ADDRESSES) + 1}, stats)
+
+    def test_stats_logged(self):
+        """Los contadores del pool deberían ser registrados en el log al
+        finalizar una request que parseó direcciones."""
+        self.set_msearch_results([])
+
+        with self.assertLogs('georef', 'DEBUG') as logs:
+            self.get_response(endpoint='/api/direcciones',
+                              entity='direcciones',
+                              params={'direccion': 'Santa Fe 1050'})
+
+        self.assertTrue(any('Parsers de direcciones' in line
+                            for line in logs.output), logs.output)
+
+
+class AddressBulkParamsTest(GeorefMockTest):
+    def test_bulk_parse_many(self):
+        """Las direcciones de una request POST deberían ser parseadas en
+        lote, manteniendo un resultado por consulta."""
+        body = {'direcciones': [{'direccion': address}
+                                for address in ADDRESSES]}
+
+        with mock.patch.object(params.AddressParameter, '_parse_value') as \
+                parse_value:
+            results = params.PARAMS_ADDRESSES.parse_post_params(
+                {}, body, 'direcciones')
+
+        self.assertTrue(
+            not parse_value.called and
+            to_dicts(result.values['direccion'] for result in results) ==
+            to_dicts(AddressParser().parse(address)
+                     for address in ADDRESSES))
+
+    def test_bulk_errors_preserved(self):
+        """Los errores de cada consulta deberían ser reportados en su
+        posición original."""
+        body = {'direcciones': [
+            {'direccion': 'Santa Fe 1050'},
+            {'direccion': ''},
+            {'direccion': 'Santa Fe 1050', 'foo': 'bar'},
+            {'direccion': 'Callao 20'}
+        ]}
+
+        with self.assertRaises(ParametersParseException) as context:
+            params.PARAMS_ADDRESSES.parse_post_params({}, body,
+                                                      'direcciones')
+
+        errors = context.exception.errors
+        self.assertTrue(len(errors) == 4 and
+                        not errors[0] and not errors[3] and
+                        list(errors[1]) == ['direccion'] and
+                        list(errors[2]) == ['foo'])
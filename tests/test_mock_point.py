@@ -1,3 +1,5 @@
+from unittest import mock
+from service import geometry
 from service.geometry import Point
 from . import GeorefMockTest
 
@@ -31,3 +33,69 @@ class PointTest(GeorefMockTest):
         midpoint = p1.midpoint(p2)
         self.assertAlmostEqual(midpoint.lat, 5)
         self.assertAlmostEqual(midpoint.lon, 5)
+
+
+class PointBatchTest(GeorefMockTest):
+    def test_distances(self):
+        """Las distancias calculadas para listas de puntos deberían ser
+        iguales a las calculadas para cada par de puntos."""
+        points_a = [p1 for p1, _, _ in DISTANCES]
+        points_b = [p2 for _, p2, _ in DISTANCES]
+        distances = geometry.approximate_distances_meters(points_a, points_b)
+
+        for p1, p2, distance in zip(points_a, points_b, distances):
+            self.assertAlmostEqual(distance,
+                                   p1.approximate_distance_meters(p2))
+
+    def test_distance_matrix(self):
+        """La matriz de distancias debería contener la distancia entre cada
+        par de puntos."""
+        points = [POINT_1, POINT_2, POINT_3]
+        matrix = geometry.approximate_distance_matrix_meters(points,
+                                                             points[:2])
+
+        self.assertEqual([len(row) for row in matrix], [2, 2, 2])
+        for i, p1 in enumerate(points):
+            for j, p2 in enumerate(points[:2]):
+                self.assertAlmostEqual(matrix[i][j],
+                                       p1.approximate_distance_meters(p2))
+
+    def test_midpoints(self):
+        """Los puntos medios calculados para listas de puntos deberían ser
+        iguales a los calculados para cada par de puntos."""
+        points = geometry.midpoints([POINT_1, POINT_2], [POINT_3, POINT_1])
+        expected = [POINT_1.midpoint(POINT_3), POINT_2.midpoint(POINT_1)]
+
+        self.assertListEqual([p.to_json_location() for p in points],
+                             [p.to_json_location() for p in expected])
+
+    def test_geojson_circles(self):
+        """Los círculos construidos a partir del círculo precalculado
+        deberían ser idénticos a los generados por Shapely."""
+        points = [POINT_1, POINT_2, POINT_3, Point(0, 0)]
+
+        for radius in [1, 50, 100, 1000]:
+            self.assertListEqual(
+                geometry.geojson_circles(points, radius),
+                [point.to_geojson_circle(radius) for point in points])
+
+    def test_empty(self):
+        """Las operaciones sobre listas vacías deberían devolver listas
+        vacías."""
+        self.assertTrue(
+            geometry.approximate_distances_meters([], []) == [] and
+            geometry.approximate_distance_matrix_meters([], []) == [] and
+            geometry.midpoints([], []) == [] and
+            geometry.geojson_circles([], 100) == [])
+
+    def test_without_numpy(self):
+        """Si NumPy no está instalado, se deberían utilizar los métodos de
+        'Point'."""
+        with mock.patch.object(geometry, 'numpy', None):
+            circles = geometry.geojson_circles([POINT_1], 100)
+            distances = geometry.approximate_distances_meters([POINT_1],
+                                                              [POINT_2])
+
+        self.assertTrue(
+            circles == [POINT_1.to_geojson_circle(100)] and
+            distances == [POINT_1.approximate_distance_meters(POINT_2)])
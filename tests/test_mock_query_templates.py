@@ -0,0 +1,81 @@
+import copy
+import json
+from unittest import mock
+from service import data, query_templates
+from service.query_templates import CompiledSearch
+from . import GeorefMockTest
+
+GEOM = {'type': 'Point', 'coordinates': [-58.4, -34.6]}
+
+QUERIES = [
+    (data.StatesSearch, {'ids': ['02', '06'], 'fields': ('id', 'nombre'),
+                         'size': 3}),
+    (data.StatesSearch, {'name': 'bue', 'order': 'nombre', 'offset': 5}),
+    (data.StatesSearch, {'name': 'buenos aires', 'exact': False}),
+    (data.StatesSearch, {'name': 'buenos aires', 'exact': True}),
+    (data.DepartmentsSearch, {'name': 'capital', 'state': ['02'],
+                              'fields': ['id', 'geometria']}),
+    (data.DepartmentsSearch, {'state': (['02'], 'cordoba'), 'name': 'cap'}),
+    (data.DepartmentsSearch, {'state': 'cordoba', 'order': 'id',
+                              'geo_shape_geoms': [GEOM, GEOM],
+                              'geo_shape_relation': 'contains'}),
+    (data.LocalitiesSearch, {'municipality': ['060007'], 'department': 'x',
+                             'census_locality': (['06'], 'abcd'),
+                             'ids': []}),
+    (data.StreetsSearch, {'name': 'santa fe', 'category': 'AV',
+                          'state': ['02'],
+                          'department': (['02007'], 'comuna 1')}),
+    (data.IntersectionsSearch, {'ids': (['a', 'b'], ['c']),
+                                'geo_shape_geoms': [GEOM], 'state': ['02'],
+                                'department': 'xx'}),
+    (data.StreetBlocksSearch, {'name': 'corrientes', 'number': 1234,
+                               'state': 'buenos', 'order': 'nombre'}),
+    (data.StreetBlocksSearch, {'name': 'co', 'number': 0,
+                               'census_locality': ['02']})
+]
+
+
+def dsl_search(search_class, query):
+    with mock.patch('service.constants.ES_COMPILED_QUERIES', False):
+        return search_class(copy.deepcopy(query))
+
+
+class QueryTemplatesTest(GeorefMockTest):
+    def test_identical_bodies(self):
+        """Los cuerpos de búsquedas construidos a partir de templates deberían
+        ser idénticos (byte a byte) a los construidos con
+        elasticsearch_dsl."""
+        for search_class, query in QUERIES:
+            # Construir dos veces: al crear el template, y al reutilizarlo
+            for _ in range(2):
+                compiled = search_class(copy.deepcopy(query))
+                dsl = dsl_search(search_class, query)
+
+                self.assertEqual(
+                    json.dumps(compiled._search.to_dict()),
+                    json.dumps(dsl._search.to_dict()),
+                    (search_class.__name__, query))
+
+    def test_template_reused(self):
+        """Búsquedas con la misma forma deberían utilizar el mismo
+        template."""
+        query_templates._templates.clear()
+        data.StatesSearch({'ids': ['02'], 'name': 'buenos aires'})
+        data.StatesSearch({'ids': ['06', '10'], 'name': 'catamarca'})
+        data.StatesSearch({'ids': ['06'], 'name': 'jujuy', 'exact': True})
+
+        self.assertEqual(len(query_templates._templates), 2)
+
+    def test_dsl_switch(self):
+        """Con ES_COMPILED_QUERIES desactivado, las búsquedas deberían ser
+        construidas con elasticsearch_dsl."""
+        search = dsl_search(data.StatesSearch, {'ids': ['02']})
+        self.assertNotIsInstance(search._search, CompiledSearch)
+
+    def test_geo_shape_ids_uses_dsl(self):
+        """Las búsquedas con 'geo_shape_ids' deberían ser construidas con
+        elasticsearch_dsl, ya que son modificadas luego de validar los
+        IDs."""
+        search = data.StreetsSearch({'geo_shape_ids': {'provincias': ['02']},
+                                     'name': 'santa fe'})
+        self.assertNotIsInstance(search._search, CompiledSearch)
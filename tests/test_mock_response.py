@@ -1,7 +1,16 @@
-from service import formatter
+import json
+from unittest import mock
+from service import app, formatter
 from . import GeorefMockTest
 
 
+STATE = {
+    'id': '02',
+    'nombre': 'Ciudad Autónoma de Buenos Aires',
+    'centroide': {'lat': -34.6144934119689, 'lon': -58.4458563545429}
+}
+
+
 class ResponsesTest(GeorefMockTest):
     def setUp(self):
         super().setUp()
@@ -87,3 +96,71 @@ class ResponsesTest(GeorefMockTest):
         xml_params = xml_resp.find('resultado').find('parametros')
 
         self.assert_xml_equal(json_as_xml, xml_params)
+
+    def post_states(self, queries):
+        self.set_msearch_results([STATE])
+        return self.app.post('/api/provincias', json={
+            'provincias': queries
+        })
+
+    def test_bulk_response_streamed(self):
+        """Las respuestas bulk deberían ser enviadas de forma incremental, y
+        su contenido debería ser idéntico al de codificar la respuesta
+        completa."""
+        resp = self.post_states([
+            {'id': '02'}, {'id': '02', 'aplanar': True},
+            {'nombre': 'ciudad', 'campos': 'completo'}
+        ])
+        expected = json.dumps(json.loads(resp.data), sort_keys=True,
+                              ensure_ascii=False, separators=(',', ':'))
+
+        # Las respuestas incrementales no especifican su largo.
+        self.assertTrue('Content-Length' not in resp.headers and
+                        resp.data == (expected + '\n').encode() and
+                        len(resp.json['resultados']) == 3)
+
+    def test_bulk_response_pretty_print(self):
+        """Las respuestas bulk con indentación deberían ser iguales a las
+        respuestas enviadas de forma incremental."""
+        queries = [{'id': '02'}, {'nombre': 'ciudad', 'aplanar': True}]
+        streamed = self.post_states(queries)
+
+        with mock.patch.dict(app.config,
+                             {'JSONIFY_PRETTYPRINT_REGULAR': True}):
+            pretty = self.post_states(queries)
+
+        self.assertTrue('Content-Length' in pretty.headers and
+                        b'\n  "resultados": [' in pretty.data and
+                        pretty.json == streamed.json)
+
+    def get_states(self, params):
+        self.set_msearch_results([STATE])
+        return self.app.get('/api/provincias', query_string=params)
+
+    def test_ndjson_response(self):
+        """Las respuestas NDJSON deberían contener una entidad por línea,
+        idéntica a las entidades de la respuesta JSON."""
+        params = {'nombre': 'ciudad', 'campos': 'id, centroide',
+                  'aplanar': True}
+        json_resp = self.get_states(params)
+        ndjson_resp = self.get_states(dict(params, formato='ndjson'))
+
+        lines = ndjson_resp.data.decode().splitlines()
+        self.assertTrue(ndjson_resp.mimetype == 'application/x-ndjson' and
+                        'Content-Length' not in ndjson_resp.headers and
+                        ndjson_resp.data.endswith(b'\n') and
+                        [json.loads(line) for line in lines] ==
+                        json_resp.json['provincias'])
+
+    def test_ndjson_response_fields(self):
+        """Las respuestas NDJSON deberían respetar los parámetros 'campos' y
+        'aplanar'."""
+        resp = self.get_states({'id': '02', 'campos': 'id, centroide',
+                                'aplanar': True, 'formato': 'ndjson'})
+
+        self.assertDictEqual(json.loads(resp.data), {
+            'id': '02',
+            'nombre': 'Ciudad Autónoma de Buenos Aires',
+            'centroide_lat': -34.6144934119689,
+            'centroide_lon': -58.4458563545429
+        })
@@ -0,0 +1,103 @@
+from unittest import mock
+from flask import current_app
+from service import app
+from service.query_templates import CompiledSearch
+from service.search_cache import LRUStorage
+from . import GeorefMockTest
+
+CACHE_CONFIG = {
+    'ES_CACHE_STORAGE': 'lru',
+    'ES_CACHE_SIZE': 10,
+    'ES_CACHE_TTL': 300,
+    'ES_CACHE_VERSION_TTL': 0
+}
+
+
+class SearchCacheTest(GeorefMockTest):
+    def setUp(self):
+        super().setUp()
+        self.set_msearch_results([{'id': '02', 'nombre': 'CABA'}])
+        self.es.return_value.indices = mock.MagicMock()
+        self.set_alias_index('provincias-a1b2c3d4-1')
+
+    def tearDown(self):
+        with app.app_context():
+            if hasattr(current_app, 'search_cache'):
+                delattr(current_app, 'search_cache')
+
+        super().tearDown()
+
+    def set_alias_index(self, index):
+        self.es.return_value.indices.get_alias.return_value = {
+            index: {'aliases': {'provincias': {}}}
+        }
+
+    def get_states(self, params=None):
+        return self.get_response(endpoint='/api/provincias',
+                                 entity='provincias',
+                                 params=params or {'id': '02'})
+
+    def test_lru_max_len(self):
+        """El almacenamiento LRU nunca debería tener más entradas que
+        'size'."""
+        storage = LRUStorage(2)
+        storage.set_many([(str(i), str(i)) for i in range(5)], 10)
+
+        self.assertTrue(len(storage) == 2 and
+                        storage.get_many(['0', '4']) == [None, '4'])
+
+    def test_lru_ttl(self):
+        """Las entradas expiradas no deberían ser devueltas."""
+        storage = LRUStorage(2)
+        storage.set_many([('a', 'a')], 10)
+
+        with mock.patch('time.monotonic', return_value=1e12):
+            self.assertEqual(storage.get_many(['a']), [None])
+
+    def test_cached_response(self):
+        """Una búsqueda repetida no debería ser enviada a Elasticsearch, y
+        debería devolver el mismo resultado."""
+        with mock.patch.dict(app.config, CACHE_CONFIG):
+            resp_a = self.get_states()
+            resp_b = self.get_states()
+
+        self.assertTrue(self.es.return_value.msearch.call_count == 1 and
+                        resp_a == resp_b, resp_b)
+
+    def test_body_built_once(self):
+        """El cuerpo de cada búsqueda debería ser generado una sola vez, tanto
+        para el cache como para la búsqueda MultiSearch."""
+        with mock.patch.dict(app.config, CACHE_CONFIG), \
+                mock.patch.object(CompiledSearch, 'to_dict', autospec=True,
+                                  side_effect=CompiledSearch.to_dict
+                                  ) as to_dict:
+            self.get_states()
+
+        self.assertTrue(self.es.return_value.msearch.call_count == 1 and
+                        to_dict.call_count == 1)
+
+    def test_different_search_not_cached(self):
+        """Búsquedas distintas deberían ser enviadas a Elasticsearch."""
+        with mock.patch.dict(app.config, CACHE_CONFIG):
+            self.get_states({'id': '02'})
+            self.get_states({'id': '06'})
+
+        self.assertEqual(self.es.return_value.msearch.call_count, 2)
+
+    def test_new_index_invalidates(self):
+        """Si el alias referencia a un nuevo índice, las respuestas
+        almacenadas no deberían ser utilizadas."""
+        with mock.patch.dict(app.config, CACHE_CONFIG):
+            self.get_states()
+            self.set_alias_index('provincias-e5f6a7b8-2')
+            self.get_states()
+
+        self.assertEqual(self.es.return_value.msearch.call_count, 2)
+
+    def test_cache_disabled(self):
+        """Sin ES_CACHE_STORAGE, todas las búsquedas deberían ser enviadas a
+        Elasticsearch."""
+        self.get_states()
+        self.get_states()
+
+        self.assertEqual(self.es.return_value.msearch.call_count, 2)
@@ -0,0 +1,87 @@
+from unittest import mock
+from georef_ar_address import AddressParser
+from service import app, serializer
+from . import GeorefMockTest
+
+STATE = {
+    'id': '02',
+    'nombre': 'Ciudad Autónoma de Buenos Aires',
+    'centroide': {'lat': -34.6144934119689, 'lon': -58.4458563545429}
+}
+
+
+class SerializerTest(GeorefMockTest):
+    def get_body(self, backend, **kwargs):
+        # Los resultados son modificados al generar cada respuesta.
+        self.set_msearch_results([STATE])
+
+        with mock.patch('service.constants.JSON_SERIALIZER', backend):
+            return self.get_response(return_value='raw', **kwargs)
+
+    def test_single_identical_output(self):
+        """Ambos backends deberían generar respuestas JSON idénticas."""
+        kwargs = {'endpoint': '/api/provincias', 'entity': 'provincias',
+                  'params': {'id': '02', 'campos': 'completo'}}
+
+        self.assertEqual(self.get_body('json', **kwargs),
+                         self.get_body('orjson', **kwargs))
+
+    def test_bulk_identical_output(self):
+        """Ambos backends deberían generar respuestas JSON bulk
+        idénticas."""
+        kwargs = {'endpoint': '/api/provincias', 'method': 'POST',
+                  'body': {'provincias': [{'id': '02', 'aplanar': True}]}}
+
+        self.assertEqual(self.get_body('json', **kwargs),
+                         self.get_body('orjson', **kwargs))
+
+    def test_geojson_identical_output(self):
+        """Ambos backends deberían generar respuestas GeoJSON idénticas."""
+        kwargs = {'endpoint': '/api/provincias', 'entity': 'provincias',
+                  'params': {'id': '02', 'formato': 'geojson'}}
+
+        self.assertEqual(self.get_body('json', **kwargs),
+                         self.get_body('orjson', **kwargs))
+
+    def test_address_data_and_sets(self):
+        """Ambos backends deberían poder codificar valores de tipo
+        'AddressData' y 'set'."""
+        value = {
+            'direccion': AddressParser().parse('Corrientes 1234'),
+            'campos': {'id'}
+        }
+
+        with app.test_request_context():
+            contents = [
+                serializer.dumps(value, backend)
+                for backend in serializer.BACKENDS
+            ]
+
+        self.assertTrue(contents[0] == contents[1] and
+                        b'"calles":["Corrientes"]' in contents[0])
+
+    def test_exponent_floats(self):
+        """Ambos backends deberían codificar de forma idéntica los números de
+        punto flotante con exponente."""
+        value = {'lat': -1e-7, 'lon': 1e16, 'valores': [1.5e-5, 2.5e20]}
+
+        with app.test_request_context():
+            contents = [
+                serializer.dumps(value, backend)
+                for backend in serializer.BACKENDS
+            ]
+            response = serializer.json_response(value, 'orjson')
+
+        self.assertTrue(contents[0] == contents[1] and
+                        b'"lat":-1e-07' in contents[0] and
+                        response.get_data() == contents[0] + b'\n',
+                        contents)
+
+    def test_ascii_fallback(self):
+        """Si JSON_AS_ASCII está activado, se debería utilizar el backend
+        'json'."""
+        with mock.patch.dict(app.config, {'JSON_AS_ASCII': True}):
+            with app.test_request_context():
+                backend = serializer.get_backend('orjson')
+
+        self.assertEqual(backend, 'json')
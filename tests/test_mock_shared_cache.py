@@ -0,0 +1,123 @@
+import os
+import multiprocessing
+import tempfile
+from unittest import mock
+from georef_ar_address import AddressParser
+from service import params, shared_cache
+from service.shared_cache import SharedAddressCache, SharedCache
+from . import GeorefMockTest
+
+
+def store_address(path, address):
+    cache = SharedAddressCache(path, 16)
+    cache.store(address, AddressParser().parse(address))
+    cache.close()
+
+
+class SharedCacheTest(GeorefMockTest):
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'cache')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        super().tearDown()
+
+    def test_set_get(self):
+        """Los valores almacenados deberían poder ser leídos desde otra
+        instancia que utilice el mismo archivo."""
+        writer = SharedCache(self.path, 16)
+        writer.set('foo', 'bar')
+        reader = SharedCache(self.path, 16)
+
+        self.assertTrue(reader.get('foo') == 'bar' and
+                        reader.get('baz') is None and
+                        reader.hits == 1 and reader.misses == 1)
+
+    def test_resized_table_reset(self):
+        """Si la cantidad de slots cambia, la tabla debería ser
+        reinicializada."""
+        SharedCache(self.path, 16).set('foo', 'bar')
+        self.assertIsNone(SharedCache(self.path, 32).get('foo'))
+
+    def test_slot_replaced(self):
+        """Si todos los slots de una clave están ocupados, se debería
+        reemplazar uno de ellos sin perder la integridad de la tabla."""
+        cache = SharedCache(self.path, 2)
+        for i in range(10):
+            cache.set('key{}'.format(i), str(i))
+
+        values = [cache.get('key{}'.format(i)) for i in range(10)]
+        self.assertTrue(
+            len([value for value in values if value is not None]) <= 2 and
+            values[9] == '9' and
+            all(value in (None, str(i)) for i, value in enumerate(values)))
+
+    def test_value_too_long(self):
+        """Los valores que no entran en un slot no deberían ser
+        almacenados."""
+        cache = SharedCache(self.path, 16)
+
+        self.assertTrue(not cache.set('foo', 'x' * shared_cache.SLOT_SIZE) and
+                        cache.get('foo') is None)
+
+    def test_slot_being_written(self):
+        """No se deberían leer slots que están siendo escritos."""
+        cache = SharedCache(self.path, 1)
+        cache.set('foo', 'bar')
+        offset = shared_cache._FILE_HEADER.size
+        seq = shared_cache._SEQ.unpack_from(cache._mmap, offset)[0]
+        shared_cache._SEQ.pack_into(cache._mmap, offset, seq + 1)
+
+        self.assertIsNone(cache.get('foo'))
+
+    def test_write_lock_busy(self):
+        """Si otro proceso está escribiendo, la escritura se debería
+        omitir."""
+        cache = SharedCache(self.path, 16)
+        with mock.patch('fcntl.flock', side_effect=BlockingIOError):
+            stored = cache.set('foo', 'bar')
+
+        self.assertTrue(not stored and cache.get('foo') is None)
+
+    def test_cross_process(self):
+        """Las direcciones almacenadas por un proceso deberían poder ser
+        leídas por otro proceso."""
+        address = 'Santa Fe 1050 2° B'
+        process = multiprocessing.get_context('fork').Process(
+            target=store_address, args=(self.path, address))
+        process.start()
+        process.join()
+
+        found, address_data = SharedAddressCache(self.path, 16).lookup(
+            address)
+        self.assertTrue(
+            found and
+            address_data.to_dict() == AddressParser().parse(address).to_dict())
+
+    def test_empty_result(self):
+        """Se deberían almacenar los resultados vacíos del parser."""
+        cache = SharedAddressCache(self.path, 16)
+        cache.store('???', None)
+
+        self.assertEqual(cache.lookup('???'), (True, None))
+
+    def test_address_parameter(self):
+        """El parámetro de direcciones debería utilizar el cache compartido
+        si está configurado."""
+        cache = SharedAddressCache(self.path, 16)
+        cache.store('Santa Fe 1050', AddressParser().parse('Callao 20'))
+
+        with mock.patch.multiple(
+                'service.constants',
+                ADDRESS_PARSER_SHARED_CACHE_PATH=self.path,
+                ADDRESS_PARSER_SHARED_CACHE_LEN=16):
+            param = params.AddressParameter()
+
+        address_data = param.get_value('Santa Fe 1050')
+        other = param.get_value('Riobamba 30')
+
+        self.assertTrue(address_data.street_names == ['Callao'] and
+                        cache.lookup('Riobamba 30')[0] and
+                        other.street_names == ['Riobamba'])
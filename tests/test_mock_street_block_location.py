@@ -0,0 +1,92 @@
+from unittest import mock
+from service import geometry
+from . import GeorefMockTest
+
+DOOR_NUMS = {
+    'inicio': {'derecha': 1000, 'izquierda': 1001},
+    'fin': {'derecha': 1100, 'izquierda': 1101}
+}
+
+EMPTY_DOOR_NUMS = {
+    'inicio': {'derecha': 0, 'izquierda': 0},
+    'fin': {'derecha': 0, 'izquierda': 0}
+}
+
+BLOCKS = [
+    # Un tramo
+    [[[0, 0], [0, 4], [3, 4]]],
+    # Dos tramos conectados y ordenados
+    [[[0, 0], [2, 0]], [[2, 0], [2, 2], [4, 2]]],
+    # Dos tramos conectados y no ordenados
+    [[[2, 0], [2, 2]], [[0, 0], [2, 0]]],
+    # Dos tramos conectados con el segundo invertido
+    [[[0, 0], [2, 0]], [[4, 0], [2, 0]]],
+    # Tramos no conectados
+    [[[0, 0], [1, 0]], [[5, 5], [6, 6]]],
+    # Tres tramos formando un anillo
+    [[[0, 0], [1, 0]], [[1, 0], [1, 1]], [[1, 1], [0, 0]]]
+]
+
+
+def multilinestring(coordinates):
+    return {'type': 'MultiLineString', 'coordinates': coordinates}
+
+
+class StreetBlockLocationTest(GeorefMockTest):
+    def assert_same_locations(self, door_nums, number, approximate):
+        blocks = [(multilinestring(coords), door_nums) for coords in BLOCKS]
+        expected = [
+            geometry.street_block_number_location(geom, nums, number,
+                                                  approximate)
+            for geom, nums in blocks
+        ]
+        points = geometry.street_block_number_locations(blocks, number,
+                                                        approximate)
+
+        self.assertEqual(len(points), len(expected))
+        for point, expected_point in zip(points, expected):
+            if expected_point is None:
+                self.assertIsNone(point)
+            else:
+                self.assertAlmostEqual(point.lon, expected_point.lon)
+                self.assertAlmostEqual(point.lat, expected_point.lat)
+
+    def test_interpolation(self):
+        """Las posiciones calculadas para una lista de cuadras deberían ser
+        iguales a las calculadas para cada cuadra individualmente."""
+        for number in [1000, 1025, 1050, 1100, 1001, 1077]:
+            self.assert_same_locations(DOOR_NUMS, number, False)
+
+    def test_approximate(self):
+        """Si la altura no puede ser interpolada, se debería devolver el
+        centroide de cada cuadra, igual que para cada cuadra
+        individualmente."""
+        self.assert_same_locations(DOOR_NUMS, None, True)
+        self.assert_same_locations(EMPTY_DOOR_NUMS, 0, True)
+
+    def test_not_approximate(self):
+        """Si la altura no puede ser interpolada y no se permiten estimados,
+        no se deberían devolver posiciones."""
+        self.assert_same_locations(DOOR_NUMS, None, False)
+        self.assert_same_locations(EMPTY_DOOR_NUMS, 0, False)
+
+    def test_interpolated_point(self):
+        """La altura debería ser interpolada sobre el largo de la cuadra."""
+        point, = geometry.street_block_number_locations(
+            [(multilinestring(BLOCKS[0]), DOOR_NUMS)], 1050)
+
+        self.assertAlmostEqual(point.lon, 0)
+        self.assertAlmostEqual(point.lat, 3.5)
+
+    def test_without_numpy(self):
+        """Si NumPy no está instalado, se deberían calcular las posiciones de
+        cada cuadra individualmente."""
+        with mock.patch.object(geometry, 'numpy', None):
+            self.assert_same_locations(DOOR_NUMS, 1050, True)
+
+    def test_invalid_geometry(self):
+        """Se debería lanzar un error si alguna geometría no es de tipo
+        MultiLineString."""
+        with self.assertRaises(TypeError):
+            geometry.street_block_number_locations(
+                [({'type': 'Point', 'coordinates': [0, 0]}, DOOR_NUMS)], 1050)